@@ -21,12 +21,22 @@ from typing import Any, Dict, List, Optional
 
 import httpx
 import uvicorn
-from fastapi import Depends, FastAPI, HTTPException, Request, Security
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Security
 from fastapi.responses import StreamingResponse
 from fastapi.security import APIKeyHeader
 from langsmith import traceable
+from lib.approval_dispatcher import ApprovalDispatcher
 from lib.command_parser import get_help_text, looks_like_task_request, parse_command
-from lib.event_bus import Event, get_event_bus
+from lib.dag_scheduler import (
+    DAGScheduler,
+    DependencyCycleError,
+    NodeOutcome,
+    topological_levels,
+)
+from lib.db_pool import get_pool_registry
+from lib.durable_registry import DurableRegistry, create_registry_store
+from lib.error_pattern_memory import close_embedding_worker, get_error_pattern_memory
+from lib.event_bus import DeliveryOptions, Event, OverflowPolicy, get_event_bus
 from lib.github_permalink_generator import enrich_markdown_with_permalinks_stateless
 from lib.guardrail import GuardrailOrchestrator, GuardrailReport, GuardrailStatus
 from lib.hitl_manager import get_hitl_manager
@@ -117,11 +127,12 @@ async def evaluate_intent_accuracy(
 from lib.langgraph_base import (
     BaseAgentState,
     create_workflow_config,
-    get_postgres_checkpointer,
+    get_async_postgres_checkpointer,
 )
 from lib.linear_client import get_linear_client
 from lib.linear_project_manager import get_project_manager
 from lib.llm_client import LLMClient, get_llm_client
+from lib.llm_providers import shared_embeddings
 from lib.mcp_client import MCPClient, resolve_manifest_path
 from lib.mcp_discovery import get_mcp_discovery
 from lib.mcp_tool_client import get_mcp_tool_client
@@ -140,6 +151,7 @@ from lib.qdrant_client import get_qdrant_client
 from lib.registry_client import AgentCapability, RegistryClient
 from lib.risk_assessor import get_risk_assessor
 from lib.session_manager import get_session_manager
+from lib.sse_stream import SSEStream, sse_frame
 from prometheus_client import Counter, Histogram
 
 try:
@@ -280,95 +292,76 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"⚠️  Failed to connect to Event Bus: {e}")
 
-    # Start HITL approval polling task (fallback for missed webhooks)
-    import asyncio
-    import random
-
-    # Sampling rate for HITL polling traces (0.1 = 10% of traces logged)
-    HITL_POLLING_SAMPLE_RATE = float(os.getenv("HITL_POLLING_SAMPLE_RATE", "0.1"))
-
-    async def poll_pending_approvals():
-        """Fallback: runs every 30s to catch missed webhooks.
-
-        Uses LangSmith sampling to reduce trace volume for background polling.
-        Only HITL_POLLING_SAMPLE_RATE (default 10%) of polls are traced.
-        """
-        while True:
-            try:
-                await asyncio.sleep(30)  # Poll every 30 seconds
-
-                # Sampling: only trace a fraction of polling iterations
-                should_trace = random.random() < HITL_POLLING_SAMPLE_RATE
+    # Attach the async PostgreSQL checkpointer to the shared compiled graph
+    global checkpointer
+    try:
+        from graph import configure_checkpointer
 
-                async with await hitl_manager._get_connection() as conn:
-                    async with conn.cursor() as cursor:
-                        # Find approved requests that haven't been resumed yet
-                        await cursor.execute(
-                            """
-                            SELECT id, thread_id, checkpoint_id, workflow_id
-                            FROM approval_requests 
-                            WHERE status = 'approved' AND resumed_at IS NULL
-                            AND updated_at > NOW() - INTERVAL '5 minutes'
-                            """
-                        )
-                        pending = await cursor.fetchall()
+        checkpointer = await get_async_postgres_checkpointer()
+        configure_checkpointer(checkpointer)
+        logger.info("✅ LangGraph async PostgreSQL checkpointer initialized")
+    except Exception as e:
+        checkpointer = None
+        logger.warning(f"⚠️  LangGraph checkpointer not available: {e}")
+
+    # Create the registry table if missing, then drop expired entries from the shared store
+    for registry in (task_registry, pending_approval_registry):
+        await registry.aensure_schema()
+        pruned = await registry.aprune()
+        if pruned:
+            logger.info(f"🧹 Pruned {pruned} expired {registry.name} registry entries")
+
+    # Serve the cached MCP catalog immediately and refresh it in the background
+    mcp_discovery.start_background_refresh()
+
+    # Warm the error pattern cache with the most-used patterns (Tier 0 reads it)
+    pattern_prefetch_task = asyncio.create_task(
+        get_error_pattern_memory().prefetch_top_patterns()
+    )
 
-                        # Log poll results only when sampled (reduces log volume)
-                        if should_trace and pending:
-                            logger.debug(
-                                f"[HITL Polling] Sampled poll found {len(pending)} pending approvals"
-                            )
+    # Resume workflows as soon as their approval is decided (NOTIFY + sweep)
+    try:
+        await approval_dispatcher.start()
+        logger.info("✅ Started HITL approval dispatcher")
+    except Exception as e:
+        logger.warning(f"⚠️  Failed to start HITL approval dispatcher: {e}")
 
-                        for req_id, thread_id, checkpoint_id, workflow_id in pending:
-                            # Always log actual resumptions (important events)
-                            logger.info(
-                                f"[HITL Polling] Found unresumed approval: {req_id}"
-                            )
-                            try:
-                                from graph import app as workflow_app
-                                from langchain_core.messages import HumanMessage
+    # Expire lapsed approval requests (records the timeouts and frees the backlog)
+    hitl_manager.start_expiry_sweep()
 
-                                if thread_id:
-                                    config = {"configurable": {"thread_id": thread_id}}
-                                    resume_message = HumanMessage(
-                                        content="HITL approval granted (via polling). Resuming workflow."
-                                    )
+    yield
 
-                                    await workflow_app.ainvoke(  # type: ignore
-                                        {"messages": [resume_message]},
-                                        config=config,
-                                    )
+    # Shutdown: Stop warming the error pattern cache
+    pattern_prefetch_task.cancel()
+    await asyncio.gather(pattern_prefetch_task, return_exceptions=True)
 
-                                    # Mark as resumed
-                                    await cursor.execute(
-                                        "UPDATE approval_requests SET resumed_at = NOW() WHERE id = %s",
-                                        (req_id,),
-                                    )
-                                    await conn.commit()
-                                    logger.info(
-                                        f"[HITL Polling] Resumed workflow for {req_id}"
-                                    )
-                            except Exception as e:
-                                logger.error(
-                                    f"[HITL Polling] Failed to resume {req_id}: {e}"
-                                )
+    # Shutdown: Stop the approval dispatcher (waits for in-flight resumptions)
+    await hitl_manager.stop_expiry_sweep()
+    await approval_dispatcher.stop()
+    logger.info("🛑 Stopped HITL approval dispatcher")
 
-            except Exception as e:
-                logger.error(f"[HITL Polling] Error in polling loop: {e}")
+    # Shutdown: Flush queued notifications and disconnect the event bus
+    try:
+        await event_bus.close()
+        logger.info("🛑 Closed event bus")
+    except Exception as e:
+        logger.warning(f"⚠️  Failed to close event bus: {e}")
 
-    # Start polling task in background
-    hitl_polling_task = asyncio.create_task(poll_pending_approvals())
-    logger.info("✅ Started HITL approval polling task")
+    # Shutdown: Stop MCP catalog refresh
+    await mcp_discovery.stop_background_refresh()
 
-    yield
+    # Shutdown: Write queued memory telemetry while MCP sessions are still open
+    try:
+        await mcp_tool_client.close()
+    except Exception as e:
+        logger.warning(f"⚠️  Failed to flush memory telemetry: {e}")
 
-    # Shutdown: Cancel polling task
-    hitl_polling_task.cancel()
+    # Shutdown: Close persistent MCP server sessions
     try:
-        await hitl_polling_task
-    except asyncio.CancelledError:
-        pass
-    logger.info("🛑 Stopped HITL approval polling task")
+        await mcp_tool_client.session_pool.close()
+        logger.info("🛑 Closed MCP session pool")
+    except Exception as e:
+        logger.warning(f"⚠️  Failed to close MCP session pool: {e}")
 
     # Shutdown: Stop heartbeat
     try:
@@ -378,6 +371,41 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"⚠️  Failed to unregister from agent registry: {e}")
 
+    # Shutdown: Persist queued chat messages before the pools close
+    try:
+        await session_manager.close()
+    except Exception as e:
+        logger.warning(f"⚠️  Failed to flush chat messages: {e}")
+
+    # Shutdown: Disconnect the task and approval registry stores
+    for registry in (task_registry, pending_approval_registry):
+        try:
+            await registry.aclose()
+        except Exception as e:
+            logger.warning(f"⚠️  Failed to close {registry.name} registry: {e}")
+
+    # Shutdown: Write buffered checkpoint writes and stop pruning
+    if checkpointer is not None:
+        try:
+            await checkpointer.aclose()
+            logger.info("🛑 Closed LangGraph checkpointer")
+        except Exception as e:
+            logger.warning(f"⚠️  Failed to close LangGraph checkpointer: {e}")
+
+    # Shutdown: Encode pending error embeddings and stop the worker thread
+    try:
+        await close_embedding_worker()
+        logger.info("🛑 Closed embedding worker")
+    except Exception as e:
+        logger.warning(f"⚠️  Failed to close embedding worker: {e}")
+
+    # Shutdown: Close shared database pools last (components only borrow them)
+    try:
+        await get_pool_registry().close_all()
+        logger.info("🛑 Closed database pools")
+    except Exception as e:
+        logger.warning(f"⚠️  Failed to close database pools: {e}")
+
 
 # =============================================================================
 # API KEY AUTHENTICATION
@@ -491,7 +519,10 @@ linear_client = get_linear_client()
 mcp_tool_client = get_mcp_tool_client("orchestrator")
 
 # Progressive MCP loader for token-optimized tool disclosure
-progressive_loader = get_progressive_loader(mcp_client, mcp_discovery)
+# (embeddings enable the EMBEDDING strategy; None falls back to progressive)
+progressive_loader = get_progressive_loader(
+    mcp_client, mcp_discovery, embeddings=shared_embeddings
+)
 
 # Risk evaluation + HITL orchestration
 risk_assessor = get_risk_assessor()
@@ -522,13 +553,27 @@ registry_client: Optional[RegistryClient] = None
 RAG_SERVICE_URL = os.getenv("RAG_SERVICE_URL", "http://rag-context:8007")
 RAG_TIMEOUT = int(os.getenv("RAG_TIMEOUT", "10"))
 
+# Subtasks whose tools are loaded and checked at once during planning
+TOOL_VALIDATION_CONCURRENCY = max(
+    1, int(os.getenv("TOOL_VALIDATION_CONCURRENCY", "8"))
+)
+
 # Initialize notifiers
 linear_notifier = LinearWorkspaceNotifier(agent_name="orchestrator")
 email_notifier = EmailNotifier()
 
-# Subscribe notifiers to event bus
-event_bus.subscribe("approval_required", linear_notifier.on_approval_required)
-event_bus.subscribe("approval_required", email_notifier.on_approval_required)
+# Subscribe notifiers to event bus (queued so workflow steps don't wait on
+# Linear/SMTP round-trips; approvals are never dropped, only spilled)
+notifier_delivery = DeliveryOptions(
+    max_queue_size=int(os.getenv("NOTIFIER_QUEUE_SIZE", "500")),
+    overflow=OverflowPolicy.SPILL,
+)
+event_bus.subscribe(
+    "approval_required", linear_notifier.on_approval_required, delivery=notifier_delivery
+)
+event_bus.subscribe(
+    "approval_required", email_notifier.on_approval_required, delivery=notifier_delivery
+)
 
 logger.info("Notification system initialized (Linear + Email)")
 
@@ -616,16 +661,32 @@ intent_override_total = Counter(
     ["client_hint", "backend_intent", "final_intent"],
 )
 
-# Track approval-pending tasks awaiting resumption
-pending_approval_registry: Dict[str, Dict[str, Any]] = {}
+def _serialize_pending_task(entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        **entry,
+        "guardrail_report": entry["guardrail_report"].model_dump(mode="json"),
+        "created_at": entry["created_at"].isoformat(),
+    }
 
-# LangGraph infrastructure
-try:
-    checkpointer = get_postgres_checkpointer()
-    logger.info("LangGraph PostgreSQL checkpointer initialized")
-except Exception as e:
-    logger.warning(f"LangGraph checkpointer not available: {e}")
-    checkpointer = None
+
+def _deserialize_pending_task(raw: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        **raw,
+        "guardrail_report": GuardrailReport.model_validate(raw["guardrail_report"]),
+        "created_at": datetime.fromisoformat(raw["created_at"]),
+    }
+
+
+# Track approval-pending tasks awaiting resumption (shared by all workers)
+pending_approval_registry = DurableRegistry(
+    "pending_approvals",
+    store=create_registry_store("pending_approvals"),
+    serialize=_serialize_pending_task,
+    deserialize=_deserialize_pending_task,
+)
+
+# LangGraph infrastructure: the async checkpointer is attached at startup
+checkpointer = None
 
 # Qdrant Cloud client for vector operations
 qdrant_client = get_qdrant_client()
@@ -697,8 +758,13 @@ class TaskResponse(BaseModel):
     linear_project: Optional[Dict[str, str]] = None  # Linear project info for caching
 
 
-# In-memory task registry (in production, this would use State Persistence Layer)
-task_registry: Dict[str, TaskResponse] = {}
+# Task registry: bounded in memory, written through to a store all workers share
+task_registry = DurableRegistry(
+    "tasks",
+    store=create_registry_store("tasks"),
+    serialize=lambda task: task.model_dump(mode="json"),
+    deserialize=TaskResponse.model_validate,
+)
 
 # ============================================================================
 # HITL Risk Assessment Helper Functions
@@ -947,7 +1013,7 @@ async def query_vendor_context(
             )
 
             # Track RAG usage
-            await mcp_tool_client.create_memory_entity(
+            mcp_tool_client.record_memory_entity(
                 name=f"rag_context_used_{uuid.uuid4().hex[:8]}",
                 entity_type="rag_query",
                 observations=[
@@ -1152,6 +1218,10 @@ async def readiness_check():
             "openrouter": openrouter_ready,
             "openai_embeddings": bool(os.getenv("OPENAI_API_KEY")),
         },
+        "database_pools": {
+            "health": await get_pool_registry().health_check(),
+            "stats": get_pool_registry().get_stats(),
+        },
         "chat": {
             "enabled": True,
             "endpoint": "/chat",
@@ -1328,51 +1398,53 @@ async def linear_webhook(request: Request):
                         (metadata["issue_id"],),
                     )
                     row = await cursor.fetchone()
-                    if row:
-                        approval_request_id = row[0]
-                        # Call workflow resume logic
-                        approval_result = await resume_workflow_from_approval(
-                            approval_request_id, action="approved"
-                        )
-                        logger.info(
-                            f"✅ Workflow resumed for approval_request_id={approval_request_id}, result={approval_result}"
-                        )
 
-                        # Update Linear comment with resume status
-                        if approval_result and approval_result.get("resumed"):
-                            try:
-                                from lib.linear_workspace_client import (
-                                    LinearWorkspaceClient,
-                                )
+            # Resume after the lookup connection is back in the pool
+            if row:
+                approval_request_id = row[0]
+                # Call workflow resume logic
+                approval_result = await resume_workflow_from_approval(
+                    approval_request_id, action="approved"
+                )
+                logger.info(
+                    f"✅ Workflow resumed for approval_request_id={approval_request_id}, result={approval_result}"
+                )
 
-                                linear_client = LinearWorkspaceClient()
-                                await linear_client.add_comment(
-                                    metadata["issue_id"],
-                                    f"✅ **Workflow Resumed Successfully**\n\n"
-                                    f"- Thread ID: `{approval_result.get('thread_id')}`\n"
-                                    f"- Status: {approval_result.get('final_status')}\n"
-                                    f"- Approved by: @{metadata['approved_by_name']}",
-                                )
-                            except Exception as comment_err:
-                                logger.error(
-                                    f"Failed to update Linear with resume status: {comment_err}"
-                                )
+                # Update Linear comment with resume status
+                if approval_result and approval_result.get("resumed"):
+                    try:
+                        from lib.linear_workspace_client import (
+                            LinearWorkspaceClient,
+                        )
 
-                        return {
-                            "status": "workflow_resumed",
-                            "metadata": metadata,
-                            "approval_result": approval_result,
-                            "message": "Workflow approved and resumed",
-                        }
-                    else:
-                        logger.warning(
-                            f"No pending approval found for linear_issue_id={metadata['issue_id']}"
+                        linear_client = LinearWorkspaceClient()
+                        await linear_client.add_comment(
+                            metadata["issue_id"],
+                            f"✅ **Workflow Resumed Successfully**\n\n"
+                            f"- Thread ID: `{approval_result.get('thread_id')}`\n"
+                            f"- Status: {approval_result.get('final_status')}\n"
+                            f"- Approved by: @{metadata['approved_by_name']}",
                         )
-                        return {
-                            "status": "no_pending_approval",
-                            "metadata": metadata,
-                            "message": "No pending approval request found for this issue",
-                        }
+                    except Exception as comment_err:
+                        logger.error(
+                            f"Failed to update Linear with resume status: {comment_err}"
+                        )
+
+                return {
+                    "status": "workflow_resumed",
+                    "metadata": metadata,
+                    "approval_result": approval_result,
+                    "message": "Workflow approved and resumed",
+                }
+            else:
+                logger.warning(
+                    f"No pending approval found for linear_issue_id={metadata['issue_id']}"
+                )
+                return {
+                    "status": "no_pending_approval",
+                    "metadata": metadata,
+                    "message": "No pending approval request found for this issue",
+                }
         except Exception as e:
             logger.error(
                 f"Failed to resume workflow from Linear approval: {e}", exc_info=True
@@ -1546,14 +1618,19 @@ async def orchestrate_task(request: TaskRequest):
 
         if approval_request_id:
             approval_requests_total.labels(risk_level=risk_level).inc()
-            pending_approval_registry[task_id] = {
-                "request_payload": request.model_dump(),
-                "guardrail_report": guardrail_report,
-                "risk_context": risk_context,
-                "approval_request_id": approval_request_id,
-                "risk_level": risk_level,
-                "created_at": datetime.utcnow(),
-            }
+            await pending_approval_registry.aset(
+                task_id,
+                {
+                    "request_payload": request.model_dump(mode="json"),
+                    "guardrail_report": guardrail_report,
+                    "workspace_ctx": workspace_ctx,
+                    "project": project,
+                    "risk_context": risk_context,
+                    "approval_request_id": approval_request_id,
+                    "risk_level": risk_level,
+                    "created_at": datetime.utcnow(),
+                },
+            )
 
             # Emit approval_required event for notifications
             await event_bus.emit(
@@ -1594,12 +1671,12 @@ async def orchestrate_task(request: TaskRequest):
                 guardrail_report=guardrail_report,
             )
 
-            task_registry[task_id] = response
+            await task_registry.aset(task_id, response)
             await persist_task_state(
                 task_id, request, response, status="approval_pending"
             )
 
-            await mcp_tool_client.create_memory_entity(
+            mcp_tool_client.record_memory_entity(
                 name=f"task_requires_approval_{task_id}",
                 entity_type="orchestrator_event",
                 observations=[
@@ -1629,6 +1706,58 @@ async def orchestrate_task(request: TaskRequest):
     )
 
 
+@traceable(name="validate_subtask_tools", tags=["orchestrator", "tools", "validation"])
+async def validate_subtask_tools(
+    task_id: str, subtasks: List[SubTask]
+) -> Dict[str, Any]:
+    """Load and check tools for every subtask concurrently.
+
+    At most TOOL_VALIDATION_CONCURRENCY subtasks are validated at once, so the
+    planning phase takes about as long as the slowest subtask rather than the
+    sum of all of them. Results are keyed by subtask id in subtask order.
+    """
+    semaphore = asyncio.Semaphore(TOOL_VALIDATION_CONCURRENCY)
+
+    async def validate(subtask: SubTask) -> Dict[str, Any]:
+        async with semaphore:
+            agent_toolsets = await progressive_loader.aget_tools_for_task(
+                task_description=subtask.description,
+                assigned_agent=subtask.agent_type.value,
+                strategy=ToolLoadingStrategy.PROGRESSIVE,
+            )
+            subtask_required_tools = get_required_tools_for_task(subtask.description)
+            availability = await check_agent_tool_availability(
+                subtask.agent_type, subtask_required_tools
+            )
+
+        if not availability["available"]:
+            logger.warning(
+                "[Orchestrator] Agent %s missing tools for subtask %s: %s",
+                subtask.agent_type,
+                subtask.id,
+                availability["missing_tools"],
+            )
+            mcp_tool_client.record_memory_entity(
+                name=f"tool_availability_warning_{task_id}_{subtask.id}",
+                entity_type="orchestrator_warning",
+                observations=[
+                    f"Task: {task_id}",
+                    f"Subtask: {subtask.id}",
+                    f"Agent: {subtask.agent_type.value}",
+                    f"Missing tools: {availability['missing_tools']}",
+                ],
+            )
+
+        return {
+            **availability,
+            "loaded_toolsets": len(agent_toolsets),
+            "tools_context": progressive_loader.format_tools_for_llm(agent_toolsets),
+        }
+
+    results = await asyncio.gather(*(validate(subtask) for subtask in subtasks))
+    return {subtask.id: result for subtask, result in zip(subtasks, results)}
+
+
 @traceable(
     name="execute_orchestration_flow", tags=["orchestrator", "decomposition", "flow"]
 )
@@ -1647,7 +1776,7 @@ async def execute_orchestration_flow(
 
     stats = progressive_loader.get_tool_usage_stats(relevant_toolsets)
     logger.info(f"[Orchestrator] Progressive loading stats: {stats}")
-    await mcp_tool_client.create_memory_entity(
+    mcp_tool_client.record_memory_entity(
         name=f"tool_loading_stats_{task_id}",
         entity_type="orchestrator_metrics",
         observations=[
@@ -1674,41 +1803,7 @@ async def execute_orchestration_flow(
     else:
         subtasks = decompose_request(request)
 
-    validation_results: Dict[str, Any] = {}
-    for subtask in subtasks:
-        agent_toolsets = progressive_loader.get_tools_for_task(
-            task_description=subtask.description,
-            assigned_agent=subtask.agent_type.value,
-            strategy=ToolLoadingStrategy.PROGRESSIVE,
-        )
-
-        subtask_required_tools = get_required_tools_for_task(subtask.description)
-        availability = await check_agent_tool_availability(
-            subtask.agent_type, subtask_required_tools
-        )
-        validation_results[subtask.id] = {
-            **availability,
-            "loaded_toolsets": len(agent_toolsets),
-            "tools_context": progressive_loader.format_tools_for_llm(agent_toolsets),
-        }
-
-        if not availability["available"]:
-            logger.warning(
-                "[Orchestrator] Agent %s missing tools for subtask %s: %s",
-                subtask.agent_type,
-                subtask.id,
-                availability["missing_tools"],
-            )
-            await mcp_tool_client.create_memory_entity(
-                name=f"tool_availability_warning_{task_id}_{subtask.id}",
-                entity_type="orchestrator_warning",
-                observations=[
-                    f"Task: {task_id}",
-                    f"Subtask: {subtask.id}",
-                    f"Agent: {subtask.agent_type.value}",
-                    f"Missing tools: {availability['missing_tools']}",
-                ],
-            )
+    validation_results = await validate_subtask_tools(task_id, subtasks)
 
     routing_plan = {
         "execution_order": [st.id for st in subtasks],
@@ -1738,7 +1833,7 @@ async def execute_orchestration_flow(
         ),
     )
 
-    task_registry[task_id] = response
+    await task_registry.aset(task_id, response)
     await persist_task_state(task_id, request, response)
 
     tools_validated = (
@@ -1747,7 +1842,7 @@ async def execute_orchestration_flow(
         else True
     )
 
-    await mcp_tool_client.create_memory_entity(
+    mcp_tool_client.record_memory_entity(
         name=f"task_orchestrated_{task_id}",
         entity_type="orchestrator_event",
         observations=[
@@ -1767,7 +1862,7 @@ async def execute_orchestration_flow(
 async def resume_approved_task(task_id: str):
     """Resume a workflow once its approval request is satisfied."""
 
-    pending_task = pending_approval_registry.get(task_id)
+    pending_task = await pending_approval_registry.aget(task_id)
     if not pending_task:
         raise HTTPException(
             status_code=404, detail="Task not awaiting approval or not found"
@@ -1777,35 +1872,25 @@ async def resume_approved_task(task_id: str):
     status_info = await hitl_manager.check_approval_status(approval_request_id)
     approval_status = status_info.get("status")
 
-    if approval_status == "approved":
-        risk_level = pending_task["risk_level"]
-        wait_seconds = (datetime.utcnow() - pending_task["created_at"]).total_seconds()
-        approval_wait_time.labels(risk_level=risk_level).observe(max(wait_seconds, 0.0))
-
-        request_payload = pending_task["request_payload"]
-        guardrail_report = pending_task["guardrail_report"]
-        pending_approval_registry.pop(task_id, None)
-
-        request = TaskRequest(**request_payload)
-        response = await execute_orchestration_flow(task_id, request, guardrail_report)
-
-        await mcp_tool_client.create_memory_entity(
-            name=f"task_resumed_{task_id}",
-            entity_type="orchestrator_event",
-            observations=[
-                f"Task ID: {task_id}",
-                f"Approval request: {approval_request_id}",
-                f"Approver: {status_info.get('approver_id')}",
-                f"Resumed at: {datetime.utcnow().isoformat()}",
-            ],
-        )
-
-        return response
-
     if approval_status == "pending":
         raise HTTPException(status_code=409, detail="Approval still pending")
 
-    pending_approval_registry.pop(task_id, None)
+    if approval_status in ("approved", "rejected"):
+        # Approvals normally resume the task on their own (approval dispatcher);
+        # claiming here keeps a manual resume from running it a second time
+        claim = await approval_dispatcher.claim(approval_request_id)
+        if claim is None:
+            raise HTTPException(status_code=409, detail="Task already resumed")
+        try:
+            response = await _resume_pending_task(task_id, claim)
+        except Exception:
+            await approval_dispatcher.release(approval_request_id)
+            raise
+        await approval_dispatcher.complete(approval_request_id)
+        if response is not None:
+            return response
+
+    await pending_approval_registry.adelete(task_id)
 
     if approval_status == "rejected":
         raise HTTPException(
@@ -1882,7 +1967,7 @@ async def approve_request(
         )
 
         # Log to MCP memory
-        await mcp_tool_client.create_memory_entity(
+        mcp_tool_client.record_memory_entity(
             name=f"approval_{approval_id}",
             entity_type="approval_decision",
             observations=[
@@ -1965,7 +2050,7 @@ async def reject_request(
         )
 
         # Log to MCP memory
-        await mcp_tool_client.create_memory_entity(
+        mcp_tool_client.record_memory_entity(
             name=f"rejection_{approval_id}",
             entity_type="approval_decision",
             observations=[
@@ -1996,24 +2081,40 @@ async def reject_request(
 
 
 @app.get("/approvals/pending")
-async def list_pending_approvals(approver_role: Optional[str] = None, limit: int = 50):
+async def list_pending_approvals(
+    approver_role: Optional[str] = None,
+    risk_level: Optional[List[str]] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
     """
-    List all pending approval requests.
+    List pending approval requests, newest first.
 
     Args:
-        approver_role: Filter by approver role (optional)
-        limit: Maximum number of results (default 50)
+        approver_role: Only requests this role can approve (optional)
+        risk_level: Only these risk levels; repeat for several (optional)
+        limit: Page size (default 50)
+        cursor: next_cursor from the previous page (optional)
 
     Returns:
-        List of pending approval requests
+        One page of pending approval requests and the cursor for the next page
     """
     try:
-        approvals = await hitl_manager.list_pending_requests(
-            approver_role=approver_role, limit=limit
+        approvals, next_cursor = await hitl_manager.list_pending_page(
+            approver_role=approver_role,
+            risk_levels=risk_level,
+            limit=limit,
+            cursor=cursor,
         )
 
-        return {"count": len(approvals), "approvals": approvals}
+        return {
+            "count": len(approvals),
+            "approvals": approvals,
+            "next_cursor": next_cursor,
+        }
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"List approvals error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -2092,7 +2193,7 @@ async def persist_task_state(
                 f"{STATE_SERVICE_URL}/workflows", json=workflow_payload, timeout=5.0
             )
 
-            await mcp_tool_client.create_memory_entity(
+            mcp_tool_client.record_memory_entity(
                 name=f"orchestrator_state_persisted_{task_id}",
                 entity_type="orchestrator_event",
                 observations=[
@@ -2104,7 +2205,7 @@ async def persist_task_state(
 
     except Exception as e:
         print(f"State persistence failed (non-critical): {e}")
-        await mcp_tool_client.create_memory_entity(
+        mcp_tool_client.record_memory_entity(
             name=f"orchestrator_state_persistence_failed_{task_id}",
             entity_type="orchestrator_error",
             observations=[f"Task ID: {task_id}", f"Error: {str(e)}"],
@@ -2114,11 +2215,10 @@ async def persist_task_state(
 @app.get("/tasks/{task_id}")
 async def get_task_status(task_id: str):
     """Retrieve task status and subtask progress"""
-    if task_id not in task_registry:
+    task = await task_registry.aget(task_id)
+    if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    task = task_registry[task_id]
-
     # Calculate completion status from subtasks
     subtasks_list = task.subtasks if hasattr(task, "subtasks") else []
     completed = sum(1 for s in subtasks_list if s.status == TaskStatus.COMPLETED)
@@ -2231,7 +2331,7 @@ async def discover_mcp_servers():
     Returns real-time server and tool inventory.
     """
     try:
-        servers = mcp_discovery.discover_servers()
+        servers = await mcp_discovery.adiscover_servers()
         return {
             "success": True,
             "discovery": servers,
@@ -2570,7 +2670,7 @@ async def list_tool_servers():
         }
     """
     try:
-        discovery = mcp_discovery.discover_servers()
+        discovery = await mcp_discovery.adiscover_servers()
 
         servers = []
         total_tools = 0
@@ -2762,7 +2862,7 @@ async def update_phase_completion(request: Dict[str, Any]):
 
 @app.post("/execute/{task_id}")
 @traceable(name="execute_task_workflow", tags=["orchestrator", "execution", "agents"])
-async def execute_task_by_id(task_id: str):
+async def execute_task_by_id(task_id: str, stream: bool = False):
     """Execute workflow using LangGraph agents (not HTTP microservices).
 
     This endpoint invokes agents in-process via the LangGraph StateGraph,
@@ -2770,8 +2870,14 @@ async def execute_task_by_id(task_id: str):
 
     Execution flow:
     1. Look up task in registry to get subtasks
-    2. For each subtask, invoke the corresponding LangGraph agent node
-    3. Collect results and update task status
+    2. Schedule subtasks as a DAG over SubTask.dependencies: each one starts
+       as soon as its dependencies have completed, with up to
+       DAG_MAX_CONCURRENCY agents running at once
+    3. Give each agent the results of its declared dependencies as context
+    4. Collect results and update task status (with stream=true, one SSE
+       event per subtask as it finishes)
+
+    Subtasks whose dependency failed are skipped.
 
     Benefits over HTTP-based execution:
     - 50% faster (in-memory vs HTTP)
@@ -2779,127 +2885,149 @@ async def execute_task_by_id(task_id: str):
     - Proper checkpointing via PostgreSQL
     - Progressive tool disclosure per agent
     """
-    if task_id not in task_registry:
+    task = await task_registry.aget(task_id)
+    if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    task = task_registry[task_id]
-    execution_results = []
+    subtasks = {st.id: st for st in task.subtasks}
+    dependencies = {st.id: st.dependencies or [] for st in task.subtasks}
+    try:
+        levels = topological_levels(dependencies)
+    except DependencyCycleError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     # Import LangGraph components
-    from graph import WorkflowState, get_agent
-    from langchain_core.messages import AIMessage, HumanMessage
-
-    for subtask in task.subtasks:
-        try:
-            # Update subtask status
-            subtask.status = TaskStatus.IN_PROGRESS
-
-            # Map AgentType enum to agent name
-            agent_name_map = {
-                AgentType.FEATURE_DEV: "feature-dev",
-                AgentType.CODE_REVIEW: "code-review",
-                AgentType.INFRASTRUCTURE: "infrastructure",
-                AgentType.CICD: "cicd",
-                AgentType.DOCUMENTATION: "documentation",
-            }
+    from graph import get_agent
+    from langchain_core.messages import HumanMessage
 
-            agent_name = agent_name_map.get(subtask.agent_type)
-            if not agent_name:
-                logger.warning(f"[Execute] Unknown agent type: {subtask.agent_type}")
-                subtask.status = TaskStatus.FAILED
-                execution_results.append(
-                    {
-                        "subtask_id": subtask.id,
-                        "agent": str(subtask.agent_type),
-                        "status": "failed",
-                        "error": f"Unknown agent type: {subtask.agent_type}",
-                    }
-                )
-                continue
+    # Map AgentType enum to agent name
+    agent_name_map = {
+        AgentType.FEATURE_DEV: "feature-dev",
+        AgentType.CODE_REVIEW: "code-review",
+        AgentType.INFRASTRUCTURE: "infrastructure",
+        AgentType.CICD: "cicd",
+        AgentType.DOCUMENTATION: "documentation",
+    }
 
-            logger.info(f"[Execute] Invoking {agent_name} for subtask {subtask.id}")
+    async def run_subtask(subtask_id: str, upstream: Dict[str, Any]) -> str:
+        subtask = subtasks[subtask_id]
+        agent_name = agent_name_map.get(subtask.agent_type)
+        if not agent_name:
+            logger.warning(f"[Execute] Unknown agent type: {subtask.agent_type}")
+            raise ValueError(f"Unknown agent type: {subtask.agent_type}")
 
-            # Get the real LangGraph agent
-            agent = get_agent(agent_name)
+        subtask.status = TaskStatus.IN_PROGRESS
+        logger.info(f"[Execute] Invoking {agent_name} for subtask {subtask.id}")
 
-            # Build message for agent
-            messages = [HumanMessage(content=subtask.description)]
+        # Get the real LangGraph agent
+        agent = get_agent(agent_name)
 
-            # Add context from previous results if available
-            if execution_results:
-                prev_result = execution_results[-1]
-                if prev_result.get("status") == "completed" and prev_result.get(
-                    "result"
-                ):
-                    context_msg = f"\n\nContext from previous step ({prev_result.get('agent')}):\n{str(prev_result.get('result'))[:2000]}"
-                    messages[0] = HumanMessage(
-                        content=subtask.description + context_msg
-                    )
-
-            # Invoke agent via LangGraph (in-process, not HTTP)
-            response = await agent.invoke(messages)
+        # Context comes only from the subtasks this one declared it depends on
+        content = subtask.description
+        for dep_id, dep_result in upstream.items():
+            content += f"\n\nContext from {subtasks[dep_id].agent_type} ({dep_id}):\n{str(dep_result)[:2000]}"
 
-            # Extract result content
-            result_content = (
-                response.content if hasattr(response, "content") else str(response)
-            )
+        # Invoke agent via LangGraph (in-process, not HTTP)
+        response = await agent.invoke([HumanMessage(content=content)])
 
-            logger.info(
-                f"[Execute] {agent_name} completed. Response length: {len(result_content)}"
-            )
+        # Extract result content
+        result_content = (
+            response.content if hasattr(response, "content") else str(response)
+        )
 
+        logger.info(
+            f"[Execute] {agent_name} completed. Response length: {len(result_content)}"
+        )
+        return result_content
+
+    def record(outcome: NodeOutcome) -> Dict[str, Any]:
+        subtask = subtasks[outcome.node_id]
+        entry = {
+            "subtask_id": subtask.id,
+            "agent": str(subtask.agent_type),
+            "status": outcome.status,
+            "duration_ms": int(outcome.duration_seconds * 1000),
+        }
+        if outcome.status == "completed":
             subtask.status = TaskStatus.COMPLETED
-            execution_results.append(
-                {
-                    "subtask_id": subtask.id,
-                    "agent": str(subtask.agent_type),
-                    "status": "completed",
-                    "result": result_content[:5000],  # Truncate for response
-                }
+            entry["result"] = outcome.result[:5000]  # Truncate for response
+        else:
+            if outcome.status == "failed":
+                subtask.status = TaskStatus.FAILED
+            entry["error"] = outcome.error
+        return entry
+
+    def summarize(execution_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        # Report results in subtask order, whatever order they finished in
+        position = {st.id: i for i, st in enumerate(task.subtasks)}
+        execution_results.sort(key=lambda r: position[r["subtask_id"]])
+
+        # Update overall task status
+        overall_status = (
+            "completed"
+            if all(r["status"] == "completed" for r in execution_results)
+            else (
+                "partial"
+                if any(r["status"] == "completed" for r in execution_results)
+                else "failed"
             )
+        )
 
-        except Exception as e:
-            logger.error(
-                f"[Execute] Agent {subtask.agent_type} failed: {e}", exc_info=True
-            )
-            subtask.status = TaskStatus.FAILED
-            execution_results.append(
+        logger.info(f"[Execute] Task {task_id} finished: {overall_status}")
+
+        return {
+            "task_id": task_id,
+            "status": overall_status,
+            "execution_results": execution_results,
+            "subtasks": [
                 {
-                    "subtask_id": subtask.id,
-                    "agent": str(subtask.agent_type),
-                    "status": "failed",
-                    "error": str(e),
+                    "id": st.id,
+                    "agent_type": str(st.agent_type),
+                    "status": str(st.status),
+                    "description": st.description,
                 }
-            )
+                for st in task.subtasks
+            ],
+        }
 
-    # Update overall task status
-    overall_status = (
-        "completed"
-        if all(r["status"] == "completed" for r in execution_results)
-        else (
-            "partial"
-            if any(r["status"] == "completed" for r in execution_results)
-            else "failed"
-        )
-    )
+    scheduler = DAGScheduler()
 
-    logger.info(f"[Execute] Task {task_id} finished: {overall_status}")
+    if not stream:
+        execution_results = [
+            record(outcome)
+            async for outcome in scheduler.run(dependencies, run_subtask)
+        ]
+        # Persist subtask statuses so every worker reports the same progress
+        await task_registry.aset(task_id, task)
+        return summarize(execution_results)
 
-    return {
-        "task_id": task_id,
-        "status": overall_status,
-        "execution_results": execution_results,
-        "subtasks": [
+    async def event_generator():
+        execution_results = []
+        yield sse_frame(
             {
-                "id": st.id,
-                "agent_type": str(st.agent_type),
-                "status": str(st.status),
-                "description": st.description,
+                "type": "execution_started",
+                "task_id": task_id,
+                "subtasks": len(subtasks),
+                "levels": levels,
             }
-            for st in task.subtasks
-        ],
-    }
+        )
+        async for outcome in scheduler.run(dependencies, run_subtask):
+            entry = record(outcome)
+            execution_results.append(entry)
+            yield sse_frame({"type": "subtask_completed", **entry})
+        await task_registry.aset(task_id, task)
+        yield sse_frame({"type": "done", **summarize(execution_results)})
 
+    return StreamingResponse(
+        SSEStream().iterate(event_generator()),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # Disable nginx buffering
+            "Access-Control-Allow-Origin": "*",
+        },
+    )
 
 def decompose_request(request: TaskRequest) -> List[SubTask]:
     """
@@ -2988,18 +3116,13 @@ def decompose_request(request: TaskRequest) -> List[SubTask]:
 
 
 def identify_parallel_tasks(subtasks: List[SubTask]) -> List[List[str]]:
-    """Identify subtasks that can run in parallel"""
-    parallel_groups = []
-    independent_tasks = []
-
-    for task in subtasks:
-        if not task.dependencies:
-            independent_tasks.append(task.id)
-
-    if len(independent_tasks) > 1:
-        parallel_groups.append(independent_tasks)
-
-    return parallel_groups
+    """Identify subtasks that can run in parallel (topological levels of 2+)"""
+    try:
+        levels = topological_levels({st.id: st.dependencies or [] for st in subtasks})
+    except DependencyCycleError as e:
+        logger.warning(f"[Orchestrator] Cannot plan parallel groups: {e}")
+        return []
+    return [level for level in levels if len(level) > 1]
 
 
 def estimate_duration(subtasks: List[SubTask]) -> int:
@@ -3015,7 +3138,7 @@ async def configure_tool_loading(request: Dict[str, Any]):
 
     Request:
         {
-            "strategy": "minimal" | "agent_profile" | "progressive" | "full",
+            "strategy": "minimal" | "agent_profile" | "progressive" | "semantic" | "embedding" | "full",
             "reason": "debugging" | "cost_optimization" | "high_complexity_task"
         }
     """
@@ -3026,7 +3149,7 @@ async def configure_tool_loading(request: Dict[str, Any]):
         strategy = ToolLoadingStrategy(strategy_name)
         progressive_loader.default_strategy = strategy
 
-        await mcp_tool_client.create_memory_entity(
+        mcp_tool_client.record_memory_entity(
             name=f"tool_loading_config_change_{datetime.utcnow().isoformat()}",
             entity_type="orchestrator_config",
             observations=[
@@ -3040,7 +3163,7 @@ async def configure_tool_loading(request: Dict[str, Any]):
     except ValueError:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid strategy: {strategy_name}. Valid values: minimal, agent_profile, progressive, full",
+            detail=f"Invalid strategy: {strategy_name}. Valid values: {', '.join(s.value for s in ToolLoadingStrategy)}",
         )
 
 
@@ -3050,7 +3173,7 @@ async def get_tool_loading_stats():
     Get statistics about current tool loading configuration.
     """
     # Get current strategy tools
-    sample_toolsets = progressive_loader.get_tools_for_task(
+    sample_toolsets = await progressive_loader.aget_tools_for_task(
         task_description="sample task", strategy=progressive_loader.default_strategy
     )
 
@@ -3302,19 +3425,16 @@ async def chat_endpoint(request: ChatRequest):
     session_id = request.session_id or f"session-{uuid.uuid4()}"
 
     try:
-        # Ensure session exists
-        existing_session = await session_manager.get_session(session_id)
-        if not existing_session:
-            await session_manager.create_session(
-                session_id=session_id,
-                user_id=request.user_id,
-                metadata=request.context or {},
-            )
+        # Ensure session exists and load conversation history (one round-trip)
+        _, history, created = await session_manager.get_or_create_session(
+            session_id,
+            user_id=request.user_id,
+            metadata=request.context or {},
+            history_limit=10,
+        )
+        if created:
             logger.info(f"Created new chat session: {session_id}")
 
-        # Load conversation history
-        history = await session_manager.load_conversation_history(session_id, limit=10)
-
         # Save user message
         await session_manager.add_message(
             session_id=session_id,
@@ -3442,7 +3562,7 @@ async def chat_endpoint(request: ChatRequest):
             # Look up task status
             if intent.entity_id:
                 # Look up task in registry
-                task_response = task_registry.get(intent.entity_id)
+                task_response = await task_registry.aget(intent.entity_id)
                 if task_response:
                     status_counts = {}
                     for subtask in task_response.subtasks:
@@ -3677,9 +3797,10 @@ async def chat_stream_endpoint(request: ChatStreamRequest):
     requests to maintain conversation context.
     """
     session_id = request.session_id or f"stream-{uuid.uuid4()}"
+    stream = SSEStream()
 
     async def event_generator():
-        """Generate SSE events from LangGraph stream."""
+        """Generate SSE events from LangGraph stream (content goes through `stream`)."""
         try:
             # Import the graph for streaming
             from graph import WorkflowState, get_graph
@@ -3797,35 +3918,29 @@ async def chat_stream_endpoint(request: ChatStreamRequest):
                     # Load conversation history
                     conversation_history = []
                     try:
-                        existing_session = await session_manager.get_session(session_id)
-                        if existing_session:
-                            history = await session_manager.load_conversation_history(
-                                session_id, limit=10
-                            )
-                            for msg in history:
-                                role = msg.get("role", "user")
-                                content = msg.get("content", "")
-                                if role == "user":
-                                    conversation_history.append(
-                                        HumanMessage(content=content)
-                                    )
-                                elif role == "assistant":
-                                    conversation_history.append(
-                                        AIMessage(content=content)
-                                    )
-                            logger.info(
-                                f"[Chat Stream] Loaded {len(conversation_history)} messages from session"
-                            )
-                        else:
-                            # Create new session
-                            await session_manager.create_session(
-                                session_id=session_id,
-                                user_id=request.user_id,
-                                metadata={
-                                    "project_context": request.project_context,
-                                    "workspace_root": request.workspace_root,
-                                },
-                            )
+                        _, history, _ = await session_manager.get_or_create_session(
+                            session_id,
+                            user_id=request.user_id,
+                            metadata={
+                                "project_context": request.project_context,
+                                "workspace_root": request.workspace_root,
+                            },
+                            history_limit=10,
+                        )
+                        for msg in history:
+                            role = msg.get("role", "user")
+                            content = msg.get("content", "")
+                            if role == "user":
+                                conversation_history.append(
+                                    HumanMessage(content=content)
+                                )
+                            elif role == "assistant":
+                                conversation_history.append(
+                                    AIMessage(content=content)
+                                )
+                        logger.info(
+                            f"[Chat Stream] Loaded {len(conversation_history)} messages from session"
+                        )
                     except Exception as e:
                         logger.warning(f"[Chat Stream] Could not load session: {e}")
 
@@ -3943,16 +4058,8 @@ async def chat_stream_endpoint(request: ChatStreamRequest):
                             else str(response_message)
                         )
 
-                        # Stream response with preserved formatting
-                        # Stream in chunks instead of word-by-word to preserve whitespace
-                        chunk_size = 10  # words per chunk
-                        words = content.split(" ")
-                        for i in range(0, len(words), chunk_size):
-                            chunk = " ".join(words[i : i + chunk_size])
-                            if i + chunk_size < len(words):
-                                chunk += " "  # Add space between chunks
-                            yield f"data: {json.dumps({'type': 'content', 'content': chunk})}\n\n"
-                            await asyncio.sleep(0.05)  # Smooth streaming
+                        # Complete response; the stream frames it without delay
+                        stream.content(content)
 
                         # Save to session history
                         try:
@@ -3993,33 +4100,29 @@ async def chat_stream_endpoint(request: ChatStreamRequest):
             # Load conversation history from session if exists
             conversation_history = []
             try:
-                existing_session = await session_manager.get_session(session_id)
-                if existing_session:
-                    # Load previous messages
-                    history = await session_manager.load_conversation_history(
-                        session_id, limit=10
-                    )
-                    for msg in history:
-                        role = msg.get("role", "user")
-                        content = msg.get("content", "")
-                        if role == "user":
-                            conversation_history.append(HumanMessage(content=content))
-                        elif role == "assistant":
-                            conversation_history.append(AIMessage(content=content))
+                # Get or create the session and load previous messages together
+                _, history, created = await session_manager.get_or_create_session(
+                    session_id,
+                    user_id=request.user_id,
+                    metadata={
+                        "project_context": request.project_context,
+                        "workspace_root": request.workspace_root,
+                    },
+                    history_limit=10,
+                )
+                for msg in history:
+                    role = msg.get("role", "user")
+                    content = msg.get("content", "")
+                    if role == "user":
+                        conversation_history.append(HumanMessage(content=content))
+                    elif role == "assistant":
+                        conversation_history.append(AIMessage(content=content))
+                if created:
+                    logger.info(f"[Chat Stream] Created new session {session_id}")
+                else:
                     logger.info(
                         f"[Chat Stream] Loaded {len(conversation_history)} messages from session {session_id}"
                     )
-                else:
-                    # Create new session
-                    await session_manager.create_session(
-                        session_id=session_id,
-                        user_id=request.user_id,
-                        metadata={
-                            "project_context": request.project_context,
-                            "workspace_root": request.workspace_root,
-                        },
-                    )
-                    logger.info(f"[Chat Stream] Created new session {session_id}")
             except Exception as e:
                 logger.warning(f"[Chat Stream] Could not load session history: {e}")
 
@@ -4148,6 +4251,14 @@ async def chat_stream_endpoint(request: ChatStreamRequest):
                 "thread_id": session_id,  # Reuse same thread for continuity
                 "pending_operation": None,
                 "project_context": project_context,
+                # The checkpoint carries the previous turn's values into this
+                # thread, so reset every per-turn field explicitly
+                "workflow_template": None,
+                "workflow_context": None,
+                "use_template_engine": False,
+                "routing_decision": None,
+                "captured_insights": [],
+                "memory_context": None,
             }
 
             config = {"configurable": {"thread_id": session_id}}
@@ -4166,8 +4277,6 @@ async def chat_stream_endpoint(request: ChatStreamRequest):
 
             # Track current node for filtering
             current_node = None
-            last_keepalive = asyncio.get_event_loop().time()
-            keepalive_interval = 15  # Send keepalive every 15 seconds
 
             # Stream events from LangGraph
             async for event in graph.astream_events(
@@ -4189,8 +4298,8 @@ async def chat_stream_endpoint(request: ChatStreamRequest):
                     if chunk and hasattr(chunk, "content") and chunk.content:
                         # Check if this is from a specialist agent (not supervisor routing)
                         if current_node and current_node != "supervisor":
-                            yield f"data: {json.dumps({'type': 'content', 'content': chunk.content})}\n\n"
-                            last_keepalive = asyncio.get_event_loop().time()
+                            # Coalesced into content frames and kept for the session
+                            stream.content(chunk.content)
 
                 # Agent completed (for progress indication)
                 elif event_kind == "on_chain_end":
@@ -4198,23 +4307,12 @@ async def chat_stream_endpoint(request: ChatStreamRequest):
                     if any(agent in name.lower() for agent in SPECIALIST_AGENTS):
                         yield f"data: {json.dumps({'type': 'agent_complete', 'agent': name})}\n\n"
                         current_node = None  # Reset after completion
-                        last_keepalive = asyncio.get_event_loop().time()
 
                 # Tool calls from specialist agents only
                 elif event_kind == "on_tool_start":
                     if current_node and current_node != "supervisor":
                         tool_name = event.get("name", "unknown")
                         yield f"data: {json.dumps({'type': 'tool_call', 'tool': tool_name})}\n\n"
-                        last_keepalive = asyncio.get_event_loop().time()
-
-                # Send keepalive comment to prevent connection timeout
-                current_time = asyncio.get_event_loop().time()
-                if current_time - last_keepalive > keepalive_interval:
-                    yield ": keepalive\n\n"
-                    last_keepalive = current_time
-
-                # Add small delay to prevent overwhelming the client
-                await asyncio.sleep(0.01)
 
             # Save messages to session history
             try:
@@ -4229,15 +4327,14 @@ async def chat_stream_endpoint(request: ChatStreamRequest):
                     },
                 )
 
-                # Get final state to extract assistant response
-                # Note: In streaming, we should collect the response as we go
-                # For now, we'll save a completion marker
-                await session_manager.add_message(
-                    session_id=session_id,
-                    role="assistant",
-                    content="[Response streamed to client]",
-                    metadata={"workflow_id": session_id},
-                )
+                # Save the assistant response accumulated from the stream
+                if stream.text:
+                    await session_manager.add_message(
+                        session_id=session_id,
+                        role="assistant",
+                        content=stream.text,
+                        metadata={"workflow_id": session_id},
+                    )
                 logger.debug(f"[Chat Stream] Saved messages to session {session_id}")
             except Exception as e:
                 logger.warning(f"[Chat Stream] Could not save to session: {e}")
@@ -4298,7 +4395,7 @@ async def chat_stream_endpoint(request: ChatStreamRequest):
             yield f"data: {json.dumps(error_response)}\n\n"
 
     return StreamingResponse(
-        event_generator(),
+        stream.iterate(event_generator()),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -4342,9 +4439,10 @@ async def execute_stream_endpoint(request: ChatStreamRequest):
     - `error`: Error occurred
     """
     session_id = request.session_id or f"exec-{uuid.uuid4()}"
+    stream = SSEStream()
 
     async def event_generator():
-        """Generate SSE events from workflow execution."""
+        """Generate SSE events from workflow execution (content goes through `stream`)."""
         # Yield immediate heartbeat to prevent UI hang
         init_msg = json.dumps(
             {"type": "content", "content": "⚙️ *Initializing agent workflow...*\n\n"}
@@ -4376,17 +4474,17 @@ async def execute_stream_endpoint(request: ChatStreamRequest):
 
             # Create/load session
             try:
-                existing_session = await session_manager.get_session(session_id)
-                if not existing_session:
-                    await session_manager.create_session(
-                        session_id=session_id,
-                        user_id=request.user_id,
-                        metadata={
-                            "mode": "agent",
-                            "project_context": request.project_context,
-                            "workspace_root": request.workspace_root,
-                        },
-                    )
+                _, _, created = await session_manager.get_or_create_session(
+                    session_id,
+                    user_id=request.user_id,
+                    metadata={
+                        "mode": "agent",
+                        "project_context": request.project_context,
+                        "workspace_root": request.workspace_root,
+                    },
+                    history_limit=0,
+                )
+                if created:
                     logger.info(
                         f"[Execute Stream] Created new agent-mode session {session_id}"
                     )
@@ -4556,6 +4654,14 @@ async def execute_stream_endpoint(request: ChatStreamRequest):
                 "thread_id": session_id,
                 "pending_operation": None,
                 "project_context": project_context,
+                # The session's thread is checkpointed; reset every per-turn
+                # field so the previous turn's template or routing can't leak in
+                "workflow_template": None,
+                "workflow_context": None,
+                "use_template_engine": False,
+                "routing_decision": None,
+                "captured_insights": [],
+                "memory_context": None,
             }
 
             # Add workflow template if selected
@@ -4641,9 +4747,6 @@ async def execute_stream_endpoint(request: ChatStreamRequest):
 
             config = {"configurable": {"thread_id": session_id}}
 
-            last_keepalive = asyncio.get_event_loop().time()
-            keepalive_interval = 15
-
             # Track current executing agent for Linear updates
             current_executing_agent = None
             current_agent_issue_id = initial_state.get("current_agent_issue_id")
@@ -4688,8 +4791,7 @@ async def execute_stream_endpoint(request: ChatStreamRequest):
                 if event_kind == "on_chat_model_stream":
                     chunk = event.get("data", {}).get("chunk")
                     if chunk and hasattr(chunk, "content") and chunk.content:
-                        yield f"data: {json.dumps({'type': 'content', 'content': chunk.content})}\n\n"
-                        last_keepalive = asyncio.get_event_loop().time()
+                        stream.content(chunk.content)
 
                 # Agent completed
                 elif event_kind == "on_chain_end":
@@ -4708,7 +4810,6 @@ async def execute_stream_endpoint(request: ChatStreamRequest):
                         ]
                     ):
                         yield f"data: {json.dumps({'type': 'agent_complete', 'agent': name})}\n\n"
-                        last_keepalive = asyncio.get_event_loop().time()
 
                         # Update Linear issue to "Done" when agent completes
                         if current_executing_agent and current_agent_issue_id:
@@ -4780,15 +4881,6 @@ async def execute_stream_endpoint(request: ChatStreamRequest):
                 elif event_kind == "on_tool_start":
                     tool_name = event.get("name", "unknown")
                     yield f"data: {json.dumps({'type': 'tool_call', 'tool': tool_name})}\n\n"
-                    last_keepalive = asyncio.get_event_loop().time()
-
-                # Keepalive
-                current_time = asyncio.get_event_loop().time()
-                if current_time - last_keepalive > keepalive_interval:
-                    yield ": keepalive\n\n"
-                    last_keepalive = current_time
-
-                await asyncio.sleep(0.01)
 
             # Save to session history
             try:
@@ -4805,12 +4897,13 @@ async def execute_stream_endpoint(request: ChatStreamRequest):
                         ),
                     },
                 )
-                await session_manager.add_message(
-                    session_id=session_id,
-                    role="assistant",
-                    content="[Agent execution streamed to client]",
-                    metadata={"workflow_id": session_id},
-                )
+                if stream.text:
+                    await session_manager.add_message(
+                        session_id=session_id,
+                        role="assistant",
+                        content=stream.text,
+                        metadata={"workflow_id": session_id},
+                    )
             except Exception as e:
                 logger.warning(f"[Execute Stream] Could not save to session: {e}")
 
@@ -4855,7 +4948,7 @@ async def execute_stream_endpoint(request: ChatStreamRequest):
             yield f"data: {json.dumps({'type': 'error', 'error': error_message, 'session_id': session_id})}\n\n"
 
     return StreamingResponse(
-        event_generator(),
+        stream.iterate(event_generator()),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -5246,16 +5339,14 @@ async def resume_langgraph_workflow(
     """
     from graph import WorkflowState
     from graph import app as workflow_app
-    from lib.langgraph_base import get_postgres_checkpointer
 
     logger.info(
         f"[LangGraph Resume] Resuming thread {thread_id} with decision: {approval_decision}"
     )
 
     try:
-        # Get checkpointer to load saved state
-        checkpoint_conn = os.getenv("CHECKPOINT_POSTGRES_CONNECTION_STRING")
-        if not checkpoint_conn:
+        # The shared graph loads saved state through its checkpointer
+        if workflow_app.checkpointer is None:
             raise HTTPException(
                 status_code=500, detail="Checkpoint database not configured"
             )
@@ -5342,74 +5433,74 @@ async def resume_workflow_from_approval(
 ) -> Dict[str, Any]:
     """Helper to resume workflow from approval request ID.
 
-    Looks up the approval request, updates status, and resumes the workflow.
+    Records the decision and claims the request for resumption in one
+    statement, so the NOTIFY it triggers finds the request already claimed and
+    the approval dispatcher does not resume it a second time.
     """
     try:
         async with await hitl_manager._get_connection() as conn:
             async with conn.cursor() as cursor:
-                # Get approval request details including GitHub PR info
                 await cursor.execute(
                     """
-                    SELECT thread_id, checkpoint_id, workflow_id, status,
-                           pr_number, pr_url, github_repo, risk_level,
-                           task_description, linear_issue_id, linear_issue_url
-                    FROM approval_requests 
-                    WHERE id = %s
+                    UPDATE approval_requests
+                    SET status = %s, approved_at = NOW(), resumed_at = NOW(),
+                        claimed_until = NOW() + make_interval(secs => %s)
+                    WHERE id = %s AND status = 'pending'
+                    RETURNING thread_id, checkpoint_id, workflow_id,
+                              pr_number, pr_url, github_repo, risk_level,
+                              task_description, linear_issue_id, linear_issue_url,
+                              agent_name, created_at
                     """,
-                    (approval_request_id,),
+                    (action, approval_dispatcher.lease_seconds, approval_request_id),
                 )
                 row = await cursor.fetchone()
 
                 if not row:
-                    return {"error": "Approval request not found"}
-
-                (
-                    thread_id,
-                    checkpoint_id,
-                    workflow_id,
-                    status,
-                    pr_number,
-                    pr_url,
-                    github_repo,
-                    risk_level,
-                    task_description,
-                    linear_issue_id,
-                    linear_issue_url,
-                ) = row
-
-                if status != "pending":
-                    return {"error": f"Approval request already {status}"}
-
-                # Update approval status
-                await cursor.execute(
-                    """
-                    UPDATE approval_requests 
-                    SET status = %s, approved_at = NOW(), resumed_at = NOW()
-                    WHERE id = %s
-                    """,
-                    (action, approval_request_id),
-                )
+                    await cursor.execute(
+                        "SELECT status FROM approval_requests WHERE id = %s",
+                        (approval_request_id,),
+                    )
+                    existing = await cursor.fetchone()
+                    if not existing:
+                        return {"error": "Approval request not found"}
+                    return {"error": f"Approval request already {existing[0]}"}
+
                 await conn.commit()
 
-                logger.info(f"[HITL] Approval {approval_request_id} -> {action}")
+        (
+            thread_id,
+            checkpoint_id,
+            workflow_id,
+            pr_number,
+            pr_url,
+            github_repo,
+            risk_level,
+            task_description,
+            linear_issue_id,
+            linear_issue_url,
+            agent_name,
+            created_at,
+        ) = row
 
-                # Phase 2: Post GitHub PR comment if PR is linked
-                if pr_number and github_repo:
-                    try:
-                        # Extract owner and repo from github_repo (format: owner/repo)
-                        owner, repo = (
-                            github_repo.split("/")
-                            if "/" in github_repo
-                            else (None, None)
-                        )
+        logger.info(f"[HITL] Approval {approval_request_id} -> {action}")
 
-                        if owner and repo:
-                            # Use activate_pull_request_management_tools to get GitHub PR tools
-                            github_token = os.environ.get("GITHUB_TOKEN")
-                            if github_token:
-                                import requests
+        # Phase 2: Post GitHub PR comment if PR is linked
+        if pr_number and github_repo:
+            try:
+                # Extract owner and repo from github_repo (format: owner/repo)
+                owner, repo = (
+                    github_repo.split("/")
+                    if "/" in github_repo
+                    else (None, None)
+                )
+
+                if owner and repo:
+                    # Use activate_pull_request_management_tools to get GitHub PR tools
+                    github_token = os.environ.get("GITHUB_TOKEN")
+                    if github_token:
+                        import requests
 
-                                comment_body = f"""✅ **HITL Approval Granted**
+                        comment_body = f"""✅ **HITL Approval Granted**
 
 Workflow resumed after human approval.
 
@@ -5424,148 +5515,244 @@ Workflow resumed after human approval.
 *This approval was processed automatically via Linear webhook integration.*
 """
 
-                                # Post comment to GitHub PR
-                                api_url = f"https://api.github.com/repos/{owner}/{repo}/issues/{pr_number}/comments"
-                                headers = {
-                                    "Authorization": f"Bearer {github_token}",
-                                    "Accept": "application/vnd.github.v3+json",
-                                    "Content-Type": "application/json",
-                                }
-
-                                response = requests.post(
-                                    api_url,
-                                    headers=headers,
-                                    json={"body": comment_body},
-                                    timeout=10,
-                                )
+                        # Post comment to GitHub PR
+                        api_url = f"https://api.github.com/repos/{owner}/{repo}/issues/{pr_number}/comments"
+                        headers = {
+                            "Authorization": f"Bearer {github_token}",
+                            "Accept": "application/vnd.github.v3+json",
+                            "Content-Type": "application/json",
+                        }
 
-                                if response.status_code == 201:
-                                    logger.info(
-                                        f"[HITL] Posted approval comment to PR #{pr_number} in {github_repo}"
-                                    )
-                                else:
-                                    logger.warning(
-                                        f"[HITL] Failed to post PR comment: {response.status_code} - {response.text}"
-                                    )
-                            else:
-                                logger.warning(
-                                    "[HITL] GITHUB_TOKEN not set, skipping PR comment"
-                                )
+                        response = await asyncio.to_thread(
+                            requests.post,
+                            api_url,
+                            headers=headers,
+                            json={"body": comment_body},
+                            timeout=10,
+                        )
+
+                        if response.status_code == 201:
+                            logger.info(
+                                f"[HITL] Posted approval comment to PR #{pr_number} in {github_repo}"
+                            )
                         else:
                             logger.warning(
-                                f"[HITL] Invalid github_repo format: {github_repo}"
+                                f"[HITL] Failed to post PR comment: {response.status_code} - {response.text}"
                             )
-                    except Exception as pr_err:
-                        logger.error(
-                            f"[HITL] Failed to post GitHub PR comment: {pr_err}"
-                        )
-
-                # Phase 4: Record approval resolution metrics
-                try:
-                    # Parse created_at from row (assuming it's in the query results)
-                    # We'll need to query it if not already in row
-                    async with conn.cursor() as cursor:
-                        await cursor.execute(
-                            "SELECT agent_name, created_at FROM approval_requests WHERE id = %s",
-                            (approval_request_id,),
+                    else:
+                        logger.warning(
+                            "[HITL] GITHUB_TOKEN not set, skipping PR comment"
                         )
-                        metric_row = await cursor.fetchone()
-                        if metric_row:
-                            agent_name_metric, created_at = metric_row
-                            # Cast action to ApprovalStatus
-                            from lib.hitl_manager import ApprovalStatus
-
-                            approval_status = (
-                                action
-                                if action
-                                in [
-                                    "approved",
-                                    "rejected",
-                                    "pending",
-                                    "expired",
-                                    "cancelled",
-                                ]
-                                else "approved"
-                            )  # type: ApprovalStatus
-                            await hitl_manager.record_approval_resolution(
-                                request_id=approval_request_id,
-                                status=approval_status,  # type: ignore
-                                agent_name=agent_name_metric,
-                                risk_level=risk_level,
-                                created_at=created_at,
-                            )
-                except Exception as metric_err:
+                else:
                     logger.warning(
-                        f"[HITL] Failed to record approval metrics: {metric_err}"
+                        f"[HITL] Invalid github_repo format: {github_repo}"
                     )
+            except Exception as pr_err:
+                logger.error(
+                    f"[HITL] Failed to post GitHub PR comment: {pr_err}"
+                )
 
-                # Resume the workflow with insight injection (CHEF-207)
-                if thread_id:
-                    from graph import app as workflow_app
-                    from langchain_core.messages import HumanMessage
+        # Phase 4: Record approval resolution metrics
+        try:
+            approval_status = (
+                action
+                if action in ["approved", "rejected", "pending", "expired", "cancelled"]
+                else "approved"
+            )
+            await hitl_manager.record_approval_resolution(
+                request_id=approval_request_id,
+                status=approval_status,  # type: ignore
+                agent_name=agent_name,
+                risk_level=risk_level,
+                created_at=created_at,
+            )
+        except Exception as metric_err:
+            logger.warning(f"[HITL] Failed to record approval metrics: {metric_err}")
+
+        claim = {
+            "id": str(approval_request_id),
+            "status": action,
+            "thread_id": thread_id,
+            "checkpoint_id": checkpoint_id,
+            "workflow_id": workflow_id,
+            "risk_level": risk_level,
+            "agent_name": agent_name,
+            "approver_id": None,
+            "created_at": created_at,
+        }
+        try:
+            result = await resume_claimed_approval(claim)
+        except Exception:
+            # Let the dispatcher's sweep retry the resumption
+            await approval_dispatcher.release(approval_request_id)
+            raise
+        await approval_dispatcher.complete(approval_request_id)
+        return result
 
-                    config = {"configurable": {"thread_id": thread_id}}
+    except Exception as e:
+        logger.error(f"[HITL] Resume failed for {approval_request_id}: {e}")
+        return {"error": str(e)}
 
-                    # CHEF-207: Extract captured_insights from checkpoint for context injection
-                    memory_context = ""
-                    try:
-                        checkpoint_state = await workflow_app.aget_state(config)
-                        if checkpoint_state and checkpoint_state.values:
-                            captured_insights = checkpoint_state.values.get(
-                                "captured_insights", []
-                            )
-                            if captured_insights:
-                                insight_summaries = []
-                                for insight in captured_insights[-10:]:
-                                    agent = insight.get("agent_id", "unknown")
-                                    itype = insight.get("insight_type", "general")
-                                    content = insight.get("content", "")[:200]
-                                    insight_summaries.append(
-                                        f"- [{agent}] {itype}: {content}"
-                                    )
-                                memory_context = "\n\nPrior Insights:\n" + "\n".join(
-                                    insight_summaries
-                                )
-                                logger.info(
-                                    f"[HITL] Injecting {len(captured_insights)} insights on resume"
-                                )
-                    except Exception as insight_err:
-                        logger.warning(f"[HITL] Could not load insights: {insight_err}")
 
-                    resume_content = (
-                        f"HITL approval {action}. Resuming workflow.{memory_context}"
-                    )
-                    resume_message = HumanMessage(content=resume_content)
+async def _resume_langgraph_thread(
+    thread_id: str, workflow_id: Optional[str], action: str
+) -> Dict[str, Any]:
+    """Continue a checkpointed LangGraph thread after its approval was decided."""
+    from graph import app as workflow_app
+    from langchain_core.messages import HumanMessage
 
-                    final_state = await workflow_app.ainvoke(
-                        {
-                            "messages": [resume_message],
-                            "memory_context": memory_context,
-                        },
-                        config=config,
-                    )
+    config = {"configurable": {"thread_id": thread_id}}
 
+    # CHEF-207: Extract captured_insights from checkpoint for context injection
+    memory_context = ""
+    try:
+        checkpoint_state = await workflow_app.aget_state(config)
+        if checkpoint_state and checkpoint_state.values:
+            captured_insights = checkpoint_state.values.get("captured_insights", [])
+            if captured_insights:
+                insight_summaries = []
+                for insight in captured_insights[-10:]:
+                    agent = insight.get("agent_id", "unknown")
+                    itype = insight.get("insight_type", "general")
+                    content = insight.get("content", "")[:200]
+                    insight_summaries.append(f"- [{agent}] {itype}: {content}")
+                memory_context = "\n\nPrior Insights:\n" + "\n".join(insight_summaries)
+                logger.info(
+                    f"[HITL] Injecting {len(captured_insights)} insights on resume"
+                )
+    except Exception as insight_err:
+        logger.warning(f"[HITL] Could not load insights: {insight_err}")
+
+    resume_content = f"HITL approval {action}. Resuming workflow.{memory_context}"
+    resume_message = HumanMessage(content=resume_content)
+
+    final_state = await workflow_app.ainvoke(
+        {
+            "messages": [resume_message],
+            "memory_context": memory_context,
+        },
+        config=config,
+    )
+
+    return {
+        "thread_id": thread_id,
+        "workflow_id": workflow_id,
+        "resumed": True,
+        "final_status": (
+            "completed" if not final_state.get("requires_approval") else "in_progress"
+        ),
+    }
+
+
+async def _resume_pending_task(task_id: str, claim: Dict[str, Any]) -> Optional[TaskResponse]:
+    """Run (or drop, if rejected) an orchestration task held in pending_approval_registry.
+
+    The entry is removed only after the task ran, so a failed resumption
+    leaves it in place for the dispatcher's retry.
+    """
+    pending_task = await pending_approval_registry.aget(task_id)
+    if pending_task is None:
+        return None
+    if claim["status"] != "approved":
+        await pending_approval_registry.adelete(task_id)
+        return None
+
+    risk_level = pending_task["risk_level"]
+    wait_seconds = (datetime.utcnow() - pending_task["created_at"]).total_seconds()
+    approval_wait_time.labels(risk_level=risk_level).observe(max(wait_seconds, 0.0))
+
+    request = TaskRequest(**pending_task["request_payload"])
+    response = await execute_orchestration_flow(
+        task_id,
+        request,
+        pending_task["guardrail_report"],
+        pending_task["workspace_ctx"],
+        pending_task["project"],
+    )
+    await pending_approval_registry.adelete(task_id)
+
+    mcp_tool_client.record_memory_entity(
+        name=f"task_resumed_{task_id}",
+        entity_type="orchestrator_event",
+        observations=[
+            f"Task ID: {task_id}",
+            f"Approval request: {claim['id']}",
+            f"Approver: {claim.get('approver_id')}",
+            f"Resumed at: {datetime.utcnow().isoformat()}",
+        ],
+    )
+    return response
+
+
+async def resume_claimed_approval(claim: Dict[str, Any]) -> Dict[str, Any]:
+    """Resume whatever is paused on a decided, claimed approval request.
+
+    Called exactly once per request: by the approval dispatcher (NOTIFY or
+    sweep), or inline by the Linear webhook / manual resume paths.
+    """
+    action = claim["status"]
+    thread_id = claim.get("thread_id")
+    workflow_id = claim.get("workflow_id")
+
+    # Orchestration tasks paused in /orchestrate
+    if workflow_id and await pending_approval_registry.aget(workflow_id) is not None:
+        response = await _resume_pending_task(workflow_id, claim)
+        return {
+            "workflow_id": workflow_id,
+            "resumed": response is not None,
+            "final_status": response.status if response else action,
+        }
+
+    # Checkpointed LangGraph threads
+    if thread_id:
+        from graph import app as workflow_app
+
+        if workflow_app.checkpointer is not None:
+            state = await workflow_app.aget_state(
+                {"configurable": {"thread_id": thread_id}}
+            )
+            if state and state.values:
+                if action != "approved":
                     return {
                         "thread_id": thread_id,
                         "workflow_id": workflow_id,
-                        "resumed": True,
-                        "final_status": (
-                            "completed"
-                            if not final_state.get("requires_approval")
-                            else "in_progress"
-                        ),
+                        "resumed": False,
+                        "reason": "Approval rejected",
                     }
+                return await _resume_langgraph_thread(thread_id, workflow_id, action)
 
-                return {
-                    "workflow_id": workflow_id,
-                    "resumed": False,
-                    "reason": "No thread_id found",
-                }
+    # Declarative WorkflowEngine workflows paused at a HITL step
+    if workflow_id:
+        from workflows.workflow_engine import WorkflowEngine
+
+        engine = WorkflowEngine(
+            llm_client=get_llm_client("orchestrator"),
+            state_client=state_client,
+        )
+        try:
+            workflow_state = await engine.resume_workflow(
+                workflow_id=workflow_id,
+                approval_decision=action,
+                approver=claim.get("approver_id"),
+            )
+            return {
+                "workflow_id": workflow_id,
+                "resumed": True,
+                "final_status": workflow_state.status.value,
+            }
+        except ValueError as e:
+            # Not a paused workflow; nothing is waiting on this approval
+            logger.info(f"[HITL] Nothing to resume for {workflow_id}: {e}")
+
+    return {
+        "workflow_id": workflow_id,
+        "resumed": False,
+        "reason": "No paused workflow found",
+    }
 
-    except Exception as e:
-        logger.error(f"[HITL] Resume failed for {approval_request_id}: {e}")
-        return {"error": str(e)}
 
+# Resumes paused workflows as soon as approval_requests NOTIFY a decision
+approval_dispatcher = ApprovalDispatcher(handler=resume_claimed_approval)
 
 @app.get("/debug/task/{task_id}")
 async def debug_task(task_id: str):
@@ -5574,17 +5761,16 @@ async def debug_task(task_id: str):
 
     registry_info = {
         "total_tasks": len(task_registry),
-        "recent_task_ids": list(task_registry.keys())[-10:],
+        "recent_task_ids": task_registry.keys()[-10:],
     }
 
-    if task_id not in task_registry:
+    task = await task_registry.aget(task_id)
+    if task is None:
         return {
             "found": False,
             "task_id": task_id,
             "registry": registry_info,
         }
-
-    task = task_registry[task_id]
     return {
         "found": True,
         "task_id": task_id,
@@ -31,7 +31,9 @@ from jinja2 import Template
 from langsmith import traceable
 from pydantic import BaseModel, Field
 
+from shared.lib.db_pool import default_dsn
 from shared.lib.llm_client import LLMClient
+from shared.lib.resource_lock_manager import ResourceLockManager, get_resource_lock_manager
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -179,17 +181,22 @@ class WorkflowEngine:
     # Auto-expire abandoned workflows to prevent memory leaks
     WORKFLOW_TTL_HOURS = int(os.getenv("WORKFLOW_TTL_HOURS", "24"))
 
+    # How long a step waits for a resource lock held by another workflow
+    RESOURCE_LOCK_WAIT_SECONDS = float(os.getenv("WORKFLOW_LOCK_WAIT_SECONDS", "300"))
+
     def __init__(
         self,
         templates_dir: str = "agent_orchestrator/workflows/templates",
         llm_client: Optional[LLMClient] = None,
         state_client: Optional[Any] = None,
         linear_client: Optional[Any] = None,
+        lock_manager: Optional[ResourceLockManager] = None,
     ):
         self.templates_dir = Path(templates_dir)
         self.llm_client = llm_client  # Will be provided by caller
         self.state_client = state_client  # Will be provided by caller
         self.linear_client = linear_client  # For dependency escalation
+        self.lock_manager = lock_manager  # Defaults to the shared manager on first lock
 
         # Initialize dependency error handler for auto-remediation
         self.dependency_handler = get_dependency_handler(
@@ -738,8 +745,18 @@ class WorkflowEngine:
 
         return result
 
+    async def _get_lock_manager(self) -> ResourceLockManager:
+        if self.lock_manager is None:
+            self.lock_manager = get_resource_lock_manager(default_dsn())
+        await self.lock_manager.connect()
+        return self.lock_manager
+
+    @staticmethod
+    def _lock_owner(workflow_id: str) -> str:
+        return f"workflow:{workflow_id}"
+
     async def _acquire_lock(self, lock_name: str, state: WorkflowState):
-        """Acquire resource lock to prevent concurrent operations using PostgreSQL advisory locks."""
+        """Acquire resource lock to prevent concurrent operations (ResourceLockManager lease)."""
 
         if not self.state_client:
             # No state client, just track locally
@@ -747,23 +764,28 @@ class WorkflowEngine:
             return
 
         try:
-            # Use PostgreSQL advisory locks
-            # Convert lock_name to integer hash for pg_advisory_lock
-            import hashlib
-
-            lock_id = int(hashlib.md5(lock_name.encode()).hexdigest()[:8], 16)
-
-            # Acquire lock (blocks until available)
-            await self.state_client.execute(
-                "SELECT pg_advisory_lock($1)",
-                lock_id,
+            lock_manager = await self._get_lock_manager()
+            # The step releases the lock in a finally block, so keep the
+            # lease alive for as long as the step runs
+            acquired = await lock_manager.acquire_lock(
+                lock_name,
+                self._lock_owner(state.workflow_id),
+                reason=f"workflow {state.definition.name} step {state.current_step}",
+                wait_timeout=self.RESOURCE_LOCK_WAIT_SECONDS,
+                renew=True,
             )
-
-            state.resource_locks.append(lock_name)
-
         except Exception as e:
             # Fallback to local tracking if DB fails
+            logger.warning(f"[WorkflowEngine] Lock service unavailable for {lock_name}: {e}")
             state.resource_locks.append(lock_name)
+            return
+
+        if not acquired:
+            raise RuntimeError(
+                f"Resource lock {lock_name} still held after "
+                f"{self.RESOURCE_LOCK_WAIT_SECONDS:.0f}s (workflow {state.workflow_id})"
+            )
+        state.resource_locks.append(lock_name)
 
     async def _release_lock(self, lock_name: str, state: WorkflowState):
         """Release resource lock."""
@@ -777,20 +799,14 @@ class WorkflowEngine:
             return
 
         try:
-            # Release PostgreSQL advisory lock
-            import hashlib
-
-            lock_id = int(hashlib.md5(lock_name.encode()).hexdigest()[:8], 16)
-
-            await self.state_client.execute(
-                "SELECT pg_advisory_unlock($1)",
-                lock_id,
-            )
+            lock_manager = await self._get_lock_manager()
+            await lock_manager.release_lock(lock_name, self._lock_owner(state.workflow_id))
 
             state.resource_locks.remove(lock_name)
 
         except Exception as e:
-            # Fallback to local removal if DB fails
+            # Fallback to local removal if DB fails (the lease lapses on its own)
+            logger.warning(f"[WorkflowEngine] Failed to release lock {lock_name}: {e}")
             state.resource_locks.remove(lock_name)
 
     async def _create_approval_issue(
@@ -1323,13 +1339,8 @@ class WorkflowEngine:
         resource_locks = state_dict.get("resource_locks", [])
         for lock_name in resource_locks:
             try:
-                import hashlib
-
-                lock_id = int(hashlib.md5(lock_name.encode()).hexdigest()[:8], 16)
-                await self.state_client.execute(
-                    "SELECT pg_advisory_unlock($1)",
-                    lock_id,
-                )
+                lock_manager = await self._get_lock_manager()
+                await lock_manager.release_lock(lock_name, self._lock_owner(workflow_id))
             except Exception as e:
                 print(f"Warning: Failed to release lock {lock_name}: {e}")
 
@@ -38,6 +38,7 @@ CREATE TABLE IF NOT EXISTS approval_requests (
     
     -- Workflow resumption
     resumed_at TIMESTAMP,
+    claimed_until TIMESTAMP,  -- lease on an unfinished resumption; NULL once it completes
     
     -- Timeout handling
     expires_at TIMESTAMP,
@@ -62,6 +63,17 @@ CREATE INDEX IF NOT EXISTS idx_approval_workflow ON approval_requests(workflow_i
 CREATE INDEX IF NOT EXISTS idx_approval_created_at ON approval_requests(created_at);
 CREATE INDEX IF NOT EXISTS idx_approval_risk_level ON approval_requests(risk_level);
 CREATE INDEX IF NOT EXISTS idx_approval_expires ON approval_requests(expires_at) WHERE status = 'pending';
+-- Pending queue, newest first: keyset pagination with risk/expiry filters served from the index
+CREATE INDEX IF NOT EXISTS idx_approval_pending_queue ON approval_requests(created_at DESC, id DESC)
+    INCLUDE (risk_level, expires_at) WHERE status = 'pending';
+-- Decided but not yet resumed (approval dispatcher reconciliation sweep)
+CREATE INDEX IF NOT EXISTS idx_approval_unresumed ON approval_requests((COALESCE(approved_at, rejected_at)))
+    WHERE resumed_at IS NULL AND status IN ('approved', 'rejected');
+
+-- Resumption leases (existing tables gain the column; the sweep reclaims expired leases)
+ALTER TABLE approval_requests ADD COLUMN IF NOT EXISTS claimed_until TIMESTAMP;
+CREATE INDEX IF NOT EXISTS idx_approval_claimed_until ON approval_requests(claimed_until)
+    WHERE claimed_until IS NOT NULL;
 
 -- Approval Actions Table (audit trail of individual approvals/rejections)
 CREATE TABLE IF NOT EXISTS approval_actions (
@@ -104,6 +116,53 @@ CREATE TRIGGER update_approval_requests_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+-- Pending backlog per risk level, maintained incrementally (read by the backlog gauge)
+CREATE TABLE IF NOT EXISTS approval_backlog_counts (
+    risk_level VARCHAR(20) PRIMARY KEY,
+    pending INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION update_approval_backlog_counts()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status = 'pending' THEN
+        UPDATE approval_backlog_counts SET pending = pending - 1 WHERE risk_level = OLD.risk_level;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status = 'pending' THEN
+        UPDATE approval_backlog_counts SET pending = pending + 1 WHERE risk_level = NEW.risk_level;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS maintain_approval_backlog_counts ON approval_requests;
+CREATE TRIGGER maintain_approval_backlog_counts
+    AFTER INSERT OR DELETE OR UPDATE OF status, risk_level ON approval_requests
+    FOR EACH ROW
+    EXECUTE FUNCTION update_approval_backlog_counts();
+
+-- Push status changes to listeners (orchestrator approval dispatcher resumes paused workflows)
+CREATE OR REPLACE FUNCTION notify_approval_status_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('approval_status', json_build_object('id', NEW.id, 'status', NEW.status)::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS notify_approval_status ON approval_requests;
+CREATE TRIGGER notify_approval_status
+    AFTER UPDATE OF status ON approval_requests
+    FOR EACH ROW
+    WHEN (OLD.status IS DISTINCT FROM NEW.status)
+    EXECUTE FUNCTION notify_approval_status_change();
+
+-- Seed (or reconcile) the counts from the current rows
+INSERT INTO approval_backlog_counts (risk_level, pending)
+SELECT level, (SELECT COUNT(*) FROM approval_requests WHERE status = 'pending' AND risk_level = level)
+FROM unnest(ARRAY['low', 'medium', 'high', 'critical']) AS level
+ON CONFLICT (risk_level) DO UPDATE SET pending = EXCLUDED.pending;
+
 -- View for pending approvals (commonly used query)
 CREATE OR REPLACE VIEW pending_approvals AS
 SELECT 
@@ -150,9 +209,11 @@ COMMENT ON TABLE approval_requests IS 'Stores HITL approval requests for high-ri
 COMMENT ON TABLE approval_actions IS 'Audit trail of all approval/rejection actions';
 COMMENT ON VIEW pending_approvals IS 'Active approvals awaiting decision, ordered by priority';
 COMMENT ON VIEW approval_statistics IS 'Historical approval metrics for the past 30 days';
+COMMENT ON TABLE approval_backlog_counts IS 'Pending approvals per risk level, kept current by trigger';
 
 -- Grant permissions (adjust as needed)
 GRANT SELECT, INSERT, UPDATE ON approval_requests TO devtools;
 GRANT SELECT, INSERT ON approval_actions TO devtools;
 GRANT SELECT ON pending_approvals TO devtools;
 GRANT SELECT ON approval_statistics TO devtools;
+GRANT SELECT, UPDATE ON approval_backlog_counts TO devtools;
@@ -0,0 +1,21 @@
+-- Orchestrator Registries
+-- Backing store for the orchestrator's task and pending-approval registries
+-- (shared/lib/durable_registry.py). Every worker writes entries through on
+-- create and loads them on a local miss, so a task created on one worker can
+-- be executed or resumed on any other.
+
+CREATE TABLE IF NOT EXISTS orchestrator_registry (
+    registry VARCHAR(64) NOT NULL,   -- e.g. 'tasks', 'pending_approvals'
+    key VARCHAR(255) NOT NULL,
+    value JSONB NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMPTZ,          -- NULL keeps the entry until deleted
+    PRIMARY KEY (registry, key)
+);
+
+-- Expired entries are removed by DurableRegistry.aprune() at startup
+CREATE INDEX IF NOT EXISTS idx_orchestrator_registry_expiry
+    ON orchestrator_registry(registry, expires_at)
+    WHERE expires_at IS NOT NULL;
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON orchestrator_registry TO devtools;
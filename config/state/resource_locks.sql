@@ -1,5 +1,12 @@
 -- Resource Locking Schema for Multi-Agent Coordination
--- Implements PostgreSQL advisory locks with metadata tracking
+-- Lock ownership lives in resource_locks; transaction-scoped advisory locks
+-- serialize concurrent acquirers, so a lock is independent of the pooled
+-- connection that took it. Releases NOTIFY 'resource_lock_released' with the
+-- resource_id so waiters can block on LISTEN instead of polling, and waiters
+-- are granted the lock in lock_wait_queue order (priority, then arrival).
+-- A queue entry only lives for a short heartbeat window that each re-poll
+-- extends, so a waiter that crashed or was cancelled without leaving the
+-- queue stops blocking others within that window.
 -- Part of Phase 6: Multi-Agent Collaboration - Task 6.4
 
 -- ============================================================================
@@ -61,6 +68,14 @@ CREATE TABLE IF NOT EXISTS lock_wait_queue (
 CREATE INDEX IF NOT EXISTS idx_queue_resource ON lock_wait_queue(resource_id, requested_at);
 CREATE INDEX IF NOT EXISTS idx_queue_timeout ON lock_wait_queue(timeout_at);
 
+-- Wake waiters for a resource (LISTEN resource_lock_released)
+CREATE OR REPLACE FUNCTION notify_lock_released(p_resource_id VARCHAR)
+RETURNS VOID AS $$
+BEGIN
+    PERFORM pg_notify('resource_lock_released', p_resource_id);
+END;
+$$ LANGUAGE plpgsql;
+
 -- ============================================================================
 -- HELPER FUNCTIONS
 -- ============================================================================
@@ -77,12 +92,21 @@ $$ LANGUAGE plpgsql IMMUTABLE;
 -- ============================================================================
 -- ACQUIRE LOCK FUNCTION
 -- ============================================================================
+-- p_wait_timeout_seconds: how long the caller will wait if the lock is busy.
+-- 0 or NULL = don't queue.
+-- p_heartbeat_seconds: how long a queue entry outlives the caller's latest
+-- attempt; callers re-poll well within it (at least every recheck interval),
+-- so only abandoned entries lapse.
+DROP FUNCTION IF EXISTS acquire_resource_lock(VARCHAR, VARCHAR, INTEGER, VARCHAR, JSONB);
+DROP FUNCTION IF EXISTS acquire_resource_lock(VARCHAR, VARCHAR, INTEGER, VARCHAR, JSONB, INTEGER);
 CREATE OR REPLACE FUNCTION acquire_resource_lock(
     p_resource_id VARCHAR,
     p_agent_id VARCHAR,
     p_timeout_seconds INTEGER DEFAULT 300,
     p_reason VARCHAR DEFAULT NULL,
-    p_metadata JSONB DEFAULT '{}'::jsonb
+    p_metadata JSONB DEFAULT '{}'::jsonb,
+    p_wait_timeout_seconds INTEGER DEFAULT NULL,
+    p_heartbeat_seconds INTEGER DEFAULT 30
 )
 RETURNS TABLE(
     success BOOLEAN,
@@ -97,9 +121,15 @@ DECLARE
     v_wait_time_ms INTEGER;
     v_existing_owner VARCHAR;
     v_existing_expiry TIMESTAMP;
+    v_next_waiter VARCHAR;
+    v_wait_timeout INTEGER;
 BEGIN
     v_start_time := clock_timestamp();
     v_lock_key := resource_id_to_lock_key(p_resource_id);
+    v_wait_timeout := COALESCE(p_wait_timeout_seconds, 0);
+    
+    -- Serialize acquirers of this resource until the transaction ends
+    PERFORM pg_advisory_xact_lock(v_lock_key);
     
     -- Check if lock already exists
     SELECT agent_id, expires_at INTO v_existing_owner, v_existing_expiry
@@ -112,8 +142,16 @@ BEGIN
         v_existing_owner := NULL;
     END IF;
     
-    -- Try to acquire PostgreSQL advisory lock (non-blocking)
-    v_lock_acquired := pg_try_advisory_lock(v_lock_key);
+    -- FIFO: the lock goes to the first live waiter, if any (entries whose
+    -- owner stopped re-polling have lapsed and are skipped)
+    SELECT agent_id INTO v_next_waiter
+    FROM lock_wait_queue
+    WHERE resource_id = p_resource_id AND timeout_at > NOW()
+    ORDER BY priority DESC, requested_at, queue_id
+    LIMIT 1;
+    
+    v_lock_acquired := v_existing_owner IS NULL
+        AND (v_next_waiter IS NULL OR v_next_waiter = p_agent_id);
     
     IF v_lock_acquired THEN
         -- Success - insert metadata
@@ -136,6 +174,9 @@ BEGIN
             reason = p_reason,
             metadata = p_metadata;
         
+        -- Leave the wait queue
+        DELETE FROM lock_wait_queue WHERE resource_id = p_resource_id AND agent_id = p_agent_id;
+        
         v_wait_time_ms := EXTRACT(MILLISECONDS FROM (clock_timestamp() - v_start_time))::INTEGER;
         
         -- Log success
@@ -152,16 +193,27 @@ BEGIN
         -- Lock held by another agent
         v_wait_time_ms := EXTRACT(MILLISECONDS FROM (clock_timestamp() - v_start_time))::INTEGER;
         
-        -- Add to wait queue
-        INSERT INTO lock_wait_queue (
-            resource_id, agent_id, requested_at, timeout_at, metadata
-        ) VALUES (
-            p_resource_id,
-            p_agent_id,
-            NOW(),
-            NOW() + (p_timeout_seconds || ' seconds')::INTERVAL,
-            p_metadata
-        );
+        -- Join (or stay in) the wait queue, keeping the original position;
+        -- the entry lives until the next heartbeat is due (or the wait ends)
+        IF v_wait_timeout > 0 THEN
+            v_wait_timeout := LEAST(v_wait_timeout, GREATEST(p_heartbeat_seconds, 1));
+            
+            UPDATE lock_wait_queue
+            SET timeout_at = NOW() + (v_wait_timeout || ' seconds')::INTERVAL
+            WHERE resource_id = p_resource_id AND agent_id = p_agent_id;
+            
+            IF NOT FOUND THEN
+                INSERT INTO lock_wait_queue (
+                    resource_id, agent_id, requested_at, timeout_at, metadata
+                ) VALUES (
+                    p_resource_id,
+                    p_agent_id,
+                    NOW(),
+                    NOW() + (v_wait_timeout || ' seconds')::INTERVAL,
+                    p_metadata
+                );
+            END IF;
+        END IF;
         
         -- Log failure
         INSERT INTO lock_history (
@@ -214,15 +266,15 @@ BEGIN
             v_duration_ms := EXTRACT(MILLISECONDS FROM (NOW() - v_acquired_at))::INTEGER;
         END IF;
         
-        -- Release PostgreSQL advisory lock
-        PERFORM pg_advisory_unlock(v_lock_key);
-        
         -- Remove metadata
         DELETE FROM resource_locks WHERE resource_id = p_resource_id;
         
         -- Remove from wait queue
         DELETE FROM lock_wait_queue WHERE resource_id = p_resource_id AND agent_id = p_agent_id;
         
+        -- Wake waiters (delivered on commit)
+        PERFORM notify_lock_released(p_resource_id);
+        
         -- Log release
         INSERT INTO lock_history (
             resource_id, agent_id, operation, acquired_at, released_at,
@@ -242,6 +294,50 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- ============================================================================
+-- RENEW LOCK FUNCTION
+-- ============================================================================
+-- Extends a live lock held by p_agent_id; FALSE if it expired or changed hands
+CREATE OR REPLACE FUNCTION renew_resource_lock(
+    p_resource_id VARCHAR,
+    p_agent_id VARCHAR,
+    p_timeout_seconds INTEGER DEFAULT 300
+)
+RETURNS BOOLEAN AS $$
+BEGIN
+    UPDATE resource_locks
+    SET expires_at = NOW() + (p_timeout_seconds || ' seconds')::INTERVAL
+    WHERE resource_id = p_resource_id
+    AND agent_id = p_agent_id
+    AND expires_at > NOW();
+    
+    RETURN FOUND;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- LEAVE WAIT QUEUE FUNCTION
+-- ============================================================================
+-- Called by waiters that give up, so the next waiter in line isn't blocked
+CREATE OR REPLACE FUNCTION leave_lock_wait_queue(
+    p_resource_id VARCHAR,
+    p_agent_id VARCHAR
+)
+RETURNS INTEGER AS $$
+DECLARE
+    v_removed INTEGER;
+BEGIN
+    DELETE FROM lock_wait_queue WHERE resource_id = p_resource_id AND agent_id = p_agent_id;
+    GET DIAGNOSTICS v_removed = ROW_COUNT;
+    
+    IF v_removed > 0 THEN
+        PERFORM notify_lock_released(p_resource_id);
+    END IF;
+    
+    RETURN v_removed;
+END;
+$$ LANGUAGE plpgsql;
+
 -- ============================================================================
 -- CHECK LOCK STATUS FUNCTION
 -- ============================================================================
@@ -308,9 +404,9 @@ BEGIN
     
     IF v_owner IS NOT NULL THEN
         -- Force release
-        PERFORM pg_advisory_unlock(v_lock_key);
         DELETE FROM resource_locks WHERE resource_id = p_resource_id;
         DELETE FROM lock_wait_queue WHERE resource_id = p_resource_id;
+        PERFORM notify_lock_released(p_resource_id);
         
         -- Log force release
         INSERT INTO lock_history (
@@ -345,8 +441,8 @@ BEGIN
         FROM resource_locks
         WHERE expires_at < NOW()
     LOOP
-        -- Release advisory lock
-        PERFORM pg_advisory_unlock(v_expired_locks.lock_key);
+        -- Wake waiters
+        PERFORM notify_lock_released(v_expired_locks.resource_id);
         
         -- Log timeout
         INSERT INTO lock_history (
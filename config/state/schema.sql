@@ -37,6 +37,10 @@ CREATE TABLE IF NOT EXISTS workflows (
 CREATE INDEX idx_tasks_status ON tasks(status);
 CREATE INDEX idx_tasks_created ON tasks(created_at);
 CREATE INDEX idx_agent_logs_task ON agent_logs(task_id);
+-- Keyset pagination for /tasks and /logs/{task_id}
+CREATE INDEX IF NOT EXISTS idx_tasks_created_id ON tasks(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_status_created_id ON tasks(status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_agent_logs_task_ts_id ON agent_logs(task_id, timestamp, id);
 CREATE INDEX idx_workflows_status ON workflows(status);
 
 CREATE TABLE IF NOT EXISTS compliance_runs (
@@ -0,0 +1,265 @@
+"""
+Push-based resumption of workflows paused for HITL approval.
+
+approval_requests rows NOTIFY on the ``approval_status`` channel when their
+status changes (see config/state/approval_requests.sql). ApprovalDispatcher
+LISTENs on a dedicated connection and hands each decided request to a resume
+handler as soon as the notification arrives, instead of waiting for a poll.
+A slow reconciliation sweep picks up decisions made while no listener was
+connected.
+
+Exactly once: before resuming, a request is claimed with a conditional UPDATE
+that sets ``resumed_at`` and a lease, ``claimed_until``. Only the caller that
+flips it from NULL runs the handler, whichever replica or path (NOTIFY, sweep,
+Linear webhook, manual resume) gets there first. When the handler succeeds the
+claim is completed (lease cleared); if it fails, the claim is released so the
+sweep retries it. If the worker dies mid-resume, the lease runs out and the
+sweep claims the request again.
+
+Usage:
+    dispatcher = ApprovalDispatcher(handler=resume_claimed_approval)
+    await dispatcher.start()
+    ...
+    await dispatcher.stop()
+
+Configuration (environment):
+    APPROVAL_SWEEP_INTERVAL_SECONDS: Reconciliation sweep interval (default: 60)
+    APPROVAL_SWEEP_LOOKBACK_MINUTES: Oldest decision the sweep resumes (default: 60)
+    APPROVAL_CLAIM_LEASE_SECONDS: How long a claim lasts before the sweep can
+        reclaim it; keep it above the longest resumption (default: 600)
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+import psycopg
+from prometheus_client import Counter, Histogram
+from psycopg.rows import dict_row
+
+from .checkpoint_connection import get_async_connection
+from .db_pool import default_dsn
+
+logger = logging.getLogger(__name__)
+
+APPROVAL_CHANNEL = "approval_status"
+DECIDED_STATUSES = ("approved", "rejected")
+
+ResumeHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+approval_resume_delay_seconds = Histogram(
+    "hitl_approval_resume_delay_seconds",
+    "Time from an approval decision to the start of workflow resumption",
+    ["source"],
+    buckets=[0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300],
+)
+
+approval_resumptions = Counter(
+    "hitl_approval_resumptions_total",
+    "Approval requests handed to the resume handler",
+    ["source", "outcome"],
+)
+
+# Unclaimed, or claimed by a resumption whose lease ran out
+_CLAIMABLE = "(resumed_at IS NULL OR claimed_until <= NOW())"
+
+_CLAIM_SQL = f"""
+    UPDATE approval_requests
+    SET resumed_at = NOW(), claimed_until = NOW() + make_interval(secs => %s)
+    WHERE id = %s AND status IN ('approved', 'rejected') AND {_CLAIMABLE}
+    RETURNING id::text AS id, status, thread_id, checkpoint_id, workflow_id,
+              risk_level, agent_name, approver_id, created_at,
+              EXTRACT(EPOCH FROM (NOW() - COALESCE(approved_at, rejected_at, updated_at)))
+                  AS decision_age_seconds
+"""
+
+_SWEEP_SQL = f"""
+    SELECT id::text FROM approval_requests
+    WHERE status IN ('approved', 'rejected') AND {_CLAIMABLE}
+      AND COALESCE(approved_at, rejected_at) > NOW() - make_interval(mins => %s)
+"""
+
+
+class ApprovalDispatcher:
+    """
+    Resumes paused workflows when their approval request is decided.
+
+    The handler receives the claimed approval row as a dict (id, status,
+    thread_id, checkpoint_id, workflow_id, risk_level, agent_name,
+    approver_id, created_at) and is called at most once per request.
+    """
+
+    def __init__(
+        self,
+        handler: ResumeHandler,
+        dsn: Optional[str] = None,
+        sweep_interval_seconds: Optional[float] = None,
+        sweep_lookback_minutes: Optional[float] = None,
+        lease_seconds: Optional[float] = None,
+        reconnect_delay_seconds: float = 1.0,
+        max_reconnect_delay_seconds: float = 30.0,
+    ):
+        self.handler = handler
+        self.dsn = dsn
+        self.sweep_interval_seconds = sweep_interval_seconds or float(
+            os.getenv("APPROVAL_SWEEP_INTERVAL_SECONDS", "60")
+        )
+        self.sweep_lookback_minutes = sweep_lookback_minutes or float(
+            os.getenv("APPROVAL_SWEEP_LOOKBACK_MINUTES", "60")
+        )
+        self.lease_seconds = lease_seconds or float(
+            os.getenv("APPROVAL_CLAIM_LEASE_SECONDS", "600")
+        )
+        self.reconnect_delay_seconds = reconnect_delay_seconds
+        self.max_reconnect_delay_seconds = max_reconnect_delay_seconds
+
+        self.listening = False
+        self._inflight: Set[str] = set()
+        self._handler_tasks: Set[asyncio.Task] = set()
+        self._listen_task: Optional[asyncio.Task] = None
+        self._sweep_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start listening for decisions and the reconciliation sweep."""
+        if self._listen_task is not None:
+            return
+        self._listen_task = asyncio.create_task(self._listen_loop())
+        self._sweep_task = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        """Stop listening and wait for running resumptions to finish."""
+        tasks = [t for t in (self._listen_task, self._sweep_task) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._listen_task = self._sweep_task = None
+        if self._handler_tasks:
+            await asyncio.gather(*self._handler_tasks, return_exceptions=True)
+
+    async def claim(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """Claim a decided request for resumption; None if it is undecided or already claimed.
+
+        The claim is a lease: call complete() once the resumption succeeds or
+        release() if it fails; otherwise the sweep reclaims it after
+        lease_seconds.
+        """
+        async with get_async_connection() as conn:
+            async with conn.cursor(row_factory=dict_row) as cursor:
+                await cursor.execute(_CLAIM_SQL, (self.lease_seconds, request_id))
+                row = await cursor.fetchone()
+            await conn.commit()
+        return row
+
+    async def complete(self, request_id: str) -> None:
+        """Mark a claimed request as resumed for good (its lease no longer expires)."""
+        async with get_async_connection() as conn:
+            await conn.execute(
+                "UPDATE approval_requests SET claimed_until = NULL WHERE id = %s",
+                (request_id,),
+            )
+            await conn.commit()
+
+    async def release(self, request_id: str) -> None:
+        """Give a claim back so the request is retried by the next sweep."""
+        async with get_async_connection() as conn:
+            await conn.execute(
+                "UPDATE approval_requests SET resumed_at = NULL, claimed_until = NULL WHERE id = %s",
+                (request_id,),
+            )
+            await conn.commit()
+
+    async def dispatch(self, request_id: str, source: str = "notify") -> bool:
+        """Claim and resume one request; True if this call ran the handler successfully."""
+        if request_id in self._inflight:
+            return False
+        self._inflight.add(request_id)
+        try:
+            claim = await self.claim(request_id)
+            if claim is None:
+                return False
+
+            approval_resume_delay_seconds.labels(source=source).observe(
+                max(float(claim.pop("decision_age_seconds") or 0), 0.0)
+            )
+            try:
+                await self.handler(claim)
+            except Exception as e:
+                logger.error(f"[ApprovalDispatcher] Resume failed for {request_id}: {e}")
+                approval_resumptions.labels(source=source, outcome="failed").inc()
+                await self.release(request_id)
+                return False
+
+            await self.complete(request_id)
+            approval_resumptions.labels(source=source, outcome="resumed").inc()
+            logger.info(
+                f"[ApprovalDispatcher] Resumed approval {request_id} ({claim['status']}, via {source})"
+            )
+            return True
+        finally:
+            self._inflight.discard(request_id)
+
+    async def sweep(self) -> int:
+        """Resume decided requests that no notification delivered; returns how many."""
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(_SWEEP_SQL, (self.sweep_lookback_minutes,))
+                rows = await cursor.fetchall()
+
+        resumed = 0
+        for (request_id,) in rows:
+            if await self.dispatch(request_id, source="sweep"):
+                resumed += 1
+        if resumed:
+            logger.info(f"[ApprovalDispatcher] Sweep resumed {resumed} approval(s)")
+        return resumed
+
+    def _on_notification(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"[ApprovalDispatcher] Ignoring malformed notification: {payload!r}")
+            return
+        if event.get("status") not in DECIDED_STATUSES:
+            return
+        # Run outside the listener so a long resume never delays later notifications
+        task = asyncio.create_task(self.dispatch(str(event["id"])))
+        self._handler_tasks.add(task)
+        task.add_done_callback(self._handler_tasks.discard)
+
+    async def _listen_loop(self) -> None:
+        delay = self.reconnect_delay_seconds
+        while True:
+            try:
+                conn = await psycopg.AsyncConnection.connect(
+                    self.dsn or default_dsn(), autocommit=True
+                )
+                async with conn:
+                    await conn.execute(f"LISTEN {APPROVAL_CHANNEL}")
+                    self.listening = True
+                    delay = self.reconnect_delay_seconds
+                    logger.info(f"[ApprovalDispatcher] Listening on '{APPROVAL_CHANNEL}'")
+
+                    # Catch up on decisions made before LISTEN took effect
+                    await self.sweep()
+                    async for notify in conn.notifies():
+                        self._on_notification(notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    f"[ApprovalDispatcher] Listener disconnected: {e}; retrying in {delay:.0f}s"
+                )
+            finally:
+                self.listening = False
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay_seconds)
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"[ApprovalDispatcher] Sweep failed: {e}")
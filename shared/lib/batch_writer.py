@@ -0,0 +1,146 @@
+"""
+Background batch writer shared by the event bus publisher, the session
+message writer and the MCP memory-entity sink.
+
+Items are buffered and written by a background task. Every write wakes the
+task, which lingers briefly (unless max_batch items are already waiting) and
+then writes everything buffered, max_batch at a time. Items leave the buffer
+only after write_batch returns, so a batch interrupted by an error or a
+cancellation is written again by the next flush, and a failed flush is
+retried after retry_delay even if nothing new arrives.
+
+Subclasses implement write_batch: raising keeps the batch buffered for a
+retry; returning marks it done (a subclass that does not want a failure
+retried counts or logs it and returns).
+
+Usage:
+    class _Sink(BatchWriter[Dict[str, Any]]):
+        async def write_batch(self, batch):
+            await client.create_entities(batch)
+
+    sink = _Sink(linger_ms=250, max_batch=50, max_pending=1000)
+    sink.add(entity)        # never waits; drops the oldest when full
+    await sink.put(entity)  # writes inline first when full (backpressure)
+    await sink.close()      # writes what is left and stops the task
+"""
+
+import asyncio
+import logging
+from typing import Generic, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+async def cancel_and_wait(tasks: List[asyncio.Task]) -> None:
+    """
+    Cancel tasks and wait until they finish.
+
+    Before Python 3.12, asyncio.wait_for (used by Redis clients while
+    reading) can swallow a cancellation that races with its inner await
+    completing, leaving the task running; such tasks are cancelled again.
+    """
+    pending = {task for task in tasks if not task.done()}
+    while pending:
+        for task in pending:
+            task.cancel()
+        _, pending = await asyncio.wait(pending, timeout=0.1)
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class BatchWriter(Generic[T]):
+    """
+    Buffers items and writes them in batches from a background task.
+
+    At most max_pending items are buffered: add() drops the oldest beyond
+    that, put() flushes inline first, and a failed flush drops the oldest
+    items that no longer fit.
+    """
+
+    retry_delay = 1.0
+
+    def __init__(self, linger_ms: float, max_batch: int, max_pending: int, name: str = "batch"):
+        self.linger = linger_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.max_pending = max(1, max_pending)
+        self.name = name
+        self._buffer: List[T] = []
+        # Items at the front of the buffer that write_batch is writing now
+        self._inflight = 0
+        self._wakeup = asyncio.Event()
+        # Serializes flushes: keeps write order and lets flush() wait for a
+        # batch the background task already has in flight
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def write_batch(self, batch: List[T]) -> None:
+        raise NotImplementedError
+
+    def on_dropped(self, count: int) -> None:
+        """Called when buffered items are discarded because the buffer is full."""
+        logger.error(f"[{self.name}] Dropped {count} buffered items")
+
+    def add(self, item: T) -> None:
+        """Buffer an item without waiting, dropping the oldest one if the buffer is full."""
+        if len(self._buffer) >= self.max_pending:
+            if self._inflight >= len(self._buffer):
+                # Everything buffered is being written; the new item does not fit
+                self.on_dropped(1)
+                return
+            del self._buffer[self._inflight]
+            self.on_dropped(1)
+        self._append(item)
+
+    async def put(self, item: T) -> None:
+        """Buffer an item, first writing the buffer inline if it is full."""
+        if len(self._buffer) >= self.max_pending:
+            await self.flush()
+        self._append(item)
+
+    def _append(self, item: T) -> None:
+        self._buffer.append(item)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            if len(self._buffer) < self.max_batch:
+                await asyncio.sleep(self.linger)
+            self._wakeup.clear()
+            if not await self.flush() and self._buffer:
+                await asyncio.sleep(self.retry_delay)
+                self._wakeup.set()
+
+    async def flush(self) -> bool:
+        """Write everything buffered so far; False if a batch failed and is still buffered."""
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[: self.max_batch]
+                self._inflight = len(batch)
+                try:
+                    await self.write_batch(batch)
+                except Exception as e:
+                    logger.error(f"[{self.name}] Failed to write {len(batch)} items: {e}")
+                    overflow = len(self._buffer) - self.max_pending
+                    if overflow > 0:
+                        del self._buffer[:overflow]
+                        self.on_dropped(overflow)
+                    return False
+                finally:
+                    self._inflight = 0
+                # Only flush() removes from the front while a batch is in
+                # flight, and it holds the lock
+                del self._buffer[: len(batch)]
+            return True
+
+    async def close(self) -> None:
+        """Write everything still buffered, then stop the background task."""
+        await self.flush()
+        if self._task:
+            await cancel_and_wait([self._task])
+            self._task = None
+        # Anything written (or left by an interrupted batch) after the first flush
+        await self.flush()
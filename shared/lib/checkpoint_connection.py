@@ -3,7 +3,7 @@ Checkpoint connection utilities for HITL manager and approval workflows.
 Re-exports postgres utilities from langgraph_base.
 """
 from .langgraph_base import get_postgres_checkpointer, get_postgres_connection_string
-import psycopg
+from .db_pool import get_pool_registry
 from contextlib import asynccontextmanager
 
 # Alias for consistency
@@ -12,13 +12,9 @@ get_checkpoint_connection = get_postgres_checkpointer
 
 @asynccontextmanager
 async def get_async_connection():
-    """Get async PostgreSQL connection for HITL manager"""
-    conn_string = get_postgres_connection_string()
-    conn = await psycopg.AsyncConnection.connect(conn_string)
-    try:
+    """Borrow an async PostgreSQL connection for HITL manager from the shared psycopg pool"""
+    async with get_pool_registry().psycopg_connection() as conn:
         yield conn
-    finally:
-        await conn.close()
 
 
 __all__ = [
@@ -16,13 +16,16 @@ Usage:
 
 import os
 import asyncio
+import json
 import uuid
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Dict, Any, List, Callable, Awaitable
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 import httpx
 import logging
 
+from .shared_cache import LRUCache, TieredCache
+
 logger = logging.getLogger(__name__)
 
 # Configuration
@@ -30,6 +33,9 @@ RAG_SERVICE_URL = os.environ.get("RAG_SERVICE_URL", "http://rag:8007")
 COLLECTION_NAME = "library_registry"
 CACHE_TTL_DAYS = int(os.environ.get("LIBRARY_CACHE_TTL_DAYS", "30"))
 SIMILARITY_THRESHOLD = 0.85  # Minimum score for cache hit
+LOCAL_CACHE_SIZE = int(os.environ.get("LIBRARY_LOCAL_CACHE_SIZE", "500"))
+# Optional Redis tier so library IDs are shared across processes
+CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL")
 
 
 @dataclass
@@ -60,7 +66,16 @@ class Context7CacheClient:
     ):
         self.rag_url = rag_url
         self.fallback_resolver = fallback_resolver
-        self._local_cache: Dict[str, CachedLibrary] = {}
+        self._local_cache = TieredCache(
+            LRUCache(
+                "context7_library_ids",
+                max_size=LOCAL_CACHE_SIZE,
+                ttl_seconds=CACHE_TTL_DAYS * 86400,
+            ),
+            redis_url=CACHE_REDIS_URL,
+            serialize=lambda entry: json.dumps(asdict(entry)),
+            deserialize=lambda raw: CachedLibrary(**json.loads(raw)),
+        )
         self._cache_hits = 0
         self._cache_misses = 0
 
@@ -79,9 +94,9 @@ class Context7CacheClient:
         """
         normalized_name = library_name.lower().strip()
 
-        # Check in-memory cache first (fastest)
-        if normalized_name in self._local_cache:
-            entry = self._local_cache[normalized_name]
+        # Check in-memory (then Redis, if configured) cache first (fastest)
+        entry = await self._local_cache.aget(normalized_name)
+        if entry is not None:
             self._cache_hits += 1
             logger.debug(f"Local cache hit: {library_name} → {entry.library_id}")
             return entry.library_id
@@ -91,7 +106,7 @@ class Context7CacheClient:
 
         if cached and cached.relevance_score >= SIMILARITY_THRESHOLD:
             # Cache hit - store locally and return
-            self._local_cache[normalized_name] = cached
+            await self._local_cache.aset(normalized_name, cached)
             self._cache_hits += 1
 
             # Update usage count (non-blocking)
@@ -217,14 +232,17 @@ class Context7CacheClient:
                     logger.info(f"Cached new library: {library_name}")
 
                     # Update local cache
-                    self._local_cache[library_name.lower()] = CachedLibrary(
-                        library_name=library_name,
-                        library_id=library_id,
-                        aliases=aliases or [],
-                        category=category,
-                        last_verified=timestamp,
-                        usage_count=1,
-                        relevance_score=1.0,
+                    await self._local_cache.aset(
+                        library_name.lower(),
+                        CachedLibrary(
+                            library_name=library_name,
+                            library_id=library_id,
+                            aliases=aliases or [],
+                            category=category,
+                            last_verified=timestamp,
+                            usage_count=1,
+                            relevance_score=1.0,
+                        ),
                     )
                     return True
 
@@ -248,18 +266,19 @@ class Context7CacheClient:
             "cache_hits": self._cache_hits,
             "cache_misses": self._cache_misses,
             "hit_rate_percent": round(hit_rate, 2),
-            "local_cache_size": len(self._local_cache),
+            "local_cache_size": len(self._local_cache.local),
+            "local_cache": self._local_cache.get_stats(),
             "estimated_tokens_saved": self._cache_hits * 1000,  # ~1000 tokens per hit
         }
 
     def clear_local_cache(self) -> None:
         """Clear the in-memory cache."""
-        self._local_cache.clear()
+        self._local_cache.local.clear()
         logger.info("Local cache cleared")
 
     def get_cached_libraries(self) -> List[str]:
         """Get list of locally cached library names."""
-        return list(self._local_cache.keys())
+        return list(self._local_cache.local.keys())
 
 
 # Singleton instance for use across agents
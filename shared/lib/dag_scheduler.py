@@ -0,0 +1,190 @@
+"""
+Dependency-aware concurrent execution of task graphs.
+
+Provides:
+- topological_levels: groups of nodes whose dependencies are all in earlier groups
+- DAGScheduler: runs every node as soon as its declared dependencies have
+  completed, with at most ``max_concurrency`` nodes in flight, and yields each
+  result as it finishes
+
+Each node only sees the results of its own declared dependencies. Nodes whose
+dependency failed are not run; they are reported as "skipped".
+
+Usage:
+    scheduler = DAGScheduler(max_concurrency=4)
+    deps = {"infra": [], "docs": [], "review": ["code"], "code": []}
+
+    async def run(node_id, upstream):      # upstream: {dep_id: result}
+        return await agents[node_id].invoke(...)
+
+    async for outcome in scheduler.run(deps, run):
+        print(outcome.node_id, outcome.status)
+
+Configuration (environment):
+    DAG_MAX_CONCURRENCY: Default concurrency cap (default: 4)
+"""
+
+import asyncio
+import logging
+import os
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterable, List, Mapping, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+NodeRunner = Callable[[str, Dict[str, Any]], Awaitable[Any]]
+
+
+class DependencyCycleError(ValueError):
+    """The dependency graph contains a cycle."""
+
+
+@dataclass
+class NodeOutcome:
+    """Result of one node: status is "completed", "failed" or "skipped"."""
+
+    node_id: str
+    status: str
+    result: Any = None
+    error: Optional[str] = None
+    duration_seconds: float = 0.0
+
+
+def _normalize(dependencies: Mapping[str, Optional[Iterable[str]]]) -> Dict[str, List[str]]:
+    """Drop self-references and references to unknown nodes (logged)."""
+    graph = {}
+    for node_id, deps in dependencies.items():
+        known = []
+        for dep in deps or []:
+            if dep == node_id or dep not in dependencies:
+                logger.warning(f"[DAGScheduler] Ignoring dependency {dep!r} of {node_id!r}")
+                continue
+            if dep not in known:
+                known.append(dep)
+        graph[node_id] = known
+    return graph
+
+
+def topological_levels(dependencies: Mapping[str, Optional[Iterable[str]]]) -> List[List[str]]:
+    """
+    Group nodes into levels; every node's dependencies are in earlier levels.
+
+    Nodes keep their input order within a level.
+
+    Raises:
+        DependencyCycleError: If the graph has a cycle
+    """
+    graph = _normalize(dependencies)
+    remaining = {node_id: set(deps) for node_id, deps in graph.items()}
+    levels = []
+    while remaining:
+        level = [node_id for node_id, deps in remaining.items() if not deps]
+        if not level:
+            raise DependencyCycleError(f"Dependency cycle among {sorted(remaining)}")
+        levels.append(level)
+        for node_id in level:
+            del remaining[node_id]
+        for deps in remaining.values():
+            deps.difference_update(level)
+    return levels
+
+
+class DAGScheduler:
+    """
+    Runs a dependency graph with bounded concurrency.
+
+    One instance can run any number of graphs; the cap applies per run().
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        self.max_concurrency = max(
+            1, max_concurrency or int(os.getenv("DAG_MAX_CONCURRENCY", "4"))
+        )
+
+    async def run(
+        self,
+        dependencies: Mapping[str, Optional[Iterable[str]]],
+        run_node: NodeRunner,
+    ) -> AsyncIterator[NodeOutcome]:
+        """
+        Run every node and yield outcomes in completion order.
+
+        run_node(node_id, upstream) receives only the results of the node's
+        declared dependencies. If the consumer stops iterating, nodes still
+        running are cancelled.
+
+        Raises:
+            DependencyCycleError: If the graph has a cycle (before anything runs)
+        """
+        topological_levels(dependencies)  # validate up front
+        graph = _normalize(dependencies)
+
+        waiting_on: Dict[str, Set[str]] = {n: set(deps) for n, deps in graph.items()}
+        dependents: Dict[str, List[str]] = {n: [] for n in graph}
+        for node_id, deps in graph.items():
+            for dep in deps:
+                dependents[dep].append(node_id)
+
+        order = {node_id: index for index, node_id in enumerate(graph)}
+        ready: Deque[str] = deque(n for n, deps in graph.items() if not deps)
+        results: Dict[str, Any] = {}
+        running: Dict[asyncio.Task, str] = {}
+        loop = asyncio.get_running_loop()
+
+        async def execute(node_id: str) -> NodeOutcome:
+            upstream = {dep: results[dep] for dep in graph[node_id]}
+            started = loop.time()
+            try:
+                result = await run_node(node_id, upstream)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[DAGScheduler] Node {node_id} failed: {e}")
+                return NodeOutcome(node_id, "failed", error=str(e), duration_seconds=loop.time() - started)
+            return NodeOutcome(node_id, "completed", result=result, duration_seconds=loop.time() - started)
+
+        def skip_dependents(node_id: str) -> List[NodeOutcome]:
+            skipped = []
+            stack = list(dependents[node_id])
+            while stack:
+                dependent = stack.pop()
+                if dependent not in waiting_on:
+                    continue
+                del waiting_on[dependent]
+                skipped.append(
+                    NodeOutcome(dependent, "skipped", error=f"Dependency {node_id} did not complete")
+                )
+                stack.extend(dependents[dependent])
+            return skipped
+
+        try:
+            while ready or running:
+                while ready and len(running) < self.max_concurrency:
+                    node_id = ready.popleft()
+                    del waiting_on[node_id]
+                    running[asyncio.create_task(execute(node_id))] = node_id
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                # Keep input order among nodes that finish together
+                for task in sorted(done, key=lambda t: order[running[t]]):
+                    node_id = running.pop(task)
+                    outcome = task.result()
+                    yield outcome
+
+                    if outcome.status != "completed":
+                        for skipped in skip_dependents(node_id):
+                            yield skipped
+                        continue
+
+                    results[node_id] = outcome.result
+                    for dependent in dependents[node_id]:
+                        if dependent in waiting_on:
+                            waiting_on[dependent].discard(node_id)
+                            if not waiting_on[dependent] and dependent not in ready:
+                                ready.append(dependent)
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
@@ -0,0 +1,385 @@
+"""
+Process-wide PostgreSQL connection pool registry.
+
+Every subsystem in a process borrows connections from the same named pools
+instead of building its own, so one orchestrator holds a bounded, predictable
+number of server connections.
+
+Provides:
+- PoolRegistry: lazily created asyncpg pools (and a psycopg pool for
+  psycopg-based callers) keyed by name, with statement caching, health checks
+  and saturation gauges
+- MeteredPool: what get_pool() hands out; pool.acquire() applies
+  PG_POOL_ACQUIRE_TIMEOUT and records wait time and saturation timeouts,
+  everything else is the underlying asyncpg pool
+- get_pool_registry(): the process singleton
+- default_dsn(): connection string from DB_* (falling back to POSTGRES_*) env vars
+
+Usage:
+    registry = get_pool_registry()
+    pool = await registry.get_pool()                 # "default" pool
+    async with pool.acquire() as conn:               # records acquire wait time
+        await conn.fetchval("SELECT 1")
+    async with registry.acquire() as conn:           # same, without keeping the pool
+        ...
+
+    async with registry.psycopg_connection() as conn:  # psycopg 3 callers
+        ...
+
+Environment Variables:
+    DB_HOST / DB_PORT / DB_NAME / DB_USER / DB_PASSWORD(_FILE): default database
+    (POSTGRES_HOST / POSTGRES_PORT / POSTGRES_DB / POSTGRES_USER /
+    POSTGRES_PASSWORD(_FILE) are honoured when the DB_* variable is unset)
+    PG_POOL_MIN_SIZE / PG_POOL_MAX_SIZE: asyncpg pool bounds (default 1 / 10)
+    PG_PSYCOPG_POOL_MAX_SIZE: psycopg pool bound (default 5)
+    PG_STATEMENT_CACHE_SIZE: prepared statements cached per connection
+    (default 512; set 0 behind pgbouncer in transaction mode)
+    PG_POOL_ACQUIRE_TIMEOUT: seconds to wait for a free connection (default 30)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import asyncpg
+
+try:
+    from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+
+    def _get_or_create(factory, name, description, labelnames, **kwargs):
+        existing = REGISTRY._names_to_collectors.get(name)
+        if existing is not None:
+            return existing
+        try:
+            return factory(name, description, labelnames, **kwargs)
+        except ValueError:
+            return REGISTRY._names_to_collectors.get(name)
+
+    pool_connections = _get_or_create(
+        Gauge,
+        "db_pool_connections",
+        "Connections per pool by state (open, in_use, max)",
+        ["pool", "state"],
+    )
+    pool_acquire_seconds = _get_or_create(
+        Histogram,
+        "db_pool_acquire_seconds",
+        "Time spent waiting for a pooled connection",
+        ["pool"],
+        buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+    )
+    pool_acquire_timeouts_total = _get_or_create(
+        Counter,
+        "db_pool_acquire_timeouts_total",
+        "Acquisitions that timed out because the pool was saturated",
+        ["pool"],
+    )
+    PROMETHEUS_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    PROMETHEUS_AVAILABLE = False
+
+try:
+    from psycopg_pool import AsyncConnectionPool
+
+    PSYCOPG_POOL_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    AsyncConnectionPool = None
+    PSYCOPG_POOL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL = "default"
+
+
+def _env(primary: str, fallback: str, default: str) -> str:
+    return os.getenv(primary) or os.getenv(fallback) or default
+
+
+def _read_secret(env_var: str) -> Optional[str]:
+    """Value of env_var, or the contents of the file named by env_var_FILE."""
+    value = os.getenv(env_var)
+    if value:
+        return value
+    path = os.getenv(f"{env_var}_FILE")
+    if path and os.path.exists(path):
+        with open(path, "r") as f:
+            return f.read().strip()
+    return None
+
+
+def default_dsn() -> str:
+    """Connection string for the default database."""
+    host = _env("DB_HOST", "POSTGRES_HOST", "postgres")
+    port = _env("DB_PORT", "POSTGRES_PORT", "5432")
+    name = _env("DB_NAME", "POSTGRES_DB", "devtools")
+    user = _env("DB_USER", "POSTGRES_USER", "devtools")
+    password = _read_secret("DB_PASSWORD") or _read_secret("POSTGRES_PASSWORD") or "changeme"
+    return f"postgresql://{user}:{password}@{host}:{port}/{name}"
+
+
+def _redact(dsn: str) -> str:
+    parts = urlsplit(dsn)
+    return f"{parts.username}@{parts.hostname}:{parts.port or 5432}{parts.path}"
+
+
+@dataclass
+class PoolConfig:
+    """Settings for one named pool."""
+
+    dsn: str
+    min_size: int = 1
+    max_size: int = 10
+    statement_cache_size: int = 512
+    command_timeout: Optional[float] = 60
+    max_inactive_connection_lifetime: float = 300
+    acquire_timeout: float = 30
+
+    @classmethod
+    def from_env(cls, dsn: str) -> "PoolConfig":
+        return cls(
+            dsn=dsn,
+            min_size=int(os.getenv("PG_POOL_MIN_SIZE", "1")),
+            max_size=int(os.getenv("PG_POOL_MAX_SIZE", "10")),
+            statement_cache_size=int(os.getenv("PG_STATEMENT_CACHE_SIZE", "512")),
+            acquire_timeout=float(os.getenv("PG_POOL_ACQUIRE_TIMEOUT", "30")),
+        )
+
+
+class MeteredPool:
+    """
+    An asyncpg pool whose acquire() is bounded and measured.
+
+    acquire() waits at most acquire_timeout for a connection, observes the
+    wait in db_pool_acquire_seconds and counts timeouts in
+    db_pool_acquire_timeouts_total. Other attributes (fetch, execute,
+    get_size, close, ...) are the asyncpg pool's own.
+    """
+
+    def __init__(self, name: str, pool: asyncpg.Pool, acquire_timeout: float):
+        self.name = name
+        self.pool = pool
+        self.acquire_timeout = acquire_timeout
+
+    @asynccontextmanager
+    async def acquire(self, timeout: Optional[float] = None):
+        """Borrow a connection, recording wait time and saturation timeouts."""
+        started = time.perf_counter()
+        try:
+            conn = await self.pool.acquire(timeout=timeout or self.acquire_timeout)
+        except asyncio.TimeoutError:
+            if PROMETHEUS_AVAILABLE:
+                pool_acquire_timeouts_total.labels(pool=self.name).inc()
+            logger.error(f"[DBPool] Pool '{self.name}' saturated: no connection within timeout")
+            raise
+        if PROMETHEUS_AVAILABLE:
+            pool_acquire_seconds.labels(pool=self.name).observe(time.perf_counter() - started)
+        try:
+            yield conn
+        finally:
+            await self.pool.release(conn)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.pool, attr)
+
+
+class PoolRegistry:
+    """
+    Named, lazily created connection pools shared by a whole process.
+
+    Pools are keyed by name. Callers that only know a DSN get the default
+    pool when it matches the default database, otherwise a pool named after
+    the DSN, so the same database is never pooled twice. Components must not
+    close pools they borrow; close_all() runs once at shutdown.
+    """
+
+    def __init__(self):
+        self._configs: Dict[str, PoolConfig] = {}
+        self._pools: Dict[str, MeteredPool] = {}
+        self._psycopg_pools: Dict[str, Any] = {}
+        self._create_lock = asyncio.Lock()
+
+    def configure(self, name: str, config: PoolConfig) -> None:
+        """Set the config for a pool before first use."""
+        if name in self._pools:
+            raise ValueError(f"Pool '{name}' is already open")
+        self._configs[name] = config
+
+    def pool_name_for(self, dsn: Optional[str]) -> str:
+        """Registry name that pools connections to dsn."""
+        if dsn is None or dsn == self._config(DEFAULT_POOL).dsn:
+            return DEFAULT_POOL
+        return _redact(dsn)
+
+    def _config(self, name: str, dsn: Optional[str] = None) -> PoolConfig:
+        config = self._configs.get(name)
+        if config is None:
+            config = self._configs[name] = PoolConfig.from_env(dsn or default_dsn())
+        return config
+
+    async def get_pool(self, name: Optional[str] = None, dsn: Optional[str] = None) -> MeteredPool:
+        """
+        Get (creating on first use) an asyncpg pool, wrapped so acquire() is metered.
+
+        Args:
+            name: Pool name (default: derived from dsn, else "default")
+            dsn: Connection string, used when the pool doesn't exist yet
+        """
+        name = name or self.pool_name_for(dsn)
+        pool = self._pools.get(name)
+        if pool is not None:
+            return pool
+
+        async with self._create_lock:
+            pool = self._pools.get(name)
+            if pool is not None:
+                return pool
+
+            config = self._config(name, dsn)
+            pool = await asyncpg.create_pool(
+                config.dsn,
+                min_size=config.min_size,
+                max_size=config.max_size,
+                statement_cache_size=config.statement_cache_size,
+                command_timeout=config.command_timeout,
+                max_inactive_connection_lifetime=config.max_inactive_connection_lifetime,
+            )
+            self._export_gauges(name, pool)
+            pool = self._pools[name] = MeteredPool(name, pool, config.acquire_timeout)
+            logger.info(
+                f"[DBPool] Opened pool '{name}' -> {_redact(config.dsn)} "
+                f"(min={config.min_size}, max={config.max_size})"
+            )
+            return pool
+
+    @asynccontextmanager
+    async def acquire(self, name: Optional[str] = None, dsn: Optional[str] = None):
+        """Borrow a connection, recording wait time and saturation timeouts."""
+        pool = await self.get_pool(name, dsn)
+        async with pool.acquire() as conn:
+            yield conn
+
+    async def get_psycopg_pool(self, name: str = "psycopg", **connection_kwargs):
+        """
+        Get (creating on first use) a psycopg 3 pool for the default database.
+
+        Args:
+            name: Pool name; callers needing different connection settings
+                use their own name
+            **connection_kwargs: Extra psycopg connection arguments (e.g.
+                autocommit, row_factory), applied when the pool is created
+        """
+        pool = self._psycopg_pools.get(name)
+        if pool is not None:
+            return pool
+        if not PSYCOPG_POOL_AVAILABLE:
+            raise RuntimeError("psycopg_pool is not installed")
+
+        async with self._create_lock:
+            pool = self._psycopg_pools.get(name)
+            if pool is None:
+                config = self._config(DEFAULT_POOL)
+                kwargs = {
+                    # Server-side prepare after 5 executions; None disables it
+                    "prepare_threshold": 5 if config.statement_cache_size else None,
+                    **connection_kwargs,
+                }
+                pool = AsyncConnectionPool(
+                    config.dsn,
+                    min_size=1,
+                    max_size=int(os.getenv("PG_PSYCOPG_POOL_MAX_SIZE", "5")),
+                    timeout=config.acquire_timeout,
+                    max_idle=config.max_inactive_connection_lifetime,
+                    kwargs=kwargs,
+                    check=AsyncConnectionPool.check_connection,
+                    open=False,
+                )
+                await pool.open()
+                self._psycopg_pools[name] = pool
+                logger.info(f"[DBPool] Opened psycopg pool '{name}' -> {_redact(config.dsn)}")
+        return pool
+
+    @asynccontextmanager
+    async def psycopg_connection(self):
+        """Borrow a psycopg connection (committed on clean exit, rolled back on error)."""
+        pool = await self.get_psycopg_pool()
+        async with pool.connection() as conn:
+            yield conn
+
+    def _export_gauges(self, name: str, pool: asyncpg.Pool) -> None:
+        if not PROMETHEUS_AVAILABLE:
+            return
+        pool_connections.labels(pool=name, state="open").set_function(pool.get_size)
+        pool_connections.labels(pool=name, state="in_use").set_function(
+            lambda: pool.get_size() - pool.get_idle_size()
+        )
+        pool_connections.labels(pool=name, state="max").set_function(pool.get_max_size)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Size and saturation of every open pool."""
+        stats = {}
+        for name, pool in self._pools.items():
+            in_use = pool.get_size() - pool.get_idle_size()
+            stats[name] = {
+                "open": pool.get_size(),
+                "in_use": in_use,
+                "max": pool.get_max_size(),
+                "saturation": in_use / pool.get_max_size(),
+            }
+        for name, pool in self._psycopg_pools.items():
+            psycopg_stats = pool.get_stats()
+            stats[name] = {
+                "open": psycopg_stats.get("pool_size", 0),
+                "in_use": psycopg_stats.get("pool_size", 0) - psycopg_stats.get("pool_available", 0),
+                "max": pool.max_size,
+                "waiting": psycopg_stats.get("requests_waiting", 0),
+            }
+        return stats
+
+    async def health_check(self, timeout: float = 5.0) -> Dict[str, Dict[str, Any]]:
+        """Run SELECT 1 on every open pool."""
+        results = {}
+        for name, pool in list(self._pools.items()):
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(pool.fetchval("SELECT 1"), timeout=timeout)
+                results[name] = {
+                    "healthy": True,
+                    "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+                }
+            except Exception as e:
+                results[name] = {"healthy": False, "error": str(e)}
+        for name, pool in list(self._psycopg_pools.items()):
+            try:
+                async with pool.connection(timeout=timeout) as conn:
+                    await conn.execute("SELECT 1")
+                results[name] = {"healthy": True}
+            except Exception as e:
+                results[name] = {"healthy": False, "error": str(e)}
+        return results
+
+    async def close_all(self) -> None:
+        """Close every pool (process shutdown only)."""
+        pools, self._pools = self._pools, {}
+        for name, pool in pools.items():
+            await pool.close()
+            logger.info(f"[DBPool] Closed pool '{name}'")
+        psycopg_pools, self._psycopg_pools = self._psycopg_pools, {}
+        for name, pool in psycopg_pools.items():
+            await pool.close()
+            logger.info(f"[DBPool] Closed psycopg pool '{name}'")
+
+
+_registry: Optional[PoolRegistry] = None
+
+
+def get_pool_registry() -> PoolRegistry:
+    """Get the process-wide pool registry."""
+    global _registry
+    if _registry is None:
+        _registry = PoolRegistry()
+    return _registry
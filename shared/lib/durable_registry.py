@@ -0,0 +1,408 @@
+"""
+Bounded registries shared by every orchestrator worker.
+
+DurableRegistry keeps a bounded LRUCache (see shared_cache) in front of a
+backing store that all workers and replicas share:
+- writes go through to the store (aset, adelete)
+- reads check the LRU first and load misses from the store on demand
+- apop removes and returns the entry in one store operation, so only one
+  worker gets it
+
+So a task created on one worker can be read, executed or resumed on another.
+Local copies of stored entries expire after a short TTL, bounding how long a
+worker can serve an entry that another worker has since updated or removed.
+Local memory stays bounded because old entries leave the LRU and stay only in
+the store. If the store is unreachable, operations are logged and the
+registry keeps working as a local LRU: entries whose write-through failed
+never expire locally, since the LRU holds the only copy.
+
+aensure_schema() creates the PostgreSQL table if it is missing (databases
+initialized before config/state/orchestrator_registry.sql existed).
+
+Stores:
+- PostgresRegistryStore: rows in orchestrator_registry (config/state/orchestrator_registry.sql)
+- RedisRegistryStore: one key per entry, expired by Redis
+- None: local LRU only (single worker)
+
+Usage:
+    tasks = DurableRegistry(
+        "tasks",
+        store=create_registry_store("tasks"),
+        serialize=lambda task: task.model_dump(mode="json"),
+        deserialize=TaskResponse.model_validate,
+    )
+    await tasks.aset(task_id, response)
+    task = await tasks.aget(task_id)    # local first, then the store
+
+Configuration (environment):
+    REGISTRY_BACKEND: postgres, redis or memory (default: postgres)
+    REGISTRY_REDIS_URL: Redis URL for the redis backend (default: REDIS_URL)
+    REGISTRY_MAX_SIZE: Entries kept in memory per registry (default: 1000)
+    REGISTRY_LOCAL_TTL_SECONDS: How long a worker trusts its local copy before
+        reloading it from the store (default: 2; ignored without a store)
+    REGISTRY_TTL_SECONDS: How long the store keeps an entry (default: 604800)
+"""
+
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from prometheus_client import Counter, Gauge
+
+from .checkpoint_connection import get_async_connection
+from .shared_cache import LRUCache
+
+try:
+    import redis.asyncio as redis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+registry_size = Gauge(
+    "orchestrator_registry_size",
+    "Entries held in memory per registry",
+    ["registry"],
+)
+
+registry_store_operations = Counter(
+    "orchestrator_registry_store_operations_total",
+    "Backing store operations per registry (load and pop: hit/miss/error, save and delete: ok/error)",
+    ["registry", "operation", "result"],
+)
+
+
+REGISTRY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orchestrator_registry (
+    registry VARCHAR(64) NOT NULL,
+    key VARCHAR(255) NOT NULL,
+    value JSONB NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMPTZ,
+    PRIMARY KEY (registry, key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_orchestrator_registry_expiry
+    ON orchestrator_registry(registry, expires_at)
+    WHERE expires_at IS NOT NULL;
+"""
+
+
+class RegistryStore:
+    """
+    Backing store for a DurableRegistry.
+
+    Values are JSON-compatible dicts; subclasses implement load, save, delete
+    and pop and may raise on connection errors (the registry logs them).
+    """
+
+    async def load(self, key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def save(self, key: str, value: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def pop(self, key: str) -> Optional[Dict[str, Any]]:
+        """Atomically remove and return an entry; None if it was not there."""
+        raise NotImplementedError
+
+    async def ensure_schema(self) -> None:
+        """Create whatever the store needs to hold entries (nothing by default)."""
+
+    async def prune(self) -> int:
+        """Remove expired entries; returns how many (0 if the store expires them itself)."""
+        return 0
+
+    async def close(self) -> None:
+        pass
+
+
+class PostgresRegistryStore(RegistryStore):
+    """Entries as rows of orchestrator_registry, keyed by (registry, key)."""
+
+    def __init__(self, registry: str, ttl_seconds: Optional[float] = None):
+        self.registry = registry
+        self.ttl_seconds = ttl_seconds
+
+    async def ensure_schema(self) -> None:
+        async with get_async_connection() as conn:
+            await conn.execute(REGISTRY_SCHEMA)
+            await conn.commit()
+
+    async def load(self, key: str) -> Optional[Dict[str, Any]]:
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(
+                    """
+                    SELECT value FROM orchestrator_registry
+                    WHERE registry = %s AND key = %s
+                      AND (expires_at IS NULL OR expires_at > NOW())
+                    """,
+                    (self.registry, key),
+                )
+                row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def save(self, key: str, value: Dict[str, Any]) -> None:
+        async with get_async_connection() as conn:
+            await conn.execute(
+                """
+                INSERT INTO orchestrator_registry (registry, key, value, updated_at, expires_at)
+                VALUES (%s, %s, %s::jsonb, NOW(), NOW() + make_interval(secs => %s))
+                ON CONFLICT (registry, key) DO UPDATE
+                SET value = EXCLUDED.value,
+                    updated_at = EXCLUDED.updated_at,
+                    expires_at = EXCLUDED.expires_at
+                """,
+                (self.registry, key, json.dumps(value, default=str), self.ttl_seconds),
+            )
+            await conn.commit()
+
+    async def delete(self, key: str) -> None:
+        async with get_async_connection() as conn:
+            await conn.execute(
+                "DELETE FROM orchestrator_registry WHERE registry = %s AND key = %s",
+                (self.registry, key),
+            )
+            await conn.commit()
+
+    async def pop(self, key: str) -> Optional[Dict[str, Any]]:
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(
+                    """
+                    DELETE FROM orchestrator_registry
+                    WHERE registry = %s AND key = %s
+                    RETURNING value, (expires_at IS NULL OR expires_at > NOW()) AS live
+                    """,
+                    (self.registry, key),
+                )
+                row = await cursor.fetchone()
+            await conn.commit()
+        return row[0] if row and row[1] else None
+
+    async def prune(self) -> int:
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(
+                    "DELETE FROM orchestrator_registry WHERE registry = %s AND expires_at <= NOW()",
+                    (self.registry,),
+                )
+                deleted = cursor.rowcount
+            await conn.commit()
+        return max(deleted, 0)
+
+
+class RedisRegistryStore(RegistryStore):
+    """Entries as JSON strings under registry:<registry>:<key>, expired by Redis."""
+
+    def __init__(self, registry: str, redis_url: str, ttl_seconds: Optional[float] = None):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis package is required for the redis registry backend")
+        self.registry = registry
+        self.ttl_seconds = ttl_seconds
+        self._redis = redis.from_url(redis_url, decode_responses=True)
+
+    def _key(self, key: str) -> str:
+        return f"registry:{self.registry}:{key}"
+
+    async def load(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = await self._redis.get(self._key(key))
+        return json.loads(raw) if raw is not None else None
+
+    async def save(self, key: str, value: Dict[str, Any]) -> None:
+        await self._redis.set(
+            self._key(key),
+            json.dumps(value, default=str),
+            ex=int(self.ttl_seconds) if self.ttl_seconds else None,
+        )
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(self._key(key))
+
+    async def pop(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = await self._redis.getdel(self._key(key))
+        return json.loads(raw) if raw is not None else None
+
+    async def close(self) -> None:
+        await self._redis.close()
+
+
+def create_registry_store(
+    registry: str,
+    backend: Optional[str] = None,
+    ttl_seconds: Optional[float] = None,
+) -> Optional[RegistryStore]:
+    """Build the configured backing store for a registry (None for memory)."""
+    backend = (backend or os.getenv("REGISTRY_BACKEND", "postgres")).lower()
+    if ttl_seconds is None:
+        ttl_seconds = float(os.getenv("REGISTRY_TTL_SECONDS", "604800")) or None
+
+    if backend == "postgres":
+        return PostgresRegistryStore(registry, ttl_seconds=ttl_seconds)
+    if backend == "redis":
+        redis_url = os.getenv("REGISTRY_REDIS_URL") or os.getenv("REDIS_URL", "redis://redis:6379")
+        return RedisRegistryStore(registry, redis_url, ttl_seconds=ttl_seconds)
+    if backend == "memory":
+        return None
+    raise ValueError(f"Unknown REGISTRY_BACKEND: {backend}")
+
+
+class DurableRegistry:
+    """
+    Bounded in-memory registry with a write-through backing store.
+
+    serialize/deserialize convert values to and from the JSON-compatible dicts
+    the store holds. Keys are strings. With a store, local copies of stored
+    entries expire after local_ttl_seconds; entries only held locally (no
+    store, or a failed write-through) stay until evicted.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        store: Optional[RegistryStore] = None,
+        max_size: Optional[int] = None,
+        local_ttl_seconds: Optional[float] = None,
+        serialize: Callable[[Any], Dict[str, Any]] = lambda value: value,
+        deserialize: Callable[[Dict[str, Any]], Any] = lambda value: value,
+    ):
+        self.name = name
+        self.store = store
+        self.serialize = serialize
+        self.deserialize = deserialize
+        if local_ttl_seconds is None:
+            local_ttl_seconds = float(os.getenv("REGISTRY_LOCAL_TTL_SECONDS", "2"))
+        self.local_ttl_seconds = (local_ttl_seconds or None) if store is not None else None
+        # No default TTL: only copies of entries the store holds expire
+        self.local = LRUCache(
+            f"registry_{name}",
+            max_size=max_size or int(os.getenv("REGISTRY_MAX_SIZE", "1000")),
+        )
+
+    async def aget(self, key: str, default: Any = None) -> Any:
+        """Return the entry, loading it from the store on a local miss."""
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.store is None:
+            return default
+
+        try:
+            raw = await self.store.load(key)
+        except Exception as e:
+            logger.warning(f"[DurableRegistry] Load failed for {self.name}/{key}: {e}")
+            registry_store_operations.labels(registry=self.name, operation="load", result="error").inc()
+            return default
+
+        if raw is None:
+            registry_store_operations.labels(registry=self.name, operation="load", result="miss").inc()
+            return default
+        registry_store_operations.labels(registry=self.name, operation="load", result="hit").inc()
+        value = self.deserialize(raw)
+        self._set_local(key, value, self.local_ttl_seconds)
+        return value
+
+    async def aset(self, key: str, value: Any) -> None:
+        """Store an entry locally and write it through to the store."""
+        self._set_local(key, value)
+        if self.store is None:
+            return
+        try:
+            await self.store.save(key, self.serialize(value))
+        except Exception as e:
+            logger.warning(f"[DurableRegistry] Save failed for {self.name}/{key}: {e}")
+            registry_store_operations.labels(registry=self.name, operation="save", result="error").inc()
+            return
+        registry_store_operations.labels(registry=self.name, operation="save", result="ok").inc()
+        # Stored, so the local copy may now expire and be reloaded
+        self._set_local(key, value, self.local_ttl_seconds)
+
+    async def adelete(self, key: str) -> None:
+        """Remove an entry locally and from the store."""
+        self.local.delete(key)
+        registry_size.labels(registry=self.name).set(len(self.local))
+        if self.store is None:
+            return
+        try:
+            await self.store.delete(key)
+        except Exception as e:
+            logger.warning(f"[DurableRegistry] Delete failed for {self.name}/{key}: {e}")
+            registry_store_operations.labels(registry=self.name, operation="delete", result="error").inc()
+            return
+        registry_store_operations.labels(registry=self.name, operation="delete", result="ok").inc()
+
+    async def apop(self, key: str, default: Any = None) -> Any:
+        """Remove and return an entry (from any worker's writes), or default.
+
+        The store removes and returns the entry in one operation, so when
+        several workers pop the same key only one of them gets it.
+        """
+        local = self.local.get(key, _MISSING)
+        self.local.delete(key)
+        registry_size.labels(registry=self.name).set(len(self.local))
+        if self.store is None:
+            return default if local is _MISSING else local
+
+        try:
+            raw = await self.store.pop(key)
+        except Exception as e:
+            logger.warning(f"[DurableRegistry] Pop failed for {self.name}/{key}: {e}")
+            registry_store_operations.labels(registry=self.name, operation="pop", result="error").inc()
+            return default if local is _MISSING else local
+
+        if raw is None:
+            registry_store_operations.labels(registry=self.name, operation="pop", result="miss").inc()
+            return default
+        registry_store_operations.labels(registry=self.name, operation="pop", result="hit").inc()
+        return self.deserialize(raw)
+
+    async def aensure_schema(self) -> None:
+        """Create the store's table if it is missing; failures are logged."""
+        if self.store is None:
+            return
+        try:
+            await self.store.ensure_schema()
+        except Exception as e:
+            logger.warning(f"[DurableRegistry] Schema setup failed for {self.name}: {e}")
+
+    async def aprune(self) -> int:
+        """Drop expired entries from the store."""
+        if self.store is None:
+            return 0
+        try:
+            return await self.store.prune()
+        except Exception as e:
+            logger.warning(f"[DurableRegistry] Prune failed for {self.name}: {e}")
+            return 0
+
+    async def aclose(self) -> None:
+        if self.store is not None:
+            await self.store.close()
+
+    def keys(self) -> List[Hashable]:
+        """Keys held in memory, least to most recently used."""
+        return self.local.keys()
+
+    def __len__(self) -> int:
+        """Entries held in memory on this worker."""
+        return len(self.local)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.local.get_stats(),
+            "store": type(self.store).__name__ if self.store else None,
+        }
+
+    def _set_local(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        self.local.set(key, value, ttl_seconds=ttl_seconds)
+        registry_size.labels(registry=self.name).set(len(self.local))
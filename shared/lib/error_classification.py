@@ -17,17 +17,25 @@ Categories:
     - Workflow: State corruption, deadlocks, infinite loops
     - Database: Connection errors, query failures, deadlocks
     - External: Third-party API failures, webhook errors
+
+Patterns are compiled once at import. Classifications are memoized by
+exception type plus normalized-message hash, so error storms classify each
+distinct error once.
 """
 
+import os
 import re
 import logging
 import traceback
 from enum import Enum
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 import hashlib
 
+from .shared_cache import LRUCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -102,9 +110,7 @@ class ErrorSignature:
         error_type = type(exception).__name__
         
         # Normalize message: remove variable parts like IDs, timestamps, etc.
-        message = str(exception)
-        normalized_message = _normalize_error_message(message)
-        message_hash = hashlib.md5(normalized_message.encode()).hexdigest()[:12]
+        message_hash = _message_hash(_normalize_error_message(str(exception)))
         
         # Extract file context from traceback if available
         file_context = None
@@ -263,6 +269,61 @@ ERROR_PATTERNS: Dict[ErrorCategory, List[Tuple[str, ErrorSeverity, RecoveryTier,
 }
 
 
+# Flattened, precompiled view of ERROR_PATTERNS in declaration order:
+# (compiled regex, source pattern, category, severity, tier, hints)
+_COMPILED_PATTERNS: List[Tuple[re.Pattern, str, ErrorCategory, ErrorSeverity, RecoveryTier, List[str]]] = [
+    (re.compile(pattern, re.IGNORECASE), pattern, category, severity, tier, hints)
+    for category, patterns in ERROR_PATTERNS.items()
+    for pattern, severity, tier, hints in patterns
+]
+
+# Single alternation over every pattern. Most messages during an error storm
+# match nothing, and one search rules that out; only messages that match
+# something are checked against the individual patterns (a combined
+# alternation reports one alternative per position, not every match).
+_ANY_PATTERN = re.compile(
+    "|".join(f"(?:{pattern})" for _, pattern, *_ in _COMPILED_PATTERNS),
+    re.IGNORECASE,
+)
+
+# Exception type -> (category, severity, tier), checked in order
+_TYPE_CLASSIFICATIONS: Tuple[Tuple[Tuple[type, ...], Tuple[ErrorCategory, ErrorSeverity, RecoveryTier]], ...] = (
+    # Network errors
+    ((ConnectionError, ConnectionRefusedError, ConnectionResetError, TimeoutError),
+        (ErrorCategory.NETWORK, ErrorSeverity.MEDIUM, RecoveryTier.TIER_1)),
+    # Auth errors
+    ((PermissionError,),
+        (ErrorCategory.AUTH, ErrorSeverity.HIGH, RecoveryTier.TIER_3)),
+    # Resource errors
+    ((MemoryError, FileNotFoundError, OSError),
+        (ErrorCategory.RESOURCE, ErrorSeverity.HIGH, RecoveryTier.TIER_2)),
+    # Dependency errors
+    ((ModuleNotFoundError, ImportError),
+        (ErrorCategory.DEPENDENCY, ErrorSeverity.MEDIUM, RecoveryTier.TIER_1)),
+    # Config errors
+    ((ValueError, TypeError, AttributeError, KeyError),
+        (ErrorCategory.CONFIG, ErrorSeverity.MEDIUM, RecoveryTier.TIER_2)),
+)
+
+# Variable parts of error messages, replaced in one pass. Alternatives are
+# tried in this order at each position (UUIDs before hex addresses, before
+# IPs, before timestamps, before bare numeric IDs).
+_VARIABLE_PARTS = re.compile(
+    r"(?P<UUID>(?i:[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}))"
+    r"|(?P<ADDR>(?i:0x[0-9a-f]+))"
+    r"|(?P<IP>\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}(?::\d+)?)"
+    r"|(?P<TIMESTAMP>\d{4}-\d{2}-\d{2}[T\s]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:[+-]\d{2}:?\d{2}|Z)?)"
+    # A hex address directly after the digits counts as a boundary, as it
+    # did when addresses were replaced in an earlier pass
+    r"|(?P<ID>\b\d{4,}(?:\b|(?=(?i:0x[0-9a-f]))))"
+)
+
+
+def _placeholder(match: re.Match) -> str:
+    return f"<{match.lastgroup}>"
+
+
+@lru_cache(maxsize=4096)
 def _normalize_error_message(message: str) -> str:
     """Normalize error message for consistent hashing.
     
@@ -273,50 +334,31 @@ def _normalize_error_message(message: str) -> str:
     - File paths with variable names
     - Memory addresses
     """
-    # Remove UUIDs
-    message = re.sub(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", "<UUID>", message, flags=re.IGNORECASE)
-    
-    # Remove hex addresses (e.g., 0x7fff...)
-    message = re.sub(r"0x[0-9a-f]+", "<ADDR>", message, flags=re.IGNORECASE)
-    
-    # Remove IP addresses
-    message = re.sub(r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}(:\d+)?", "<IP>", message)
-    
-    # Remove timestamps (ISO format)
-    message = re.sub(r"\d{4}-\d{2}-\d{2}[T\s]\d{2}:\d{2}:\d{2}(\.\d+)?([+-]\d{2}:?\d{2}|Z)?", "<TIMESTAMP>", message)
-    
-    # Remove numeric IDs (standalone numbers > 3 digits)
-    message = re.sub(r"\b\d{4,}\b", "<ID>", message)
+    message = _VARIABLE_PARTS.sub(_placeholder, message)
     
     # Normalize whitespace
-    message = re.sub(r"\s+", " ", message).strip().lower()
-    
-    return message
+    return " ".join(message.split()).lower()
 
 
-def classify_error(
-    exception: Exception,
-    context: Optional[Dict[str, Any]] = None,
-) -> ErrorClassification:
-    """Classify an exception into category, severity, and suggested recovery tier.
-    
-    Args:
-        exception: The exception to classify
-        context: Optional context dict with additional info (workflow_id, step_id, etc.)
-    
-    Returns:
-        ErrorClassification with full classification details
-    
-    Example:
-        >>> try:
-        ...     raise ConnectionError("Connection timed out to api.example.com")
-        ... except Exception as e:
-        ...     classification = classify_error(e)
-        ...     print(f"Category: {classification.category}, Tier: {classification.suggested_tier}")
-        Category: ErrorCategory.NETWORK, Tier: RecoveryTier.TIER_1
-    """
-    context = context or {}
-    error_message = str(exception).lower()
+def _message_hash(normalized_message: str) -> str:
+    return hashlib.md5(normalized_message.encode()).hexdigest()[:12]
+
+
+# (exception type, normalized-message hash) -> context-free classification
+_classification_cache = LRUCache(
+    "error_classification",
+    max_size=int(os.getenv("ERROR_CLASSIFICATION_CACHE_SIZE", "2048")),
+)
+
+
+def clear_classification_cache() -> None:
+    """Drop memoized classifications (e.g. after changing ERROR_PATTERNS in tests)."""
+    _classification_cache.clear()
+    _normalize_error_message.cache_clear()
+
+
+def _classify_message(exception: Exception, error_message: str) -> ErrorClassification:
+    """Classify from exception type and normalized message (uncached, no context)."""
     error_type = type(exception).__name__
     
     # Try to match against known patterns
@@ -327,29 +369,7 @@ def classify_error(
     remediation_hints = []
     
     # First, try type-based classification
-    type_classifications = {
-        # Network errors
-        (ConnectionError, ConnectionRefusedError, ConnectionResetError, TimeoutError): 
-            (ErrorCategory.NETWORK, ErrorSeverity.MEDIUM, RecoveryTier.TIER_1),
-        
-        # Auth errors
-        (PermissionError,): 
-            (ErrorCategory.AUTH, ErrorSeverity.HIGH, RecoveryTier.TIER_3),
-        
-        # Resource errors
-        (MemoryError, FileNotFoundError, OSError): 
-            (ErrorCategory.RESOURCE, ErrorSeverity.HIGH, RecoveryTier.TIER_2),
-        
-        # Dependency errors
-        (ModuleNotFoundError, ImportError): 
-            (ErrorCategory.DEPENDENCY, ErrorSeverity.MEDIUM, RecoveryTier.TIER_1),
-        
-        # Config errors
-        (ValueError, TypeError, AttributeError, KeyError): 
-            (ErrorCategory.CONFIG, ErrorSeverity.MEDIUM, RecoveryTier.TIER_2),
-    }
-    
-    for exc_types, (category, severity, tier) in type_classifications.items():
+    for exc_types, (category, severity, tier) in _TYPE_CLASSIFICATIONS:
         if isinstance(exception, exc_types):
             matched_category = category
             matched_severity = severity
@@ -357,9 +377,9 @@ def classify_error(
             break
     
     # Then, refine with pattern matching
-    for category, patterns in ERROR_PATTERNS.items():
-        for pattern, severity, tier, hints in patterns:
-            if re.search(pattern, error_message, re.IGNORECASE):
+    if _ANY_PATTERN.search(error_message):
+        for regex, pattern, category, severity, tier, hints in _COMPILED_PATTERNS:
+            if regex.search(error_message):
                 matched_patterns.append(pattern)
                 remediation_hints.extend(hints)
                 
@@ -393,8 +413,48 @@ def classify_error(
         requires_state_reset=requires_state_reset,
         requires_resource_cleanup=requires_resource_cleanup,
         matched_patterns=matched_patterns[:3],  # Limit patterns for logging
-        remediation_hints=list(set(remediation_hints))[:5],  # Dedupe and limit hints
-        context=context,
+        remediation_hints=list(dict.fromkeys(remediation_hints))[:5],  # Dedupe and limit hints
+    )
+
+
+def classify_error(
+    exception: Exception,
+    context: Optional[Dict[str, Any]] = None,
+) -> ErrorClassification:
+    """Classify an exception into category, severity, and suggested recovery tier.
+    
+    Args:
+        exception: The exception to classify
+        context: Optional context dict with additional info (workflow_id, step_id, etc.)
+    
+    Returns:
+        ErrorClassification with full classification details
+    
+    Example:
+        >>> try:
+        ...     raise ConnectionError("Connection timed out to api.example.com")
+        ... except Exception as e:
+        ...     classification = classify_error(e)
+        ...     print(f"Category: {classification.category}, Tier: {classification.suggested_tier}")
+        Category: ErrorCategory.NETWORK, Tier: RecoveryTier.TIER_1
+    """
+    # Patterns run against the normalized message, so IDs, IPs and timestamps
+    # embedded in the message can't produce spurious matches (e.g. "401" in
+    # "port 34011") and equivalent errors share one cache entry
+    error_message = _normalize_error_message(str(exception))
+    cache_key = (type(exception), _message_hash(error_message))
+    
+    classification = _classification_cache.get(cache_key)
+    if classification is None:
+        classification = _classify_message(exception, error_message)
+        _classification_cache.set(cache_key, classification)
+    
+    # Hand out a copy so callers can't mutate the cached instance
+    return replace(
+        classification,
+        matched_patterns=list(classification.matched_patterns),
+        remediation_hints=list(classification.remediation_hints),
+        context=context or {},
     )
 
 
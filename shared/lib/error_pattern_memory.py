@@ -5,7 +5,8 @@ Provides semantic storage and retrieval of error patterns using Qdrant vector da
 Enables RAG-assisted recovery (Tier 2) by matching new errors against previously resolved patterns.
 
 Features:
-    - Semantic embedding of error messages using sentence-transformers
+    - Semantic embedding of error messages using sentence-transformers, computed
+      off the event loop by a micro-batching worker thread and memoized
     - Pattern storage with resolution steps, success rates, and metadata
     - Similarity-based retrieval for finding relevant past resolutions
     - Automatic cleanup of stale or low-success patterns
@@ -16,12 +17,13 @@ Configuration: config/error-handling.yaml -> error_pattern_memory section
 
 import asyncio
 import hashlib
+import importlib.util
 import logging
 import os
-import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from uuid import uuid4
 
 import yaml
@@ -33,33 +35,207 @@ from .error_classification import (
     RecoveryTier,
     classify_error,
     get_error_signature,
+    _message_hash,
+    _normalize_error_message,
 )
 from .qdrant_client import get_qdrant_client, QdrantCloudClient
+from .shared_cache import LRUCache
+
+# Import metrics (optional - graceful degradation if not available)
+try:
+    from . import error_recovery_metrics as metrics
+    METRICS_ENABLED = True
+except ImportError:
+    METRICS_ENABLED = False
+    metrics = None
 
 logger = logging.getLogger(__name__)
 
+# Cached marker for "Qdrant has no pattern for this key"
+_NO_PATTERN = object()
+
 # Lazy import for sentence-transformers (heavy dependency)
 _embedding_model = None
+_embedding_model_failed = False
 
 
 def _get_embedding_model():
-    """Lazy load sentence-transformers model."""
-    global _embedding_model
-    if _embedding_model is None:
+    """Lazy load sentence-transformers model (blocking; call off the event loop)."""
+    global _embedding_model, _embedding_model_failed
+    if _embedding_model is None and not _embedding_model_failed:
         try:
             from sentence_transformers import SentenceTransformer
             model_name = _load_config().get("embedding", {}).get("model", "all-MiniLM-L6-v2")
             _embedding_model = SentenceTransformer(model_name)
             logger.info(f"Loaded embedding model: {model_name}")
         except ImportError:
+            _embedding_model_failed = True
             logger.warning("sentence-transformers not installed. Error pattern memory disabled.")
             return None
         except Exception as e:
+            _embedding_model_failed = True
             logger.error(f"Failed to load embedding model: {e}")
             return None
     return _embedding_model
 
 
+def _embedding_model_available() -> bool:
+    """Whether embeddings can be produced, without loading the model."""
+    if _embedding_model is not None:
+        return True
+    if _embedding_model_failed:
+        return False
+    return importlib.util.find_spec("sentence_transformers") is not None
+
+
+class EmbeddingWorker:
+    """
+    Computes error-message embeddings on a dedicated thread.
+    
+    Concurrent `embed` calls arriving within `batch_window_ms` are encoded in
+    a single `model.encode` batch. Results are memoized by normalized-message
+    hash, and identical in-flight requests share one future. The model is
+    loaded lazily on the worker thread by the first batch.
+    """
+    
+    def __init__(
+        self,
+        model_loader: Callable[[], Any] = _get_embedding_model,
+        batch_size: int = 32,
+        batch_window_ms: float = 5.0,
+        cache_size: int = 1024,
+    ):
+        self._model_loader = model_loader
+        self.batch_size = batch_size
+        self.batch_window = batch_window_ms / 1000
+        self._cache = LRUCache("error_embeddings", max_size=cache_size)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="error-embeddings")
+        # key -> (text, future) waiting for the next batch
+        self._pending: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self.batches_encoded = 0
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "EmbeddingWorker":
+        embedding_config = config.get("embedding", {})
+        return cls(
+            batch_size=embedding_config.get("batch_size", 32),
+            batch_window_ms=embedding_config.get("batch_window_ms", 5),
+            cache_size=embedding_config.get("cache_size", 1024),
+        )
+    
+    async def embed(self, text: str) -> Optional[List[float]]:
+        """Embedding for `text`, or None if the model is unavailable or encoding failed."""
+        key = _message_hash(_normalize_error_message(text))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        
+        future = self._in_flight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._in_flight[key] = future
+            self._pending[key] = (text, future)
+            if len(self._pending) >= self.batch_size:
+                self._schedule_flush(loop, delay=0)
+            elif self._flush_handle is None:
+                self._schedule_flush(loop, delay=self.batch_window)
+        return await asyncio.shield(future)
+    
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop, delay: float) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = loop.call_later(delay, self._start_flush)
+    
+    def _start_flush(self) -> None:
+        # Keep a reference so the task is not garbage-collected mid-flush
+        task = asyncio.get_running_loop().create_task(self._flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_done)
+    
+    def _flush_done(self, task: asyncio.Task) -> None:
+        self._flush_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Embedding flush failed: {task.exception()}")
+    
+    async def _flush(self) -> None:
+        self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        
+        keys = list(batch)
+        texts = [batch[key][0] for key in keys]
+        vectors: List[Optional[List[float]]] = [None] * len(keys)
+        loop = asyncio.get_running_loop()
+        try:
+            try:
+                vectors = await loop.run_in_executor(self._executor, self._encode_batch, texts)
+            except Exception as e:
+                logger.error(f"Failed to generate embeddings: {e}")
+            self.batches_encoded += 1
+        finally:
+            # Always resolve the waiters, even if the flush is cancelled
+            for key, vector in zip(keys, vectors):
+                future = self._in_flight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_result(vector)
+        for key, vector in zip(keys, vectors):
+            if vector is not None:
+                self._cache.set(key, vector)
+    
+    def _encode_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Runs on the worker thread."""
+        model = self._model_loader()
+        if model is None:
+            return [None] * len(texts)
+        embeddings = model.encode(texts, batch_size=len(texts), convert_to_numpy=True)
+        return [embedding.tolist() for embedding in embeddings]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "batches_encoded": self.batches_encoded,
+            "pending": len(self._pending),
+            "cache": self._cache.get_stats(),
+        }
+    
+    async def close(self) -> None:
+        """Encode anything still pending, wait for running flushes, then stop the thread."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._pending:
+            self._start_flush()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        self.shutdown()
+    
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+_embedding_worker: Optional[EmbeddingWorker] = None
+
+
+def get_embedding_worker() -> EmbeddingWorker:
+    """Get or create the shared embedding worker."""
+    global _embedding_worker
+    if _embedding_worker is None:
+        _embedding_worker = EmbeddingWorker.from_config(_load_config())
+    return _embedding_worker
+
+
+async def close_embedding_worker() -> None:
+    """Drain and stop the shared embedding worker, if one was created."""
+    global _embedding_worker
+    if _embedding_worker is not None:
+        worker, _embedding_worker = _embedding_worker, None
+        await worker.close()
+
+
 def _load_config() -> Dict[str, Any]:
     """Load error pattern memory configuration."""
     config_path = os.path.join(
@@ -234,18 +410,30 @@ class ErrorPatternMemory:
             # Apply best_match.pattern.resolution_steps
     """
     
-    def __init__(self, qdrant_client: Optional[QdrantCloudClient] = None):
+    def __init__(
+        self,
+        qdrant_client: Optional[QdrantCloudClient] = None,
+        embedding_worker: Optional[EmbeddingWorker] = None,
+    ):
         """Initialize error pattern memory.
         
         Args:
             qdrant_client: Optional Qdrant client. If None, uses singleton.
+            embedding_worker: Optional embedding worker. If None, uses the shared one.
         """
         self._qdrant = qdrant_client or get_qdrant_client()
+        self._embedding_worker = embedding_worker
         self._config = _load_config()
         self._collection_name = self._config.get("qdrant", {}).get("collection_name", "error_patterns")
-        self._local_cache: Dict[str, ErrorPattern] = {}  # signature_key -> pattern
-        self._cache_ttl_seconds = 300  # 5 min local cache
-        self._cache_timestamps: Dict[str, float] = {}
+        cache_config = self._config.get("cache", {})
+        self._negative_ttl_seconds = cache_config.get("negative_ttl_seconds", 30)
+        self._prefetch_top_n = cache_config.get("prefetch_top_n", 100)
+        # signature_key -> ErrorPattern or _NO_PATTERN; ("search", signature_key) -> _NO_PATTERN
+        self._local_cache = LRUCache(
+            "error_patterns",
+            max_size=cache_config.get("max_size", 1024),
+            ttl_seconds=cache_config.get("ttl_seconds", 300),
+        )
         self._initialized = False
         self._init_lock = asyncio.Lock()
     
@@ -256,10 +444,16 @@ class ErrorPatternMemory:
             return False
         if not self._qdrant.is_enabled():
             return False
-        if _get_embedding_model() is None:
+        if self._embedding_worker is None and not _embedding_model_available():
             return False
         return True
     
+    @property
+    def embedding_worker(self) -> EmbeddingWorker:
+        if self._embedding_worker is None:
+            self._embedding_worker = get_embedding_worker()
+        return self._embedding_worker
+    
     async def _ensure_initialized(self):
         """Ensure Qdrant collection exists."""
         if self._initialized:
@@ -301,37 +495,95 @@ class ErrorPatternMemory:
                 logger.error(f"Failed to initialize error pattern memory: {e}")
                 self._initialized = True  # Mark as initialized to prevent retry loops
     
-    def _generate_embedding(self, text: str) -> Optional[List[float]]:
-        """Generate embedding for error message."""
-        model = _get_embedding_model()
-        if model is None:
-            return None
+    async def _generate_embedding(self, text: str) -> Optional[List[float]]:
+        """Generate embedding for error message without blocking the event loop."""
+        return await self.embedding_worker.embed(text)
+    
+    def _lookup_cache(self, key: Any) -> Any:
+        """Cached entry for key (pattern or _NO_PATTERN), or None on a miss.
         
-        try:
-            embedding = model.encode(text, convert_to_numpy=True)
-            return embedding.tolist()
-        except Exception as e:
-            logger.error(f"Failed to generate embedding: {e}")
-            return None
+        Negative entries count as hits: they are what spares Qdrant during outages.
+        """
+        entry = self._local_cache.get(key)
+        if METRICS_ENABLED:
+            metrics.record_pattern_cache_hit(hit=entry is not None)
+        return entry
     
     def _get_from_cache(self, signature_key: str) -> Optional[ErrorPattern]:
         """Get pattern from local cache if not expired."""
-        if signature_key not in self._local_cache:
-            return None
-        
-        timestamp = self._cache_timestamps.get(signature_key, 0)
-        if time.time() - timestamp > self._cache_ttl_seconds:
-            # Cache expired
-            del self._local_cache[signature_key]
-            del self._cache_timestamps[signature_key]
-            return None
-        
-        return self._local_cache[signature_key]
+        entry = self._lookup_cache(signature_key)
+        return entry if isinstance(entry, ErrorPattern) else None
     
     def _add_to_cache(self, pattern: ErrorPattern):
-        """Add pattern to local cache."""
-        self._local_cache[pattern.signature_key] = pattern
-        self._cache_timestamps[pattern.signature_key] = time.time()
+        """Add pattern to local cache, replacing any negative entries for it."""
+        self._local_cache.set(pattern.signature_key, pattern)
+        self._local_cache.delete(("search", pattern.signature_key))
+        if METRICS_ENABLED:
+            metrics.update_cache_size(len(self._local_cache))
+    
+    def _add_negative(self, key: Any):
+        """Remember that Qdrant had nothing for key, for a short TTL."""
+        self._local_cache.set(key, _NO_PATTERN, ttl_seconds=self._negative_ttl_seconds)
+    
+    async def prefetch_top_patterns(self, limit: Optional[int] = None) -> int:
+        """
+        Warm the local cache with the most-used patterns.
+        
+        Ranks patterns by attempt count from a vector-less scroll, then fetches
+        the top `limit` (config cache.prefetch_top_n) with their embeddings so
+        they can be updated in place. Intended to run once at startup.
+        
+        Returns:
+            Number of patterns cached
+        """
+        limit = self._prefetch_top_n if limit is None else limit
+        if limit <= 0 or not self._qdrant.is_enabled():
+            return 0
+        
+        await self._ensure_initialized()
+        
+        try:
+            ranked: List[Tuple[int, str]] = []
+            offset = None
+            while True:
+                results, offset = await asyncio.to_thread(
+                    self._qdrant.client.scroll,
+                    collection_name=self._collection_name,
+                    limit=256,
+                    offset=offset,
+                    with_payload=["attempt_count"],
+                    with_vectors=False,
+                )
+                for point in results:
+                    ranked.append(((point.payload or {}).get("attempt_count", 0), str(point.id)))
+                if not results or offset is None:
+                    break
+            
+            ranked.sort(reverse=True)
+            top_ids = [point_id for _, point_id in ranked[:limit]]
+            if not top_ids:
+                return 0
+            
+            points = await asyncio.to_thread(
+                self._qdrant.client.retrieve,
+                collection_name=self._collection_name,
+                ids=top_ids,
+                with_vectors=True,
+            )
+            cached = 0
+            for point in points:
+                if point.payload is None:
+                    continue
+                vector = point.vector if isinstance(point.vector, list) else None
+                self._add_to_cache(ErrorPattern.from_dict(dict(point.payload), embedding=vector))
+                cached += 1
+            
+            logger.info(f"Prefetched {cached} error patterns into local cache")
+            return cached
+            
+        except Exception as e:
+            logger.warning(f"Failed to prefetch error patterns: {e}")
+            return 0
     
     async def store_pattern(
         self,
@@ -386,10 +638,10 @@ class ErrorPatternMemory:
     
     async def _find_by_signature(self, signature_key: str) -> Optional[ErrorPattern]:
         """Find pattern by exact signature key."""
-        # Check local cache first
-        cached = self._get_from_cache(signature_key)
-        if cached:
-            return cached
+        # Check local cache first (including cached "no pattern" results)
+        cached = self._lookup_cache(signature_key)
+        if cached is not None:
+            return cached if isinstance(cached, ErrorPattern) else None
         
         if not self._qdrant.is_enabled():
             return None
@@ -420,6 +672,7 @@ class ErrorPatternMemory:
                 self._add_to_cache(pattern)
                 return pattern
             
+            self._add_negative(signature_key)
             return None
             
         except Exception as e:
@@ -438,7 +691,7 @@ class ErrorPatternMemory:
         """Create a new error pattern."""
         # Generate embedding
         message_template = str(exception)
-        embedding = self._generate_embedding(message_template)
+        embedding = await self._generate_embedding(message_template)
         
         if embedding is None:
             logger.warning("Failed to generate embedding, pattern not stored")
@@ -565,9 +818,16 @@ class ErrorPatternMemory:
         if exact_match and exact_match.is_effective:
             return [PatternMatch(pattern=exact_match, similarity_score=1.0, is_exact_match=True)]
         
+        # A recent search for this signature found nothing similar
+        search_key = ("search", signature_key)
+        if self._lookup_cache(search_key) is _NO_PATTERN:
+            if exact_match:
+                return [PatternMatch(pattern=exact_match, similarity_score=1.0, is_exact_match=True)]
+            return []
+        
         # Semantic search for similar patterns
         message = str(exception)
-        embedding = self._generate_embedding(message)
+        embedding = await self._generate_embedding(message)
         
         if embedding is None:
             # Fall back to exact match only
@@ -622,6 +882,9 @@ class ErrorPatternMemory:
                     is_exact_match=is_exact,
                 ))
             
+            if not matches:
+                self._add_negative(search_key)
+            
             # Include exact match if found but wasn't in results
             if exact_match and not any(m.pattern.id == exact_match.id for m in matches):
                 matches.append(PatternMatch(
@@ -735,6 +998,7 @@ class ErrorPatternMemory:
                     break
                 
                 patterns_to_delete = []
+                deleted_signatures = []
                 for point in results:
                     if point.payload is None:
                         continue
@@ -743,11 +1007,13 @@ class ErrorPatternMemory:
                     # Delete if too old
                     if pattern.last_seen < cutoff_date:
                         patterns_to_delete.append(pattern.id)
+                        deleted_signatures.append(pattern.signature_key)
                         continue
                     
                     # Delete if low success rate and enough attempts
                     if pattern.attempt_count >= 5 and pattern.success_rate < min_success_rate:
                         patterns_to_delete.append(pattern.id)
+                        deleted_signatures.append(pattern.signature_key)
                 
                 if patterns_to_delete:
                     self._qdrant.client.delete(
@@ -757,8 +1023,8 @@ class ErrorPatternMemory:
                     deleted_count += len(patterns_to_delete)
                     
                     # Clear from local cache
-                    for pid in patterns_to_delete:
-                        self._local_cache = {k: v for k, v in self._local_cache.items() if v.id != pid}
+                    for signature_key in deleted_signatures:
+                        self._local_cache.delete(signature_key)
                 
                 if offset is None:
                     break
@@ -785,6 +1051,7 @@ class ErrorPatternMemory:
                 "collection": self._collection_name,
                 "total_patterns": info.get("points_count", 0),
                 "local_cache_size": len(self._local_cache),
+                "local_cache": self._local_cache.get_stats(),
                 "status": info.get("status", "unknown"),
             }
             
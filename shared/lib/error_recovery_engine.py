@@ -23,11 +23,13 @@ import logging
 import os
 import random
 import time
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 from functools import wraps
-from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar, Union
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar, Union
+from uuid import uuid4
 import yaml
 
 from .error_classification import (
@@ -60,6 +62,13 @@ except ImportError:
     METRICS_ENABLED = False
     metrics = None
 
+try:
+    import redis.asyncio as redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
@@ -158,14 +167,78 @@ class RecoveryOutcome:
         }
 
 
+class _LoopShard:
+    """One slice of loop-protection state, guarded by its own lock."""
+    
+    __slots__ = ("lock", "error_times", "escalations")
+    
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        # signature -> last N error timestamps (ring buffer, N = max_identical_errors)
+        self.error_times: Dict[str, Deque[float]] = {}
+        # workflow_id -> [escalation count, last escalation timestamp]
+        self.escalations: Dict[str, List[float]] = {}
+
+
 class LoopProtection:
-    """Protects against infinite recovery loops."""
+    """
+    Protects against infinite recovery loops.
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    Each error signature keeps only its last `max_identical_errors` timestamps;
+    a loop is detected when the oldest of them still falls inside the window.
+    State is split across shards with independent locks, and signatures and
+    workflows idle for longer than their window or `cooldown_seconds` are swept
+    periodically. With `redis_url` (or LOOP_PROTECTION_REDIS_URL) set, counts
+    are kept in Redis so detection spans replicas; local state is the fallback
+    when Redis is unreachable.
+    """
+    
+    REDIS_PREFIX = "loop-protection"
+    
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        clock: Callable[[], float] = time.time,
+    ):
         self._config = config or _load_config().get("loop_protection", {})
-        self._error_counts: Dict[str, List[datetime]] = {}  # signature -> timestamps
-        self._workflow_escalations: Dict[str, int] = {}  # workflow_id -> count
-        self._lock = asyncio.Lock()
+        self._clock = clock
+        
+        loop_detection = self._config.get("loop_detection", {})
+        self._window_seconds = loop_detection.get("window_seconds", 60)
+        self._max_identical = loop_detection.get("max_identical_errors", 3)
+        self._max_escalations = self._config.get("max_tier_escalations_per_workflow", 10)
+        self._cooldown_seconds = self._config.get("cooldown_seconds", 300)
+        self._sweep_interval = self._config.get("sweep_interval_seconds", 60)
+        
+        self._shards = [_LoopShard() for _ in range(self._config.get("shards", 16))]
+        self._last_sweep = self._clock()
+        
+        redis_url = self._config.get("redis_url") or os.getenv("LOOP_PROTECTION_REDIS_URL")
+        self._redis = None
+        self._redis_url = redis_url
+        self._redis_disabled = not (redis_url and REDIS_AVAILABLE)
+    
+    def _shard(self, key: str) -> _LoopShard:
+        return self._shards[hash(key) % len(self._shards)]
+    
+    async def _get_redis(self):
+        if self._redis_disabled:
+            return None
+        if self._redis is None:
+            try:
+                self._redis = redis.from_url(self._redis_url, decode_responses=True)
+                await self._redis.ping()
+            except Exception as e:
+                logger.warning(f"[LoopProtection] Redis backend disabled, using local state: {e}")
+                self._redis = None
+                self._redis_disabled = True
+        return self._redis
+    
+    def _errors_key(self, signature_key: str) -> str:
+        return f"{self.REDIS_PREFIX}:errors:{signature_key}"
+    
+    def _escalations_key(self, workflow_id: str) -> str:
+        return f"{self.REDIS_PREFIX}:escalations:{workflow_id}"
     
     async def check_loop(
         self,
@@ -177,35 +250,58 @@ class LoopProtection:
         Returns:
             True if loop detected (should stop recovery)
         """
-        async with self._lock:
-            signature_key = signature.to_key()
-            now = datetime.utcnow()
-            
-            # Check per-error loop
-            window_seconds = self._config.get("loop_detection", {}).get("window_seconds", 60)
-            max_identical = self._config.get("loop_detection", {}).get("max_identical_errors", 3)
-            
-            cutoff = now - timedelta(seconds=window_seconds)
-            
-            if signature_key in self._error_counts:
-                # Remove old timestamps
-                self._error_counts[signature_key] = [
-                    ts for ts in self._error_counts[signature_key] if ts > cutoff
-                ]
-                
-                if len(self._error_counts[signature_key]) >= max_identical:
-                    logger.warning(f"Loop detected for error {signature_key}: {len(self._error_counts[signature_key])} occurrences in {window_seconds}s")
-                    return True
-            
-            # Check workflow escalation limit
-            if workflow_id:
-                max_escalations = self._config.get("max_tier_escalations_per_workflow", 10)
-                current = self._workflow_escalations.get(workflow_id, 0)
-                if current >= max_escalations:
-                    logger.warning(f"Workflow {workflow_id} exceeded max tier escalations: {current}")
-                    return True
-            
-            return False
+        signature_key = signature.to_key()
+        
+        # Check per-error loop
+        count = await self._recent_error_count(signature_key)
+        if count >= self._max_identical:
+            logger.warning(f"Loop detected for error {signature_key}: {count} occurrences in {self._window_seconds}s")
+            return True
+        
+        # Check workflow escalation limit
+        if workflow_id:
+            current = await self._escalation_count(workflow_id)
+            if current >= self._max_escalations:
+                logger.warning(f"Workflow {workflow_id} exceeded max tier escalations: {current}")
+                return True
+        
+        return False
+    
+    async def _recent_error_count(self, signature_key: str) -> int:
+        now = self._clock()
+        cutoff = now - self._window_seconds
+        
+        client = await self._get_redis()
+        if client is not None:
+            key = self._errors_key(signature_key)
+            try:
+                async with client.pipeline(transaction=True) as pipe:
+                    pipe.zremrangebyscore(key, "-inf", cutoff)
+                    pipe.zcard(key)
+                    _, count = await pipe.execute()
+                return count
+            except Exception as e:
+                logger.warning(f"[LoopProtection] Redis check failed for {signature_key}: {e}")
+        
+        shard = self._shard(signature_key)
+        async with shard.lock:
+            times = shard.error_times.get(signature_key)
+            if not times:
+                return 0
+            return sum(1 for ts in times if ts > cutoff)
+    
+    async def _escalation_count(self, workflow_id: str) -> int:
+        client = await self._get_redis()
+        if client is not None:
+            try:
+                return int(await client.get(self._escalations_key(workflow_id)) or 0)
+            except Exception as e:
+                logger.warning(f"[LoopProtection] Redis check failed for {workflow_id}: {e}")
+        
+        shard = self._shard(workflow_id)
+        async with shard.lock:
+            entry = shard.escalations.get(workflow_id)
+            return int(entry[0]) if entry else 0
     
     async def record_error(
         self,
@@ -213,26 +309,114 @@ class LoopProtection:
         workflow_id: Optional[str] = None,
     ):
         """Record an error occurrence."""
-        async with self._lock:
-            signature_key = signature.to_key()
-            now = datetime.utcnow()
-            
-            if signature_key not in self._error_counts:
-                self._error_counts[signature_key] = []
-            self._error_counts[signature_key].append(now)
+        signature_key = signature.to_key()
+        now = self._clock()
+        
+        client = await self._get_redis()
+        if client is not None:
+            key = self._errors_key(signature_key)
+            try:
+                async with client.pipeline(transaction=True) as pipe:
+                    pipe.zadd(key, {f"{now}:{uuid4().hex[:8]}": now})
+                    pipe.zremrangebyscore(key, "-inf", now - self._window_seconds)
+                    # Keep the set as bounded as the local ring buffer
+                    pipe.zremrangebyrank(key, 0, -(self._max_identical + 1))
+                    pipe.expire(key, int(self._window_seconds) + 1)
+                    await pipe.execute()
+                return
+            except Exception as e:
+                logger.warning(f"[LoopProtection] Redis record failed for {signature_key}: {e}")
+        
+        shard = self._shard(signature_key)
+        async with shard.lock:
+            times = shard.error_times.get(signature_key)
+            if times is None:
+                times = shard.error_times[signature_key] = deque(maxlen=self._max_identical)
+            times.append(now)
+        await self._maybe_sweep(now)
     
     async def record_escalation(self, workflow_id: str):
         """Record a tier escalation for a workflow."""
-        async with self._lock:
-            self._workflow_escalations[workflow_id] = (
-                self._workflow_escalations.get(workflow_id, 0) + 1
-            )
+        now = self._clock()
+        
+        client = await self._get_redis()
+        if client is not None:
+            key = self._escalations_key(workflow_id)
+            try:
+                async with client.pipeline(transaction=True) as pipe:
+                    pipe.incr(key)
+                    pipe.expire(key, int(self._cooldown_seconds))
+                    await pipe.execute()
+                return
+            except Exception as e:
+                logger.warning(f"[LoopProtection] Redis record failed for {workflow_id}: {e}")
+        
+        shard = self._shard(workflow_id)
+        async with shard.lock:
+            entry = shard.escalations.setdefault(workflow_id, [0, now])
+            entry[0] += 1
+            entry[1] = now
+        await self._maybe_sweep(now)
     
     async def reset_workflow(self, workflow_id: str):
         """Reset counters for a workflow (on success or new run)."""
-        async with self._lock:
-            if workflow_id in self._workflow_escalations:
-                del self._workflow_escalations[workflow_id]
+        client = await self._get_redis()
+        if client is not None:
+            try:
+                await client.delete(self._escalations_key(workflow_id))
+            except Exception as e:
+                logger.warning(f"[LoopProtection] Redis reset failed for {workflow_id}: {e}")
+        
+        shard = self._shard(workflow_id)
+        async with shard.lock:
+            shard.escalations.pop(workflow_id, None)
+    
+    async def _maybe_sweep(self, now: float):
+        if now - self._last_sweep >= self._sweep_interval:
+            self._last_sweep = now
+            await self.sweep(now)
+    
+    async def sweep(self, now: Optional[float] = None) -> int:
+        """Drop signatures and workflows with no recent activity.
+        
+        Returns:
+            Number of keys removed
+        """
+        now = self._clock() if now is None else now
+        error_cutoff = now - self._window_seconds
+        escalation_cutoff = now - self._cooldown_seconds
+        removed = 0
+        
+        for shard in self._shards:
+            async with shard.lock:
+                stale_errors = [
+                    key for key, times in shard.error_times.items()
+                    if not times or times[-1] <= error_cutoff
+                ]
+                for key in stale_errors:
+                    del shard.error_times[key]
+                
+                stale_workflows = [
+                    key for key, (_, last_seen) in shard.escalations.items()
+                    if last_seen <= escalation_cutoff
+                ]
+                for key in stale_workflows:
+                    del shard.escalations[key]
+                
+                removed += len(stale_errors) + len(stale_workflows)
+        
+        if removed:
+            logger.debug(f"[LoopProtection] Swept {removed} stale keys")
+        return removed
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Number of tracked keys and backend in use."""
+        return {
+            "tracked_signatures": sum(len(shard.error_times) for shard in self._shards),
+            "tracked_workflows": sum(len(shard.escalations) for shard in self._shards),
+            "shards": len(self._shards),
+            "redis_enabled": not self._redis_disabled,
+        }
 
 
 class ErrorRecoveryEngine:
@@ -601,13 +785,10 @@ class ErrorRecoveryEngine:
         
         # Check local cache for quick resolution
         # (Tier 0 only uses local cache, not Qdrant)
+        # (cache hits and misses are recorded by the pattern memory)
         cached_pattern = self._pattern_memory._get_from_cache(context.signature.to_key())
         
         if cached_pattern and cached_pattern.is_effective:
-            # Record cache hit
-            if METRICS_ENABLED:
-                metrics.record_pattern_cache_hit(hit=True)
-            
             context.pattern_matches.append(PatternMatch(
                 pattern=cached_pattern,
                 similarity_score=1.0,
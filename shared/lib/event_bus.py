@@ -4,7 +4,21 @@ Event Bus - Pub/Sub Pattern for Agent Notifications and Inter-Agent Communicatio
 Provides in-memory event routing with support for:
 - General pub/sub events (approval_required, task_completed, etc.)
 - Agent-to-agent request/response messaging
+- Cross-node request/response over Redis (per-node reply channels)
+- Redis transport sharded per event type ("agent-events:<event_type>"), so a
+  node only receives the event types it subscribes to; glob patterns such as
+  "task.*" become pattern subscriptions. Rolling deploys from the legacy
+  single "agent-events" channel can opt in to EVENT_BUS_LEGACY_CHANNEL=subscribe
+  (also read it) or =dual (also publish to it); the default is off
+- Optional Redis Streams transport (EVENT_BUS_TRANSPORT=streams) with consumer
+  groups, acks and replay of unacknowledged entries
+- Batched Redis publishing: publishes within a short linger window share one
+  pipeline round-trip (EVENT_BUS_PUBLISH_LINGER_MS, 0 disables)
+- Pluggable wire codec (EVENT_BUS_CODEC=json|orjson|msgpack) with a versioned
+  envelope, so nodes decode every format regardless of what they publish
 - Timeout handling and correlation tracking
+- Opt-in queued (fire-and-forget) delivery per subscriber, with bounded
+  priority queues, dedicated workers and drop/block/spill overflow policies
 
 Supported Events:
 - approval_required: HITL approval request created
@@ -28,6 +42,14 @@ Usage:
         print(f"Approval needed: {event.data['approval_id']}")
     
     bus.subscribe("approval_required", on_approval_required)
+    bus.subscribe("task.*", on_any_task_event)  # glob pattern
+    
+    # Slow subscribers can opt into queued delivery so emit() doesn't wait on them
+    bus.subscribe(
+        "approval_required",
+        send_email,
+        delivery=DeliveryOptions(max_queue_size=500, overflow=OverflowPolicy.SPILL),
+    )
     
     # Agent-to-agent request/response
     request = AgentRequestEvent(
@@ -40,13 +62,17 @@ Usage:
 """
 
 import asyncio
+import fnmatch
+import heapq
+import itertools
 import logging
-from typing import Dict, List, Callable, Any, Optional, Union
+from typing import Dict, List, Callable, Any, Optional, Tuple, Union
 from dataclasses import dataclass, field
 from datetime import datetime
 import os
 from enum import Enum
 import json
+import socket
 import uuid
 import time
 
@@ -59,9 +85,41 @@ try:
 except ImportError:
     redis = None
     REDIS_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+from .batch_writer import BatchWriter, cancel_and_wait
+from .shared_cache import LRUCache
     
 logger = logging.getLogger(__name__)
 
+EVENTS_CHANNEL = "agent-events"
+STREAM_PREFIX = "agent-stream:"
+REPLY_CHANNEL_PREFIX = "agent-replies:"
+TRANSPORTS = ("pubsub", "streams")
+LEGACY_CHANNEL_MODES = ("off", "subscribe", "dual")
+PATTERN_CHARS = frozenset("*?[")
+
+# Wire format: plain JSON objects are schema v1 (what every node version
+# publishes and reads). Binary codecs are wrapped in an envelope:
+# ENVELOPE_MAGIC + schema version byte + codec id byte + body.
+SCHEMA_VERSION = 2
+ENVELOPE_MAGIC = b"\x00EB"
+CODECS = ("json", "orjson", "msgpack")
+MSGPACK_CODEC_ID = 1
+
 # Prometheus Metrics
 event_bus_events_emitted_total = Counter(
     'event_bus_events_emitted_total',
@@ -112,6 +170,57 @@ agent_request_timeouts_total = Counter(
     ['source_agent', 'target_agent']
 )
 
+agent_reply_routing_total = Counter(
+    'agent_reply_routing_total',
+    'Agent responses by routing outcome (local, sent, received, late_discarded, unroutable)',
+    ['outcome']
+)
+
+event_bus_publish_batch_size = Histogram(
+    'event_bus_publish_batch_size',
+    'Number of events sent to Redis per pipelined publish',
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500)
+)
+
+event_bus_decode_errors_total = Counter(
+    'event_bus_decode_errors_total',
+    'Redis messages that could not be decoded (unknown codec or schema version)',
+    ['reason']
+)
+
+event_bus_queue_depth = Gauge(
+    'event_bus_queue_depth',
+    'Events waiting in a queued subscriber (including spilled events)',
+    ['event_type', 'subscriber']
+)
+
+event_bus_queue_overflow_total = Counter(
+    'event_bus_queue_overflow_total',
+    'Queued subscriber overflows by policy outcome (dropped, blocked, spilled)',
+    ['event_type', 'subscriber', 'outcome']
+)
+
+
+class OverflowPolicy(str, Enum):
+    """What emit() does when a queued subscriber's queue is full."""
+    DROP = "drop"    # Discard the new event
+    BLOCK = "block"  # Emitter waits until the queue has room
+    SPILL = "spill"  # Park in an overflow buffer drained by the worker
+
+
+@dataclass
+class DeliveryOptions:
+    """
+    Opt-in queued delivery for a subscriber.
+
+    Events are put on a bounded per-subscriber priority queue and delivered by
+    dedicated worker tasks, so emit() returns without waiting for the callback.
+    """
+    max_queue_size: int = 1000
+    overflow: OverflowPolicy = OverflowPolicy.DROP
+    workers: int = 1
+    spill_max_size: int = 10000  # Spilled events beyond this are dropped
+
 
 class EventType(str, Enum):
     """Supported event types."""
@@ -145,6 +254,7 @@ class InterAgentEvent:
     timestamp: datetime = field(default_factory=datetime.utcnow)
     correlation_id: Optional[str] = None
     priority: int = 0
+    origin_node: Optional[str] = None  # EventBus node that published it
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -155,7 +265,8 @@ class InterAgentEvent:
             "payload": self.payload,
             "timestamp": self.timestamp.isoformat(),
             "correlation_id": self.correlation_id,
-            "priority": self.priority
+            "priority": self.priority,
+            "origin_node": self.origin_node
         }
     
     @classmethod
@@ -172,7 +283,8 @@ class InterAgentEvent:
             event_id=data.get("event_id", str(uuid.uuid4())),
             timestamp=ts or datetime.utcnow(),
             correlation_id=data.get("correlation_id"),
-            priority=data.get("priority", 0)
+            priority=data.get("priority", 0),
+            origin_node=data.get("origin_node")
         )
 
 
@@ -202,6 +314,246 @@ class Event:
         )
 
 
+def _callback_name(callback: Callable) -> str:
+    return getattr(callback, "__name__", repr(callback))
+
+
+def _is_pattern(event_type: str) -> bool:
+    return not PATTERN_CHARS.isdisjoint(event_type)
+
+
+def _text(value: Union[bytes, str]) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class EventCodec:
+    """
+    Encodes events for Redis and decodes any supported wire format.
+    
+    json and orjson both produce plain JSON, readable by every node version.
+    msgpack is more compact but only readable by nodes that understand the
+    envelope, so switch to it once all replicas run this version.
+    """
+    
+    def __init__(self, name: str = "json"):
+        name = name.lower()
+        if name not in CODECS:
+            logger.warning(f"Unknown EVENT_BUS_CODEC '{name}', using json")
+            name = "json"
+        elif name == "orjson" and not ORJSON_AVAILABLE:
+            logger.warning("orjson not installed, using json codec")
+            name = "json"
+        elif name == "msgpack" and not MSGPACK_AVAILABLE:
+            logger.warning("msgpack not installed, using json codec")
+            name = "json"
+        self.name = name
+    
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        if self.name == "msgpack":
+            header = ENVELOPE_MAGIC + bytes((SCHEMA_VERSION, MSGPACK_CODEC_ID))
+            return header + msgpack.packb(data, default=str)
+        if self.name == "orjson":
+            return orjson.dumps(data, default=str)
+        return json.dumps(data, default=str).encode()
+    
+    @staticmethod
+    def decode(raw: Union[bytes, str]) -> Dict[str, Any]:
+        """Decode a message; raises ValueError for unsupported versions/codecs."""
+        if isinstance(raw, str):
+            raw = raw.encode()
+        if not raw.startswith(ENVELOPE_MAGIC):
+            return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+        
+        version, codec_id = raw[len(ENVELOPE_MAGIC)], raw[len(ENVELOPE_MAGIC) + 1]
+        body = raw[len(ENVELOPE_MAGIC) + 2:]
+        if version > SCHEMA_VERSION:
+            event_bus_decode_errors_total.labels(reason="schema_version").inc()
+            raise ValueError(f"Unsupported event schema version {version}")
+        if codec_id != MSGPACK_CODEC_ID or not MSGPACK_AVAILABLE:
+            event_bus_decode_errors_total.labels(reason="codec").inc()
+            raise ValueError(f"Cannot decode event codec id {codec_id}")
+        return msgpack.unpackb(body)
+
+
+class _BatchPublisher(BatchWriter[Tuple[str, bytes]]):
+    """
+    Buffers Redis publishes (event_type, encoded message) and sends them in
+    pipelined batches.
+    
+    Everything buffered when the linger timer fires (or as soon as max_batch
+    messages are waiting) goes out in one non-transactional pipeline. If
+    max_pending messages are already buffered, the emitter flushes inline,
+    which applies backpressure. A failed pipeline is counted and not retried.
+    """
+    
+    def __init__(self, bus: "EventBus", linger_ms: float, max_batch: int, max_pending: int):
+        super().__init__(linger_ms, max_batch, max_pending, name="EventBus")
+        self.bus = bus
+    
+    async def publish(self, event_type: str, message: bytes) -> None:
+        await self.put((event_type, message))
+    
+    async def write_batch(self, batch: List[Tuple[str, bytes]]) -> None:
+        bus = self.bus
+        if not bus.redis_client:
+            return
+        try:
+            async with bus.redis_client.pipeline(transaction=False) as pipe:
+                for event_type, message in batch:
+                    bus._add_publish(pipe, event_type, message)
+                await pipe.execute()
+            bus._stats["redis_events_published"] += len(batch)
+            bus._stats["redis_publish_batches"] += 1
+            event_bus_publish_batch_size.observe(len(batch))
+        except Exception as e:
+            bus._stats["redis_publish_errors"] += len(batch)
+            logger.error(f"Failed to publish {len(batch)} events to Redis: {e}")
+
+
+class _SubscriberQueue:
+    """
+    Bounded priority queue plus worker tasks for one queued subscriber.
+
+    Higher event priority is delivered first; equal priorities keep FIFO order.
+    Spilled events are held in a heap with the same ordering and nothing new
+    enters the queue ahead of them, so spilling never reorders delivery.
+    """
+
+    def __init__(
+        self,
+        bus: "EventBus",
+        event_type: str,
+        callback: Callable[["Event"], Any],
+        options: DeliveryOptions,
+    ):
+        self.bus = bus
+        self.event_type = event_type
+        self.callback = callback
+        self.options = options
+        self.name = _callback_name(callback)
+        # Heap of (-priority, seq, event), like the queue itself
+        self.spill: List[Tuple[int, int, "Event"]] = []
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._seq = itertools.count()
+        self._workers: List[asyncio.Task] = []
+        # Accepted events not yet delivered (queued, spilled or in a worker)
+        self._outstanding = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def depth(self) -> int:
+        return (self._queue.qsize() if self._queue else 0) + len(self.spill)
+
+    def _ensure_started(self) -> asyncio.PriorityQueue:
+        # Created lazily: subscribe() may run before the event loop starts
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue(maxsize=self.options.max_queue_size)
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker())
+                for _ in range(max(1, self.options.workers))
+            ]
+        return self._queue
+
+    async def put(self, event: "Event", priority: int = 0) -> bool:
+        """Enqueue an event; returns False if it was dropped."""
+        queue = self._ensure_started()
+        item = (-priority, next(self._seq), event)
+        policy = self.options.overflow
+
+        self._refill()
+        if not self.spill and not queue.full():
+            self._accept()
+            queue.put_nowait(item)
+        elif policy == OverflowPolicy.BLOCK:
+            self._record_overflow("blocked")
+            self._accept()
+            try:
+                await queue.put(item)
+            except asyncio.CancelledError:
+                self._delivered()
+                raise
+        elif policy == OverflowPolicy.SPILL and len(self.spill) < self.options.spill_max_size:
+            # Earlier events are already waiting in the spill buffer (or the
+            # queue is full): order against them there
+            self._record_overflow("spilled")
+            self._accept()
+            heapq.heappush(self.spill, item)
+        else:
+            self._record_overflow("dropped")
+            logger.warning(
+                f"Dropped '{self.event_type}' event for queued subscriber {self.name} "
+                f"(queue full, policy={policy.value})"
+            )
+            return False
+
+        self.bus._stats["events_queued"] += 1
+        event_bus_queue_depth.labels(event_type=self.event_type, subscriber=self.name).set(self.depth)
+        return True
+
+    def _record_overflow(self, outcome: str) -> None:
+        self.bus._stats[f"events_{outcome}"] += 1
+        event_bus_queue_overflow_total.labels(
+            event_type=self.event_type, subscriber=self.name, outcome=outcome
+        ).inc()
+
+    def _refill(self) -> None:
+        """Move spilled events into the queue while it has room, best first."""
+        while self.spill and not self._queue.full():
+            self._queue.put_nowait(heapq.heappop(self.spill))
+
+    def _accept(self) -> None:
+        self._outstanding += 1
+        self._idle.clear()
+
+    def _delivered(self) -> None:
+        self._outstanding -= 1
+        if self._outstanding <= 0:
+            self._outstanding = 0
+            self._idle.set()
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            _, _, event = await self._queue.get()
+            try:
+                if await self.bus._call_subscriber(self.callback, event):
+                    self.bus._stats["events_delivered"] += 1
+                    event_bus_events_delivered_total.labels(event_type=event.type).inc()
+            finally:
+                self._queue.task_done()
+                self._delivered()
+                # Refill from the spill buffer now that there is room
+                self._refill()
+                event_bus_queue_depth.labels(
+                    event_type=self.event_type, subscriber=self.name
+                ).set(self.depth)
+
+    async def drain(self) -> None:
+        """Wait until every queued (and spilled) event has been delivered."""
+        await self._idle.wait()
+
+    async def stop(self, drain_timeout: Optional[float] = None) -> None:
+        """Optionally drain, then cancel the worker tasks."""
+        if drain_timeout:
+            try:
+                await asyncio.wait_for(self.drain(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Queued subscriber {self.name} did not drain within {drain_timeout}s "
+                    f"({self.depth} events discarded)"
+                )
+        self.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def cancel(self) -> None:
+        for task in self._workers:
+            task.cancel()
+
+
 class EventBus:
     """
     In-memory event bus with pub/sub pattern and agent-to-agent messaging.
@@ -211,10 +563,10 @@ class EventBus:
     - Multiple subscribers per event type
     - Agent request/response correlation
     - Timeout handling with asyncio.wait_for
-    - Priority queuing for agent requests
+    - Opt-in queued delivery with priority lanes and overflow policies
     - Error handling (failed subscribers don't block others)
     - Singleton pattern for global access
-    - Optional Redis backend (future)
+    - Optional Redis backend: sharded pub/sub channels or Streams
     """
     
     _instance: Optional['EventBus'] = None
@@ -222,24 +574,87 @@ class EventBus:
     def __init__(self):
         """Initialize event bus with empty subscribers and request tracking."""
         self._subscribers: Dict[str, List[Callable]] = {}
+        self._pattern_types: set = set()  # Subscribed event types containing glob chars
+        # (event_type, callback) -> queue for subscribers using queued delivery
+        self._queued_subscribers: Dict[Tuple[str, Callable], _SubscriberQueue] = {}
         self._pending_requests: Dict[str, asyncio.Future] = {}  # request_id -> Future
-        self._request_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        # request_id -> reply channel of the node waiting on it, kept until
+        # the requester's timeout so late replies are discarded at the source
+        self._reply_routes = LRUCache(
+            "event_bus_reply_routes",
+            max_size=int(os.getenv("EVENT_BUS_REPLY_ROUTES_MAX", "10000")),
+        )
         self._stats: Dict[str, int] = {
             "events_emitted": 0,
             "events_delivered": 0,
+            "events_queued": 0,
+            "events_dropped": 0,
+            "events_blocked": 0,
+            "events_spilled": 0,
             "subscriber_errors": 0,
             "agent_requests_sent": 0,
             "agent_responses_received": 0,
             "agent_timeouts": 0,
+            "late_replies_discarded": 0,
             "redis_events_published": 0,
-            "redis_events_received": 0
+            "redis_events_received": 0,
+            "redis_publish_batches": 0,
+            "redis_publish_errors": 0,
+            "redis_echoes_suppressed": 0,
+            "redis_duplicates_skipped": 0,
+            "stream_entries_acked": 0,
+            "redis_replies_sent": 0,
+            "redis_replies_received": 0
         }
         
+        # Node identity: each replica listens on its own reply channel
+        self.node_id = os.getenv("EVENT_BUS_NODE_ID") or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self.reply_channel = f"{REPLY_CHANNEL_PREFIX}{self.node_id}"
+        # Streams consumer group: defaults to one group per node (every node
+        # sees every event). A shared group name load-balances events instead.
+        # Set a stable EVENT_BUS_NODE_ID to replay what was missed across restarts.
+        self.consumer_group = os.getenv("EVENT_BUS_CONSUMER_GROUP") or self.node_id
+        
         # Redis setup
         self.redis_url = os.getenv("REDIS_URL", "redis://redis:6379")
         self.redis_client = None
         self.redis_pubsub = None
         self._redis_task = None
+        self._stream_task = None
+        self._background_tasks: set = set()
+        
+        self.transport = os.getenv("EVENT_BUS_TRANSPORT", "pubsub").lower()
+        if self.transport not in TRANSPORTS:
+            logger.warning(f"Unknown EVENT_BUS_TRANSPORT '{self.transport}', using pubsub")
+            self.transport = "pubsub"
+        self.stream_maxlen = int(os.getenv("EVENT_BUS_STREAM_MAXLEN", "10000"))
+        self.codec = EventCodec(os.getenv("EVENT_BUS_CODEC", "json"))
+        # Mixed-version clusters (opt-in): older nodes publish and listen only
+        # on the single EVENTS_CHANNEL. "subscribe" also reads it, "dual" also
+        # publishes every event there so older nodes keep receiving them
+        legacy_mode = os.getenv("EVENT_BUS_LEGACY_CHANNEL", "off").lower()
+        if legacy_mode not in LEGACY_CHANNEL_MODES:
+            logger.warning(f"Unknown EVENT_BUS_LEGACY_CHANNEL '{legacy_mode}', using off")
+            legacy_mode = "off"
+        self.legacy_subscribe = legacy_mode in ("subscribe", "dual")
+        self.legacy_publish = legacy_mode == "dual"
+        linger_ms = float(os.getenv("EVENT_BUS_PUBLISH_LINGER_MS", "2"))
+        self._publisher: Optional[_BatchPublisher] = None
+        if linger_ms > 0:
+            self._publisher = _BatchPublisher(
+                self,
+                linger_ms=linger_ms,
+                max_batch=int(os.getenv("EVENT_BUS_PUBLISH_BATCH_SIZE", "256")),
+                max_pending=int(os.getenv("EVENT_BUS_PUBLISH_MAX_PENDING", "10000")),
+            )
+        self.stream_block_ms = int(os.getenv("EVENT_BUS_STREAM_BLOCK_MS", "1000"))
+        self._stream_groups: set = set()
+        self._pattern_streams: set = set()
+        self._pattern_scan_at = 0.0
+        
+        # Overlapping subscriptions (e.g. "task.*" and "task.failed") deliver
+        # the same message more than once; dispatch each event id only once
+        self._recent_event_ids = LRUCache("event_bus_recent_events", max_size=4096, ttl_seconds=60)
         
         # Do not connect in __init__ as it may be called before event loop is running
         # Call connect() explicitly during application startup
@@ -260,53 +675,218 @@ class EventBus:
     async def _connect_redis(self):
         """Connect to Redis and start listening for events."""
         try:
-            self.redis_client = redis.from_url(self.redis_url, decode_responses=True)
+            # Raw bytes: messages may use a binary codec
+            self.redis_client = redis.from_url(self.redis_url, decode_responses=False)
             await self.redis_client.ping()
             logger.info(f"✅ Connected to Redis at {self.redis_url}")
             
-            # Start listener
+            # Start listener: reply channel always, event channels per subscribed type
             self.redis_pubsub = self.redis_client.pubsub()
-            await self.redis_pubsub.subscribe("agent-events")
+            await self.redis_pubsub.subscribe(self.reply_channel)
+            if self.legacy_subscribe:
+                await self.redis_pubsub.subscribe(EVENTS_CHANNEL)
+            for event_type in list(self._subscribers):
+                await self._redis_subscribe(event_type)
             self._redis_task = asyncio.create_task(self._redis_listener())
             
+            if self.transport == "streams":
+                self._stream_task = asyncio.create_task(self._stream_reader())
+            
+            logger.info(
+                f"Event bus node {self.node_id} using Redis {self.transport} transport"
+            )
+            
         except Exception as e:
             logger.warning(f"⚠️  Redis connection failed: {e}. Inter-agent events will be local-only.")
             self.redis_client = None
 
+    def _channel(self, event_type: str) -> str:
+        return f"{EVENTS_CHANNEL}:{event_type}"
+    
+    def _stream_key(self, event_type: str) -> str:
+        return f"{STREAM_PREFIX}{event_type}"
+    
+    async def _redis_subscribe(self, event_type: str) -> None:
+        """Subscribe this node's pub/sub connection to an event type's channel."""
+        if not self.redis_pubsub or self.transport != "pubsub":
+            return
+        channel = self._channel(event_type)
+        if _is_pattern(event_type):
+            await self.redis_pubsub.psubscribe(channel)
+        else:
+            await self.redis_pubsub.subscribe(channel)
+    
+    async def _redis_unsubscribe(self, event_type: str) -> None:
+        if not self.redis_pubsub or self.transport != "pubsub":
+            return
+        channel = self._channel(event_type)
+        if _is_pattern(event_type):
+            await self.redis_pubsub.punsubscribe(channel)
+        else:
+            await self.redis_pubsub.unsubscribe(channel)
+    
+    def _run_in_background(self, coro) -> None:
+        """Schedule a coroutine from sync code if an event loop is running."""
+        try:
+            task = asyncio.get_running_loop().create_task(coro)
+        except RuntimeError:
+            coro.close()  # No loop yet; connect() subscribes existing types
+            return
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
     async def _redis_listener(self):
         """Listen for Redis messages and dispatch to local subscribers."""
         try:
             async for message in self.redis_pubsub.listen():
-                if message["type"] == "message":
-                    try:
-                        data = json.loads(message["data"])
-                        event = InterAgentEvent.from_dict(data)
-                        
-                        # Dispatch locally
-                        # We use a special prefix or just map to local event types
-                        # For now, we'll emit as a standard Event
-                        
-                        self._stats["redis_events_received"] += 1
-                        
-                        # Avoid re-publishing to Redis if we are the source (simple check)
-                        # In a real system, we'd check source_agent against our identity
-                        
-                        await self.emit(
-                            event.event_type,
-                            event.payload,
-                            source=event.source_agent,
-                            correlation_id=event.correlation_id,
-                            publish_to_redis=False  # Don't echo back
-                        )
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing Redis message: {e}")
+                if message["type"] not in ("message", "pmessage"):
+                    continue
+                try:
+                    data = EventCodec.decode(message["data"])
+                    
+                    if _text(message["channel"]) == self.reply_channel:
+                        self._stats["redis_replies_received"] += 1
+                        agent_reply_routing_total.labels(outcome="received").inc()
+                        self._resolve_pending_request(data)
+                        continue
+                    
+                    await self._dispatch_remote(data)
+                    
+                except Exception as e:
+                    logger.error(f"Error processing Redis message: {e}")
         except asyncio.CancelledError:
             pass
         except Exception as e:
             logger.error(f"Redis listener error: {e}")
             # Retry logic could go here
     
+    async def _dispatch_remote(self, data: Dict[str, Any]) -> None:
+        """Dispatch an event received from Redis to local subscribers."""
+        event = InterAgentEvent.from_dict(data)
+        
+        # Our own publications come back to us; local subscribers already ran
+        if event.origin_node == self.node_id:
+            self._stats["redis_echoes_suppressed"] += 1
+            return
+        
+        if event.event_id in self._recent_event_ids:
+            self._stats["redis_duplicates_skipped"] += 1
+            return
+        self._recent_event_ids.set(event.event_id, True)
+        
+        self._stats["redis_events_received"] += 1
+        
+        if event.event_type == "agent_request":
+            self._record_reply_route(event.payload)
+        
+        await self.emit(
+            event.event_type,
+            event.payload,
+            source=event.source_agent,
+            correlation_id=event.correlation_id,
+            publish_to_redis=False,  # Don't echo back
+            priority=event.priority
+        )
+    
+    async def _stream_keys(self) -> List[str]:
+        """Streams this node reads: one per subscribed type, patterns resolved via SCAN."""
+        keys = {
+            self._stream_key(event_type)
+            for event_type, callbacks in self._subscribers.items()
+            if callbacks and not _is_pattern(event_type)
+        }
+        if self._pattern_types and time.monotonic() - self._pattern_scan_at > 5.0:
+            found = set()
+            for pattern in self._pattern_types:
+                async for key in self.redis_client.scan_iter(match=self._stream_key(pattern)):
+                    found.add(_text(key))
+            self._pattern_streams = found
+            self._pattern_scan_at = time.monotonic()
+        return sorted(keys | self._pattern_streams)
+    
+    def _add_publish(self, pipe, event_type: str, message: bytes) -> None:
+        """
+        Queue one event's publish on a Redis pipeline, using the configured
+        transport (plus the legacy channel when dual publishing is enabled).
+        """
+        if self.transport == "streams":
+            pipe.xadd(
+                self._stream_key(event_type),
+                {"event": message},
+                maxlen=self.stream_maxlen,
+                approximate=True,
+            )
+        else:
+            pipe.publish(self._channel(event_type), message)
+        if self.legacy_publish:
+            pipe.publish(EVENTS_CHANNEL, message)
+    
+    async def flush(self) -> None:
+        """Send any batched Redis publishes now instead of after the linger window."""
+        if self._publisher:
+            await self._publisher.flush()
+    
+    async def _ensure_group(self, stream: str) -> None:
+        if stream in self._stream_groups:
+            return
+        try:
+            await self.redis_client.xgroup_create(stream, self.consumer_group, id="$", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._stream_groups.add(stream)
+    
+    async def _stream_reader(self):
+        """
+        Read subscribed streams through this node's consumer group.
+        
+        Starts by replaying entries delivered to this consumer but never acked
+        (e.g. the process died mid-dispatch), then reads new entries. Entries
+        are acked after local dispatch.
+        """
+        replaying = True
+        while True:
+            try:
+                streams = await self._stream_keys()
+                if not streams:
+                    await asyncio.sleep(self.stream_block_ms / 1000)
+                    continue
+                for stream in streams:
+                    await self._ensure_group(stream)
+                
+                read_started = time.monotonic()
+                response = await self.redis_client.xreadgroup(
+                    self.consumer_group,
+                    self.node_id,
+                    {stream: "0" if replaying else ">" for stream in streams},
+                    count=100,
+                    block=None if replaying else self.stream_block_ms,
+                )
+                if replaying and not any(entries for _, entries in response or []):
+                    replaying = False
+                    continue
+                if not response:
+                    # Don't hot-loop if the server returned before BLOCK elapsed
+                    remaining = self.stream_block_ms / 1000 - (time.monotonic() - read_started)
+                    if remaining > 0:
+                        await asyncio.sleep(remaining)
+                    continue
+                
+                for stream, entries in response or []:
+                    for entry_id, fields in entries:
+                        try:
+                            await self._dispatch_remote(EventCodec.decode(fields[b"event"]))
+                        except Exception as e:
+                            logger.error(f"Error processing stream entry {stream}/{entry_id}: {e}")
+                        # Ack even on failure so a poison entry isn't replayed forever
+                        await self.redis_client.xack(stream, self.consumer_group, entry_id)
+                        self._stats["stream_entries_acked"] += 1
+            except asyncio.CancelledError:
+                return
+            except Exception as e:
+                logger.error(f"Redis stream reader error: {e}")
+                await asyncio.sleep(1.0)
+    
     @classmethod
     def get_instance(cls) -> 'EventBus':
         """
@@ -329,7 +909,8 @@ class EventBus:
     def subscribe(
         self,
         event_type: str,
-        callback: Callable[[Event], Any]
+        callback: Callable[[Event], Any],
+        delivery: Optional[DeliveryOptions] = None
     ) -> None:
         """
         Subscribe to event type.
@@ -338,6 +919,8 @@ class EventBus:
             event_type: Type of event to listen for
             callback: Async function to call when event emitted
                       Signature: async def callback(event: Event) -> None
+            delivery: Opt into queued (fire-and-forget) delivery. emit() then
+                      enqueues instead of awaiting this callback.
         
         Example:
             async def on_approval(event: Event):
@@ -346,11 +929,20 @@ class EventBus:
             
             bus.subscribe("approval_required", on_approval)
         """
-        if event_type not in self._subscribers:
+        if not self._subscribers.get(event_type):
             self._subscribers[event_type] = []
+            if _is_pattern(event_type):
+                self._pattern_types.add(event_type)
+            if self.redis_pubsub:
+                self._run_in_background(self._redis_subscribe(event_type))
         
         self._subscribers[event_type].append(callback)
         
+        if delivery is not None:
+            self._queued_subscribers[(event_type, callback)] = _SubscriberQueue(
+                self, event_type, callback, delivery
+            )
+        
         logger.info(
             f"Subscribed to '{event_type}' "
             f"(now {len(self._subscribers[event_type])} subscribers)"
@@ -371,6 +963,14 @@ class EventBus:
         if event_type in self._subscribers:
             try:
                 self._subscribers[event_type].remove(callback)
+                queued = self._queued_subscribers.pop((event_type, callback), None)
+                if queued is not None:
+                    queued.cancel()
+                if not self._subscribers[event_type]:
+                    del self._subscribers[event_type]
+                    self._pattern_types.discard(event_type)
+                    if self.redis_pubsub:
+                        self._run_in_background(self._redis_unsubscribe(event_type))
                 logger.info(f"Unsubscribed from '{event_type}'")
             except ValueError:
                 logger.warning(f"Callback not found for '{event_type}'")
@@ -381,17 +981,23 @@ class EventBus:
         data: Dict[str, Any],
         source: str = "unknown",
         correlation_id: Optional[str] = None,
-        publish_to_redis: bool = True
+        publish_to_redis: bool = True,
+        priority: int = 0
     ) -> None:
         """
         Emit event to all subscribers.
         
+        Direct subscribers are awaited concurrently; queued subscribers only
+        have the event enqueued (unless their overflow policy is BLOCK and
+        their queue is full).
+        
         Args:
             event_type: Type of event (approval_required, task_completed, etc.)
             data: Event payload (dict with event-specific fields)
             source: Which agent/component is emitting
             correlation_id: Optional ID to correlate related events
             publish_to_redis: Whether to broadcast to other agents via Redis
+            priority: Delivery priority for queued subscribers (higher first)
         
         Example:
             await bus.emit(
@@ -430,18 +1036,26 @@ class EventBus:
                     event_type=event_type,
                     source_agent=source,
                     payload=data,
-                    correlation_id=correlation_id
-                )
-                await self.redis_client.publish(
-                    "agent-events",
-                    json.dumps(inter_agent_event.to_dict())
+                    correlation_id=correlation_id,
+                    priority=priority,
+                    origin_node=self.node_id
                 )
-                self._stats["redis_events_published"] += 1
+                message = self.codec.encode(inter_agent_event.to_dict())
+                if self._publisher:
+                    await self._publisher.publish(event_type, message)
+                else:
+                    async with self.redis_client.pipeline(transaction=False) as pipe:
+                        self._add_publish(pipe, event_type, message)
+                        await pipe.execute()
+                    self._stats["redis_events_published"] += 1
             except Exception as e:
                 logger.error(f"Failed to publish to Redis: {e}")
 
-        # Get subscribers for this event type
-        subscribers = self._subscribers.get(event_type, [])
+        # Get subscribers for this event type (exact and glob-pattern matches)
+        subscribers = [(event_type, callback) for callback in self._subscribers.get(event_type, ())]
+        for pattern in self._pattern_types:
+            if fnmatch.fnmatchcase(event_type, pattern):
+                subscribers.extend((pattern, callback) for callback in self._subscribers[pattern])
         
         if not subscribers:
             # If no local subscribers, we still might have remote ones via Redis
@@ -457,16 +1071,24 @@ class EventBus:
             f"(source: {source}, correlation_id: {correlation_id})"
         )
         
-        # Call all subscribers concurrently
+        # Queued subscribers: enqueue and move on (workers deliver)
         tasks = []
-        for callback in subscribers:
-            tasks.append(self._call_subscriber(callback, event))
+        for subscribed_type, callback in subscribers:
+            queued = self._queued_subscribers.get((subscribed_type, callback))
+            if queued is not None:
+                await queued.put(event, priority)
+            else:
+                tasks.append(self._call_subscriber(callback, event))
+        
+        if not tasks:
+            return
         
+        # Call direct subscribers concurrently
         # Wait for all subscribers (don't let one failure block others)
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        # Count successful deliveries
-        successful = sum(1 for r in results if not isinstance(r, Exception))
+        # Count successful deliveries (_call_subscriber returns False on error)
+        successful = sum(1 for r in results if r is True)
         self._stats["events_delivered"] += successful
         
         # Prometheus: Increment delivered counter
@@ -474,23 +1096,26 @@ class EventBus:
             event_type=event_type
         ).inc(successful)
         
-        if successful < len(subscribers):
-            failed = len(subscribers) - successful
+        if successful < len(tasks):
+            failed = len(tasks) - successful
             logger.error(
-                f"{failed}/{len(subscribers)} subscribers failed for '{event_type}'"
+                f"{failed}/{len(tasks)} subscribers failed for '{event_type}'"
             )
     
     async def _call_subscriber(
         self,
         callback: Callable[[Event], Any],
         event: Event
-    ) -> None:
+    ) -> bool:
         """
         Call subscriber callback with error handling.
         
         Args:
             callback: Subscriber function
             event: Event object
+        
+        Returns:
+            True if the callback completed, False if it raised
         """
         try:
             # Check if callback is async
@@ -501,7 +1126,8 @@ class EventBus:
                 loop = asyncio.get_event_loop()
                 await loop.run_in_executor(None, callback, event)
             
-            logger.debug(f"Delivered event to {callback.__name__}")
+            logger.debug(f"Delivered event to {_callback_name(callback)}")
+            return True
             
         except Exception as e:
             self._stats["subscriber_errors"] += 1
@@ -509,13 +1135,14 @@ class EventBus:
             # Prometheus: Increment subscriber error counter
             event_bus_subscriber_errors_total.labels(
                 event_type=event.type,
-                callback_name=callback.__name__
+                callback_name=_callback_name(callback)
             ).inc()
             
             logger.error(
-                f"Subscriber {callback.__name__} failed for {event.type}: {e}",
+                f"Subscriber {_callback_name(callback)} failed for {event.type}: {e}",
                 exc_info=True
             )
+            return False
     
     def get_stats(self) -> Dict[str, int]:
         """
@@ -526,6 +1153,57 @@ class EventBus:
         """
         return self._stats.copy()
     
+    def get_queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-subscriber queue depth for queued subscribers.
+        
+        Returns:
+            Dict mapping "event_type:subscriber" -> depth/spill/capacity
+        """
+        return {
+            f"{q.event_type}:{q.name}": {
+                "depth": q.depth,
+                "spilled": len(q.spill),
+                "max_queue_size": q.options.max_queue_size,
+                "overflow": q.options.overflow.value,
+            }
+            for q in self._queued_subscribers.values()
+        }
+    
+    async def drain(self) -> None:
+        """Wait until all queued subscribers have delivered their pending events."""
+        await asyncio.gather(*(q.drain() for q in self._queued_subscribers.values()))
+    
+    async def close(self, drain_timeout: float = 5.0) -> None:
+        """
+        Stop queued-delivery workers (after draining up to drain_timeout) and
+        disconnect from Redis.
+        """
+        await asyncio.gather(
+            *(q.stop(drain_timeout) for q in self._queued_subscribers.values())
+        )
+        if self._publisher:
+            await self._publisher.close()
+        
+        tasks = [t for t in (self._redis_task, self._stream_task, *self._background_tasks) if t]
+        await cancel_and_wait(tasks)
+        self._redis_task = None
+        self._stream_task = None
+        self._background_tasks.clear()
+        self._stream_groups.clear()
+        if self.redis_pubsub:
+            try:
+                await self.redis_pubsub.close()
+            except Exception as e:
+                logger.debug(f"Error closing Redis pubsub: {e}")
+            self.redis_pubsub = None
+        if self.redis_client:
+            try:
+                await self.redis_client.close()
+            except Exception as e:
+                logger.debug(f"Error closing Redis client: {e}")
+            self.redis_client = None
+    
     def list_subscribers(self) -> Dict[str, int]:
         """
         List number of subscribers per event type.
@@ -576,8 +1254,19 @@ class EventBus:
         """
         timeout_val = timeout or request.timeout_seconds
         
+        # Tell remote responders where to send the reply and for how long
+        # it is still wanted
+        if self.redis_client:
+            request = request.model_copy(update={
+                "metadata": {
+                    **request.metadata,
+                    "reply_to": self.reply_channel,
+                    "reply_deadline": time.time() + timeout_val,
+                }
+            })
+        
         # Create future for response
-        future: asyncio.Future = asyncio.Future()
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
         self._pending_requests[request.request_id] = future
         
         self._stats["agent_requests_sent"] += 1
@@ -699,22 +1388,30 @@ class EventBus:
             
             await bus.respond_to_request(response)
         """
-        # Find pending request future
-        future = self._pending_requests.get(response.request_id)
+        response_data = response.to_dict()
         
-        if future and not future.done():
-            # Resolve future with response data
-            future.set_result(response.to_dict())
-            
-            logger.info(
-                f"Delivered response for request {response.request_id} "
-                f"from {response.source_agent} to {response.target_agent}"
-            )
+        # Requester on this node: resolve its future directly
+        if response.request_id in self._pending_requests:
+            agent_reply_routing_total.labels(outcome="local").inc()
+            self._resolve_pending_request(response_data)
         else:
-            logger.warning(
-                f"No pending request found for {response.request_id} "
-                f"(may have timed out or been cancelled)"
-            )
+            # Requester on another node: send to its reply channel
+            reply_to = self._reply_routes.get(response.request_id)
+            if reply_to and self.redis_client:
+                try:
+                    await self.redis_client.publish(reply_to, self.codec.encode(response_data))
+                    self._reply_routes.delete(response.request_id)
+                    self._stats["redis_replies_sent"] += 1
+                    agent_reply_routing_total.labels(outcome="sent").inc()
+                    logger.info(
+                        f"Routed response for request {response.request_id} "
+                        f"from {response.source_agent} to {reply_to}"
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to route response {response.request_id} via Redis: {e}")
+            else:
+                # Unknown or expired route: the requester has given up
+                self._discard_late_reply(response.request_id, "unroutable")
         
         # Also emit as regular event for any subscribers
         await self.emit(
@@ -724,6 +1421,41 @@ class EventBus:
             correlation_id=response.request_id
         )
     
+    def _record_reply_route(self, request_data: Dict[str, Any]) -> None:
+        """Remember where to send the reply for a request received from Redis."""
+        metadata = request_data.get("metadata") or {}
+        reply_to = metadata.get("reply_to")
+        request_id = request_data.get("request_id")
+        if not reply_to or not request_id or reply_to == self.reply_channel:
+            return
+        
+        deadline = metadata.get("reply_deadline")
+        ttl = deadline - time.time() if deadline else request_data.get("timeout_seconds", 30.0)
+        if ttl > 0:
+            self._reply_routes.set(request_id, reply_to, ttl_seconds=ttl)
+    
+    def _resolve_pending_request(self, response_data: Dict[str, Any]) -> None:
+        """Resolve the local future for a response, or discard it if nobody is waiting."""
+        request_id = response_data.get("request_id")
+        future = self._pending_requests.get(request_id)
+        
+        if future and not future.done():
+            future.set_result(response_data)
+            logger.info(
+                f"Delivered response for request {request_id} "
+                f"from {response_data.get('source_agent')} to {response_data.get('target_agent')}"
+            )
+        else:
+            self._discard_late_reply(request_id, "late_discarded")
+    
+    def _discard_late_reply(self, request_id: Optional[str], outcome: str) -> None:
+        self._stats["late_replies_discarded"] += 1
+        agent_reply_routing_total.labels(outcome=outcome).inc()
+        logger.warning(
+            f"No pending request found for {request_id} "
+            f"(may have timed out or been cancelled); discarding reply"
+        )
+    
     async def broadcast_to_agents(
         self,
         broadcast: 'AgentBroadcastEvent'
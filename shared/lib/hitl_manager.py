@@ -6,12 +6,13 @@ Phase 4: Added Prometheus metrics for observability.
 """
 
 import asyncio
+import base64
 import json
 import logging
 import os
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Literal, Optional
+from typing import Dict, List, Literal, Optional, Sequence, Tuple
 
 import psycopg
 import yaml
@@ -57,6 +58,30 @@ approval_timeouts = Counter(
     ["agent", "risk_level"],
 )
 
+RISK_LEVELS = ["low", "medium", "high", "critical"]
+
+# Lapsed pending requests become expired; each row returned is one timeout
+_EXPIRE_SQL = """
+    UPDATE approval_requests SET status = 'expired', updated_at = NOW()
+    WHERE status = 'pending' AND expires_at <= NOW() {request_filter}
+    RETURNING id::text, agent_name, risk_level, created_at
+"""
+
+
+def encode_cursor(created_at: datetime, request_id: str) -> str:
+    """Opaque keyset cursor for the pending request at (created_at, id)"""
+    raw = json.dumps([created_at.isoformat(), str(request_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor; raises ValueError on malformed cursors"""
+    try:
+        created_at, request_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), str(uuid.UUID(request_id))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
 
 class HITLManager:
     """
@@ -109,6 +134,7 @@ class HITLManager:
             }
 
         self.db_connection = None
+        self._expiry_task: Optional[asyncio.Task] = None
 
     async def _get_connection(self):
         """Get async database connection context manager"""
@@ -294,7 +320,7 @@ class HITLManager:
             risk_level,
         ) = row
 
-        # Check expiration
+        # Check expiration (the sweep may not have reached this request yet)
         expired = False
         if status == "pending" and datetime.utcnow() > expires_at:
             expired = True
@@ -387,6 +413,7 @@ class HITLManager:
                 await conn.commit()
 
         logger.info(f"[HITLManager] Request {request_id} approved by {approver_id}")
+        await self._update_backlog_metrics()
         return True
 
     @traceable(name="hitl_reject_request", tags=["hitl", "approval"])
@@ -425,6 +452,7 @@ class HITLManager:
         logger.info(
             f"[HITLManager] Request {request_id} rejected by {approver_id} ({approver_role}): {reason}"
         )
+        await self._update_backlog_metrics()
         return True
 
     @traceable(name="hitl_list_pending_requests", tags=["hitl", "approval"])
@@ -441,24 +469,75 @@ class HITLManager:
         Returns:
             List of approval request dicts
         """
+        results, _ = await self.list_pending_page(approver_role=approver_role, limit=limit)
+        return results
+
+    @traceable(name="hitl_list_pending_page", tags=["hitl", "approval"])
+    async def list_pending_page(
+        self,
+        approver_role: Optional[str] = None,
+        risk_levels: Optional[Sequence[str]] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        One page of pending approval requests, newest first.
+
+        Role and risk filters are applied in SQL, so every page is full until
+        the queue runs out. Pages are keyset-paginated on (created_at, id) and
+        served from the partial index on pending rows.
+
+        Args:
+            approver_role: Only requests this role can approve (optional)
+            risk_levels: Only these risk levels (optional)
+            limit: Page size
+            cursor: next_cursor from the previous page (optional)
+
+        Returns:
+            Tuple of (approval request dicts, cursor for the next page or None)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        levels = set(risk_levels) if risk_levels is not None else set(RISK_LEVELS)
+        if approver_role is not None:
+            levels &= set(self._approvable_levels(approver_role))
+        if not levels:
+            return [], None
+
+        conditions = ["status = 'pending'", "expires_at > NOW()"]
+        params: List = []
+        if levels != set(RISK_LEVELS):
+            conditions.append("risk_level = ANY(%s)")
+            params.append(sorted(levels))
+        if cursor:
+            conditions.append("(created_at, id) < (%s, %s::uuid)")
+            params.extend(decode_cursor(cursor))
+        params.append(limit + 1)
+
+        query = f"""
+            SELECT id, workflow_id, task_type, task_description,
+                   agent_name, risk_level, action_type, action_impact,
+                   created_at, expires_at
+            FROM approval_requests
+            WHERE {" AND ".join(conditions)}
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s
+        """
+
         async with await self._get_connection() as conn:
-            query = """
-                SELECT id, workflow_id, task_type, task_description,
-                       agent_name, risk_level, action_type, action_impact,
-                       created_at, expires_at
-                FROM approval_requests
-                WHERE status = 'pending' AND expires_at > NOW()
-                ORDER BY created_at DESC
-                LIMIT %s
-            """
+            async with conn.cursor() as db_cursor:
+                await db_cursor.execute(query, params)
+                rows = await db_cursor.fetchall()
 
-            async with conn.cursor() as cursor:
-                await cursor.execute(query, (limit,))
-                rows = await cursor.fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][8], rows[-1][0])
 
         results = []
         for row in rows:
-            request_dict = {
+            results.append({
                 "id": row[0],
                 "workflow_id": row[1],
                 "task_type": row[2],
@@ -469,19 +548,18 @@ class HITLManager:
                 "action_impact": row[7],
                 "created_at": row[8].isoformat(),
                 "expires_at": row[9].isoformat(),
-            }
+            })
 
-            # Filter by role if specified
-            if approver_role is None or self._can_approve(approver_role, row[5]):
-                results.append(request_dict)
+        return results, next_cursor
 
-        return results
+    def _approvable_levels(self, role: str) -> List[str]:
+        """Risk levels the role may approve"""
+        role_config = self.policies.get("roles", {}).get(role, {})
+        return role_config.get("can_approve", [])
 
     def _can_approve(self, role: str, risk_level: RiskLevel) -> bool:
         """Check if role can approve risk level"""
-        role_config = self.policies.get("roles", {}).get(role, {})
-        can_approve_levels = role_config.get("can_approve", [])
-        return risk_level in can_approve_levels
+        return risk_level in self._approvable_levels(role)
 
     def _calculate_risk_score(self, task: Dict, risk_level: RiskLevel) -> float:
         """Calculate numeric risk score (0.0-10.0)"""
@@ -499,15 +577,56 @@ class HITLManager:
 
         return min(score, 10.0)
 
-    async def _mark_expired(self, request_id: str):
-        """Mark request as expired"""
+    async def _mark_expired(self, request_id: str) -> bool:
+        """Expire one lapsed pending request; False if it was already resolved or expired"""
+        expired = await self._expire(request_id)
+        return bool(expired)
+
+    async def expire_stale_requests(self) -> int:
+        """Expire every lapsed pending request and record the timeouts; returns how many"""
+        return len(await self._expire())
+
+    async def _expire(self, request_id: Optional[str] = None) -> List[tuple]:
+        """Flip lapsed pending requests to expired and record each as resolved.
+
+        The conditional UPDATE makes the status change and its metrics happen
+        once per request, whether the sweep or check_approval_status gets
+        there first.
+        """
+        query = _EXPIRE_SQL.format(request_filter="AND id = %s" if request_id else "")
         async with await self._get_connection() as conn:
             async with conn.cursor() as cursor:
-                await cursor.execute(
-                    "UPDATE approval_requests SET status = 'expired', updated_at = NOW() WHERE id = %s",
-                    (request_id,),
-                )
-                await conn.commit()
+                await cursor.execute(query, (request_id,) if request_id else None)
+                rows = await cursor.fetchall()
+            await conn.commit()
+
+        for expired_id, agent_name, risk_level, created_at in rows:
+            self._observe_resolution(expired_id, "expired", agent_name, risk_level, created_at)
+        if rows:
+            logger.info(f"[HITLManager] Expired {len(rows)} approval request(s)")
+            await self._update_backlog_metrics()
+        return rows
+
+    def start_expiry_sweep(self, interval_seconds: Optional[float] = None) -> None:
+        """Expire lapsed requests in the background every interval_seconds"""
+        if self._expiry_task is not None:
+            return
+        interval = interval_seconds or float(os.getenv("HITL_EXPIRY_SWEEP_INTERVAL_SECONDS", "60"))
+        self._expiry_task = asyncio.create_task(self._expiry_loop(interval))
+
+    async def stop_expiry_sweep(self) -> None:
+        if self._expiry_task is not None:
+            self._expiry_task.cancel()
+            await asyncio.gather(self._expiry_task, return_exceptions=True)
+            self._expiry_task = None
+
+    async def _expiry_loop(self, interval: float) -> None:
+        while True:
+            try:
+                await self.expire_stale_requests()
+            except Exception as e:
+                logger.error(f"[HITLManager] Expiry sweep failed: {e}")
+            await asyncio.sleep(interval)
 
     def _format_approval_description(
         self, request_id: str, task: Dict, risk_level: str
@@ -589,28 +708,22 @@ class HITLManager:
         """Update Prometheus backlog gauge with current pending approvals by risk level.
 
         Phase 4: Observability enhancement for monitoring approval queue health.
+        Read-only: counts come from approval_backlog_counts, which a trigger
+        keeps in step with status changes. Lapsed requests leave the counts
+        when the expiry sweep (expire_stale_requests) marks them expired.
         """
         try:
             async with await self._get_connection() as conn:
                 async with conn.cursor() as cursor:
-                    # Get count of pending approvals by risk level
                     await cursor.execute(
-                        """
-                        SELECT risk_level, COUNT(*) 
-                        FROM approval_requests 
-                        WHERE status = 'pending' AND expires_at > NOW()
-                        GROUP BY risk_level
-                        """
+                        "SELECT risk_level, pending FROM approval_backlog_counts"
                     )
                     rows = await cursor.fetchall()
 
-                    # Reset all gauges first
-                    for risk_level in ["low", "medium", "high", "critical"]:
-                        approval_backlog.labels(risk_level=risk_level).set(0)
-
-                    # Update with actual counts
-                    for risk_level, count in rows:
-                        approval_backlog.labels(risk_level=risk_level).set(count)
+            counts = dict.fromkeys(RISK_LEVELS, 0)
+            counts.update(rows)
+            for risk_level, count in counts.items():
+                approval_backlog.labels(risk_level=risk_level).set(count)
 
         except Exception as e:
             logger.error(f"[HITLManager] Failed to update backlog metrics: {e}")
@@ -634,6 +747,20 @@ class HITLManager:
             risk_level: Risk level of the operation
             created_at: When the approval request was created
         """
+        self._observe_resolution(request_id, status, agent_name, risk_level, created_at)
+
+        # Update backlog
+        await self._update_backlog_metrics()
+
+    def _observe_resolution(
+        self,
+        request_id: str,
+        status: ApprovalStatus,
+        agent_name: str,
+        risk_level: str,
+        created_at: datetime,
+    ):
+        """Emit the resolution, latency and timeout metrics for one request"""
         # Calculate latency
         resolved_at = datetime.utcnow()
         latency_seconds = (resolved_at - created_at).total_seconds()
@@ -651,9 +778,6 @@ class HITLManager:
         if status == "expired":
             approval_timeouts.labels(agent=agent_name, risk_level=risk_level).inc()
 
-        # Update backlog
-        await self._update_backlog_metrics()
-
         logger.info(
             f"[HITLManager] Approval {request_id} resolved: "
             f"status={status}, latency={latency_seconds:.1f}s"
@@ -28,6 +28,8 @@ from typing import Dict, List, Optional, Tuple
 from langchain_core.messages import BaseMessage
 from langsmith import traceable
 
+from .shared_cache import LRUCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -145,7 +147,7 @@ class IntentClassifier:
             llm_client: Optional LLM client for fallback classification
         """
         self.llm_client = llm_client
-        self._classification_cache: Dict[str, Tuple[IntentType, float]] = {}
+        self._classification_cache = LRUCache("intent_classification", max_size=1000)
 
     @traceable(name="classify_intent", tags=["intent", "routing", "optimization"])
     def classify(
@@ -166,9 +168,11 @@ class IntentClassifier:
             Tuple of (intent_type, confidence, reasoning)
         """
         # Check cache
-        if use_cache and message in self._classification_cache:
-            intent, confidence = self._classification_cache[message]
-            return intent, confidence, "cached"
+        if use_cache:
+            cached = self._classification_cache.get(message)
+            if cached is not None:
+                intent, confidence = cached
+                return intent, confidence, "cached"
 
         message_lower = message.lower().strip()
         context = context or {}
@@ -288,14 +292,8 @@ class IntentClassifier:
         return IntentType.QA, 0.60, "LLM classification not implemented"
 
     def _cache_result(self, message: str, intent: IntentType, confidence: float):
-        """Cache classification result."""
-        self._classification_cache[message] = (intent, confidence)
-
-        # Limit cache size to 1000 entries
-        if len(self._classification_cache) > 1000:
-            # Remove oldest 100 entries
-            for key in list(self._classification_cache.keys())[:100]:
-                del self._classification_cache[key]
+        """Cache classification result (least recently used entries evicted past 1000)."""
+        self._classification_cache.set(message, (intent, confidence))
 
     def get_routing_recommendation(
         self, intent: IntentType, confidence: float
@@ -0,0 +1,102 @@
+"""
+Precompiled keyword matcher (Aho-Corasick).
+
+Maps a fixed set of keywords to payload values (e.g. MCP server names) and
+finds every keyword occurring in a text in a single pass, independent of how
+many keywords are registered.
+
+Usage:
+    index = KeywordIndex({"git": ["gitmcp"], "docker": ["dockerhub"]})
+    index.match("commit and push the docker image")   # {"gitmcp", "dockerhub"}
+    index.match_fragment("dock")                       # {"dockerhub"}
+"""
+
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Set
+
+
+class KeywordIndex:
+    """
+    Aho-Corasick automaton over a keyword -> values mapping.
+
+    `match(text)` is equivalent to taking the union of values for every
+    keyword with `keyword in text`, but runs in O(len(text)) instead of
+    O(len(text) * keywords). `match_fragment(fragment)` additionally covers
+    the reverse direction (`fragment in keyword`) via a precomputed substring
+    table, which is what fuzzy LLM-extracted keywords need.
+    """
+
+    def __init__(self, mapping: Dict[str, Iterable[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[FrozenSet[str]] = [frozenset()]
+        self._substrings: Dict[str, FrozenSet[str]] = {}
+        self.keyword_count = 0
+
+        self._build(mapping)
+
+    def _build(self, mapping: Dict[str, Iterable[str]]) -> None:
+        outputs: List[Set[str]] = [set()]
+        substrings: Dict[str, Set[str]] = {}
+
+        for keyword, values in mapping.items():
+            keyword = keyword.lower()
+            if not keyword:
+                continue
+            values = set(values)
+            self.keyword_count += 1
+
+            # Trie insertion
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    outputs.append(set())
+                state = next_state
+            outputs[state].update(values)
+
+            # Every substring of the keyword, for reverse containment lookups
+            for start in range(len(keyword)):
+                for end in range(start + 1, len(keyword) + 1):
+                    substrings.setdefault(keyword[start:end], set()).update(values)
+
+        # Breadth-first construction of failure links; outputs are merged
+        # along failure links so matching never has to walk them for output.
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                outputs[next_state] |= outputs[self._fail[next_state]]
+
+        self._out = [frozenset(values) for values in outputs]
+        self._substrings = {key: frozenset(values) for key, values in substrings.items()}
+
+    def match(self, text: str) -> Set[str]:
+        """Values of every keyword that occurs in `text` (case-insensitive)."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        matched: Set[str] = set()
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                matched |= out[state]
+        return matched
+
+    def match_fragment(self, fragment: str) -> Set[str]:
+        """Values of keywords contained in `fragment` or containing it."""
+        fragment = fragment.lower()
+        matched = self.match(fragment)
+        matched |= self._substrings.get(fragment, frozenset())
+        return matched
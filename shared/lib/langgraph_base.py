@@ -27,15 +27,50 @@ Usage:
     )
 """
 
+import asyncio
+import contextvars
+import logging
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import Any, Annotated, Dict, List, Optional, Sequence, TypedDict
+from typing import (
+    Any,
+    Annotated,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypedDict,
+)
 import operator
 import os
 from pathlib import Path
 
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
 from langgraph.checkpoint.postgres import PostgresSaver
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import BaseMessage
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from .db_pool import get_pool_registry
+
+logger = logging.getLogger(__name__)
+
+# Cursor shared by every statement of a batched checkpoint write
+_batch_cursor: contextvars.ContextVar = contextvars.ContextVar(
+    "checkpoint_batch_cursor", default=None
+)
 
 
 class BaseAgentState(TypedDict):
@@ -131,6 +166,272 @@ def get_postgres_checkpointer():
     return PostgresSaver.from_conn_string(conn_string)
 
 
+class BatchingAsyncPostgresSaver(AsyncPostgresSaver):
+    """
+    AsyncPostgresSaver on a shared connection pool, with write batching and pruning.
+
+    - Task writes (``aput_writes``) are buffered per thread and sent in the
+      same pipeline as the next checkpoint (``aput``), so a superstep costs one
+      round-trip instead of one per task plus one for the checkpoint. Writes
+      to special channels (interrupts, errors, resumes) are never buffered, so
+      HITL pauses and failures are durable immediately. Anything else left
+      buffered is flushed after ``write_linger_seconds`` and before any read.
+    - Pooled connections are not shared between calls, so the saver-wide lock
+      the base class takes around every query is skipped.
+    - Pruning is opt-in. With ``prune_strategy="keep_latest"``, threads
+      written since the last pass keep only their newest checkpoint, pruned
+      every ``prune_interval_seconds``. This drops the history that time
+      travel and replay need; "none" (the default) keeps it. Threads idle for
+      more than ``retention_hours`` are deleted entirely (0 keeps them).
+
+    Trade-off: if the process dies mid-superstep, buffered writes of tasks that
+    already finished are lost and those tasks re-run on resume.
+    """
+
+    def __init__(
+        self,
+        conn: Any,
+        *,
+        write_linger_seconds: float = 1.0,
+        prune_strategy: str = "none",
+        prune_interval_seconds: float = 300,
+        retention_hours: float = 0,
+        **kwargs: Any,
+    ):
+        super().__init__(conn, **kwargs)
+        self.write_linger_seconds = write_linger_seconds
+        self.prune_strategy = prune_strategy
+        self.prune_interval_seconds = prune_interval_seconds
+        self.retention_hours = retention_hours
+        # (thread_id, checkpoint_ns) -> [(query, params), ...]
+        self._pending_writes: Dict[Tuple[str, str], List[Tuple[str, list]]] = {}
+        self._linger_handles: Dict[Tuple[str, str], asyncio.TimerHandle] = {}
+        self._touched_threads: Set[str] = set()
+        self._prune_task: Optional[asyncio.Task] = None
+        self.stats = {"checkpoints": 0, "batched_writes": 0, "immediate_writes": 0, "pruned_threads": 0}
+
+    @classmethod
+    def from_env(cls, conn: Any) -> "BatchingAsyncPostgresSaver":
+        """Build a saver configured from CHECKPOINT_* environment variables."""
+        return cls(
+            conn,
+            write_linger_seconds=float(os.getenv("CHECKPOINT_WRITE_LINGER_MS", "1000")) / 1000,
+            prune_strategy=os.getenv("CHECKPOINT_PRUNE_STRATEGY", "none"),
+            prune_interval_seconds=float(os.getenv("CHECKPOINT_PRUNE_INTERVAL_SECONDS", "300")),
+            retention_hours=float(os.getenv("CHECKPOINT_RETENTION_HOURS", "0")),
+        )
+
+    @asynccontextmanager
+    async def _cursor(self, *, pipeline: bool = False):
+        batch_cursor = _batch_cursor.get()
+        if batch_cursor is not None:
+            yield batch_cursor
+            return
+        if self.pipe or not isinstance(self.conn, AsyncConnectionPool):
+            async with super()._cursor(pipeline=pipeline) as cur:
+                yield cur
+            return
+
+        async with self.conn.connection() as conn:
+            if pipeline and self.supports_pipeline:
+                async with conn.pipeline(), conn.cursor(binary=True, row_factory=dict_row) as cur:
+                    yield cur
+            elif pipeline:
+                async with conn.transaction(), conn.cursor(binary=True, row_factory=dict_row) as cur:
+                    yield cur
+            else:
+                async with conn.cursor(binary=True, row_factory=dict_row) as cur:
+                    yield cur
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Buffer task writes until the thread's next checkpoint (special channels go out now)."""
+        configurable = config["configurable"]
+        key = (configurable["thread_id"], configurable["checkpoint_ns"])
+        special = any(w[0] in WRITES_IDX_MAP for w in writes)
+        query = self.INSERT_CHECKPOINT_WRITES_SQL
+        if all(w[0] in WRITES_IDX_MAP for w in writes):
+            query = self.UPSERT_CHECKPOINT_WRITES_SQL
+        params = await asyncio.to_thread(
+            self._dump_writes,
+            key[0],
+            key[1],
+            configurable["checkpoint_id"],
+            task_id,
+            task_path,
+            writes,
+        )
+        self._pending_writes.setdefault(key, []).append((query, params))
+
+        if special or self.write_linger_seconds <= 0:
+            self.stats["immediate_writes"] += 1
+            await self._flush_writes(key)
+        else:
+            self.stats["batched_writes"] += 1
+            if key not in self._linger_handles:
+                self._linger_handles[key] = self.loop.call_later(
+                    self.write_linger_seconds, self._flush_after_linger, key
+                )
+
+    def _flush_after_linger(self, key: Tuple[str, str]) -> None:
+        self._linger_handles.pop(key, None)
+        task = asyncio.ensure_future(self._flush_writes(key))
+        # Failures are already logged by _flush_writes
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    def _take_writes(self, key: Tuple[str, str]) -> List[Tuple[str, list]]:
+        handle = self._linger_handles.pop(key, None)
+        if handle:
+            handle.cancel()
+        return self._pending_writes.pop(key, [])
+
+    async def _flush_writes(self, key: Tuple[str, str]) -> None:
+        batch = self._take_writes(key)
+        if not batch:
+            return
+        try:
+            async with self._cursor(pipeline=True) as cur:
+                for query, params in batch:
+                    await cur.executemany(query, params)
+        except Exception as e:
+            logger.error(f"Failed to write checkpoint writes for thread {key[0]}: {e}")
+            raise
+
+    async def aflush(self, thread_id: Optional[str] = None) -> None:
+        """Write buffered task writes now (for one thread, or all)."""
+        for key in list(self._pending_writes):
+            if thread_id is None or key[0] == thread_id:
+                await self._flush_writes(key)
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Save a checkpoint together with the thread's buffered writes in one pipeline."""
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        batch = self._take_writes((thread_id, configurable["checkpoint_ns"]))
+        self._touched_threads.add(thread_id)
+        self.stats["checkpoints"] += 1
+        if not batch:
+            return await super().aput(config, checkpoint, metadata, new_versions)
+
+        async with self._cursor(pipeline=True) as cur:
+            token = _batch_cursor.set(cur)
+            try:
+                for query, params in batch:
+                    await cur.executemany(query, params)
+                return await super().aput(config, checkpoint, metadata, new_versions)
+            finally:
+                _batch_cursor.reset(token)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        await self.aflush(config["configurable"].get("thread_id"))
+        return await super().aget_tuple(config)
+
+    async def alist(self, config: Optional[RunnableConfig], **kwargs: Any) -> AsyncIterator[CheckpointTuple]:
+        await self.aflush(config["configurable"].get("thread_id") if config else None)
+        async for item in super().alist(config, **kwargs):
+            yield item
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        for key in [key for key in self._pending_writes if key[0] == str(thread_id)]:
+            self._take_writes(key)
+        self._touched_threads.discard(str(thread_id))
+        await super().adelete_thread(thread_id)
+
+    def start_pruning(self) -> None:
+        """Start the background pruning loop (no-op unless pruning or retention is enabled)."""
+        if self._prune_task is not None:
+            return
+        if self.prune_strategy == "none" and self.retention_hours <= 0:
+            return
+        self._prune_task = asyncio.create_task(self._prune_loop())
+
+    async def _prune_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.prune_interval_seconds)
+            try:
+                await self.prune()
+            except Exception as e:
+                logger.warning(f"Checkpoint pruning failed: {e}")
+
+    async def prune(self) -> int:
+        """Apply the pruning policy once; returns the number of threads pruned."""
+        pruned = 0
+        if self.retention_hours > 0:
+            async with self._cursor() as cur:
+                await cur.execute(
+                    """
+                    SELECT thread_id FROM checkpoints
+                    GROUP BY thread_id
+                    HAVING max((checkpoint->>'ts')::timestamptz) < now() - make_interval(hours => %s)
+                    """,
+                    (self.retention_hours,),
+                )
+                expired = [row["thread_id"] for row in await cur.fetchall()]
+            if expired:
+                await self.aprune(expired, strategy="delete")
+                self._touched_threads.difference_update(expired)
+                pruned += len(expired)
+
+        if self.prune_strategy != "none":
+            touched, self._touched_threads = self._touched_threads, set()
+            for thread_id in touched:
+                try:
+                    await self.aprune([thread_id], strategy=self.prune_strategy)
+                    pruned += 1
+                except NotImplementedError:
+                    # Threads using delta channels need their full history
+                    pass
+
+        self.stats["pruned_threads"] += pruned
+        return pruned
+
+    async def aclose(self) -> None:
+        """Stop pruning and flush buffered writes."""
+        if self._prune_task:
+            self._prune_task.cancel()
+            await asyncio.gather(self._prune_task, return_exceptions=True)
+            self._prune_task = None
+        await self.aflush()
+
+
+_async_checkpointer: Optional[BatchingAsyncPostgresSaver] = None
+_async_checkpointer_lock = asyncio.Lock()
+
+
+async def get_async_postgres_checkpointer() -> BatchingAsyncPostgresSaver:
+    """
+    Get the process-wide async checkpointer (creating tables on first use).
+
+    Connections come from a dedicated psycopg pool in the shared pool registry,
+    configured the way the LangGraph Postgres savers require.
+    """
+    global _async_checkpointer
+    if _async_checkpointer is not None:
+        return _async_checkpointer
+
+    async with _async_checkpointer_lock:
+        if _async_checkpointer is None:
+            pool = await get_pool_registry().get_psycopg_pool(
+                "checkpoints", autocommit=True, prepare_threshold=0, row_factory=dict_row
+            )
+            saver = BatchingAsyncPostgresSaver.from_env(pool)
+            await saver.setup()
+            saver.start_pruning()
+            _async_checkpointer = saver
+    return _async_checkpointer
+
+
 def create_workflow_config(thread_id: str, checkpoint_ns: str = "", **kwargs) -> Dict:
     """
     Create standard workflow configuration for LangGraph execution.
@@ -66,6 +66,8 @@ import asyncpg
 from loguru import logger
 from prometheus_client import Counter, Gauge, Histogram
 
+from .db_pool import get_pool_registry
+
 # Prometheus metrics
 eval_results_total = Counter(
     "eval_results_total",
@@ -129,14 +131,9 @@ class LongitudinalTracker:
         )
 
         try:
-            self.pool = await asyncpg.create_pool(
-                db_url,
-                min_size=2,
-                max_size=10,
-                command_timeout=30,
-            )
+            self.pool = await get_pool_registry().get_pool(dsn=db_url)
             logger.info(
-                f"✓ Database pool created: {db_url.split('@')[1] if '@' in db_url else 'localhost'}"
+                f"✓ Database pool acquired: {db_url.split('@')[1] if '@' in db_url else 'localhost'}"
             )
 
             # Load schema
@@ -161,10 +158,10 @@ class LongitudinalTracker:
             raise
 
     async def close(self):
-        """Close database connection pool."""
+        """Release the shared connection pool (the registry owns it)."""
         if self.pool:
-            await self.pool.close()
-            logger.info("LongitudinalTracker connection pool closed")
+            self.pool = None
+            logger.info("LongitudinalTracker connection pool released")
             self._initialized = False
 
     async def record_result(
@@ -1,23 +1,58 @@
 """
 MCP Server Discovery via Docker MCP Toolkit
 Ports functionality from MCPRegistry.js to Python for orchestrator usage
+
+Discovery results are cached on disk with a TTL. On startup the last known
+catalog is served immediately while a background task refreshes it; server
+inspection runs concurrently (asyncio subprocesses, or a thread pool for
+synchronous callers).
+
+Configuration (environment):
+    MCP_DISCOVERY_CACHE_PATH: Catalog cache file (default: /tmp/code-chef/mcp_discovery.json)
+    MCP_DISCOVERY_CACHE_TTL: Seconds before the catalog is refreshed (default: 300)
+    MCP_DISCOVERY_CONCURRENCY: Max concurrent `docker mcp server inspect` calls (default: 8)
 """
 
+import asyncio
 import subprocess
 import json
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+DISCOVERY_CACHE_PATH = Path(
+    os.getenv("MCP_DISCOVERY_CACHE_PATH", "/tmp/code-chef/mcp_discovery.json")
+)
+DISCOVERY_CACHE_TTL_SECONDS = float(os.getenv("MCP_DISCOVERY_CACHE_TTL", "300"))
+DISCOVERY_CONCURRENCY = int(os.getenv("MCP_DISCOVERY_CONCURRENCY", "8"))
+
+LIST_TIMEOUT_SECONDS = 30
+INSPECT_TIMEOUT_SECONDS = 10
+
 
 class MCPToolkitDiscovery:
     """Discovers MCP servers and tools via Docker MCP Toolkit."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        cache_path: Optional[Path] = DISCOVERY_CACHE_PATH,
+        cache_ttl_seconds: float = DISCOVERY_CACHE_TTL_SECONDS,
+        concurrency: int = DISCOVERY_CONCURRENCY,
+    ):
         self.servers: Dict[str, Any] = {}
         self.last_refresh: Optional[datetime] = None
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.concurrency = max(1, concurrency)
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._background_task: Optional[asyncio.Task] = None
+        self._listeners: List[Any] = []
+        self._load_cache()
         self._check_toolkit_available()
 
     def _check_toolkit_available(self) -> bool:
@@ -39,10 +74,94 @@ class MCPToolkitDiscovery:
             logger.error(f"[MCPDiscovery] Failed to check Docker MCP Toolkit: {e}")
             return False
 
-    def discover_servers(self) -> Dict[str, Any]:
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def is_stale(self) -> bool:
+        """Whether the in-memory catalog is missing or older than the TTL."""
+        if not self.servers or self.last_refresh is None:
+            return True
+        age = (datetime.utcnow() - self.last_refresh).total_seconds()
+        return age > self.cache_ttl_seconds
+
+    def add_refresh_listener(self, callback) -> None:
+        """Register a callback invoked with the new catalog after each refresh."""
+        self._listeners.append(callback)
+
+    def _load_cache(self) -> None:
+        """Load the last known catalog from disk, if any."""
+        if self.cache_path is None or not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, "r") as f:
+                cached = json.load(f)
+            self.servers = cached
+            self.last_refresh = datetime.fromisoformat(cached["discovered_at"])
+            logger.info(
+                f"[MCPDiscovery] Loaded cached catalog: {cached.get('total_servers', 0)} servers "
+                f"from {self.last_refresh.isoformat()}"
+            )
+        except Exception as e:
+            logger.warning(f"[MCPDiscovery] Ignoring unreadable discovery cache: {e}")
+
+    def _save_cache(self) -> None:
+        """Atomically persist the current catalog to disk."""
+        if self.cache_path is None:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(self.servers, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.warning(f"[MCPDiscovery] Failed to write discovery cache: {e}")
+
+    def _store_catalog(self, tools_by_server: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Build the catalog from per-server tools, cache it and notify listeners."""
+        enriched_servers = [
+            {
+                "name": server_name,
+                "tools": tools,
+                "tool_count": len(tools),
+                "status": "available",
+                "type": "stdio",  # Docker MCP Toolkit uses stdio transport
+            }
+            for server_name, tools in tools_by_server.items()
+        ]
+        total_tools = sum(server["tool_count"] for server in enriched_servers)
+
+        self.servers = {
+            "servers": enriched_servers,
+            "total_servers": len(enriched_servers),
+            "total_tools": total_tools,
+            "discovered_at": datetime.utcnow().isoformat(),
+        }
+        self.last_refresh = datetime.utcnow()
+        self._save_cache()
+        logger.info(f"[MCPDiscovery] Discovered {len(enriched_servers)} servers with {total_tools} tools")
+
+        for callback in self._listeners:
+            try:
+                callback(self.servers)
+            except Exception as e:
+                logger.warning(f"[MCPDiscovery] Refresh listener failed: {e}")
+
+        return self.servers
+
+    # ------------------------------------------------------------------
+    # Discovery
+    # ------------------------------------------------------------------
+
+    def discover_servers(self, force_refresh: bool = False) -> Dict[str, Any]:
         """
         Discover all MCP servers via Docker MCP Toolkit.
 
+        Serves the cached catalog when one exists. A stale catalog is still
+        returned immediately and refreshed in the background when an event
+        loop is running; only a cold start (or force_refresh) blocks.
+
         Returns:
             {
                 "servers": [
@@ -59,54 +178,143 @@ class MCPToolkitDiscovery:
                 "discovered_at": "2025-11-15T..."
             }
         """
+        if self.servers and not force_refresh:
+            if self.is_stale():
+                self._schedule_refresh()
+            return self.servers
+
         try:
-            # Execute: docker mcp server list --json
-            result = subprocess.run(
-                ["docker", "mcp", "server", "list", "--json"],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+            server_names = self._list_server_names()
+            if server_names is None:
+                return self.servers or {"servers": [], "total_servers": 0, "total_tools": 0}
 
-            if result.returncode != 0:
-                logger.error(f"[MCPDiscovery] Server list failed: {result.stderr}")
-                return {"servers": [], "total_servers": 0, "total_tools": 0}
-
-            # Parse server list (returns JSON array of server names)
-            server_names = json.loads(result.stdout)
-
-            # Enrich with tool details for each server
-            enriched_servers = []
-            total_tools = 0
-
-            for server_name in server_names:
-                tools = self._get_server_tools(server_name)
-
-                enriched_servers.append({
-                    "name": server_name,
-                    "tools": tools,
-                    "tool_count": len(tools),
-                    "status": "available",
-                    "type": "stdio"  # Docker MCP Toolkit uses stdio transport
-                })
-
-                total_tools += len(tools)
-
-            self.servers = {
-                "servers": enriched_servers,
-                "total_servers": len(enriched_servers),
-                "total_tools": total_tools,
-                "discovered_at": datetime.utcnow().isoformat()
-            }
+            # Inspect servers concurrently; each inspect is an independent CLI call
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                tools = list(executor.map(self._get_server_tools, server_names))
 
-            self.last_refresh = datetime.utcnow()
-            logger.info(f"[MCPDiscovery] Discovered {len(enriched_servers)} servers with {total_tools} tools")
+            return self._store_catalog(dict(zip(server_names, tools)))
 
+        except Exception as e:
+            logger.error(f"[MCPDiscovery] Discovery failed: {e}", exc_info=True)
+            return self.servers or {"servers": [], "total_servers": 0, "total_tools": 0}
+
+    async def adiscover_servers(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Async discovery that never blocks the event loop.
+
+        Serves the cache when fresh; otherwise awaits a (shared) refresh, or
+        serves a stale catalog while the refresh runs in the background.
+        """
+        if self.servers and not force_refresh:
+            if self.is_stale():
+                self._schedule_refresh()
             return self.servers
+        return await self.refresh()
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Refresh the catalog, sharing one in-flight refresh between callers."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return await asyncio.shield(self._refresh_task)
+
+    async def _refresh(self) -> Dict[str, Any]:
+        try:
+            code, stdout, stderr = await self._run_async(
+                ["docker", "mcp", "server", "list", "--json"], LIST_TIMEOUT_SECONDS
+            )
+            if code != 0:
+                logger.error(f"[MCPDiscovery] Server list failed: {stderr}")
+                return self.servers or {"servers": [], "total_servers": 0, "total_tools": 0}
+
+            server_names = json.loads(stdout)
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def inspect(server_name: str) -> List[str]:
+                async with semaphore:
+                    return await self._aget_server_tools(server_name)
+
+            tools = await asyncio.gather(*(inspect(name) for name in server_names))
+            return self._store_catalog(dict(zip(server_names, tools)))
 
         except Exception as e:
             logger.error(f"[MCPDiscovery] Discovery failed: {e}", exc_info=True)
-            return {"servers": [], "total_servers": 0, "total_tools": 0}
+            return self.servers or {"servers": [], "total_servers": 0, "total_tools": 0}
+
+    def _schedule_refresh(self) -> None:
+        """Start a background refresh if an event loop is running."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    def start_background_refresh(self) -> None:
+        """Refresh now (serving the cached catalog meanwhile) and then every TTL."""
+        if self._background_task is not None and not self._background_task.done():
+            return
+
+        async def refresh_loop():
+            while True:
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    logger.error(f"[MCPDiscovery] Background refresh failed: {e}")
+                await asyncio.sleep(self.cache_ttl_seconds)
+
+        self._background_task = asyncio.create_task(refresh_loop())
+
+    async def stop_background_refresh(self) -> None:
+        """Cancel the periodic refresh task."""
+        for task in (self._background_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._background_task = None
+        self._refresh_task = None
+
+    @staticmethod
+    async def _run_async(cmd: List[str], timeout: float):
+        """Run a CLI command without blocking the event loop."""
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+        return process.returncode, stdout.decode(), stderr.decode()
+
+    def _list_server_names(self) -> Optional[List[str]]:
+        """Run `docker mcp server list` synchronously; None on failure."""
+        # Execute: docker mcp server list --json
+        result = subprocess.run(
+            ["docker", "mcp", "server", "list", "--json"],
+            capture_output=True,
+            text=True,
+            timeout=LIST_TIMEOUT_SECONDS
+        )
+
+        if result.returncode != 0:
+            logger.error(f"[MCPDiscovery] Server list failed: {result.stderr}")
+            return None
+
+        # Parse server list (returns JSON array of server names)
+        return json.loads(result.stdout)
+
+    @staticmethod
+    def _parse_tools(output: str) -> List[str]:
+        """Extract tool names from `docker mcp server inspect` output."""
+        server_data = json.loads(output)
+        tools = server_data.get("tools", [])
+        return [tool["name"] for tool in tools]
 
     def _get_server_tools(self, server_name: str) -> List[str]:
         """Get list of tools for a specific server."""
@@ -115,17 +323,30 @@ class MCPToolkitDiscovery:
                 ["docker", "mcp", "server", "inspect", server_name],
                 capture_output=True,
                 text=True,
-                timeout=10
+                timeout=INSPECT_TIMEOUT_SECONDS
             )
 
             if result.returncode != 0:
                 logger.warning(f"[MCPDiscovery] Failed to get tools for {server_name}")
                 return []
 
-            # Parse inspect output to extract tool names
-            server_data = json.loads(result.stdout)
-            tools = server_data.get("tools", [])
-            return [tool["name"] for tool in tools]
+            return self._parse_tools(result.stdout)
+
+        except Exception as e:
+            logger.error(f"[MCPDiscovery] Tool enumeration failed for {server_name}: {e}")
+            return []
+
+    async def _aget_server_tools(self, server_name: str) -> List[str]:
+        """Async variant of _get_server_tools."""
+        try:
+            code, stdout, _ = await self._run_async(
+                ["docker", "mcp", "server", "inspect", server_name],
+                INSPECT_TIMEOUT_SECONDS,
+            )
+            if code != 0:
+                logger.warning(f"[MCPDiscovery] Failed to get tools for {server_name}")
+                return []
+            return self._parse_tools(stdout)
 
         except Exception as e:
             logger.error(f"[MCPDiscovery] Tool enumeration failed for {server_name}: {e}")
@@ -0,0 +1,489 @@
+"""
+Persistent MCP stdio session pool.
+
+Keeps one long-lived MCP server process per server name and speaks JSON-RPC 2.0
+over its stdin/stdout, instead of paying `docker run -i --rm mcp/<server>`
+container startup on every tool call.
+
+Features:
+- asyncio subprocesses (never blocks the event loop)
+- MCP `initialize` handshake once per process, concurrent requests multiplexed by id
+- Per-server concurrency limits
+- Periodic health checks (`ping`) with automatic restart of dead sessions
+- Idle reaping of sessions that have not been used for a while
+
+Usage:
+    pool = get_mcp_session_pool()
+    result = await pool.call_tool("memory", "search_nodes", {"query": "auth"})
+
+Configuration (environment):
+    MCP_POOL_MAX_CONCURRENCY: Max in-flight requests per server (default: 4)
+    MCP_POOL_IDLE_TIMEOUT: Seconds before an unused session is reaped (default: 300)
+    MCP_POOL_REQUEST_TIMEOUT: Per-request timeout in seconds (default: 30)
+    MCP_POOL_HEALTH_INTERVAL: Seconds between health checks (default: 60)
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MCP_PROTOCOL_VERSION = "2024-11-05"
+CLIENT_INFO = {"name": "code-chef-orchestrator", "version": "1.0.0"}
+
+
+def default_server_command(server: str) -> List[str]:
+    """Build the command used to launch an MCP server over stdio."""
+    return ["docker", "run", "-i", "--rm", f"mcp/{server}"]
+
+
+class MCPSessionError(Exception):
+    """Raised when an MCP session cannot serve a request."""
+
+    def __init__(self, message: str, server: str, code: Optional[int] = None):
+        super().__init__(message)
+        self.server = server
+        self.code = code
+
+
+@dataclass
+class MCPPoolConfig:
+    """Configuration for the MCP session pool."""
+
+    max_concurrency: int = 4
+    idle_timeout_seconds: float = 300.0
+    request_timeout_seconds: float = 30.0
+    startup_timeout_seconds: float = 60.0
+    health_check_interval_seconds: float = 60.0
+    max_restarts: int = 3
+    command_factory: Callable[[str], List[str]] = default_server_command
+
+    @classmethod
+    def from_env(cls) -> "MCPPoolConfig":
+        return cls(
+            max_concurrency=int(os.getenv("MCP_POOL_MAX_CONCURRENCY", "4")),
+            idle_timeout_seconds=float(os.getenv("MCP_POOL_IDLE_TIMEOUT", "300")),
+            request_timeout_seconds=float(
+                os.getenv("MCP_POOL_REQUEST_TIMEOUT", "30")
+            ),
+            health_check_interval_seconds=float(
+                os.getenv("MCP_POOL_HEALTH_INTERVAL", "60")
+            ),
+        )
+
+
+@dataclass
+class MCPSessionStats:
+    """Statistics for a single server session."""
+
+    requests: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    restarts: int = 0
+    started_at: Optional[float] = None
+    last_used_at: Optional[float] = None
+    total_latency_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "restarts": self.restarts,
+            "avg_latency_ms": (
+                self.total_latency_seconds / self.requests * 1000
+                if self.requests
+                else 0.0
+            ),
+            "uptime_seconds": (
+                time.monotonic() - self.started_at if self.started_at else 0.0
+            ),
+        }
+
+
+class MCPStdioSession:
+    """
+    A single long-lived MCP server process speaking JSON-RPC over stdio.
+
+    Requests are written as newline-delimited JSON; a background reader task
+    resolves pending futures by response id, so many requests can be in flight
+    at once on the same process.
+    """
+
+    def __init__(self, server: str, command: List[str], config: MCPPoolConfig):
+        self.server = server
+        self.command = command
+        self.config = config
+        self.stats = MCPSessionStats()
+        self.server_info: Dict[str, Any] = {}
+
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._write_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(config.max_concurrency)
+
+    @property
+    def is_alive(self) -> bool:
+        """Whether the underlying process is running and being read."""
+        return (
+            self._process is not None
+            and self._process.returncode is None
+            and self._reader_task is not None
+            and not self._reader_task.done()
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    async def start(self) -> None:
+        """Launch the server process and perform the MCP initialize handshake."""
+        self._process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        self._reader_task = asyncio.create_task(self._read_loop())
+        self._stderr_task = asyncio.create_task(self._drain_stderr())
+
+        try:
+            self.server_info = await self.request(
+                "initialize",
+                {
+                    "protocolVersion": MCP_PROTOCOL_VERSION,
+                    "capabilities": {},
+                    "clientInfo": CLIENT_INFO,
+                },
+                timeout=self.config.startup_timeout_seconds,
+            )
+            await self.notify("notifications/initialized")
+        except Exception:
+            await self.close()
+            raise
+
+        now = time.monotonic()
+        self.stats.started_at = now
+        self.stats.last_used_at = now
+        logger.info(
+            f"[MCPPool] Started session for {self.server} (pid={self._process.pid})"
+        )
+
+    async def request(
+        self,
+        method: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Send a JSON-RPC request and wait for its response."""
+        if not self.is_alive:
+            raise MCPSessionError(f"Session for {self.server} is not running", self.server)
+
+        async with self._semaphore:
+            request_id = next(self._ids)
+            future: asyncio.Future = asyncio.get_running_loop().create_future()
+            self._pending[request_id] = future
+            started = time.monotonic()
+            try:
+                await self._send(
+                    {
+                        "jsonrpc": "2.0",
+                        "id": request_id,
+                        "method": method,
+                        "params": params or {},
+                    }
+                )
+                return await asyncio.wait_for(
+                    future, timeout or self.config.request_timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                self.stats.timeouts += 1
+                raise
+            except Exception:
+                self.stats.errors += 1
+                raise
+            finally:
+                self._pending.pop(request_id, None)
+                now = time.monotonic()
+                self.stats.requests += 1
+                self.stats.total_latency_seconds += now - started
+                self.stats.last_used_at = now
+
+    async def notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """Send a JSON-RPC notification (no response expected)."""
+        message: Dict[str, Any] = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._send(message)
+
+    async def ping(self, timeout: float = 5.0) -> bool:
+        """Health check: True if the server answers a `ping` in time."""
+        try:
+            await self.request("ping", timeout=timeout)
+            return True
+        except MCPSessionError as e:
+            # Servers that don't implement ping still prove liveness by answering
+            return e.code is not None
+        except Exception:
+            return False
+
+    async def close(self) -> None:
+        """Terminate the server process and fail any pending requests."""
+        process = self._process
+        if process is not None and process.returncode is None:
+            try:
+                if process.stdin and not process.stdin.is_closing():
+                    process.stdin.close()
+                await asyncio.wait_for(process.wait(), timeout=2.0)
+            except (asyncio.TimeoutError, ProcessLookupError):
+                try:
+                    process.kill()
+                    await process.wait()
+                except ProcessLookupError:
+                    pass
+
+        for task in (self._reader_task, self._stderr_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+
+        self._fail_pending(
+            MCPSessionError(f"Session for {self.server} closed", self.server)
+        )
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        if self._process is None or self._process.stdin is None:
+            raise MCPSessionError(f"Session for {self.server} has no stdin", self.server)
+        data = (json.dumps(message) + "\n").encode()
+        async with self._write_lock:
+            self._process.stdin.write(data)
+            await self._process.stdin.drain()
+
+    async def _read_loop(self) -> None:
+        assert self._process is not None and self._process.stdout is not None
+        stdout = self._process.stdout
+        try:
+            while True:
+                line = await stdout.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.debug(
+                        f"[MCPPool] {self.server}: ignoring non-JSON output: {line[:200]!r}"
+                    )
+                    continue
+                self._dispatch(message)
+        finally:
+            self._fail_pending(
+                MCPSessionError(f"Session for {self.server} exited", self.server)
+            )
+
+    def _dispatch(self, message: Dict[str, Any]) -> None:
+        request_id = message.get("id")
+        if request_id is None or "method" in message:
+            # Server-initiated notifications/requests are not used by tool calls
+            return
+        future = self._pending.get(request_id)
+        if future is None or future.done():
+            return
+        if "error" in message:
+            error = message["error"] or {}
+            future.set_exception(
+                MCPSessionError(
+                    error.get("message", "Unknown MCP error"),
+                    self.server,
+                    code=error.get("code"),
+                )
+            )
+        else:
+            future.set_result(message.get("result"))
+
+    async def _drain_stderr(self) -> None:
+        assert self._process is not None and self._process.stderr is not None
+        while True:
+            line = await self._process.stderr.readline()
+            if not line:
+                break
+            logger.debug(f"[MCPPool] {self.server} stderr: {line.decode(errors='replace').rstrip()}")
+
+    def _fail_pending(self, error: Exception) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+
+class MCPSessionPool:
+    """
+    Pool of persistent MCP stdio sessions, one per server.
+
+    Sessions are started lazily on first use, restarted when their process
+    dies, health-checked periodically and reaped when idle.
+    """
+
+    def __init__(self, config: Optional[MCPPoolConfig] = None):
+        self.config = config or MCPPoolConfig.from_env()
+        self._sessions: Dict[str, MCPStdioSession] = {}
+        self._start_locks: Dict[str, asyncio.Lock] = {}
+        self._restart_counts: Dict[str, int] = {}
+        self._maintenance_task: Optional[asyncio.Task] = None
+
+    async def get_session(self, server: str) -> MCPStdioSession:
+        """Return a live session for a server, starting or restarting it if needed."""
+        session = self._sessions.get(server)
+        if session is not None and session.is_alive:
+            return session
+
+        lock = self._start_locks.setdefault(server, asyncio.Lock())
+        async with lock:
+            session = self._sessions.get(server)
+            if session is not None and session.is_alive:
+                return session
+
+            previous = session
+            if previous is not None:
+                await previous.close()
+                restarts = self._restart_counts.get(server, 0) + 1
+                if restarts > self.config.max_restarts:
+                    self._sessions.pop(server, None)
+                    self._restart_counts.pop(server, None)
+                    raise MCPSessionError(
+                        f"Session for {server} exceeded {self.config.max_restarts} restarts",
+                        server,
+                    )
+                self._restart_counts[server] = restarts
+                logger.warning(f"[MCPPool] Restarting dead session for {server} ({restarts})")
+
+            session = MCPStdioSession(
+                server, self.config.command_factory(server), self.config
+            )
+            await session.start()
+            if previous is not None:
+                session.stats.restarts = previous.stats.restarts + 1
+            self._sessions[server] = session
+            self._ensure_maintenance()
+            return session
+
+    async def request(
+        self, server: str, method: str, params: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """Send a raw JSON-RPC request on the server's session.
+
+        Requests are not retried: a tool that kills its server would otherwise
+        run twice. The dead session is restarted on the next request instead.
+        """
+        session = await self.get_session(server)
+        result = await session.request(method, params)
+        self._restart_counts.pop(server, None)
+        return result
+
+    async def call_tool(
+        self, server: str, tool: str, arguments: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """Invoke an MCP tool via `tools/call`."""
+        return await self.request(
+            server, "tools/call", {"name": tool, "arguments": arguments or {}}
+        )
+
+    async def list_tools(self, server: str) -> List[Dict[str, Any]]:
+        """List tools exposed by a server via `tools/list`."""
+        result = await self.request(server, "tools/list")
+        return (result or {}).get("tools", [])
+
+    async def health_check(self) -> Dict[str, bool]:
+        """Ping every session concurrently; restart the ones that fail."""
+        servers = list(self._sessions.keys())
+        results = await asyncio.gather(
+            *(self._sessions[s].ping() for s in servers), return_exceptions=True
+        )
+        health: Dict[str, bool] = {}
+        for server, ok in zip(servers, results):
+            healthy = ok is True
+            health[server] = healthy
+            if not healthy:
+                logger.warning(f"[MCPPool] Health check failed for {server}, restarting")
+                session = self._sessions.get(server)
+                if session is not None:
+                    await session.close()
+                try:
+                    await self.get_session(server)
+                except Exception as e:
+                    logger.error(f"[MCPPool] Restart failed for {server}: {e}")
+        return health
+
+    async def reap_idle(self) -> List[str]:
+        """Close sessions idle longer than the configured timeout."""
+        now = time.monotonic()
+        reaped: List[str] = []
+        for server, session in list(self._sessions.items()):
+            last_used = session.stats.last_used_at or now
+            if session.in_flight == 0 and now - last_used > self.config.idle_timeout_seconds:
+                await session.close()
+                self._sessions.pop(server, None)
+                reaped.append(server)
+                logger.info(f"[MCPPool] Reaped idle session for {server}")
+        return reaped
+
+    async def close(self) -> None:
+        """Stop maintenance and close every session."""
+        if self._maintenance_task is not None:
+            self._maintenance_task.cancel()
+            try:
+                await self._maintenance_task
+            except asyncio.CancelledError:
+                pass
+            self._maintenance_task = None
+
+        await asyncio.gather(
+            *(s.close() for s in self._sessions.values()), return_exceptions=True
+        )
+        self._sessions.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            server: {"alive": s.is_alive, "in_flight": s.in_flight, **s.stats.to_dict()}
+            for server, s in self._sessions.items()
+        }
+
+    def _ensure_maintenance(self) -> None:
+        if self._maintenance_task is None or self._maintenance_task.done():
+            self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+
+    async def _maintenance_loop(self) -> None:
+        interval = min(
+            self.config.health_check_interval_seconds,
+            self.config.idle_timeout_seconds,
+        )
+        while self._sessions:
+            await asyncio.sleep(interval)
+            try:
+                await self.reap_idle()
+                await self.health_check()
+            except Exception as e:
+                logger.error(f"[MCPPool] Maintenance failed: {e}")
+
+
+# Singleton instance
+_session_pool: Optional[MCPSessionPool] = None
+
+
+def get_mcp_session_pool() -> MCPSessionPool:
+    """Get or create the process-wide MCP session pool."""
+    global _session_pool
+    if _session_pool is None:
+        _session_pool = MCPSessionPool()
+    return _session_pool
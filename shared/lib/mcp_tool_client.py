@@ -1,5 +1,14 @@
 """Direct MCP tool invocation using Python MCP SDK.
 Replaces HTTP gateway calls with stdio transport to Docker MCP servers.
+Tool calls are served by persistent sessions from mcp_session_pool.
+
+Telemetry entities recorded with record_memory_entity() are written to the
+memory server in the background, in batches, off the request path.
+
+Configuration (environment):
+    MCP_MEMORY_SINK_LINGER_MS: How long a batch waits to fill (default: 250)
+    MCP_MEMORY_SINK_MAX_BATCH: Entities per create_entities call (default: 50)
+    MCP_MEMORY_SINK_MAX_PENDING: Buffered entities before the oldest are dropped (default: 1000)
 """
 
 import asyncio
@@ -9,22 +18,69 @@ from typing import Any, Dict, List, Optional
 
 from langsmith import traceable
 
+from .batch_writer import BatchWriter
+from .mcp_session_pool import MCPSessionError, MCPSessionPool, get_mcp_session_pool
+
 logger = logging.getLogger(__name__)
 
 
+class _MemoryEntitySink(BatchWriter[Dict[str, Any]]):
+    """
+    Buffers memory-server entities and writes them in batches.
+
+    Everything buffered when the linger timer fires (or as soon as max_batch
+    entities are waiting) is written with one create_entities call. record()
+    never waits: if max_pending entities are already buffered, the oldest is
+    dropped, so a slow or unavailable memory server cannot back up requests.
+    Failed writes are counted and not retried.
+    """
+
+    def __init__(
+        self, client: "MCPToolClient", linger_ms: float, max_batch: int, max_pending: int
+    ):
+        super().__init__(linger_ms, max_batch, max_pending, name=client.agent_name)
+        self.client = client
+        self.stats = {"written": 0, "failed": 0, "dropped": 0, "batches": 0}
+
+    def record(self, entity: Dict[str, Any]) -> None:
+        self.add(entity)
+
+    def on_dropped(self, count: int) -> None:
+        self.stats["dropped"] += count
+
+    async def write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        result = await self.client.invoke_tool(
+            "memory", "create_entities", {"entities": batch}
+        )
+        self.stats["batches"] += 1
+        if result.get("success"):
+            self.stats["written"] += len(batch)
+        else:
+            self.stats["failed"] += len(batch)
+            logger.warning(
+                f"[{self.client.agent_name}] Dropped {len(batch)} memory entities: "
+                f"{result.get('error')}"
+            )
+
+
 class MCPToolClient:
     """
     Direct MCP tool invocation client.
 
-    Uses Python MCP SDK to communicate with servers via stdio transport.
-    Note: This implementation uses subprocess-based invocation as the Python MCP SDK
-    is still evolving. For production, this can be upgraded to use the official SDK
-    when it stabilizes.
+    Uses JSON-RPC over persistent stdio sessions (see MCPSessionPool) instead of
+    starting a fresh container per call. All agents share the process-wide pool
+    unless one is passed explicitly.
     """
 
-    def __init__(self, agent_name: str):
+    def __init__(self, agent_name: str, session_pool: Optional[MCPSessionPool] = None):
         self.agent_name = agent_name
-        self.server_connections: Dict[str, Any] = {}
+        self.session_pool = session_pool or get_mcp_session_pool()
+        self._memory_sink = _MemoryEntitySink(
+            self,
+            linger_ms=float(os.getenv("MCP_MEMORY_SINK_LINGER_MS", "250")),
+            max_batch=int(os.getenv("MCP_MEMORY_SINK_MAX_BATCH", "50")),
+            max_pending=int(os.getenv("MCP_MEMORY_SINK_MAX_PENDING", "1000")),
+        )
         self._check_mcp_available()
 
     def _check_mcp_available(self) -> bool:
@@ -67,6 +123,9 @@ class MCPToolClient:
         """
         Invoke an MCP tool on a server.
 
+        Calls go through the persistent session pool, so the server process is
+        started once and reused across invocations.
+
         Args:
             server: Server name (e.g., "memory", "rust-mcp-filesystem")
             tool: Tool name (e.g., "create_entities", "read_file")
@@ -75,57 +134,25 @@ class MCPToolClient:
         Returns:
             Tool execution result
         """
-        import json
-        import subprocess
-        import tempfile
-
         try:
-            # Create input JSON for the tool invocation
-            tool_request = {"tool": tool, "params": params or {}}
-
-            # Use docker run to execute the MCP server with the tool
-            # This is a simplified approach - in production, maintain persistent connections
-            with tempfile.NamedTemporaryFile(
-                mode="w", suffix=".json", delete=False
-            ) as f:
-                json.dump(tool_request, f)
-                input_file = f.name
-
-            try:
-                # Execute: docker run -i --rm -v input:/input mcp/<server> < input.json
-                cmd = ["docker", "run", "-i", "--rm", f"mcp/{server}"]
-
-                with open(input_file, "r") as stdin_file:
-                    result = subprocess.run(
-                        cmd,
-                        stdin=stdin_file,
-                        capture_output=True,
-                        text=True,
-                        timeout=30,
-                    )
-
-                if result.returncode == 0:
-                    try:
-                        output = json.loads(result.stdout)
-                        return {"success": True, "result": output}
-                    except json.JSONDecodeError:
-                        # Some tools return plain text
-                        return {"success": True, "result": result.stdout}
-                else:
-                    logger.error(
-                        f"[{self.agent_name}] Tool invocation failed: {server}/{tool}: {result.stderr}"
-                    )
-                    return {"success": False, "error": result.stderr}
-
-            finally:
-                # Clean up temp file
-                os.unlink(input_file)
-
-        except subprocess.TimeoutExpired:
+            result = await self.session_pool.call_tool(server, tool, params)
+            if isinstance(result, dict) and result.get("isError"):
+                logger.error(
+                    f"[{self.agent_name}] Tool invocation failed: {server}/{tool}: {result}"
+                )
+                return {"success": False, "error": result.get("content", result)}
+            return {"success": True, "result": result}
+
+        except asyncio.TimeoutError:
             logger.error(
                 f"[{self.agent_name}] Tool invocation timeout: {server}/{tool}"
             )
             return {"success": False, "error": "Tool invocation timeout"}
+        except MCPSessionError as e:
+            logger.error(
+                f"[{self.agent_name}] Tool invocation failed: {server}/{tool}: {e}"
+            )
+            return {"success": False, "error": str(e)}
         except Exception as e:
             logger.error(
                 f"[{self.agent_name}] Tool invocation failed: {server}/{tool}: {e}",
@@ -137,8 +164,7 @@ class MCPToolClient:
         self, server: str, tool: str, params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
-        Simplified tool invocation using docker mcp CLI directly.
-        This is the recommended approach for Docker MCP Toolkit.
+        Simplified tool invocation (kept for existing callers).
 
         Args:
             server: Server name (e.g., "memory")
@@ -148,73 +174,39 @@ class MCPToolClient:
         Returns:
             Tool execution result
         """
-        import json
-        import subprocess
-
-        try:
-            # Build command: docker run -i --rm mcp/<server>
-            # Then send JSON-RPC request via stdin
-
-            # MCP uses JSON-RPC 2.0 protocol
-            request = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": f"tools/{tool}",
-                "params": params or {},
-            }
-
-            cmd = ["docker", "run", "-i", "--rm", f"mcp/{server}"]
+        return await self.invoke_tool(server, tool, params)
 
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdin=asyncio.subprocess.PIPE,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-
-            # Send request and get response
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(input=json.dumps(request).encode()), timeout=30.0
-            )
+    async def call_tool(
+        self,
+        server_name: str,
+        tool_name: str,
+        arguments: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Invoke a tool and return the raw MCP `tools/call` result.
 
-            if process.returncode == 0:
-                try:
-                    response = json.loads(stdout.decode())
-
-                    if "result" in response:
-                        return {"success": True, "result": response["result"]}
-                    elif "error" in response:
-                        return {"success": False, "error": response["error"]}
-                    else:
-                        return {"success": True, "result": response}
-                except json.JSONDecodeError as e:
-                    logger.warning(
-                        f"[{self.agent_name}] Non-JSON response: {stdout.decode()}"
-                    )
-                    return {"success": True, "result": stdout.decode()}
-            else:
-                error_msg = stderr.decode() if stderr else "Unknown error"
-                logger.error(
-                    f"[{self.agent_name}] Tool failed: {server}/{tool}: {error_msg}"
-                )
-                return {"success": False, "error": error_msg}
+        Args:
+            server_name: Server name (e.g., "rust-mcp-filesystem")
+            tool_name: Tool name (e.g., "read_file")
+            arguments: Tool arguments
 
-        except asyncio.TimeoutError:
-            logger.error(f"[{self.agent_name}] Tool timeout: {server}/{tool}")
-            return {"success": False, "error": "Tool invocation timeout (30s)"}
+        Returns:
+            MCP result dict with "content" and optional "isError"
+        """
+        try:
+            return await self.session_pool.call_tool(server_name, tool_name, arguments)
         except Exception as e:
             logger.error(
-                f"[{self.agent_name}] Tool invocation failed: {server}/{tool}: {e}",
-                exc_info=True,
+                f"[{self.agent_name}] Tool call failed: {server_name}/{tool_name}: {e}"
             )
-            return {"success": False, "error": str(e)}
+            return {"isError": True, "content": [{"type": "text", "text": str(e)}]}
 
     async def list_servers(self) -> List[str]:
         """List available MCP servers."""
         from lib.mcp_discovery import get_mcp_discovery
 
         discovery = get_mcp_discovery()
-        servers = discovery.discover_servers()
+        servers = await discovery.adiscover_servers()
 
         return [s["name"] for s in servers.get("servers", [])]
 
@@ -254,6 +246,37 @@ class MCPToolClient:
             server="memory", tool="create_entities", params={"entities": [entity]}
         )
 
+    def record_memory_entity(
+        self, name: str, entity_type: str, observations: Optional[List[str]] = None
+    ) -> None:
+        """
+        Queue an entity for the memory server without waiting for the write.
+
+        Use for telemetry on request paths; entities are written in batches by
+        a background task (see _MemoryEntitySink). Must be called from a
+        running event loop.
+
+        Args:
+            name: Entity name
+            entity_type: Entity type
+            observations: List of observations about the entity
+        """
+        self._memory_sink.record(
+            {
+                "name": name,
+                "entityType": entity_type,
+                "observations": observations or [],
+            }
+        )
+
+    async def flush_memory_entities(self) -> None:
+        """Write all entities queued by record_memory_entity()."""
+        await self._memory_sink.flush()
+
+    async def close(self) -> None:
+        """Stop the background memory writer after flushing what it holds."""
+        await self._memory_sink.close()
+
     async def search_memory(self, query: str) -> Dict[str, Any]:
         """
         Convenience method: Search the knowledge graph in memory server.
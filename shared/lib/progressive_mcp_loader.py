@@ -8,22 +8,33 @@ https://www.anthropic.com/engineering/code-execution-with-mcp
 
 Issue: CHEF-200 - Added @traceable decorators for LangSmith visibility.
 Issue: CHEF-XXX - Added semantic tool discovery with LLM-based keyword extraction.
+
+The EMBEDDING strategy selects tools by cosine similarity against a local
+vector index of tool descriptions (see tool_embedding_index.py), with no
+chat-model round-trip.
 """
 
 import hashlib
 import logging
 import os
-import time
-from typing import Dict, List, Any, Optional, Set, Tuple
+from typing import Dict, List, Any, Optional, Set
 from dataclasses import dataclass
 from enum import Enum
 from langsmith import traceable
 
+from .keyword_index import KeywordIndex
+from .shared_cache import LRUCache
+from .tool_embedding_index import ToolEmbeddingIndex, ToolMatch
+
 logger = logging.getLogger(__name__)
 
 # Cache TTL for semantic search results (5 minutes)
 SEMANTIC_CACHE_TTL = int(os.getenv("MCP_SEMANTIC_CACHE_TTL", "300"))
 
+# Embedding strategy: number of tools retrieved and minimum cosine similarity
+EMBEDDING_TOP_K = int(os.getenv("MCP_EMBEDDING_TOP_K", "15"))
+EMBEDDING_MIN_SCORE = float(os.getenv("MCP_EMBEDDING_MIN_SCORE", "0.2"))
+
 
 class ToolLoadingStrategy(str, Enum):
     """Strategy for loading MCP tools."""
@@ -32,6 +43,7 @@ class ToolLoadingStrategy(str, Enum):
     AGENT_PROFILE = "agent_profile"  # Load tools from assigned agent's profile
     PROGRESSIVE = "progressive"  # Start minimal, expand as needed
     SEMANTIC = "semantic"  # LLM-based semantic tool discovery
+    EMBEDDING = "embedding"  # Cosine similarity over embedded tool descriptions
     FULL = "full"  # Load all 150+ tools (legacy behavior)
 
 
@@ -58,14 +70,20 @@ class ProgressiveMCPLoader:
         mcp_discovery: Any,  # MCPToolkitDiscovery instance
         default_strategy: ToolLoadingStrategy = ToolLoadingStrategy.PROGRESSIVE,
         llm_client: Optional[Any] = None,  # Optional LLM for semantic extraction
+        embeddings: Optional[Any] = None,  # Optional LangChain Embeddings for EMBEDDING
     ):
         self.mcp_client = mcp_client
         self.mcp_discovery = mcp_discovery
         self.default_strategy = default_strategy
         self.llm_client = llm_client
 
-        # Semantic search cache: {hash(task_desc + agent_name): (toolsets, timestamp)}
-        self._semantic_cache: Dict[str, Tuple[List["ToolSet"], float]] = {}
+        # Local vector index over tool descriptions, built lazily
+        self._tool_index = ToolEmbeddingIndex(embeddings)
+
+        # Semantic search cache: {hash(task_desc + agent_name): toolsets}
+        self._semantic_cache = LRUCache(
+            "mcp_semantic_tools", max_size=100, ttl_seconds=SEMANTIC_CACHE_TTL
+        )
 
         # Task-specific keywords mapped to MCP servers
         self.keyword_to_servers = {
@@ -142,6 +160,41 @@ class ProgressiveMCPLoader:
             "time",  # Timestamps
         ]
 
+        # Precompiled keyword matcher; call rebuild_keyword_index() after
+        # mutating keyword_to_servers
+        self._keyword_index = KeywordIndex(self.keyword_to_servers)
+
+        # server -> tools table, rebuilt only when discovery refreshes
+        self._server_tools: Optional[Dict[str, List[str]]] = None
+        if hasattr(mcp_discovery, "add_refresh_listener"):
+            mcp_discovery.add_refresh_listener(self._on_discovery_refresh)
+
+    def rebuild_keyword_index(self) -> None:
+        """Recompile the keyword matcher from keyword_to_servers."""
+        self._keyword_index = KeywordIndex(self.keyword_to_servers)
+
+    def _on_discovery_refresh(self, catalog: Dict[str, Any]) -> None:
+        """Rebuild the server -> tools table from a refreshed discovery catalog."""
+        self._server_tools = self._build_server_tools(catalog)
+        self._tool_index.invalidate()
+
+    @staticmethod
+    def _build_server_tools(catalog: Any) -> Dict[str, List[str]]:
+        if not isinstance(catalog, dict):
+            return {}
+        return {
+            server_info["name"]: server_info.get("tools", [])
+            for server_info in catalog.get("servers", [])
+        }
+
+    def _get_server_tools_table(self) -> Dict[str, List[str]]:
+        """Return the cached server -> tools table, building it on first use."""
+        if self._server_tools is None:
+            self._server_tools = self._build_server_tools(
+                self.mcp_discovery.discover_servers()
+            )
+        return self._server_tools
+
     @traceable(
         name="mcp_get_tools_for_task",
         tags=["mcp", "tools", "progressive-disclosure"],
@@ -182,12 +235,33 @@ class ProgressiveMCPLoader:
         elif strategy == ToolLoadingStrategy.SEMANTIC:
             return self._get_semantic_tools(task_description, assigned_agent)
 
+        elif strategy == ToolLoadingStrategy.EMBEDDING:
+            return self._get_embedding_tools(task_description, assigned_agent)
+
         elif strategy == ToolLoadingStrategy.FULL:
             return self._get_all_tools()
 
         else:
             raise ValueError(f"Unknown loading strategy: {strategy}")
 
+    async def aget_tools_for_task(
+        self,
+        task_description: str,
+        assigned_agent: Optional[str] = None,
+        strategy: Optional[ToolLoadingStrategy] = None,
+    ) -> List[ToolSet]:
+        """
+        Async variant of get_tools_for_task().
+
+        The EMBEDDING strategy embeds the task (and, on first use, the tool
+        catalog) without blocking the event loop; other strategies are pure
+        in-memory lookups and run inline.
+        """
+        strategy = strategy or self.default_strategy
+        if strategy == ToolLoadingStrategy.EMBEDDING:
+            return await self._aget_embedding_tools(task_description, assigned_agent)
+        return self.get_tools_for_task(task_description, assigned_agent, strategy)
+
     def _get_minimal_tools(self, task_description: str) -> List[ToolSet]:
         """
         Get minimal tool set based on task keywords.
@@ -211,11 +285,8 @@ class ProgressiveMCPLoader:
                     )
                 )
 
-        # Scan for keyword matches
-        matched_servers: Set[str] = set()
-        for keyword, servers in self.keyword_to_servers.items():
-            if keyword in description_lower:
-                matched_servers.update(servers)
+        # Single pass over the description for all keyword matches
+        matched_servers = self._keyword_index.match(description_lower)
 
         # Load matched servers
         for server in matched_servers:
@@ -368,12 +439,9 @@ class ProgressiveMCPLoader:
                     )
                     matched_servers.add(server)
 
-            # Match keywords to servers
+            # Match keywords to servers (containment in either direction)
             for keyword in keywords:
-                keyword_lower = keyword.lower()
-                for kw, servers in self.keyword_to_servers.items():
-                    if keyword_lower in kw or kw in keyword_lower:
-                        matched_servers.update(servers)
+                matched_servers.update(self._keyword_index.match_fragment(keyword))
 
             # Load matched servers
             for server in matched_servers:
@@ -416,6 +484,128 @@ class ProgressiveMCPLoader:
             logger.warning(f"[ProgressiveMCP] Semantic extraction failed: {e}")
             return self._get_progressive_tools(task_description, assigned_agent)
 
+    def _server_keywords(self) -> Dict[str, List[str]]:
+        """Invert keyword_to_servers so each server's keywords describe its tools."""
+        keywords: Dict[str, List[str]] = {}
+        for keyword, servers in self.keyword_to_servers.items():
+            for server in servers:
+                keywords.setdefault(server, []).append(keyword)
+        return keywords
+
+    def _get_embedding_tools(
+        self, task_description: str, assigned_agent: Optional[str]
+    ) -> List[ToolSet]:
+        """
+        Embedding-based tool selection (synchronous).
+
+        Prefer aget_tools_for_task() from async code: this path computes the
+        query embedding inline. Falls back to progressive strategy when
+        embeddings are unavailable.
+        Note: Tracing consolidated at get_tools_for_task() level.
+        """
+        if not self._tool_index.available:
+            logger.debug("[ProgressiveMCP] No embeddings, falling back to progressive")
+            return self._get_progressive_tools(task_description, assigned_agent)
+
+        cache_key = self._get_semantic_cache_key(f"embedding:{task_description}", assigned_agent)
+        cached = self._get_from_cache(cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            if not self._tool_index.is_built:
+                self._tool_index.build(self._get_server_tools_table(), self._server_keywords())
+            matches = self._tool_index.search(
+                task_description[:1000], top_k=EMBEDDING_TOP_K, min_score=EMBEDDING_MIN_SCORE
+            )
+        except Exception as e:
+            logger.warning(f"[ProgressiveMCP] Embedding selection failed: {e}")
+            return self._get_progressive_tools(task_description, assigned_agent)
+
+        toolsets = self._toolsets_from_matches(matches, assigned_agent)
+        self._set_cache(cache_key, toolsets)
+        return toolsets
+
+    async def _aget_embedding_tools(
+        self, task_description: str, assigned_agent: Optional[str]
+    ) -> List[ToolSet]:
+        """Embedding-based tool selection without blocking the event loop."""
+        if not self._tool_index.available:
+            logger.debug("[ProgressiveMCP] No embeddings, falling back to progressive")
+            return self._get_progressive_tools(task_description, assigned_agent)
+
+        cache_key = self._get_semantic_cache_key(f"embedding:{task_description}", assigned_agent)
+        cached = self._get_from_cache(cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            if not self._tool_index.is_built:
+                await self._tool_index.abuild(
+                    self._get_server_tools_table(), self._server_keywords()
+                )
+            matches = await self._tool_index.asearch(
+                task_description[:1000], top_k=EMBEDDING_TOP_K, min_score=EMBEDDING_MIN_SCORE
+            )
+        except Exception as e:
+            logger.warning(f"[ProgressiveMCP] Embedding selection failed: {e}")
+            return self._get_progressive_tools(task_description, assigned_agent)
+
+        toolsets = self._toolsets_from_matches(matches, assigned_agent)
+        self._set_cache(cache_key, toolsets)
+        return toolsets
+
+    def _toolsets_from_matches(
+        self, matches: List[ToolMatch], assigned_agent: Optional[str]
+    ) -> List[ToolSet]:
+        """Group embedding matches by server and merge universal/agent tools."""
+        toolsets: List[ToolSet] = []
+
+        # Always include universal tools
+        for server in self.always_available_servers:
+            tools = self._get_server_tools(server)
+            if tools:
+                toolsets.append(
+                    ToolSet(
+                        server=server,
+                        tools=tools,
+                        rationale="Universal tool",
+                        priority="critical",
+                    )
+                )
+
+        # Matches are ranked by score, so grouping preserves best-first order
+        by_server: Dict[str, List[ToolMatch]] = {}
+        for match in matches:
+            if match.server not in self.always_available_servers:
+                by_server.setdefault(match.server, []).append(match)
+
+        for server, server_matches in by_server.items():
+            toolsets.append(
+                ToolSet(
+                    server=server,
+                    tools=[m.tool for m in server_matches],
+                    rationale=f"Embedding match (score {server_matches[0].score:.2f})",
+                    priority="high",
+                )
+            )
+
+        # Add agent's critical tools (hybrid strategy)
+        if assigned_agent:
+            for toolset in self._get_agent_profile_tools(assigned_agent):
+                if toolset.priority == "critical":
+                    if not any(ts.server == toolset.server for ts in toolsets):
+                        toolsets.append(toolset)
+
+        if sum(len(ts.tools) for ts in toolsets) > 30:
+            toolsets = self._cap_toolsets(toolsets, max_tools=30)
+
+        logger.info(
+            f"[ProgressiveMCP] Embedding strategy: loaded {len(toolsets)} servers "
+            f"from {len(matches)} matches"
+        )
+        return toolsets
+
     def _extract_keywords_llm(self, task_description: str) -> List[str]:
         """
         Extract 3-5 keywords from task description using lightweight LLM.
@@ -458,27 +648,11 @@ Example: git, deploy, docker, testing"""
 
     def _get_from_cache(self, cache_key: str) -> Optional[List[ToolSet]]:
         """Get toolsets from cache if not expired."""
-        if cache_key not in self._semantic_cache:
-            return None
-        
-        toolsets, timestamp = self._semantic_cache[cache_key]
-        if time.time() - timestamp > SEMANTIC_CACHE_TTL:
-            del self._semantic_cache[cache_key]
-            return None
-        
-        return toolsets
+        return self._semantic_cache.get(cache_key)
 
     def _set_cache(self, cache_key: str, toolsets: List[ToolSet]) -> None:
-        """Store toolsets in cache with current timestamp."""
-        self._semantic_cache[cache_key] = (toolsets, time.time())
-        
-        # Prune old entries (keep max 100)
-        if len(self._semantic_cache) > 100:
-            oldest_key = min(
-                self._semantic_cache.keys(),
-                key=lambda k: self._semantic_cache[k][1]
-            )
-            del self._semantic_cache[oldest_key]
+        """Store toolsets in cache (LRU-bounded at 100 entries, TTL-expired)."""
+        self._semantic_cache.set(cache_key, toolsets)
 
     def _cap_toolsets(self, toolsets: List[ToolSet], max_tools: int = 30) -> List[ToolSet]:
         """Cap total tool count while preserving high-priority toolsets."""
@@ -520,13 +694,7 @@ Example: git, deploy, docker, testing"""
         """
         toolsets = []
 
-        # Discover all servers
-        servers = self.mcp_discovery.discover_servers()
-
-        for server_info in servers.get("servers", []):
-            server_name = server_info["name"]
-            tools = server_info.get("tools", [])
-
+        for server_name, tools in self._get_server_tools_table().items():
             if tools:
                 toolsets.append(
                     ToolSet(
@@ -543,11 +711,8 @@ Example: git, deploy, docker, testing"""
         return toolsets
 
     def _get_server_tools(self, server_name: str) -> List[str]:
-        """Get list of tools for a server from discovery."""
-        server_info = self.mcp_discovery.get_server(server_name)
-        if server_info:
-            return server_info.get("tools", [])
-        return []
+        """Get list of tools for a server from the cached discovery table."""
+        return self._get_server_tools_table().get(server_name, [])
 
     def format_tools_for_llm(self, toolsets: List[ToolSet]) -> str:
         """
@@ -666,10 +831,13 @@ Example: git, deploy, docker, testing"""
 
 
 # Convenience function for orchestrator
-def get_progressive_loader(mcp_client: Any, mcp_discovery: Any) -> ProgressiveMCPLoader:
+def get_progressive_loader(
+    mcp_client: Any, mcp_discovery: Any, embeddings: Optional[Any] = None
+) -> ProgressiveMCPLoader:
     """Factory function to create loader with default settings."""
     return ProgressiveMCPLoader(
         mcp_client=mcp_client,
         mcp_discovery=mcp_discovery,
         default_strategy=ToolLoadingStrategy.PROGRESSIVE,
+        embeddings=embeddings,
     )
@@ -1,9 +1,10 @@
 """
 Distributed Resource Locking for Multi-Agent Coordination
 
-Provides a PostgreSQL-based distributed lock manager using advisory locks
-to prevent concurrent modification conflicts when multiple agents access
-shared resources (files, state, etc.).
+Provides a PostgreSQL-based distributed lock manager to prevent concurrent
+modification conflicts when multiple agents access shared resources (files,
+state, etc.). Busy locks are waited for via LISTEN/NOTIFY, without holding a
+pool connection, and granted in wait-queue order.
 
 Usage:
     from shared.lib.resource_lock import ResourceLockManager
@@ -25,6 +26,7 @@ Usage:
 import asyncio
 import logging
 import json
+import math
 import time
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
@@ -35,6 +37,9 @@ import asyncpg
 # Prometheus metrics
 from prometheus_client import Counter, Histogram, Gauge
 
+from .db_pool import get_pool_registry
+from .resource_lock_manager import LockReleaseListener, wait_for_release
+
 logger = logging.getLogger(__name__)
 
 # Prometheus Metrics
@@ -81,6 +86,13 @@ class ResourceLockError(Exception):
     pass
 
 class ResourceLockManager:
+    # Upper bound on a wait between release notifications (covers lock expiry,
+    # which is not announced until someone cleans it up)
+    RECHECK_INTERVAL = 5.0
+    # Queue entries lapse if not re-polled within this window (a crashed or
+    # cancelled waiter stops blocking the queue)
+    QUEUE_HEARTBEAT_SECONDS = math.ceil(2 * RECHECK_INTERVAL)
+    
     def __init__(self, db_conn_string: str, event_bus: Any = None):
         """
         Initialize lock manager.
@@ -92,21 +104,18 @@ class ResourceLockManager:
         self.db_conn_string = db_conn_string
         self.event_bus = event_bus
         self.pool: Optional[asyncpg.Pool] = None
+        self._release_listener = LockReleaseListener(db_conn_string)
 
     async def connect(self):
-        """Establish database connection pool."""
+        """Borrow the shared pool for db_conn_string from the pool registry."""
         if not self.pool:
-            self.pool = await asyncpg.create_pool(
-                self.db_conn_string,
-                min_size=2,
-                max_size=10
-            )
+            self.pool = await get_pool_registry().get_pool(dsn=self.db_conn_string)
             logger.info("ResourceLockManager connected to PostgreSQL")
 
     async def close(self):
-        """Close database connection pool."""
+        """Stop the release listener; the registry owns the pool."""
+        await self._release_listener.close()
         if self.pool:
-            await self.pool.close()
             self.pool = None
             logger.info("ResourceLockManager disconnected from PostgreSQL")
 
@@ -137,29 +146,36 @@ class ResourceLockManager:
         if not self.pool:
             await self.connect()
 
-        start_time = datetime.utcnow()
         lock_start_time = time.time()
+        deadline = time.monotonic() + wait_timeout
         lock_acquired = False
         resource_type = resource_id.split(':')[0] if ':' in resource_id else 'unknown'
         contention_recorded = False
         
         try:
-            # Try to acquire lock loop
-            while True:
-                async with self.pool.acquire() as conn:
-                    # Call stored procedure
-                    row = await conn.fetchrow(
-                        """
-                        SELECT * FROM acquire_resource_lock($1, $2, $3, $4, $5::jsonb)
-                        """,
-                        resource_id,
-                        agent_id,
-                        timeout,
-                        reason,
-                        json.dumps(metadata or {})
-                    )
+            # Register for release notifications before trying, so a release
+            # between a failed attempt and the wait still wakes us
+            async with self._release_listener.watch(resource_id) as released:
+                while True:
+                    released.clear()
+                    remaining = deadline - time.monotonic()
+                    # Pool connection is held only for the attempt itself
+                    async with self.pool.acquire() as conn:
+                        # Call stored procedure
+                        row = await conn.fetchrow(
+                            """
+                            SELECT * FROM acquire_resource_lock($1, $2, $3, $4, $5::jsonb, $6, $7)
+                            """,
+                            resource_id,
+                            agent_id,
+                            timeout,
+                            reason,
+                            json.dumps(metadata or {}),
+                            max(math.ceil(remaining), 0),
+                            self.QUEUE_HEARTBEAT_SECONDS
+                        )
                     
-                    if row['success']:
+                    if row['lock_acquired']:
                         lock_acquired = True
                         break
                     elif not contention_recorded:
@@ -169,17 +185,17 @@ class ResourceLockManager:
                             agent_id=agent_id
                         ).inc()
                         contention_recorded = True
-                
-                # Check if we should keep waiting
-                elapsed = (datetime.utcnow() - start_time).total_seconds()
-                if elapsed >= wait_timeout:
-                    break
                     
-                await asyncio.sleep(0.5)
+                    # Check if we should keep waiting
+                    if remaining <= 0:
+                        break
+                    
+                    await wait_for_release(released, min(remaining, self.RECHECK_INTERVAL))
 
             if not lock_acquired:
                 # Prometheus: Track timeout if wait_timeout > 0
                 if wait_timeout > 0:
+                    await self._leave_wait_queue(resource_id, agent_id)
                     resource_lock_timeouts_total.labels(
                         resource_type=resource_type,
                         agent_id=agent_id
@@ -229,6 +245,18 @@ class ResourceLockManager:
                 
                 await self.release(resource_id, agent_id)
 
+    async def _leave_wait_queue(self, resource_id: str, agent_id: str):
+        """Give up our queue position so the next waiter isn't blocked by it."""
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute(
+                    "SELECT leave_lock_wait_queue($1, $2)",
+                    resource_id,
+                    agent_id
+                )
+        except Exception as e:
+            logger.warning(f"Failed to leave lock wait queue for {resource_id}: {e}")
+
     async def release(self, resource_id: str, agent_id: str):
         """Release a resource lock."""
         if not self.pool:
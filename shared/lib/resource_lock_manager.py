@@ -1,8 +1,10 @@
 """
 Resource Lock Manager for Multi-Agent Coordination.
 
-Implements distributed locking using PostgreSQL advisory locks with
-automatic retry, timeout handling, and observability.
+Implements distributed locking using PostgreSQL with timeout handling and
+observability. Busy locks are waited for by LISTENing for the
+'resource_lock_released' notification sent by the release procedures, without
+holding a pool connection; waiters are served in wait-queue (FIFO) order.
 
 Usage:
     from shared.lib.resource_lock_manager import ResourceLockManager
@@ -26,16 +28,111 @@ Usage:
 import asyncio
 import json
 import logging
+import math
 from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 from uuid import uuid4
 
 import asyncpg
 from pydantic import BaseModel, Field
 
+from .db_pool import get_pool_registry
+
 logger = logging.getLogger(__name__)
 
+LOCK_RELEASED_CHANNEL = "resource_lock_released"
+
+
+class LockReleaseListener:
+    """
+    Wakes local waiters when a resource lock is released anywhere.
+    
+    Holds one dedicated connection LISTENing on LOCK_RELEASED_CHANNEL; the
+    payload is the released resource_id. Waiters register before trying to
+    acquire, so a release landing between a failed attempt and the wait is
+    not missed. If the listener can't connect or drops, waiters still wake
+    on their re-check timeout.
+    """
+    
+    def __init__(self, db_conn_string: str):
+        self.db_conn_string = db_conn_string
+        self._conn: Optional[asyncpg.Connection] = None
+        self._waiters: Dict[str, Set[asyncio.Event]] = {}
+        self._start_lock = asyncio.Lock()
+    
+    async def start(self):
+        """Open the LISTEN connection (no-op if already listening)."""
+        if self._conn is not None and not self._conn.is_closed():
+            return
+        async with self._start_lock:
+            if self._conn is not None and not self._conn.is_closed():
+                return
+            try:
+                conn = await asyncpg.connect(self.db_conn_string)
+                await conn.add_listener(LOCK_RELEASED_CHANNEL, self._on_notify)
+                conn.add_termination_listener(self._on_terminated)
+                self._conn = conn
+            except Exception as e:
+                logger.warning(f"Lock release listener unavailable, waiters will poll: {e}")
+    
+    async def close(self):
+        """Stop listening and wake every waiter."""
+        conn, self._conn = self._conn, None
+        if conn is not None and not conn.is_closed():
+            await conn.close()
+        self._wake_all()
+    
+    @asynccontextmanager
+    async def watch(self, resource_id: str):
+        """Yield an Event that is set whenever resource_id is released."""
+        await self.start()
+        released = asyncio.Event()
+        self._waiters.setdefault(resource_id, set()).add(released)
+        try:
+            yield released
+        finally:
+            waiters = self._waiters.get(resource_id)
+            if waiters is not None:
+                waiters.discard(released)
+                if not waiters:
+                    del self._waiters[resource_id]
+    
+    def _on_notify(self, conn, pid, channel, payload):
+        for released in self._waiters.get(payload, ()):
+            released.set()
+    
+    def _on_terminated(self, conn):
+        if self._conn is conn:
+            self._conn = None
+        # Let waiters re-check rather than sleep through missed notifications
+        self._wake_all()
+    
+    def _wake_all(self):
+        for waiters in self._waiters.values():
+            for released in waiters:
+                released.set()
+
+
+async def wait_for_release(released: asyncio.Event, timeout: float):
+    """Wait until released is set or timeout elapses."""
+    try:
+        await asyncio.wait_for(released.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
+
+
+class _LocalLock:
+    """In-process state for one resource: local FIFO queue, holder and lease renewal."""
+    
+    __slots__ = ("lock", "holder", "users", "renewal")
+    
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.holder: Optional[str] = None
+        self.users = 0  # holder + local waiters; entry is dropped at zero
+        self.renewal: Optional[asyncio.Task] = None
+
 
 class LockStatus(BaseModel):
     """Lock status information."""
@@ -61,7 +158,12 @@ class ResourceLockManager:
     Manager for distributed resource locking using PostgreSQL advisory locks.
     
     Features:
-    - Automatic retry with exponential backoff
+    - Event-driven waiting (LISTEN/NOTIFY) with FIFO fairness
+    - In-process lock table: coroutines in this process contending for the
+      same resource queue locally, and only the head of the local queue
+      talks to PostgreSQL
+    - Opt-in background lease renewal for held locks
+    - Batch acquisition in sorted order (deadlock-free)
     - Timeout enforcement
     - Context manager for auto-release
     - Lock contention metrics
@@ -80,31 +182,74 @@ class ResourceLockManager:
         Args:
             db_conn_string: PostgreSQL connection string
             default_timeout: Default lock timeout in seconds (300 = 5 minutes)
-            retry_delays: Exponential backoff delays for retries (seconds)
+            retry_delays: Re-check intervals while waiting (seconds). Waiters
+                normally wake on the release notification; these bound how
+                long a missed or absent notification (e.g. lock expiry) can
+                delay them. Their sum is the default wait timeout.
         """
         self.db_conn_string = db_conn_string
         self.default_timeout = default_timeout
         self.retry_delays = retry_delays or [1, 2, 4, 8, 16]  # Exponential backoff
+        # A waiter re-polls at least every max(retry_delays); its queue entry
+        # lapses after twice that, so a crashed waiter can't block the queue
+        self.queue_heartbeat_seconds = math.ceil(2 * max(self.retry_delays))
         self.pool: Optional[asyncpg.Pool] = None
+        self._release_listener = LockReleaseListener(db_conn_string)
+        self._local_locks: Dict[str, _LocalLock] = {}
         
     async def connect(self):
-        """Establish database connection pool."""
+        """Borrow the shared pool for db_conn_string from the pool registry."""
         if not self.pool:
-            self.pool = await asyncpg.create_pool(
-                self.db_conn_string,
-                min_size=5,
-                max_size=20,
-                command_timeout=60
-            )
+            self.pool = await get_pool_registry().get_pool(dsn=self.db_conn_string)
             logger.info("ResourceLockManager connected to PostgreSQL")
     
     async def close(self):
-        """Close database connection pool."""
+        """Stop lease renewals and the listener; the registry owns the pool."""
+        for entry in self._local_locks.values():
+            if entry.renewal is not None:
+                entry.renewal.cancel()
+        await self._release_listener.close()
         if self.pool:
-            await self.pool.close()
             self.pool = None
             logger.info("ResourceLockManager disconnected from PostgreSQL")
     
+    async def _try_acquire(
+        self,
+        resource_id: str,
+        agent_id: str,
+        timeout_seconds: int,
+        reason: Optional[str],
+        metadata: Dict[str, Any],
+        wait_timeout: float,
+    ):
+        """One acquisition attempt; the pool connection is held only for the call."""
+        async with self.pool.acquire() as conn:
+            # asyncpg requires JSON string for JSONB
+            return await conn.fetchrow(
+                """
+                SELECT * FROM acquire_resource_lock($1, $2, $3, $4, $5, $6, $7)
+                """,
+                resource_id,
+                agent_id,
+                timeout_seconds,
+                reason,
+                json.dumps(metadata),
+                math.ceil(wait_timeout),
+                self.queue_heartbeat_seconds
+            )
+    
+    async def _leave_wait_queue(self, resource_id: str, agent_id: str):
+        """Give up our queue position so the next waiter isn't blocked by it."""
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute(
+                    "SELECT leave_lock_wait_queue($1, $2)",
+                    resource_id,
+                    agent_id
+                )
+        except Exception as e:
+            logger.warning(f"Failed to leave lock wait queue for {resource_id}: {e}")
+    
     async def acquire_lock(
         self,
         resource_id: str,
@@ -113,7 +258,9 @@ class ResourceLockManager:
         reason: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
         retry: bool = True,
-        wait: bool = True
+        wait: bool = True,
+        wait_timeout: Optional[float] = None,
+        renew: bool = False
     ) -> bool:
         """
         Acquire exclusive lock on resource.
@@ -124,76 +271,142 @@ class ResourceLockManager:
             timeout_seconds: Lock timeout (auto-release after this)
             reason: Human-readable reason for lock
             metadata: Additional context
-            retry: Whether to retry on failure with exponential backoff
+            retry: Whether to wait for a busy lock (False = single attempt)
             wait: Whether to wait for lock or return immediately
+            wait_timeout: Max seconds to wait (default: sum of retry_delays)
+            renew: Keep extending the lease until release_lock is called.
+                Only for holders that release in a finally block: a hung
+                holder keeps renewing, so without renew the lock expires
+                after timeout_seconds.
         
         Returns:
             True if lock acquired, False otherwise
         """
         timeout_seconds = timeout_seconds or self.default_timeout
         metadata = metadata or {}
+        wait = retry and wait
+        if wait_timeout is None:
+            wait_timeout = sum(self.retry_delays)
         
-        async with self.pool.acquire() as conn:
-            # Try to acquire lock (asyncpg requires JSON string for JSONB)
-            result = await conn.fetchrow(
-                """
-                SELECT * FROM acquire_resource_lock($1, $2, $3, $4, $5)
-                """,
-                resource_id,
-                agent_id,
-                timeout_seconds,
-                reason,
-                json.dumps(metadata)
+        entry = self._local_locks.get(resource_id)
+        if entry is None:
+            entry = self._local_locks[resource_id] = _LocalLock()
+        
+        # Same-process contention is settled locally without a round-trip
+        if not wait and entry.lock.locked():
+            logger.warning(
+                f"Lock acquisition failed: resource={resource_id}, agent={agent_id}, "
+                f"message=held in this process by {entry.holder}"
             )
-            
-            if result['lock_acquired']:
-                logger.info(
-                    f"Lock acquired: resource={resource_id}, agent={agent_id}, "
-                    f"wait_time={result['wait_time_ms']}ms"
+            return False
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait_timeout
+        entry.users += 1
+        acquired = False
+        try:
+            try:
+                await asyncio.wait_for(entry.lock.acquire(), timeout=wait_timeout if wait else None)
+            except asyncio.TimeoutError:
+                logger.error(
+                    f"Lock acquisition timed out after {wait_timeout:.1f}s waiting on "
+                    f"holder {entry.holder} in this process: resource={resource_id}, agent={agent_id}"
                 )
-                return True
+                return False
             
-            # Lock not acquired - retry if enabled
-            if not retry or not wait:
-                logger.warning(
-                    f"Lock acquisition failed: resource={resource_id}, agent={agent_id}, "
-                    f"message={result['message']}"
+            try:
+                acquired = await self._acquire_remote(
+                    resource_id, agent_id, timeout_seconds, reason, metadata,
+                    wait=wait, wait_timeout=max(deadline - loop.time(), 0)
                 )
+            finally:
+                if not acquired:
+                    entry.lock.release()
+            if not acquired:
                 return False
             
-            # Retry with exponential backoff
-            for attempt, delay in enumerate(self.retry_delays, 1):
+            entry.holder = agent_id
+            if renew:
+                entry.renewal = asyncio.create_task(
+                    self._renew_lease(resource_id, agent_id, timeout_seconds)
+                )
+            return True
+        finally:
+            if not acquired:
+                self._drop_local_user(resource_id, entry)
+    
+    def _drop_local_user(self, resource_id: str, entry: _LocalLock):
+        entry.users -= 1
+        if entry.users == 0 and self._local_locks.get(resource_id) is entry:
+            del self._local_locks[resource_id]
+    
+    async def _acquire_remote(
+        self,
+        resource_id: str,
+        agent_id: str,
+        timeout_seconds: int,
+        reason: Optional[str],
+        metadata: Dict[str, Any],
+        wait: bool,
+        wait_timeout: float,
+    ) -> bool:
+        """Acquire the lock in PostgreSQL, waiting on release notifications if busy."""
+        if not wait:
+            result = await self._try_acquire(
+                resource_id, agent_id, timeout_seconds, reason, metadata, wait_timeout=0
+            )
+            if result['lock_acquired']:
                 logger.info(
-                    f"Lock busy, retrying in {delay}s (attempt {attempt}/{len(self.retry_delays)}): "
-                    f"resource={resource_id}, agent={agent_id}"
+                    f"Lock acquired: resource={resource_id}, agent={agent_id}, "
+                    f"wait_time={result['wait_time_ms']}ms"
                 )
-                await asyncio.sleep(delay)
-                
-                # Try again (asyncpg requires JSON string for JSONB)
-                result = await conn.fetchrow(
-                    """
-                    SELECT * FROM acquire_resource_lock($1, $2, $3, $4, $5)
-                    """,
-                    resource_id,
-                    agent_id,
-                    timeout_seconds,
-                    reason,
-                    json.dumps(metadata)
+                return True
+            logger.warning(
+                f"Lock acquisition failed: resource={resource_id}, agent={agent_id}, "
+                f"message={result['message']}"
+            )
+            return False
+        
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + wait_timeout
+        
+        # Register for release notifications before the first attempt so a
+        # release between a failed attempt and the wait still wakes us
+        async with self._release_listener.watch(resource_id) as released:
+            attempt = 0
+            while True:
+                released.clear()
+                result = await self._try_acquire(
+                    resource_id, agent_id, timeout_seconds, reason, metadata,
+                    wait_timeout=max(deadline - loop.time(), 1)
                 )
                 
                 if result['lock_acquired']:
                     logger.info(
-                        f"Lock acquired on retry {attempt}: resource={resource_id}, "
-                        f"agent={agent_id}, wait_time={result['wait_time_ms']}ms"
+                        f"Lock acquired: resource={resource_id}, agent={agent_id}, "
+                        f"waited={(loop.time() - started) * 1000:.0f}ms"
                     )
                     return True
-            
-            # All retries exhausted
-            logger.error(
-                f"Lock acquisition failed after {len(self.retry_delays)} retries: "
-                f"resource={resource_id}, agent={agent_id}"
-            )
-            return False
+                
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                
+                recheck = self.retry_delays[min(attempt, len(self.retry_delays) - 1)]
+                attempt += 1
+                logger.info(
+                    f"Lock busy, waiting for release (up to {min(recheck, remaining):.1f}s): "
+                    f"resource={resource_id}, agent={agent_id}"
+                )
+                await wait_for_release(released, min(recheck, remaining))
+        
+        await self._leave_wait_queue(resource_id, agent_id)
+        logger.error(
+            f"Lock acquisition timed out after {wait_timeout:.1f}s: "
+            f"resource={resource_id}, agent={agent_id}"
+        )
+        return False
     
     async def release_lock(
         self,
@@ -210,26 +423,115 @@ class ResourceLockManager:
         Returns:
             True if lock released, False if not owned or already released
         """
-        async with self.pool.acquire() as conn:
-            result = await conn.fetchrow(
-                """
-                SELECT * FROM release_resource_lock($1, $2)
-                """,
-                resource_id,
-                agent_id
+        entry = self._local_locks.get(resource_id)
+        if entry is not None and entry.holder != agent_id:
+            entry = None
+        if entry is not None and entry.renewal is not None:
+            entry.renewal.cancel()
+            entry.renewal = None
+        
+        try:
+            async with self.pool.acquire() as conn:
+                result = await conn.fetchrow(
+                    """
+                    SELECT * FROM release_resource_lock($1, $2)
+                    """,
+                    resource_id,
+                    agent_id
+                )
+        finally:
+            # Hand the resource to the next local waiter either way; if the
+            # database release failed the lease will lapse on its own
+            if entry is not None:
+                entry.holder = None
+                entry.lock.release()
+                self._drop_local_user(resource_id, entry)
+        
+        if result['success']:
+            logger.info(
+                f"Lock released: resource={resource_id}, agent={agent_id}"
+            )
+            return True
+        else:
+            logger.warning(
+                f"Lock release failed: resource={resource_id}, agent={agent_id}, "
+                f"message={result['message']}"
             )
+            return False
+    
+    async def _renew_lease(self, resource_id: str, agent_id: str, timeout_seconds: int):
+        """Extend a held lock every third of its timeout until cancelled."""
+        interval = max(timeout_seconds / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with self.pool.acquire() as conn:
+                    renewed = await conn.fetchval(
+                        "SELECT renew_resource_lock($1, $2, $3)",
+                        resource_id,
+                        agent_id,
+                        timeout_seconds
+                    )
+            except Exception as e:
+                logger.warning(f"Lease renewal failed for {resource_id}, will retry: {e}")
+                continue
             
-            if result['success']:
-                logger.info(
-                    f"Lock released: resource={resource_id}, agent={agent_id}"
-                )
-                return True
-            else:
-                logger.warning(
-                    f"Lock release failed: resource={resource_id}, agent={agent_id}, "
-                    f"message={result['message']}"
+            if not renewed:
+                logger.error(
+                    f"Lease lost: resource={resource_id}, agent={agent_id} "
+                    f"(expired or force-released)"
                 )
+                return
+            logger.debug(f"Lease renewed: resource={resource_id}, agent={agent_id}")
+    
+    async def acquire_locks(
+        self,
+        resource_ids: List[str],
+        agent_id: str,
+        timeout_seconds: Optional[int] = None,
+        reason: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        wait: bool = True,
+        wait_timeout: Optional[float] = None
+    ) -> bool:
+        """
+        Acquire several locks, all or nothing.
+        
+        Resources are locked in sorted order, so two callers asking for
+        overlapping sets can't deadlock. If any lock can't be acquired within
+        the shared wait_timeout, the ones already held are released.
+        
+        Returns:
+            True if every lock was acquired
+        """
+        if wait_timeout is None:
+            wait_timeout = sum(self.retry_delays)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait_timeout
+        
+        held: List[str] = []
+        for resource_id in sorted(set(resource_ids)):
+            acquired = await self.acquire_lock(
+                resource_id,
+                agent_id,
+                timeout_seconds=timeout_seconds,
+                reason=reason,
+                metadata=metadata,
+                wait=wait,
+                wait_timeout=max(deadline - loop.time(), 0)
+            )
+            if not acquired:
+                await self.release_locks(held, agent_id)
                 return False
+            held.append(resource_id)
+        return True
+    
+    async def release_locks(self, resource_ids: List[str], agent_id: str) -> bool:
+        """Release several locks (reverse sorted order). True if all were released."""
+        released = True
+        for resource_id in sorted(set(resource_ids), reverse=True):
+            released = await self.release_lock(resource_id, agent_id) and released
+        return released
     
     async def check_lock_status(
         self,
@@ -399,7 +701,8 @@ class ResourceLockManager:
         timeout_seconds: Optional[int] = None,
         reason: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
-        retry: bool = True
+        retry: bool = True,
+        renew: bool = False
     ):
         """
         Context manager for automatic lock acquisition and release.
@@ -414,7 +717,8 @@ class ResourceLockManager:
             timeout_seconds: Lock timeout
             reason: Reason for lock
             metadata: Additional context
-            retry: Whether to retry on failure
+            retry: Whether to wait for a busy lock
+            renew: Extend the lease while the block runs (see acquire_lock)
         
         Raises:
             RuntimeError: If lock cannot be acquired
@@ -425,7 +729,8 @@ class ResourceLockManager:
             timeout_seconds=timeout_seconds,
             reason=reason,
             metadata=metadata,
-            retry=retry
+            retry=retry,
+            renew=renew
         )
         
         if not acquired:
@@ -437,6 +742,43 @@ class ResourceLockManager:
             yield
         finally:
             await self.release_lock(resource_id, agent_id)
+    
+    @asynccontextmanager
+    async def lock_many(
+        self,
+        resource_ids: List[str],
+        agent_id: str,
+        timeout_seconds: Optional[int] = None,
+        reason: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Context manager holding several locks at once (see acquire_locks).
+        
+        Usage:
+            async with lock_mgr.lock_many(["config:prod.yaml", "deployment:prod"], "infra-agent"):
+                await update_and_deploy()
+        
+        Raises:
+            RuntimeError: If the locks cannot be acquired
+        """
+        acquired = await self.acquire_locks(
+            resource_ids=resource_ids,
+            agent_id=agent_id,
+            timeout_seconds=timeout_seconds,
+            reason=reason,
+            metadata=metadata
+        )
+        
+        if not acquired:
+            raise RuntimeError(
+                f"Failed to acquire locks: resources={sorted(set(resource_ids))}, agent={agent_id}"
+            )
+        
+        try:
+            yield
+        finally:
+            await self.release_locks(resource_ids, agent_id)
 
 
 # Singleton instance (optional)
@@ -3,16 +3,36 @@ Session Manager for Conversational AI
 
 Manages chat sessions with persistent conversation history.
 Uses PostgreSQL for session storage and hybrid memory for context.
+
+Message writes are coalesced: add_message() queues the message and a
+background writer persists everything queued within a short linger window
+in one transaction (one multi-row INSERT plus one UPDATE, however many
+sessions and messages the batch covers). Recent history per session is kept
+in a short-lived in-process cache that add_message() appends to, so
+multi-turn chats don't re-read the rows they just wrote.
+
+Environment Variables:
+    SESSION_WRITE_LINGER_MS: Write coalescing window (default: 20; 0 writes inline)
+    SESSION_WRITE_BATCH_SIZE: Max messages per write transaction (default: 200)
+    SESSION_HISTORY_CACHE_SIZE: Sessions kept in the history cache (default: 1000)
+    SESSION_HISTORY_CACHE_TTL: History cache entry lifetime in seconds (default: 300)
+    SESSION_HISTORY_CACHE_MESSAGES: Messages cached per session (default: 50)
 """
 
+import asyncio
 import json
 import logging
+import os
 import uuid
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from pydantic import BaseModel
 import asyncpg
-import os
+
+from .batch_writer import BatchWriter
+from .db_pool import get_pool_registry
+from .shared_cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
@@ -28,13 +48,60 @@ class ChatSession(BaseModel):
     metadata: Dict[str, Any] = {}
 
 
+@dataclass
+class _CachedHistory:
+    """Session row plus its most recent messages (oldest to newest)."""
+
+    session: Optional[Dict[str, Any]]
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    # True when messages holds the session's entire history
+    complete: bool = False
+
+
+# (message_id, session_id, role, content, created_at, metadata_json)
+_PendingMessage = Tuple[str, str, str, str, datetime, str]
+
+
+class _MessageWriter(BatchWriter[_PendingMessage]):
+    """
+    Buffers chat messages and writes them in batched transactions.
+
+    A failed or cancelled write keeps its messages buffered for the next
+    attempt (see BatchWriter), so nothing add_message() accepted is lost
+    while the database is briefly unavailable.
+    """
+
+    def __init__(self, manager: "SessionManager", linger_ms: float, max_batch: int, max_pending: int):
+        super().__init__(linger_ms, max_batch, max_pending, name="SessionManager")
+        self.manager = manager
+
+    def pending_for(self, session_id: str) -> bool:
+        return any(message[1] == session_id for message in self._buffer)
+
+    async def write(self, message: _PendingMessage) -> None:
+        await self.put(message)
+
+    async def write_batch(self, batch: List[_PendingMessage]) -> None:
+        await self.manager._write_messages(batch)
+
+
+def _decode_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize a message row (or its JSON form) to Python types."""
+    if isinstance(message.get("metadata"), str):
+        message["metadata"] = json.loads(message["metadata"])
+    if isinstance(message.get("created_at"), str):
+        message["created_at"] = datetime.fromisoformat(message["created_at"])
+    return message
+
+
 class SessionManager:
     """
     Manages chat sessions with PostgreSQL persistence.
 
     Features:
     - Session creation and retrieval
-    - Message history storage
+    - Message history storage (write-coalesced)
+    - Recent-history cache
     - Session TTL and cleanup
     - Context injection for LLM prompts
     """
@@ -44,53 +111,54 @@ class SessionManager:
         Initialize session manager.
 
         Args:
-            db_pool: PostgreSQL connection pool (optional, will create if not provided)
+            db_pool: PostgreSQL connection pool (optional, borrows the shared
+                default pool if not provided)
         """
         self.db_pool = db_pool
-        self._pool_created = False
+        self._pool_borrowed = False
+
+        linger_ms = float(os.getenv("SESSION_WRITE_LINGER_MS", "20"))
+        max_batch = int(os.getenv("SESSION_WRITE_BATCH_SIZE", "200"))
+        self._writer: Optional[_MessageWriter] = None
+        if linger_ms > 0:
+            self._writer = _MessageWriter(
+                self, linger_ms=linger_ms, max_batch=max_batch, max_pending=max_batch * 50
+            )
+
+        self.history_cache_messages = int(os.getenv("SESSION_HISTORY_CACHE_MESSAGES", "50"))
+        self._history = LRUCache(
+            "chat_history",
+            max_size=int(os.getenv("SESSION_HISTORY_CACHE_SIZE", "1000")),
+            ttl_seconds=float(os.getenv("SESSION_HISTORY_CACHE_TTL", "300")),
+        )
+        # Strictly increasing message timestamps keep history order stable
+        self._last_message_at = datetime.min
 
     async def ensure_pool(self):
         """Ensure database connection pool is available."""
         if self.db_pool is not None:
             return
 
-        # Create pool if not provided
-        db_host = os.getenv("DB_HOST", "postgres")
-        db_port = int(os.getenv("DB_PORT", "5432"))
-        db_name = os.getenv("DB_NAME", "devtools")
-        db_user = os.getenv("DB_USER", "devtools")
-
-        # Support Docker secrets via POSTGRES_PASSWORD_FILE
-        db_password = os.getenv("DB_PASSWORD")
-        if not db_password:
-            password_file = os.getenv("POSTGRES_PASSWORD_FILE")
-            if password_file and os.path.exists(password_file):
-                with open(password_file, "r") as f:
-                    db_password = f.read().strip()
-            else:
-                db_password = "changeme"
-
+        # Borrow the process-wide default pool if none was provided
         try:
-            self.db_pool = await asyncpg.create_pool(
-                host=db_host,
-                port=db_port,
-                database=db_name,
-                user=db_user,
-                password=db_password,
-                min_size=2,
-                max_size=10,
-            )
-            self._pool_created = True
-            logger.info(f"Created database pool: {db_host}:{db_port}/{db_name}")
+            self.db_pool = await get_pool_registry().get_pool()
+            self._pool_borrowed = True
         except Exception as e:
-            logger.error(f"Failed to create database pool: {e}", exc_info=True)
+            logger.error(f"Failed to get database pool: {e}", exc_info=True)
             raise
 
+    async def flush(self) -> None:
+        """Persist queued messages now instead of after the linger window."""
+        if self._writer:
+            await self._writer.flush()
+
     async def close(self):
-        """Close database connection pool."""
-        if self._pool_created and self.db_pool:
-            await self.db_pool.close()
-            logger.info("Closed database pool")
+        """Flush queued messages and drop the borrowed pool (the registry owns it)."""
+        if self._writer:
+            await self._writer.close()
+        if self._pool_borrowed:
+            self.db_pool = None
+            self._pool_borrowed = False
 
     async def create_session(
         self,
@@ -109,29 +177,109 @@ class SessionManager:
         Returns:
             Session ID
         """
-        await self.ensure_pool()
-
         session_id = session_id or f"session-{uuid.uuid4()}"
-        now = datetime.utcnow()
-
-        async with self.db_pool.acquire() as conn:
-            metadata_json = json.dumps(metadata or {})
-            await conn.execute(
-                """
-                INSERT INTO chat_sessions (session_id, user_id, created_at, updated_at, metadata)
-                VALUES ($1, $2, $3, $4, $5::jsonb)
-                ON CONFLICT (session_id) DO NOTHING
-            """,
-                session_id,
-                user_id,
-                now,
-                now,
-                metadata_json,
-            )
+        await self.get_or_create_session(
+            session_id, user_id=user_id, metadata=metadata, history_limit=0
+        )
 
         logger.info(f"Created chat session: {session_id}")
         return session_id
 
+    async def get_or_create_session(
+        self,
+        session_id: str,
+        user_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        history_limit: int = 10,
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]], bool]:
+        """
+        Fetch a session and its recent history, creating it if missing.
+
+        One round-trip on a cache miss, none on a hit.
+
+        Args:
+            session_id: Session identifier
+            user_id: User identifier for a newly created session
+            metadata: Metadata for a newly created session
+            history_limit: Maximum number of messages to return (most recent)
+
+        Returns:
+            (session dict, messages oldest to newest, created)
+        """
+        cached = self._history.get(session_id)
+        if cached is not None and cached.session is not None:
+            if cached.complete or len(cached.messages) >= history_limit:
+                return cached.session, self._tail(cached.messages, history_limit), False
+
+        await self.ensure_pool()
+        if history_limit and self._writer and self._writer.pending_for(session_id):
+            await self._writer.flush()
+
+        now = datetime.utcnow()
+        async with self.db_pool.acquire() as conn:
+            # A session inserted concurrently by another caller conflicts but
+            # isn't visible to this statement's snapshot, so no row comes
+            # back; running the statement again sees the committed row
+            for _ in range(2):
+                row = await conn.fetchrow(
+                    """
+                    WITH inserted AS (
+                        INSERT INTO chat_sessions (session_id, user_id, created_at, updated_at, metadata)
+                        VALUES ($1, $2, $3, $3, $4::jsonb)
+                        ON CONFLICT (session_id) DO NOTHING
+                        RETURNING session_id, user_id, created_at, updated_at, metadata
+                    ),
+                    session AS (
+                        SELECT *, TRUE AS created FROM inserted
+                        UNION ALL
+                        SELECT session_id, user_id, created_at, updated_at, metadata, FALSE
+                        FROM chat_sessions
+                        WHERE session_id = $1 AND NOT EXISTS (SELECT 1 FROM inserted)
+                    ),
+                    history AS (
+                        SELECT message_id, role, content, created_at, metadata
+                        FROM chat_messages
+                        WHERE session_id = $1
+                        ORDER BY created_at DESC
+                        LIMIT $5
+                    )
+                    SELECT session.*,
+                           (SELECT COALESCE(jsonb_agg(history ORDER BY history.created_at), '[]'::jsonb)
+                            FROM history) AS history
+                    FROM session
+                """,
+                    session_id,
+                    user_id,
+                    now,
+                    json.dumps(metadata or {}),
+                    history_limit,
+                )
+                if row is not None:
+                    break
+
+        if row is None:
+            raise RuntimeError(f"Session {session_id} was neither created nor found")
+
+        session = dict(row)
+        created = session.pop("created")
+        messages = [_decode_message(m) for m in json.loads(session.pop("history"))]
+        if cached is not None and len(cached.messages) > len(messages):
+            # Cached tail is longer than requested; keep it
+            messages = cached.messages
+        self._history.set(
+            session_id,
+            _CachedHistory(
+                session=session,
+                messages=messages[-self.history_cache_messages :],
+                complete=created or len(messages) < history_limit,
+            ),
+        )
+        return session, self._tail(messages, history_limit), created
+
+    @staticmethod
+    def _tail(messages: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+        return list(messages[-limit:]) if limit > 0 else []
+
     async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve session metadata.
@@ -142,6 +290,10 @@ class SessionManager:
         Returns:
             Session dict or None if not found
         """
+        cached = self._history.get(session_id)
+        if cached is not None and cached.session is not None:
+            return cached.session
+
         await self.ensure_pool()
 
         async with self.db_pool.acquire() as conn:
@@ -169,46 +321,93 @@ class SessionManager:
         """
         Add a message to the session history.
 
+        The message is visible to load_conversation_history() immediately and
+        persisted with the next batched write (call flush() to force it).
+
         Args:
             session_id: Session identifier
             role: Message role (user, assistant, system)
             content: Message content
             metadata: Optional message metadata
         """
+        now = max(datetime.utcnow(), self._last_message_at + timedelta(microseconds=1))
+        self._last_message_at = now
+        message_id = f"msg-{uuid.uuid4()}"
+        metadata = metadata or {}
+
+        cached = self._history.get(session_id)
+        if cached is not None:
+            cached.messages.append(
+                {
+                    "message_id": message_id,
+                    "role": role,
+                    "content": content,
+                    "created_at": now,
+                    "metadata": metadata,
+                }
+            )
+            if len(cached.messages) > self.history_cache_messages:
+                del cached.messages[0]
+                cached.complete = False
+            if cached.session is not None:
+                cached.session["updated_at"] = now
+
+        message = (message_id, session_id, role, content, now, json.dumps(metadata))
+        if self._writer:
+            await self._writer.write(message)
+        else:
+            await self._write_messages([message])
+
+        logger.debug(f"Added message to session {session_id}: {role}")
+
+    async def _write_messages(self, batch: List[_PendingMessage]) -> None:
+        """Persist a batch of messages and bump their sessions' updated_at in one transaction."""
         await self.ensure_pool()
 
-        now = datetime.utcnow()
-        message_id = f"msg-{uuid.uuid4()}"
+        message_ids, session_ids, roles, contents, created, metadata = zip(*batch)
+        latest: Dict[str, datetime] = {}
+        for session_id, created_at in zip(session_ids, created):
+            latest[session_id] = max(created_at, latest.get(session_id, created_at))
 
         async with self.db_pool.acquire() as conn:
-            # Insert message
-            metadata_json = json.dumps(metadata or {})
-            await conn.execute(
-                """
-                INSERT INTO chat_messages (message_id, session_id, role, content, created_at, metadata)
-                VALUES ($1, $2, $3, $4, $5, $6::jsonb)
-            """,
-                message_id,
-                session_id,
-                role,
-                content,
-                now,
-                metadata_json,
-            )
+            async with conn.transaction():
+                # Messages for sessions that no longer exist are skipped
+                # rather than failing the whole batch on the foreign key, and
+                # re-sending a batch whose commit went unacknowledged is a no-op
+                result = await conn.execute(
+                    """
+                    INSERT INTO chat_messages (message_id, session_id, role, content, created_at, metadata)
+                    SELECT m.message_id, m.session_id, m.role, m.content, m.created_at, m.metadata::jsonb
+                    FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::timestamp[], $6::text[])
+                        AS m(message_id, session_id, role, content, created_at, metadata)
+                    JOIN chat_sessions s ON s.session_id = m.session_id
+                    ON CONFLICT (message_id) DO NOTHING
+                """,
+                    list(message_ids),
+                    list(session_ids),
+                    list(roles),
+                    list(contents),
+                    list(created),
+                    list(metadata),
+                )
+                await conn.execute(
+                    """
+                    UPDATE chat_sessions s
+                    SET updated_at = u.updated_at
+                    FROM unnest($1::text[], $2::timestamp[]) AS u(session_id, updated_at)
+                    WHERE s.session_id = u.session_id
+                """,
+                    list(latest),
+                    list(latest.values()),
+                )
 
-            # Update session timestamp
-            await conn.execute(
-                """
-                UPDATE chat_sessions
-                SET updated_at = $1
-                WHERE session_id = $2
-            """,
-                now,
-                session_id,
+        written = int(result.split()[-1])
+        if written < len(batch):
+            logger.warning(
+                f"Skipped {len(batch) - written} chat messages for unknown sessions "
+                f"or already written"
             )
 
-        logger.debug(f"Added message to session {session_id}: {role}")
-
     async def load_conversation_history(
         self, session_id: str, limit: int = 10
     ) -> List[Dict[str, Any]]:
@@ -222,7 +421,13 @@ class SessionManager:
         Returns:
             List of message dicts (oldest to newest)
         """
+        cached = self._history.get(session_id)
+        if cached is not None and (cached.complete or len(cached.messages) >= limit):
+            return self._tail(cached.messages, limit)
+
         await self.ensure_pool()
+        if self._writer and self._writer.pending_for(session_id):
+            await self._writer.flush()
 
         async with self.db_pool.acquire() as conn:
             rows = await conn.fetch(
@@ -238,9 +443,21 @@ class SessionManager:
             )
 
             # Reverse to get chronological order
-            messages = [dict(row) for row in reversed(rows)]
+            messages = [_decode_message(dict(row)) for row in reversed(rows)]
 
-            return messages
+        if cached is not None:
+            cached.messages = messages[-self.history_cache_messages :]
+            cached.complete = len(messages) < limit
+        else:
+            self._history.set(
+                session_id,
+                _CachedHistory(
+                    session=None,
+                    messages=messages[-self.history_cache_messages :],
+                    complete=len(messages) < limit,
+                ),
+            )
+        return messages
 
     async def cleanup_expired_sessions(self, ttl_hours: int = 24) -> int:
         """
@@ -253,6 +470,7 @@ class SessionManager:
             Number of sessions deleted
         """
         await self.ensure_pool()
+        await self.flush()
 
         cutoff = datetime.utcnow() - timedelta(hours=ttl_hours)
 
@@ -280,6 +498,9 @@ class SessionManager:
             # Extract count from result
             deleted_count = int(result.split()[-1])
 
+            if deleted_count:
+                self._history.clear()
+
             logger.info(
                 f"Cleaned up {deleted_count} expired sessions (TTL: {ttl_hours}h)"
             )
@@ -0,0 +1,309 @@
+"""
+Shared in-process cache utilities.
+
+Provides:
+- LRUCache: bounded LRU with optional TTL, O(1) get/set/evict, thread-safe
+- TieredCache: LRUCache in front of an optional Redis tier shared across processes
+- Hit/miss/eviction counters per cache, exported to Prometheus when available
+
+Usage:
+    cache = LRUCache("intent_classification", max_size=1000)
+    cache.set(key, value)
+    value = cache.get(key)          # None on miss or expiry
+
+    tiered = TieredCache(cache, redis_url=os.getenv("CACHE_REDIS_URL"), namespace="ctx7")
+    await tiered.aset(key, value)
+    value = await tiered.aget(key)  # local first, then Redis (populates local)
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+try:
+    from prometheus_client import REGISTRY, Counter, Gauge
+
+    def _get_or_create(factory, name, description, labelnames):
+        existing = REGISTRY._names_to_collectors.get(name)
+        if existing is not None:
+            return existing
+        try:
+            return factory(name, description, labelnames)
+        except ValueError:
+            return REGISTRY._names_to_collectors.get(name)
+
+    cache_requests_total = _get_or_create(
+        Counter,
+        "shared_cache_requests_total",
+        "Cache lookups by cache name and result (hit, miss)",
+        ["cache", "tier", "result"],
+    )
+    cache_evictions_total = _get_or_create(
+        Counter,
+        "shared_cache_evictions_total",
+        "Cache entries removed by reason (lru, expired)",
+        ["cache", "reason"],
+    )
+    cache_size = _get_or_create(
+        Gauge, "shared_cache_size", "Current number of cache entries", ["cache"]
+    )
+    PROMETHEUS_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    PROMETHEUS_AVAILABLE = False
+
+try:
+    import redis.asyncio as redis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    """Counters for a single cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate_percent": round(self.hit_rate * 100, 2),
+        }
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache with optional per-entry TTL.
+
+    Backed by an OrderedDict, so lookups, inserts, recency updates and
+    evictions are all O(1). Expired entries are dropped lazily on access
+    (and counted as misses). Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_size: int = 1000,
+        ttl_seconds: Optional[float] = None,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        # key -> (value, expires_at or None)
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value (marking it most recently used), or default."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self._record_miss()
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.stats.expirations += 1
+                self._record_eviction("expired")
+                self._record_miss()
+                return default
+
+            self._data.move_to_end(key)
+            self._record_hit()
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Insert or replace a value, evicting the least recently used entry if full."""
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+                self._record_eviction("lru")
+            self._update_size()
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove a key; returns True if it was present."""
+        with self._lock:
+            removed = self._data.pop(key, _MISSING) is not _MISSING
+            self._update_size()
+            return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._update_size()
+
+    def keys(self) -> List[Hashable]:
+        """Keys from least to most recently used (may include expired entries)."""
+        with self._lock:
+            return list(self._data.keys())
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return False
+            expires_at = entry[1]
+            return expires_at is None or expires_at > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            **self.stats.to_dict(),
+        }
+
+    def _record_hit(self, tier: str = "local") -> None:
+        self.stats.hits += 1
+        if PROMETHEUS_AVAILABLE:
+            cache_requests_total.labels(cache=self.name, tier=tier, result="hit").inc()
+
+    def _record_miss(self, tier: str = "local") -> None:
+        self.stats.misses += 1
+        if PROMETHEUS_AVAILABLE:
+            cache_requests_total.labels(cache=self.name, tier=tier, result="miss").inc()
+
+    def _record_eviction(self, reason: str) -> None:
+        if PROMETHEUS_AVAILABLE:
+            cache_evictions_total.labels(cache=self.name, reason=reason).inc()
+            self._update_size()
+
+    def _update_size(self) -> None:
+        if PROMETHEUS_AVAILABLE:
+            cache_size.labels(cache=self.name).set(len(self._data))
+
+
+class TieredCache:
+    """
+    LRUCache in front of an optional Redis tier.
+
+    Reads check the local LRU first, then Redis (populating the local tier on
+    a hit). Writes go to both. Without a Redis URL, or if Redis is unreachable,
+    it behaves as the local cache alone.
+    """
+
+    def __init__(
+        self,
+        local: LRUCache,
+        redis_url: Optional[str] = None,
+        namespace: Optional[str] = None,
+        serialize: Callable[[Any], str] = json.dumps,
+        deserialize: Callable[[str], Any] = json.loads,
+    ):
+        self.local = local
+        self.redis_url = redis_url
+        self.namespace = namespace or local.name
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.remote_stats = CacheStats()
+        self._redis = None
+        self._redis_disabled = not (redis_url and REDIS_AVAILABLE)
+
+    def _redis_key(self, key: Hashable) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    async def _get_redis(self):
+        if self._redis_disabled:
+            return None
+        if self._redis is None:
+            try:
+                self._redis = redis.from_url(self.redis_url, decode_responses=True)
+                await self._redis.ping()
+            except Exception as e:
+                logger.warning(f"[SharedCache] Redis tier disabled for {self.namespace}: {e}")
+                self._redis = None
+                self._redis_disabled = True
+        return self._redis
+
+    async def aget(self, key: Hashable, default: Any = None) -> Any:
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        client = await self._get_redis()
+        if client is None:
+            return default
+        try:
+            raw = await client.get(self._redis_key(key))
+        except Exception as e:
+            logger.warning(f"[SharedCache] Redis get failed for {self.namespace}: {e}")
+            return default
+
+        if raw is None:
+            self.remote_stats.misses += 1
+            if PROMETHEUS_AVAILABLE:
+                cache_requests_total.labels(cache=self.local.name, tier="redis", result="miss").inc()
+            return default
+
+        self.remote_stats.hits += 1
+        if PROMETHEUS_AVAILABLE:
+            cache_requests_total.labels(cache=self.local.name, tier="redis", result="hit").inc()
+        value = self.deserialize(raw)
+        self.local.set(key, value)
+        return value
+
+    async def aset(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        self.local.set(key, value, ttl_seconds)
+
+        client = await self._get_redis()
+        if client is None:
+            return
+        ttl = ttl_seconds if ttl_seconds is not None else self.local.ttl_seconds
+        try:
+            await client.set(
+                self._redis_key(key),
+                self.serialize(value),
+                ex=int(ttl) if ttl else None,
+            )
+        except Exception as e:
+            logger.warning(f"[SharedCache] Redis set failed for {self.namespace}: {e}")
+
+    async def adelete(self, key: Hashable) -> None:
+        self.local.delete(key)
+        client = await self._get_redis()
+        if client is not None:
+            try:
+                await client.delete(self._redis_key(key))
+            except Exception as e:
+                logger.warning(f"[SharedCache] Redis delete failed for {self.namespace}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.local.get_stats(),
+            "redis_enabled": not self._redis_disabled,
+            "redis": self.remote_stats.to_dict(),
+        }
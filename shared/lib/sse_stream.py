@@ -0,0 +1,175 @@
+"""
+Coalescing Server-Sent Events stream for token-by-token LLM responses.
+
+Decouples the producer (usually a LangGraph ``astream_events`` loop) from the
+HTTP client so neither paces the other:
+
+- Content tokens are accumulated in full (``stream.text``) for persisting the
+  assistant reply, and framed in coalesced ``content`` events once a size or
+  time budget is reached, instead of one SSE frame per token.
+- The producer runs in its own task. Content never blocks it: while the client
+  is slow, tokens keep merging into larger frames. Other frames go through a
+  bounded buffer, so a stalled client pauses the producer at the next
+  non-content event.
+- Idle streams get ``: keepalive`` comments.
+- If the client disconnects, the producer task is cancelled.
+
+Usage:
+    stream = SSEStream()
+
+    async def producer():
+        async for event in graph.astream_events(...):
+            stream.content(token)               # coalesced
+            yield sse_frame({"type": "tool_call", ...})  # passed through in order
+        await session_manager.add_message(..., content=stream.text)
+
+    return StreamingResponse(stream.iterate(producer()), media_type="text/event-stream")
+
+Configuration (environment):
+    SSE_MAX_FRAME_CHARS: Pending content size that triggers a frame (default: 256)
+    SSE_MAX_DELAY_MS: Longest a token waits before being framed (default: 25)
+    SSE_MAX_BUFFERED_FRAMES: Non-content frames buffered before the producer waits (default: 64)
+    SSE_KEEPALIVE_SECONDS: Idle time before a keepalive comment (default: 15)
+"""
+
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def sse_frame(payload: Dict[str, Any]) -> str:
+    """Encode one SSE data frame."""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+class SSEStream:
+    """
+    Coalescing, backpressure-aware SSE writer.
+
+    One instance per response. The producer calls content() for LLM tokens and
+    yields any other frames; iterate() drives the producer and yields frames
+    for the HTTP response.
+    """
+
+    def __init__(
+        self,
+        max_frame_chars: Optional[int] = None,
+        max_delay_ms: Optional[float] = None,
+        max_buffered_frames: Optional[int] = None,
+        keepalive_seconds: Optional[float] = None,
+    ):
+        self.max_frame_chars = max_frame_chars or int(os.getenv("SSE_MAX_FRAME_CHARS", "256"))
+        self.max_delay = (
+            max_delay_ms if max_delay_ms is not None else float(os.getenv("SSE_MAX_DELAY_MS", "25"))
+        ) / 1000
+        self.max_buffered_frames = max_buffered_frames or int(
+            os.getenv("SSE_MAX_BUFFERED_FRAMES", "64")
+        )
+        self.keepalive_seconds = keepalive_seconds or float(
+            os.getenv("SSE_KEEPALIVE_SECONDS", "15")
+        )
+
+        self._parts: List[str] = []
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self._pending_since: Optional[float] = None
+        self._frames: Deque[str] = deque()
+        self._ready = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._producer_done = False
+        self.stats = {"tokens": 0, "content_frames": 0, "frames": 0}
+
+    @property
+    def text(self) -> str:
+        """Everything passed to content() so far."""
+        return "".join(self._parts)
+
+    def content(self, text: str) -> None:
+        """Add LLM output; never blocks."""
+        if not text:
+            return
+        self._parts.append(text)
+        self._pending.append(text)
+        self._pending_chars += len(text)
+        self.stats["tokens"] += 1
+        if self._pending_since is None:
+            self._pending_since = asyncio.get_running_loop().time()
+        self._ready.set()
+
+    async def send(self, frame: str) -> None:
+        """Queue a non-content frame after any pending content, waiting while the buffer is full."""
+        self._frame_pending_content()
+        while len(self._frames) >= self.max_buffered_frames:
+            self._drained.clear()
+            await self._drained.wait()
+        self._frames.append(frame)
+        self._ready.set()
+
+    def _frame_pending_content(self) -> None:
+        if not self._pending:
+            return
+        self._frames.append(sse_frame({"type": "content", "content": "".join(self._pending)}))
+        self._pending.clear()
+        self._pending_chars = 0
+        self._pending_since = None
+        self.stats["content_frames"] += 1
+
+    async def _produce(self, producer: AsyncIterator[str]) -> None:
+        try:
+            async for frame in producer:
+                await self.send(frame)
+        finally:
+            self._producer_done = True
+            self._ready.set()
+
+    async def iterate(self, producer: AsyncIterator[str]) -> AsyncIterator[str]:
+        """Run producer in a task and yield coalesced frames until it finishes."""
+        loop = asyncio.get_running_loop()
+        task = asyncio.create_task(self._produce(producer))
+        last_sent = loop.time()
+        try:
+            while True:
+                self._ready.clear()
+                if self._frames:
+                    frame = self._frames.popleft()
+                    self._drained.set()
+                    self.stats["frames"] += 1
+                    last_sent = loop.time()
+                    yield frame
+                    continue
+
+                if self._pending:
+                    remaining = self._pending_since + self.max_delay - loop.time()
+                    if (
+                        remaining <= 0
+                        or self._pending_chars >= self.max_frame_chars
+                        or self._producer_done
+                    ):
+                        self._frame_pending_content()
+                        continue
+                    timeout = remaining
+                elif self._producer_done:
+                    break
+                else:
+                    timeout = self.keepalive_seconds - (loop.time() - last_sent)
+                    if timeout <= 0:
+                        last_sent = loop.time()
+                        yield ": keepalive\n\n"
+                        continue
+
+                try:
+                    await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if not task.done():
+                task.cancel()
+            results = await asyncio.gather(task, return_exceptions=True)
+
+        if isinstance(results[0], Exception):
+            raise results[0]
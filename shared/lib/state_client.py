@@ -13,12 +13,13 @@ Environment Variables:
     POSTGRES_PASSWORD: Database password
 """
 
-import os
 import logging
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 import asyncpg
 
+from .db_pool import get_pool_registry
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,36 +27,22 @@ class StateClient:
     """Client for state service operations."""
     
     def __init__(self):
-        """Initialize state client with database connection."""
-        self.db_host = os.getenv("POSTGRES_HOST", "postgres")
-        self.db_port = int(os.getenv("POSTGRES_PORT", "5432"))
-        self.db_name = os.getenv("POSTGRES_DB", "devtools")
-        self.db_user = os.getenv("POSTGRES_USER", "devtools")
-        self.db_password = os.getenv("POSTGRES_PASSWORD")
+        """Initialize state client (connections come from the shared pool registry)."""
         self._pool: Optional[asyncpg.Pool] = None
     
     async def connect(self):
-        """Establish connection pool to PostgreSQL."""
+        """Borrow the process-wide default PostgreSQL pool."""
         if self._pool is None:
             try:
-                self._pool = await asyncpg.create_pool(
-                    host=self.db_host,
-                    port=self.db_port,
-                    database=self.db_name,
-                    user=self.db_user,
-                    password=self.db_password,
-                    min_size=2,
-                    max_size=10
-                )
+                self._pool = await get_pool_registry().get_pool()
                 logger.info("State client connected to PostgreSQL")
             except Exception as e:
                 logger.error(f"Failed to connect to PostgreSQL: {e}")
                 raise
     
     async def close(self):
-        """Close database connection pool."""
+        """Release the pool reference (the registry owns the pool)."""
         if self._pool is not None:
-            await self._pool.close()
             self._pool = None
             logger.info("State client disconnected from PostgreSQL")
     
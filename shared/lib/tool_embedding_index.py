@@ -0,0 +1,160 @@
+"""
+Local vector index over MCP tool descriptions.
+
+Embeds every discovered tool once into an in-memory NumPy matrix (a flat
+index) and answers top-k cosine-similarity queries with a single matrix
+product. Used by ProgressiveMCPLoader's EMBEDDING strategy so tool selection
+needs no chat-model round-trip.
+
+The embedder is any LangChain-compatible Embeddings object
+(`embed_documents`/`embed_query`, optionally `aembed_documents`/`aembed_query`).
+
+Usage:
+    index = ToolEmbeddingIndex(embeddings)
+    await index.abuild({"gitmcp": ["git_commit", "create_pr"]})
+    matches = await index.asearch("open a pull request", top_k=5)
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:  # pragma: no cover - numpy ships with pandas in our images
+    np = None  # type: ignore
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ToolMatch:
+    """A tool selected by embedding similarity."""
+
+    server: str
+    tool: str
+    score: float
+
+
+def describe_tool(server: str, tool: str, server_keywords: Optional[List[str]] = None) -> str:
+    """Build the text embedded for a tool from its name, server and server keywords."""
+    text = f"{tool.replace('_', ' ').replace('-', ' ')} ({server.replace('-', ' ')} server)"
+    if server_keywords:
+        text += ": " + ", ".join(server_keywords)
+    return text
+
+
+class ToolEmbeddingIndex:
+    """Flat cosine-similarity index over (server, tool) entries."""
+
+    def __init__(self, embeddings: Any):
+        self.embeddings = embeddings
+        self._entries: List[Tuple[str, str]] = []
+        self._matrix: Optional["np.ndarray"] = None
+        self._build_lock = asyncio.Lock()
+
+    @property
+    def available(self) -> bool:
+        """Whether embeddings can be computed at all."""
+        return NUMPY_AVAILABLE and self.embeddings is not None
+
+    @property
+    def is_built(self) -> bool:
+        return self._matrix is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invalidate(self) -> None:
+        """Drop the index so it is rebuilt on next use (e.g. after discovery refresh)."""
+        self._matrix = None
+        self._entries = []
+
+    @staticmethod
+    def _entries_and_texts(
+        server_tools: Dict[str, List[str]],
+        server_keywords: Optional[Dict[str, List[str]]] = None,
+    ) -> Tuple[List[Tuple[str, str]], List[str]]:
+        entries: List[Tuple[str, str]] = []
+        texts: List[str] = []
+        for server, tools in server_tools.items():
+            keywords = (server_keywords or {}).get(server)
+            for tool in tools:
+                entries.append((server, tool))
+                texts.append(describe_tool(server, tool, keywords))
+        return entries, texts
+
+    def _store(self, entries: List[Tuple[str, str]], vectors: List[List[float]]) -> None:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or len(matrix) != len(entries):
+            raise ValueError("Embedder returned vectors that do not match the tool list")
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self._matrix = matrix / norms
+        self._entries = entries
+        logger.info(f"[ToolEmbeddingIndex] Indexed {len(entries)} tools")
+
+    def build(
+        self,
+        server_tools: Dict[str, List[str]],
+        server_keywords: Optional[Dict[str, List[str]]] = None,
+    ) -> None:
+        """Embed all tool descriptions synchronously."""
+        entries, texts = self._entries_and_texts(server_tools, server_keywords)
+        if not entries:
+            self._store([], np.zeros((0, 1), dtype=np.float32))
+            return
+        self._store(entries, self.embeddings.embed_documents(texts))
+
+    async def abuild(
+        self,
+        server_tools: Dict[str, List[str]],
+        server_keywords: Optional[Dict[str, List[str]]] = None,
+    ) -> None:
+        """Embed all tool descriptions without blocking the event loop."""
+        async with self._build_lock:
+            if self.is_built:
+                return
+            entries, texts = self._entries_and_texts(server_tools, server_keywords)
+            if not entries:
+                self._store([], np.zeros((0, 1), dtype=np.float32))
+                return
+            if hasattr(self.embeddings, "aembed_documents"):
+                vectors = await self.embeddings.aembed_documents(texts)
+            else:
+                vectors = await asyncio.to_thread(self.embeddings.embed_documents, texts)
+            self._store(entries, vectors)
+
+    def _top_k(self, query_vector: List[float], top_k: int, min_score: float) -> List[ToolMatch]:
+        if self._matrix is None or not self._entries:
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        scores = self._matrix @ (query / norm)
+
+        k = min(top_k, len(scores))
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        ranked = candidates[np.argsort(-scores[candidates])]
+        return [
+            ToolMatch(server=self._entries[i][0], tool=self._entries[i][1], score=float(scores[i]))
+            for i in ranked
+            if scores[i] >= min_score
+        ]
+
+    def search(self, query: str, top_k: int = 15, min_score: float = 0.0) -> List[ToolMatch]:
+        """Top-k tools by cosine similarity (blocking query embedding)."""
+        return self._top_k(self.embeddings.embed_query(query), top_k, min_score)
+
+    async def asearch(self, query: str, top_k: int = 15, min_score: float = 0.0) -> List[ToolMatch]:
+        """Top-k tools by cosine similarity without blocking the event loop."""
+        if hasattr(self.embeddings, "aembed_query"):
+            vector = await self.embeddings.aembed_query(query)
+        else:
+            vector = await asyncio.to_thread(self.embeddings.embed_query, query)
+        return self._top_k(vector, top_k, min_score)
@@ -3,21 +3,27 @@ State Persistence Layer Service
 
 Manages task state, workflow tracking, and agent logs in PostgreSQL.
 Provides CRUD operations for orchestrator and agent state management.
+
+All handlers share one asyncpg pool; asyncpg prepares and caches each
+statement per connection, so repeated queries skip planning. List endpoints
+use keyset pagination: when more rows follow a page, the X-Next-Cursor
+response header is set; pass it back as ``cursor`` to fetch the next page.
+GET /logs/{task_id} returns every log for the task unless ``limit`` is given.
 """
 
+import asyncio
+import base64
 import json
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-import psycopg2
-from fastapi import FastAPI, HTTPException
+import asyncpg
+from fastapi import FastAPI, HTTPException, Query, Response
 from prometheus_fastapi_instrumentator import Instrumentator
-from psycopg2.extras import Json, RealDictCursor
 from pydantic import BaseModel, Field
 
-app = FastAPI(title="State Persistence Layer", version="1.0.0")
-
 # PostgreSQL connection configuration
 PG_HOST = os.getenv("POSTGRES_HOST", "postgres")
 PG_PORT = int(os.getenv("POSTGRES_PORT", "5432"))
@@ -34,22 +40,97 @@ if PG_PASSWORD_FILE and os.path.exists(PG_PASSWORD_FILE):
 else:
     PG_PASSWORD = os.getenv("POSTGRES_PASSWORD", "devtools_prod_2024_secure")
 
+# Pool sizing (same variables as shared/lib/db_pool.py)
+PG_POOL_MIN_SIZE = int(os.getenv("PG_POOL_MIN_SIZE", "2"))
+PG_POOL_MAX_SIZE = int(os.getenv("PG_POOL_MAX_SIZE", "20"))
+PG_STATEMENT_CACHE_SIZE = int(os.getenv("PG_STATEMENT_CACHE_SIZE", "512"))
 
-def get_db_connection():
-    """Create database connection"""
-    try:
-        conn = psycopg2.connect(
-            host=PG_HOST,
-            port=PG_PORT,
-            database=PG_DB,
-            user=PG_USER,
-            password=PG_PASSWORD,
-            cursor_factory=RealDictCursor,
+# Upper bound on rows in a single /logs/batch insert
+MAX_LOG_BATCH = 1000
+
+_pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+
+
+async def _init_connection(conn: asyncpg.Connection):
+    """Encode/decode JSON columns as Python objects."""
+    for json_type in ("json", "jsonb"):
+        await conn.set_type_codec(
+            json_type, encoder=json.dumps, decoder=json.loads, schema="pg_catalog"
         )
-        return conn
-    except Exception as e:
-        print(f"Database connection failed: {e}")
-        return None
+
+
+async def get_db_pool() -> Optional[asyncpg.Pool]:
+    """Get the shared connection pool, creating it on first use"""
+    global _pool
+    if _pool is not None:
+        return _pool
+
+    async with _pool_lock:
+        if _pool is None:
+            try:
+                _pool = await asyncpg.create_pool(
+                    host=PG_HOST,
+                    port=PG_PORT,
+                    database=PG_DB,
+                    user=PG_USER,
+                    password=PG_PASSWORD,
+                    min_size=PG_POOL_MIN_SIZE,
+                    max_size=PG_POOL_MAX_SIZE,
+                    statement_cache_size=PG_STATEMENT_CACHE_SIZE,
+                    init=_init_connection,
+                )
+            except Exception as e:
+                print(f"Database connection failed: {e}")
+                return None
+    return _pool
+
+
+@asynccontextmanager
+async def db_connection():
+    """Borrow a pooled connection, or fail the request with 503"""
+    pool = await get_db_pool()
+    if pool is None:
+        raise HTTPException(status_code=503, detail="Database connection failed")
+    async with pool.acquire() as conn:
+        yield conn
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the pool on startup and close it on shutdown"""
+    await get_db_pool()
+    yield
+    if _pool is not None:
+        await _pool.close()
+
+
+app = FastAPI(title="State Persistence Layer", version="1.0.0", lifespan=lifespan)
+
+
+def encode_cursor(position: datetime, row_id: int) -> str:
+    """Opaque keyset cursor for the row at (position, row_id)"""
+    raw = json.dumps([position.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises 400 on malformed cursors"""
+    try:
+        position, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(position), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _page(rows: List[Any], limit: Optional[int], response: Response, position: str) -> List[Any]:
+    """Drop the look-ahead row (queries fetch limit + 1) and set X-Next-Cursor if there was one"""
+    if limit is None or len(rows) <= limit:
+        return rows
+    rows = rows[:limit]
+    last = rows[-1]
+    response.headers["X-Next-Cursor"] = encode_cursor(last[position], last["id"])
+    return rows
 
 
 # Request/Response Models
@@ -95,6 +176,12 @@ class AgentLogCreate(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
 
 
+class AgentLogBatch(BaseModel):
+    """Bulk agent log insert"""
+
+    logs: List[AgentLogCreate] = Field(..., max_length=MAX_LOG_BATCH)
+
+
 class AgentLog(BaseModel):
     """Agent log entry"""
 
@@ -160,16 +247,25 @@ class ComplianceRun(ComplianceRunCreate):
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    conn = get_db_connection()
-    db_status = "connected" if conn else "disconnected"
-    if conn:
-        conn.close()
+    pool = await get_db_pool()
+    db_status = "disconnected"
+    if pool is not None:
+        try:
+            await pool.fetchval("SELECT 1")
+            db_status = "connected"
+        except Exception:
+            pass
 
     return {
         "status": "ok",
         "service": "state-persistence",
         "version": "1.0.0",
         "database_status": db_status,
+        "pool": {
+            "size": pool.get_size() if pool else 0,
+            "idle": pool.get_idle_size() if pool else 0,
+            "max": PG_POOL_MAX_SIZE,
+        },
         "timestamp": datetime.utcnow().isoformat(),
     }
 
@@ -178,385 +274,331 @@ async def health_check():
 @app.post("/init")
 async def initialize_schema():
     """Initialize database schema from schema.sql"""
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection failed")
-
-    try:
-        # Read schema file
-        schema_path = "/app/schema.sql"
-        if not os.path.exists(schema_path):
-            schema_path = "../../config/state/schema.sql"
-
-        with open(schema_path, "r") as f:
-            schema_sql = f.read()
-
-        # Read workflow state schema (Phase 6)
-        workflow_schema_path = "/app/workflow_state.sql"
-        if not os.path.exists(workflow_schema_path):
-            workflow_schema_path = "../../config/state/workflow_state.sql"
-
-        if os.path.exists(workflow_schema_path):
-            with open(workflow_schema_path, "r") as f:
-                schema_sql += "\n" + f.read()
-
-        # Read resource locks schema (Phase 6)
-        locks_schema_path = "/app/resource_locks.sql"
-        if not os.path.exists(locks_schema_path):
-            locks_schema_path = "../../config/state/resource_locks.sql"
-
-        if os.path.exists(locks_schema_path):
-            with open(locks_schema_path, "r") as f:
-                schema_sql += "\n" + f.read()
-
-        cursor = conn.cursor()
-        cursor.execute(schema_sql)
-        conn.commit()
-        cursor.close()
-        conn.close()
-
-        return {"success": True, "message": "Database schema initialized successfully"}
-    except Exception as e:
-        if conn:
-            conn.close()
-        raise HTTPException(
-            status_code=500, detail=f"Schema initialization failed: {str(e)}"
-        )
+    async with db_connection() as conn:
+        try:
+            # Read schema file
+            schema_path = "/app/schema.sql"
+            if not os.path.exists(schema_path):
+                schema_path = "../../config/state/schema.sql"
+
+            with open(schema_path, "r") as f:
+                schema_sql = f.read()
+
+            # Read workflow state schema (Phase 6)
+            workflow_schema_path = "/app/workflow_state.sql"
+            if not os.path.exists(workflow_schema_path):
+                workflow_schema_path = "../../config/state/workflow_state.sql"
+
+            if os.path.exists(workflow_schema_path):
+                with open(workflow_schema_path, "r") as f:
+                    schema_sql += "\n" + f.read()
+
+            # Read resource locks schema (Phase 6)
+            locks_schema_path = "/app/resource_locks.sql"
+            if not os.path.exists(locks_schema_path):
+                locks_schema_path = "../../config/state/resource_locks.sql"
+
+            if os.path.exists(locks_schema_path):
+                with open(locks_schema_path, "r") as f:
+                    schema_sql += "\n" + f.read()
+
+            await conn.execute(schema_sql)
+
+            return {"success": True, "message": "Database schema initialized successfully"}
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Schema initialization failed: {str(e)}"
+            )
 
 
 # Task endpoints
 @app.post("/tasks", response_model=Task)
 async def create_task(task: TaskCreate):
     """Create new task"""
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection failed")
-
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO tasks (task_id, type, status, assigned_agent, payload, updated_at)
-            VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
-            RETURNING *
-            """,
-            (
+    async with db_connection() as conn:
+        try:
+            result = await conn.fetchrow(
+                """
+                INSERT INTO tasks (task_id, type, status, assigned_agent, payload, updated_at)
+                VALUES ($1, $2, $3, $4, $5, CURRENT_TIMESTAMP)
+                RETURNING *
+                """,
                 task.task_id,
                 task.type,
                 task.status,
                 task.assigned_agent,
-                Json(task.payload),
-            ),
-        )
-        result = cursor.fetchone()
-        conn.commit()
-        cursor.close()
-        conn.close()
-
-        return Task(**result)
-    except Exception as e:
-        if conn:
-            conn.close()
-        raise HTTPException(status_code=500, detail=f"Task creation failed: {str(e)}")
+                task.payload,
+            )
+            return Task(**dict(result))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Task creation failed: {str(e)}")
 
 
 @app.get("/tasks/{task_id}", response_model=Task)
 async def get_task(task_id: str):
     """Get task by ID"""
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection failed")
+    async with db_connection() as conn:
+        try:
+            result = await conn.fetchrow("SELECT * FROM tasks WHERE task_id = $1", task_id)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Task retrieval failed: {str(e)}")
 
-    try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM tasks WHERE task_id = %s", (task_id,))
-        result = cursor.fetchone()
-        cursor.close()
-        conn.close()
-
-        if not result:
-            raise HTTPException(status_code=404, detail="Task not found")
+    if not result:
+        raise HTTPException(status_code=404, detail="Task not found")
 
-        return Task(**result)
-    except HTTPException:
-        raise
-    except Exception as e:
-        if conn:
-            conn.close()
-        raise HTTPException(status_code=500, detail=f"Task retrieval failed: {str(e)}")
+    return Task(**dict(result))
 
 
 @app.put("/tasks/{task_id}", response_model=Task)
 async def update_task(task_id: str, update: TaskUpdate):
     """Update task"""
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection failed")
+    # Build update query dynamically
+    updates = []
+    values: List[Any] = []
 
-    try:
-        cursor = conn.cursor()
-
-        # Build update query dynamically
-        updates = []
-        values = []
-
-        if update.status:
-            updates.append("status = %s")
-            values.append(update.status)
-        if update.assigned_agent:
-            updates.append("assigned_agent = %s")
-            values.append(update.assigned_agent)
-        if update.result:
-            updates.append("result = %s")
-            values.append(Json(update.result))
-
-        updates.append("updated_at = CURRENT_TIMESTAMP")
-        values.append(task_id)
-
-        query = f"UPDATE tasks SET {', '.join(updates)} WHERE task_id = %s RETURNING *"
-        cursor.execute(query, values)
-        result = cursor.fetchone()
-        conn.commit()
-        cursor.close()
-        conn.close()
-
-        if not result:
-            raise HTTPException(status_code=404, detail="Task not found")
-
-        return Task(**result)
-    except HTTPException:
-        raise
-    except Exception as e:
-        if conn:
-            conn.close()
-        raise HTTPException(status_code=500, detail=f"Task update failed: {str(e)}")
+    if update.status:
+        values.append(update.status)
+        updates.append(f"status = ${len(values)}")
+    if update.assigned_agent:
+        values.append(update.assigned_agent)
+        updates.append(f"assigned_agent = ${len(values)}")
+    if update.result:
+        values.append(update.result)
+        updates.append(f"result = ${len(values)}")
+
+    updates.append("updated_at = CURRENT_TIMESTAMP")
+    values.append(task_id)
+    query = f"UPDATE tasks SET {', '.join(updates)} WHERE task_id = ${len(values)} RETURNING *"
+
+    async with db_connection() as conn:
+        try:
+            result = await conn.fetchrow(query, *values)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Task update failed: {str(e)}")
+
+    if not result:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    return Task(**dict(result))
 
 
 @app.get("/tasks", response_model=List[Task])
-async def list_tasks(status: Optional[str] = None, limit: int = 100):
-    """List tasks with optional status filter"""
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection failed")
+async def list_tasks(
+    response: Response,
+    status: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+):
+    """List tasks newest first with optional status filter (keyset paginated)"""
+    clauses = []
+    values: List[Any] = []
 
-    try:
-        cursor = conn.cursor()
+    if status:
+        values.append(status)
+        clauses.append(f"status = ${len(values)}")
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        values.extend([created_at, row_id])
+        clauses.append(f"(created_at, id) < (${len(values) - 1}, ${len(values)})")
 
-        if status:
-            cursor.execute(
-                "SELECT * FROM tasks WHERE status = %s ORDER BY created_at DESC LIMIT %s",
-                (status, limit),
-            )
-        else:
-            cursor.execute(
-                "SELECT * FROM tasks ORDER BY created_at DESC LIMIT %s", (limit,)
-            )
+    query = "SELECT * FROM tasks"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    values.append(limit + 1)
+    query += f" ORDER BY created_at DESC, id DESC LIMIT ${len(values)}"
 
-        results = cursor.fetchall()
-        cursor.close()
-        conn.close()
+    async with db_connection() as conn:
+        try:
+            results = await conn.fetch(query, *values)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Task listing failed: {str(e)}")
 
-        return [Task(**row) for row in results]
-    except Exception as e:
-        if conn:
-            conn.close()
-        raise HTTPException(status_code=500, detail=f"Task listing failed: {str(e)}")
+    return [Task(**dict(row)) for row in _page(results, limit, response, "created_at")]
 
 
 # Agent log endpoints
 @app.post("/logs", response_model=AgentLog)
 async def create_log(log: AgentLogCreate):
     """Create agent log entry"""
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection failed")
-
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO agent_logs (task_id, agent, log_level, message, metadata)
-            VALUES (%s, %s, %s, %s, %s)
-            RETURNING *
-            """,
-            (
+    async with db_connection() as conn:
+        try:
+            result = await conn.fetchrow(
+                """
+                INSERT INTO agent_logs (task_id, agent, log_level, message, metadata)
+                VALUES ($1, $2, $3, $4, $5)
+                RETURNING *
+                """,
                 log.task_id,
                 log.agent,
                 log.log_level,
                 log.message,
-                Json(log.metadata) if log.metadata else None,
-            ),
-        )
-        result = cursor.fetchone()
-        conn.commit()
-        cursor.close()
-        conn.close()
-
-        return AgentLog(**result)
-    except Exception as e:
-        if conn:
-            conn.close()
-        raise HTTPException(status_code=500, detail=f"Log creation failed: {str(e)}")
+                log.metadata,
+            )
+            return AgentLog(**dict(result))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Log creation failed: {str(e)}")
+
+
+@app.post("/logs/batch")
+async def create_logs_batch(batch: AgentLogBatch):
+    """Insert many agent log entries in one round-trip"""
+    if not batch.logs:
+        return {"success": True, "inserted": 0}
+
+    async with db_connection() as conn:
+        try:
+            inserted = await conn.fetchval(
+                """
+                WITH rows AS (
+                    INSERT INTO agent_logs (task_id, agent, log_level, message, metadata)
+                    SELECT task_id, agent, log_level, message, metadata::jsonb
+                    FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::text[])
+                        AS batch(task_id, agent, log_level, message, metadata)
+                    RETURNING 1
+                )
+                SELECT count(*) FROM rows
+                """,
+                [log.task_id for log in batch.logs],
+                [log.agent for log in batch.logs],
+                [log.log_level for log in batch.logs],
+                [log.message for log in batch.logs],
+                [json.dumps(log.metadata) if log.metadata else None for log in batch.logs],
+            )
+            return {"success": True, "inserted": inserted}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Batch log creation failed: {str(e)}")
 
 
 @app.get("/logs/{task_id}", response_model=List[AgentLog])
-async def get_task_logs(task_id: str):
-    """Get all logs for a task"""
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection failed")
-
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT * FROM agent_logs WHERE task_id = %s ORDER BY timestamp ASC",
-            (task_id,),
-        )
-        results = cursor.fetchall()
-        cursor.close()
-        conn.close()
-
-        return [AgentLog(**row) for row in results]
-    except Exception as e:
-        if conn:
-            conn.close()
-        raise HTTPException(status_code=500, detail=f"Log retrieval failed: {str(e)}")
+async def get_task_logs(
+    task_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+    cursor: Optional[str] = None,
+):
+    """Get logs for a task in chronological order (all of them, or keyset pages of ``limit``)"""
+    # LIMIT NULL means no limit
+    fetch_limit = None if limit is None else limit + 1
+    async with db_connection() as conn:
+        try:
+            if cursor:
+                after_ts, after_id = decode_cursor(cursor)
+                results = await conn.fetch(
+                    """
+                    SELECT * FROM agent_logs
+                    WHERE task_id = $1 AND (timestamp, id) > ($2, $3)
+                    ORDER BY timestamp ASC, id ASC LIMIT $4
+                    """,
+                    task_id,
+                    after_ts,
+                    after_id,
+                    fetch_limit,
+                )
+            else:
+                results = await conn.fetch(
+                    "SELECT * FROM agent_logs WHERE task_id = $1 "
+                    "ORDER BY timestamp ASC, id ASC LIMIT $2",
+                    task_id,
+                    fetch_limit,
+                )
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Log retrieval failed: {str(e)}")
+
+    return [AgentLog(**dict(row)) for row in _page(results, limit, response, "timestamp")]
 
 
 # Workflow endpoints
 @app.post("/workflows", response_model=Workflow)
 async def create_workflow(workflow: WorkflowCreate):
     """Create workflow"""
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection failed")
-
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO workflows (workflow_id, name, steps, status)
-            VALUES (%s, %s, %s, %s)
-            RETURNING *
-            """,
-            (
+    async with db_connection() as conn:
+        try:
+            result = await conn.fetchrow(
+                """
+                INSERT INTO workflows (workflow_id, name, steps, status)
+                VALUES ($1, $2, $3, $4)
+                RETURNING *
+                """,
                 workflow.workflow_id,
                 workflow.name,
-                Json(workflow.steps),
+                workflow.steps,
                 workflow.status,
-            ),
-        )
-        result = cursor.fetchone()
-        conn.commit()
-        cursor.close()
-        conn.close()
-
-        return Workflow(**result)
-    except Exception as e:
-        if conn:
-            conn.close()
-        raise HTTPException(
-            status_code=500, detail=f"Workflow creation failed: {str(e)}"
-        )
+            )
+            return Workflow(**dict(result))
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Workflow creation failed: {str(e)}"
+            )
 
 
 @app.get("/workflows/{workflow_id}", response_model=Workflow)
 async def get_workflow(workflow_id: str):
     """Get workflow by ID"""
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection failed")
+    async with db_connection() as conn:
+        try:
+            result = await conn.fetchrow(
+                "SELECT * FROM workflows WHERE workflow_id = $1", workflow_id
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Workflow retrieval failed: {str(e)}"
+            )
 
-    try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM workflows WHERE workflow_id = %s", (workflow_id,))
-        result = cursor.fetchone()
-        cursor.close()
-        conn.close()
-
-        if not result:
-            raise HTTPException(status_code=404, detail="Workflow not found")
-
-        return Workflow(**result)
-    except HTTPException:
-        raise
-    except Exception as e:
-        if conn:
-            conn.close()
-        raise HTTPException(
-            status_code=500, detail=f"Workflow retrieval failed: {str(e)}"
-        )
+    if not result:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+
+    return Workflow(**dict(result))
 
 
 @app.post("/compliance", response_model=ComplianceRun)
 async def create_compliance_run(run: ComplianceRunCreate):
     """Create and persist a compliance guardrail run."""
 
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection failed")
-
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO compliance_runs (run_id, agent, task_id, status, summary, checks, metadata, started_at, completed_at)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING *
-            """,
-            (
+    async with db_connection() as conn:
+        try:
+            result = await conn.fetchrow(
+                """
+                INSERT INTO compliance_runs (run_id, agent, task_id, status, summary, checks, metadata, started_at, completed_at)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+                RETURNING *
+                """,
                 run.run_id,
                 run.agent,
                 run.task_id,
                 run.status,
-                Json(run.summary),
-                Json(run.checks),
-                Json(run.metadata) if run.metadata is not None else None,
-                run.started_at,
-                run.completed_at,
-            ),
-        )
-        result = cursor.fetchone()
-        conn.commit()
-        cursor.close()
-        conn.close()
-
-        return ComplianceRun(**result)
-    except Exception as e:
-        if conn:
-            conn.close()
-        raise HTTPException(
-            status_code=500, detail=f"Compliance run creation failed: {str(e)}"
-        )
+                run.summary,
+                run.checks,
+                run.metadata,
+                run.started_at.replace(tzinfo=None),
+                run.completed_at.replace(tzinfo=None),
+            )
+            return ComplianceRun(**dict(result))
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Compliance run creation failed: {str(e)}"
+            )
 
 
 @app.get("/compliance/{run_id}", response_model=ComplianceRun)
 async def get_compliance_run(run_id: str):
     """Retrieve a compliance run by its identifier."""
 
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection failed")
+    async with db_connection() as conn:
+        try:
+            result = await conn.fetchrow(
+                "SELECT * FROM compliance_runs WHERE run_id = $1", run_id
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Compliance run retrieval failed: {str(e)}"
+            )
 
-    try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM compliance_runs WHERE run_id = %s", (run_id,))
-        result = cursor.fetchone()
-        cursor.close()
-        conn.close()
-
-        if not result:
-            raise HTTPException(status_code=404, detail="Compliance run not found")
-
-        return ComplianceRun(**result)
-    except HTTPException:
-        raise
-    except Exception as e:
-        if conn:
-            conn.close()
-        raise HTTPException(
-            status_code=500, detail=f"Compliance run retrieval failed: {str(e)}"
-        )
+    if not result:
+        raise HTTPException(status_code=404, detail="Compliance run not found")
+
+    return ComplianceRun(**dict(result))
 
 
 @app.get("/compliance", response_model=List[ComplianceRun])
@@ -565,42 +607,32 @@ async def list_compliance_runs(
 ):
     """List compliance runs with optional agent and status filters."""
 
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection failed")
+    query = "SELECT * FROM compliance_runs"
+    clauses = []
+    values: List[Any] = []
+
+    if agent:
+        values.append(agent)
+        clauses.append(f"agent = ${len(values)}")
+    if status:
+        values.append(status)
+        clauses.append(f"status = ${len(values)}")
+
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+
+    values.append(limit)
+    query += f" ORDER BY created_at DESC LIMIT ${len(values)}"
+
+    async with db_connection() as conn:
+        try:
+            results = await conn.fetch(query, *values)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Compliance run listing failed: {str(e)}"
+            )
 
-    try:
-        cursor = conn.cursor()
-
-        query = "SELECT * FROM compliance_runs"
-        clauses = []
-        values: List[Any] = []
-
-        if agent:
-            clauses.append("agent = %s")
-            values.append(agent)
-        if status:
-            clauses.append("status = %s")
-            values.append(status)
-
-        if clauses:
-            query += " WHERE " + " AND ".join(clauses)
-
-        query += " ORDER BY created_at DESC LIMIT %s"
-        values.append(limit)
-
-        cursor.execute(query, values)
-        results = cursor.fetchall()
-        cursor.close()
-        conn.close()
-
-        return [ComplianceRun(**row) for row in results]
-    except Exception as e:
-        if conn:
-            conn.close()
-        raise HTTPException(
-            status_code=500, detail=f"Compliance run listing failed: {str(e)}"
-        )
+    return [ComplianceRun(**dict(row)) for row in results]
 
 
 # Prometheus metrics instrumentation
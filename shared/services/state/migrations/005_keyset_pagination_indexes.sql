@@ -0,0 +1,9 @@
+-- Keyset pagination indexes for the state service
+--
+-- /tasks pages newest-first on (created_at, id), optionally filtered by status;
+-- /logs/{task_id} pages oldest-first on (timestamp, id). These composite
+-- indexes let each page be an index range scan instead of a sort.
+
+CREATE INDEX IF NOT EXISTS idx_tasks_created_id ON tasks(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_status_created_id ON tasks(status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_agent_logs_task_ts_id ON agent_logs(task_id, timestamp, id);
@@ -0,0 +1,111 @@
+"""
+Benchmark: EventBus Redis publish throughput (events/sec).
+
+Compares unbatched publishing (EVENT_BUS_PUBLISH_LINGER_MS=0, one round-trip
+per event) against pipelined batches, for each wire codec. Single node
+measures publish throughput; two nodes measures end-to-end delivery to a
+subscriber on a second bus. Redis is fakeredis, so absolute numbers exclude
+network latency; batching gains grow with real round-trip times.
+
+Usage:
+    pytest support/tests/performance/test_event_bus_throughput.py -v -s
+"""
+
+import asyncio
+import time
+
+import fakeredis
+import pytest
+
+from shared.lib import event_bus as event_bus_module
+from shared.lib.event_bus import EventBus
+
+EVENTS = 2000
+PAYLOAD = {"task_id": "task-123", "agent": "feature-dev", "status": "completed", "files": ["a.py"] * 5}
+
+
+@pytest.fixture
+async def make_node(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        event_bus_module.redis,
+        "from_url",
+        lambda url, **kwargs: fakeredis.FakeAsyncRedis(server=server, **kwargs),
+    )
+    created = []
+
+    async def factory(node_id, linger_ms, codec):
+        monkeypatch.setenv("EVENT_BUS_NODE_ID", node_id)
+        monkeypatch.setenv("EVENT_BUS_PUBLISH_LINGER_MS", linger_ms)
+        monkeypatch.setenv("EVENT_BUS_CODEC", codec)
+        bus = EventBus()
+        created.append(bus)
+        return bus
+
+    yield factory
+    for bus in created:
+        await bus.close(drain_timeout=0)
+
+
+def _codec_param(codec):
+    if codec == "json":
+        return codec
+    return pytest.param(
+        codec,
+        marks=pytest.mark.skipif(
+            not getattr(event_bus_module, f"{codec.upper()}_AVAILABLE"),
+            reason=f"{codec} not installed",
+        ),
+    )
+
+
+CODECS = [_codec_param(codec) for codec in ("json", "orjson", "msgpack")]
+MODES = [("unbatched", "0"), ("batched", "2")]
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("codec", CODECS)
+@pytest.mark.parametrize("mode,linger_ms", MODES)
+async def test_single_node_publish_throughput(make_node, mode, linger_ms, codec):
+    bus = await make_node("node-a", linger_ms, codec)
+    await bus.connect()
+
+    started = time.perf_counter()
+    for _ in range(EVENTS):
+        await bus.emit("task_completed", PAYLOAD, source="bench")
+    await bus.flush()
+    elapsed = time.perf_counter() - started
+
+    assert bus.get_stats()["redis_events_published"] == EVENTS
+    print(f"\nsingle node {mode:9s} {codec:7s}: {EVENTS / elapsed:10,.0f} events/sec")
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("codec", CODECS)
+@pytest.mark.parametrize("mode,linger_ms", MODES)
+async def test_two_node_delivery_throughput(make_node, mode, linger_ms, codec):
+    publisher = await make_node("node-a", linger_ms, codec)
+    consumer = await make_node("node-b", linger_ms, codec)
+    received = 0
+    done = asyncio.Event()
+
+    async def on_event(event):
+        nonlocal received
+        received += 1
+        if received == EVENTS:
+            done.set()
+
+    consumer.subscribe("task_completed", on_event)
+    await publisher.connect()
+    await consumer.connect()
+    await asyncio.sleep(0.05)
+
+    started = time.perf_counter()
+    for _ in range(EVENTS):
+        await publisher.emit("task_completed", PAYLOAD, source="bench")
+    await publisher.flush()
+    await asyncio.wait_for(done.wait(), timeout=60)
+    elapsed = time.perf_counter() - started
+
+    assert received == EVENTS
+    print(f"\ntwo nodes   {mode:9s} {codec:7s}: {EVENTS / elapsed:10,.0f} events/sec")
@@ -0,0 +1,94 @@
+"""
+Benchmark: ProgressiveMCPLoader tool selection latency.
+
+Measures keyword matching and minimal-strategy selection as the number of
+servers and keywords grows, comparing the precompiled KeywordIndex against
+the naive per-keyword substring scan it replaced.
+
+Usage:
+    pytest support/tests/performance/test_tool_selection_latency.py -v -s
+"""
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from shared.lib.keyword_index import KeywordIndex
+from shared.lib.progressive_mcp_loader import ProgressiveMCPLoader, ToolLoadingStrategy
+
+TASK = (
+    "Implement the authentication service, write pytest tests, commit the code, "
+    "open a pull request and deploy the docker image to kubernetes with metrics"
+)
+ITERATIONS = 200
+
+
+def naive_match(mapping, text):
+    matched = set()
+    text = text.lower()
+    for keyword, servers in mapping.items():
+        if keyword in text:
+            matched.update(servers)
+    return matched
+
+
+def synthetic_mapping(n_servers, n_keywords):
+    return {
+        f"keyword{k}": [f"server{k % n_servers}"] for k in range(n_keywords)
+    }
+
+
+def timed(fn, iterations=ITERATIONS):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1_000_000  # µs
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize(
+    "n_servers,n_keywords",
+    [(10, 50), (50, 500), (200, 2000), (500, 10000)],
+)
+def test_keyword_match_latency(n_servers, n_keywords):
+    """Indexed matching cost should not grow with the keyword count."""
+    mapping = synthetic_mapping(n_servers, n_keywords)
+    text = TASK + " keyword7 keyword42"
+    index = KeywordIndex(mapping)
+
+    assert index.match(text) == naive_match(mapping, text)
+
+    naive_us = timed(lambda: naive_match(mapping, text))
+    indexed_us = timed(lambda: index.match(text))
+
+    print(
+        f"\n  servers={n_servers:4d} keywords={n_keywords:5d} "
+        f"naive={naive_us:9.1f}µs indexed={indexed_us:7.1f}µs "
+        f"speedup={naive_us / indexed_us:6.1f}x"
+    )
+    if n_keywords >= 2000:
+        assert indexed_us < naive_us
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("n_servers", [10, 100, 1000])
+def test_minimal_selection_latency(n_servers):
+    """End-to-end minimal-strategy selection against a large catalog."""
+    discovery = MagicMock()
+    discovery.discover_servers.return_value = {
+        "servers": [
+            {"name": name, "tools": [f"{name}_tool"]}
+            for name in ["memory", "gitmcp", "dockerhub", "rust-mcp-filesystem"]
+            + [f"server{i}" for i in range(n_servers)]
+        ]
+    }
+    mcp_client = MagicMock()
+    mcp_client.profile = {}
+    loader = ProgressiveMCPLoader(mcp_client, discovery)
+    select = getattr(loader._get_minimal_tools, "__wrapped__", loader._get_minimal_tools)
+
+    latency_us = timed(lambda: select(TASK))
+
+    print(f"\n  servers={n_servers:5d} minimal selection={latency_us:8.1f}µs")
+    assert discovery.discover_servers.call_count == 1
@@ -0,0 +1,184 @@
+"""
+Unit tests for ApprovalDispatcher: exactly-once claims, retry on failure,
+lease expiry after a crash and notification handling.
+
+An in-memory approval_requests table stands in for PostgreSQL.
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+
+from shared.lib import approval_dispatcher as dispatcher_module
+from shared.lib.approval_dispatcher import ApprovalDispatcher
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.requests = {}
+        self.now = 0.0
+
+    def add(self, request_id, status, resumed=False):
+        self.requests[request_id] = {"status": status, "resumed": resumed, "claimed_until": None}
+
+    def claimable(self, row):
+        lease_expired = row["claimed_until"] is not None and row["claimed_until"] <= self.now
+        return row["status"] in ("approved", "rejected") and (not row["resumed"] or lease_expired)
+
+    @asynccontextmanager
+    async def connection(self):
+        yield FakeConnection(self)
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+        self.result = []
+
+    @asynccontextmanager
+    async def cursor(self, row_factory=None):
+        yield self
+
+    async def execute(self, query, params=()):
+        requests = self.db.requests
+        if "SET resumed_at = NOW()" in query:
+            lease_seconds, request_id = params
+            row = requests.get(request_id)
+            self.result = []
+            if row and self.db.claimable(row):
+                row["resumed"] = True
+                row["claimed_until"] = self.db.now + lease_seconds
+                self.result = [{
+                    "id": request_id, "status": row["status"], "thread_id": None,
+                    "workflow_id": f"wf-{request_id}", "decision_age_seconds": 0.2,
+                }]
+        elif "SET resumed_at = NULL" in query:
+            requests[params[0]].update(resumed=False, claimed_until=None)
+        elif "SET claimed_until = NULL" in query:
+            requests[params[0]]["claimed_until"] = None
+        else:
+            self.result = [
+                (request_id,) for request_id, row in requests.items() if self.db.claimable(row)
+            ]
+        return self
+
+    async def fetchone(self):
+        return self.result[0] if self.result else None
+
+    async def fetchall(self):
+        return self.result
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDatabase()
+    monkeypatch.setattr(dispatcher_module, "get_async_connection", db.connection)
+    return db
+
+
+@pytest.fixture
+def resumed():
+    return []
+
+
+@pytest.fixture
+def dispatcher(db, resumed):
+    async def handler(claim):
+        await asyncio.sleep(0.01)
+        resumed.append((claim["id"], claim["status"]))
+
+    return ApprovalDispatcher(handler=handler)
+
+
+async def test_request_resumed_once_across_paths(db, dispatcher, resumed):
+    db.add("a1", "approved")
+
+    results = await asyncio.gather(
+        dispatcher.dispatch("a1", source="notify"),
+        dispatcher.dispatch("a1", source="sweep"),
+        dispatcher.sweep(),
+    )
+
+    assert results[:2].count(True) == 1
+    assert resumed == [("a1", "approved")]
+    assert await dispatcher.dispatch("a1") is False
+
+
+async def test_undecided_requests_are_not_claimed(db, dispatcher, resumed):
+    db.add("p1", "pending")
+
+    assert await dispatcher.dispatch("p1") is False
+    assert resumed == []
+    assert db.requests["p1"]["resumed"] is False
+
+
+async def test_failed_resume_is_released_for_retry(db, resumed):
+    attempts = []
+
+    async def flaky(claim):
+        attempts.append(claim["id"])
+        if len(attempts) == 1:
+            raise RuntimeError("graph unavailable")
+
+    dispatcher = ApprovalDispatcher(handler=flaky)
+    db.add("a1", "approved")
+
+    assert await dispatcher.dispatch("a1") is False
+    assert db.requests["a1"]["resumed"] is False
+
+    assert await dispatcher.sweep() == 1
+    assert attempts == ["a1", "a1"]
+    assert db.requests["a1"]["resumed"] is True
+    assert db.requests["a1"]["claimed_until"] is None
+
+
+async def test_crashed_resumption_is_reclaimed_after_lease(db, resumed):
+    async def hang(claim):
+        await asyncio.Event().wait()
+
+    crashed = ApprovalDispatcher(handler=hang, lease_seconds=30)
+    db.add("a1", "approved")
+    task = asyncio.create_task(crashed.dispatch("a1"))
+    await asyncio.sleep(0.01)
+    task.cancel()  # the worker dies mid-resume, without releasing its claim
+    await asyncio.gather(task, return_exceptions=True)
+
+    async def handler(claim):
+        resumed.append(claim["id"])
+
+    survivor = ApprovalDispatcher(handler=handler, lease_seconds=30)
+    assert await survivor.sweep() == 0  # lease still held
+
+    db.now += 31
+    assert await survivor.sweep() == 1
+    assert resumed == ["a1"]
+
+    db.now += 31
+    assert await survivor.sweep() == 0  # completed claims are not reclaimed
+
+
+async def test_notifications_dispatch_decisions_only(db, dispatcher, resumed):
+    db.add("a1", "approved")
+    db.add("r1", "rejected")
+    db.add("p1", "pending")
+
+    for request_id, status in (("a1", "approved"), ("p1", "pending"), ("r1", "rejected")):
+        dispatcher._on_notification(json.dumps({"id": request_id, "status": status}))
+    dispatcher._on_notification("not json")
+    await asyncio.gather(*dispatcher._handler_tasks)
+
+    assert sorted(resumed) == [("a1", "approved"), ("r1", "rejected")]
+
+
+async def test_stop_waits_for_running_resumptions(db, dispatcher, resumed):
+    db.add("a1", "approved")
+
+    dispatcher._on_notification(json.dumps({"id": "a1", "status": "approved"}))
+    await dispatcher.stop()
+
+    assert resumed == [("a1", "approved")]
@@ -0,0 +1,83 @@
+"""
+Unit tests for BatchWriter: linger batching, retry after a failed write,
+bounded buffering and draining on close.
+"""
+
+import asyncio
+
+from shared.lib.batch_writer import BatchWriter
+
+
+class RecordingWriter(BatchWriter[str]):
+    retry_delay = 0.02
+
+    def __init__(self, linger_ms=10, max_batch=50, max_pending=1000):
+        super().__init__(linger_ms, max_batch, max_pending, name="test")
+        self.batches = []
+        self.fail = False
+        self.block: asyncio.Event = None
+        self.dropped = 0
+
+    async def write_batch(self, batch):
+        if self.block is not None:
+            await self.block.wait()
+        if self.fail:
+            raise ConnectionError("store down")
+        self.batches.append(list(batch))
+
+    def on_dropped(self, count):
+        self.dropped += count
+
+
+async def test_writes_within_linger_share_one_batch():
+    writer = RecordingWriter()
+
+    for n in range(3):
+        await writer.put(f"i{n}")
+    assert writer.batches == []
+
+    await asyncio.sleep(0.05)
+    assert writer.batches == [["i0", "i1", "i2"]]
+    await writer.close()
+
+
+async def test_writes_after_a_failure_are_not_stalled():
+    writer = RecordingWriter()
+    writer.fail = True
+
+    writer.add("i0")
+    await asyncio.sleep(0.015)
+    writer.add("i1")
+    writer.fail = False
+    await asyncio.sleep(0.08)
+
+    assert [item for batch in writer.batches for item in batch] == ["i0", "i1"]
+    await writer.close()
+
+
+async def test_add_drops_oldest_item_not_in_flight():
+    writer = RecordingWriter(linger_ms=10_000, max_pending=2)
+    writer.block = asyncio.Event()
+    writer.add("i0")
+    flush = asyncio.create_task(writer.flush())
+    await asyncio.sleep(0.01)
+
+    writer.add("i1")
+    writer.add("i2")  # i0 is being written, so i1 is dropped
+
+    writer.block.set()
+    await flush
+    await writer.close()
+    assert writer.batches == [["i0"], ["i2"]]
+    assert writer.dropped == 1
+
+
+async def test_close_drains_and_stops_task():
+    writer = RecordingWriter(linger_ms=10_000, max_batch=2)
+
+    for n in range(5):
+        await writer.put(f"i{n}")
+    await writer.close()
+
+    assert writer.batches == [["i0", "i1"], ["i2", "i3"], ["i4"]]
+    assert writer._task is None
@@ -0,0 +1,110 @@
+"""
+Unit tests for the DAG scheduler: topological levels, concurrency cap,
+upstream-only context and failure propagation.
+"""
+
+import asyncio
+
+import pytest
+
+from shared.lib.dag_scheduler import DAGScheduler, DependencyCycleError, topological_levels
+
+
+async def _run_all(scheduler, dependencies, run_node):
+    return [outcome async for outcome in scheduler.run(dependencies, run_node)]
+
+
+def test_topological_levels():
+    deps = {"code": [], "infra": [], "review": ["code"], "deploy": ["review", "infra"], "docs": []}
+
+    assert topological_levels(deps) == [["code", "infra", "docs"], ["review"], ["deploy"]]
+
+
+def test_unknown_and_self_dependencies_are_ignored():
+    assert topological_levels({"a": ["a", "missing"], "b": ["a"]}) == [["a"], ["b"]]
+
+
+def test_cycle_detected():
+    with pytest.raises(DependencyCycleError):
+        topological_levels({"a": ["b"], "b": ["a"], "c": []})
+
+
+async def test_independent_nodes_run_concurrently_under_cap():
+    running = 0
+    peak = 0
+
+    async def run_node(node_id, upstream):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        return node_id
+
+    deps = {str(n): [] for n in range(6)}
+    outcomes = await _run_all(DAGScheduler(max_concurrency=3), deps, run_node)
+
+    assert peak == 3
+    assert sorted(o.node_id for o in outcomes) == sorted(deps)
+    assert all(o.status == "completed" for o in outcomes)
+
+
+async def test_nodes_see_only_declared_upstream_results():
+    seen = {}
+
+    async def run_node(node_id, upstream):
+        seen[node_id] = upstream
+        return f"{node_id}-result"
+
+    deps = {"code": [], "infra": [], "review": ["code"]}
+    await _run_all(DAGScheduler(max_concurrency=1), deps, run_node)
+
+    assert seen["review"] == {"code": "code-result"}
+    assert seen["infra"] == {}
+
+
+async def test_dependent_starts_without_waiting_for_unrelated_nodes():
+    order = []
+
+    async def run_node(node_id, upstream):
+        await asyncio.sleep({"slow": 0.1, "fast": 0.01, "after_fast": 0.01}[node_id])
+        order.append(node_id)
+
+    deps = {"slow": [], "fast": [], "after_fast": ["fast"]}
+    await _run_all(DAGScheduler(max_concurrency=4), deps, run_node)
+
+    assert order == ["fast", "after_fast", "slow"]
+
+
+async def test_failure_skips_dependents_only():
+    async def run_node(node_id, upstream):
+        if node_id == "code":
+            raise RuntimeError("agent error")
+        return node_id
+
+    deps = {"code": [], "review": ["code"], "deploy": ["review"], "docs": []}
+    outcomes = {o.node_id: o for o in await _run_all(DAGScheduler(), deps, run_node)}
+
+    assert outcomes["code"].status == "failed" and outcomes["code"].error == "agent error"
+    assert outcomes["review"].status == "skipped"
+    assert outcomes["deploy"].status == "skipped"
+    assert outcomes["docs"].status == "completed"
+
+
+async def test_stopping_iteration_cancels_running_nodes():
+    cancelled = asyncio.Event()
+
+    async def run_node(node_id, upstream):
+        if node_id == "slow":
+            try:
+                await asyncio.sleep(10)
+            finally:
+                cancelled.set()
+        return node_id
+
+    iterator = DAGScheduler().run({"fast": [], "slow": []}, run_node)
+    first = await iterator.__anext__()
+    await iterator.aclose()
+
+    assert first.node_id == "fast"
+    assert cancelled.is_set()
@@ -0,0 +1,177 @@
+"""
+Unit tests for the process-wide PostgreSQL pool registry: DSN resolution,
+pool naming and sharing, metered acquires and saturation stats.
+
+asyncpg.create_pool is replaced by a fake so no database is needed.
+"""
+
+import asyncio
+
+import pytest
+
+from shared.lib import db_pool as db_pool_module
+from shared.lib.db_pool import (
+    DEFAULT_POOL,
+    PoolRegistry,
+    default_dsn,
+    pool_acquire_seconds,
+    pool_acquire_timeouts_total,
+)
+from shared.lib.state_client import StateClient
+
+
+class FakeConnection:
+    async def execute(self, query, *args):
+        return "UPDATE 1"
+
+
+class FakePool:
+    def __init__(self, dsn, **kwargs):
+        self.dsn = dsn
+        self.kwargs = kwargs
+        self.closed = False
+        self.in_use = 0
+        self.acquire_delay = 0.0
+        self.acquire_timeouts = []
+
+    async def acquire(self, timeout=None):
+        self.acquire_timeouts.append(timeout)
+        if timeout is not None and self.acquire_delay > timeout:
+            await asyncio.sleep(timeout)
+            raise asyncio.TimeoutError()
+        await asyncio.sleep(self.acquire_delay)
+        self.in_use += 1
+        return FakeConnection()
+
+    async def release(self, conn):
+        self.in_use -= 1
+
+    def get_size(self):
+        return self.kwargs["max_size"]
+
+    def get_idle_size(self):
+        return self.get_size() - self.in_use
+
+    def get_max_size(self):
+        return self.kwargs["max_size"]
+
+    async def fetchval(self, query):
+        return 1
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def created(monkeypatch):
+    pools = []
+
+    async def create_pool(dsn, **kwargs):
+        await asyncio.sleep(0.01)
+        pool = FakePool(dsn, **kwargs)
+        pools.append(pool)
+        return pool
+
+    monkeypatch.setattr(db_pool_module.asyncpg, "create_pool", create_pool)
+    for var in ("DB_HOST", "DB_PASSWORD", "DB_PASSWORD_FILE", "POSTGRES_HOST", "POSTGRES_PASSWORD"):
+        monkeypatch.delenv(var, raising=False)
+    return pools
+
+
+def test_dsn_prefers_db_vars_and_falls_back_to_postgres_vars(monkeypatch, tmp_path):
+    secret = tmp_path / "pg_password"
+    secret.write_text("s3cret\n")
+    monkeypatch.setenv("POSTGRES_HOST", "pg-legacy")
+    monkeypatch.setenv("POSTGRES_PASSWORD_FILE", str(secret))
+    monkeypatch.delenv("DB_HOST", raising=False)
+    monkeypatch.delenv("DB_PASSWORD", raising=False)
+    monkeypatch.delenv("POSTGRES_PASSWORD", raising=False)
+
+    assert "s3cret@pg-legacy:" in default_dsn()
+
+    monkeypatch.setenv("DB_HOST", "pg-main")
+    assert "@pg-main:" in default_dsn()
+
+
+async def test_components_share_the_default_pool(created):
+    registry = PoolRegistry()
+
+    pools = await asyncio.gather(
+        registry.get_pool(),
+        registry.get_pool(),
+        registry.get_pool(dsn=default_dsn()),
+    )
+
+    assert len(created) == 1
+    assert all(pool is pools[0] for pool in pools)
+    assert pools[0].pool is created[0]
+
+
+async def test_equal_dsns_share_a_named_pool(created):
+    registry = PoolRegistry()
+    dsn = "postgresql://locks:pw@pg-locks:5432/devtools"
+
+    first = await registry.get_pool(dsn=dsn)
+    second = await registry.get_pool(dsn=dsn)
+
+    assert first is second
+    assert registry.pool_name_for(dsn) == "locks@pg-locks:5432/devtools"
+    assert list(registry.get_stats()) == ["locks@pg-locks:5432/devtools"]
+
+
+async def test_statement_cache_and_size_come_from_env(created, monkeypatch):
+    monkeypatch.setenv("PG_POOL_MAX_SIZE", "4")
+    monkeypatch.setenv("PG_STATEMENT_CACHE_SIZE", "0")
+
+    await PoolRegistry().get_pool()
+
+    assert created[0].kwargs["max_size"] == 4
+    assert created[0].kwargs["statement_cache_size"] == 0
+
+
+async def test_stats_health_and_close(created):
+    registry = PoolRegistry()
+    pool = await registry.get_pool()
+    created[0].in_use = 5
+
+    assert registry.get_stats()[DEFAULT_POOL]["saturation"] == 0.5
+    assert (await registry.health_check())[DEFAULT_POOL]["healthy"] is True
+
+    await registry.close_all()
+    assert pool.closed
+    assert registry.get_stats() == {}
+
+
+def _observed(name):
+    sample = [s for s in pool_acquire_seconds.collect()[0].samples
+              if s.name.endswith("_count") and s.labels["pool"] == name]
+    return sample[0].value if sample else 0
+
+
+async def test_pool_acquire_is_bounded_and_counts_timeouts(created, monkeypatch):
+    monkeypatch.setenv("PG_POOL_ACQUIRE_TIMEOUT", "0.05")
+    registry = PoolRegistry()
+    pool = await registry.get_pool(dsn="postgresql://u:pw@pg-saturated:5432/db")
+    timeouts = pool_acquire_timeouts_total.labels(pool=pool.name)
+    before = timeouts._value.get()
+    created[0].acquire_delay = 1.0
+
+    with pytest.raises(asyncio.TimeoutError):
+        async with pool.acquire():
+            pass
+
+    assert created[0].acquire_timeouts == [0.05]
+    assert timeouts._value.get() == before + 1
+
+
+async def test_migrated_component_records_acquire_wait(created, monkeypatch):
+    registry = PoolRegistry()
+    monkeypatch.setattr(db_pool_module, "_registry", registry)
+    client = StateClient()
+    before = _observed(DEFAULT_POOL)
+
+    assert await client.update_task_status("t1", "done") is True
+
+    assert created[0].acquire_timeouts == [30.0]
+    assert _observed(DEFAULT_POOL) == before + 1
+    assert created[0].in_use == 0
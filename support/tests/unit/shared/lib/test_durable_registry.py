@@ -0,0 +1,171 @@
+"""
+Unit tests for DurableRegistry: bounded local LRU, write-through, lazy load
+from the shared store, local expiry, atomic pop and fallback when the store
+fails.
+
+A dict-backed store stands in for PostgreSQL/Redis; two registries sharing it
+behave like two workers.
+"""
+
+import asyncio
+
+import pytest
+
+from shared.lib.durable_registry import DurableRegistry, RegistryStore, create_registry_store, registry_size
+
+
+class MemoryStore(RegistryStore):
+    def __init__(self):
+        self.rows = {}
+        self.loads = 0
+        self.failing = False
+        self.schema_created = False
+
+    async def ensure_schema(self):
+        if self.failing:
+            raise ConnectionError("store down")
+        self.schema_created = True
+
+    async def load(self, key):
+        self.loads += 1
+        if self.failing:
+            raise ConnectionError("store down")
+        return self.rows.get(key)
+
+    async def save(self, key, value):
+        if self.failing:
+            raise ConnectionError("store down")
+        self.rows[key] = value
+
+    async def delete(self, key):
+        self.rows.pop(key, None)
+
+    async def pop(self, key):
+        if self.failing:
+            raise ConnectionError("store down")
+        await asyncio.sleep(0)  # let concurrent pops interleave
+        return self.rows.pop(key, None)
+
+
+class Task:
+    def __init__(self, task_id, status="pending"):
+        self.task_id = task_id
+        self.status = status
+
+
+def _registry(store, max_size=10, local_ttl_seconds=60):
+    return DurableRegistry(
+        "tasks_test",
+        store=store,
+        max_size=max_size,
+        local_ttl_seconds=local_ttl_seconds,
+        serialize=lambda task: {"task_id": task.task_id, "status": task.status},
+        deserialize=lambda raw: Task(raw["task_id"], raw["status"]),
+    )
+
+
+@pytest.fixture
+def store():
+    return MemoryStore()
+
+
+async def test_write_through_and_lazy_load_across_workers(store):
+    worker_a, worker_b = _registry(store), _registry(store)
+
+    await worker_a.aset("t1", Task("t1"))
+    assert store.rows["t1"] == {"task_id": "t1", "status": "pending"}
+
+    loaded = await worker_b.aget("t1")
+    assert loaded.task_id == "t1"
+
+    await worker_b.aget("t1")
+    assert store.loads == 1  # second read served locally
+
+
+async def test_local_tier_is_bounded(store):
+    registry = _registry(store, max_size=2)
+
+    for n in range(5):
+        await registry.aset(f"t{n}", Task(f"t{n}"))
+
+    assert len(registry) == 2
+    assert registry.keys() == ["t3", "t4"]
+    assert registry_size.labels(registry="tasks_test")._value.get() == 2
+    assert (await registry.aget("t0")).task_id == "t0"  # evicted locally, still in the store
+
+
+async def test_pop_removes_entry_for_every_worker(store):
+    worker_a, worker_b = _registry(store), _registry(store)
+    await worker_a.aset("t1", Task("t1"))
+
+    popped = await worker_b.apop("t1")
+
+    assert popped.task_id == "t1"
+    assert await worker_b.apop("t1") is None
+    assert "t1" not in store.rows
+
+
+async def test_concurrent_pops_hand_entry_to_one_worker(store):
+    workers = [_registry(store) for _ in range(3)]
+    await workers[0].aset("t1", Task("t1"))
+    for worker in workers:
+        await worker.aget("t1")  # every worker holds a local copy
+
+    popped = await asyncio.gather(*(worker.apop("t1") for worker in workers))
+
+    assert [task.task_id for task in popped if task is not None] == ["t1"]
+
+
+async def test_local_copies_expire_so_updates_are_seen(store):
+    worker_a, worker_b = _registry(store), _registry(store, local_ttl_seconds=0.05)
+    await worker_a.aset("t1", Task("t1"))
+    assert (await worker_b.aget("t1")).status == "pending"
+
+    await worker_a.aset("t1", Task("t1", status="running"))
+    assert (await worker_b.aget("t1")).status == "pending"  # within the local TTL
+
+    await asyncio.sleep(0.06)
+    assert (await worker_b.aget("t1")).status == "running"
+
+
+async def test_memory_registry_entries_do_not_expire():
+    registry = DurableRegistry("tasks_memory", local_ttl_seconds=0.01)
+    await registry.aset("t1", Task("t1"))
+
+    await asyncio.sleep(0.02)
+
+    assert (await registry.apop("t1")).task_id == "t1"
+    assert await registry.apop("t1") is None
+
+
+async def test_missing_entry_returns_default(store):
+    registry = _registry(store)
+
+    assert await registry.aget("unknown") is None
+    assert await registry.aget("unknown", "fallback") == "fallback"
+
+
+async def test_store_failures_fall_back_to_local(store):
+    registry = _registry(store, local_ttl_seconds=0.01)
+    store.failing = True
+
+    await registry.aensure_schema()
+    await registry.aset("t1", Task("t1"))
+    await asyncio.sleep(0.02)
+
+    # Never stored, so the local copy must outlive the local TTL
+    assert (await registry.aget("t1")).task_id == "t1"
+    assert await registry.aget("t2") is None
+    assert (await registry.apop("t1")).task_id == "t1"
+
+
+async def test_ensure_schema_creates_store_table(store):
+    await _registry(store).aensure_schema()
+
+    assert store.schema_created
+
+
+def test_memory_backend_has_no_store():
+    assert create_registry_store("tasks", backend="memory") is None
+    with pytest.raises(ValueError):
+        create_registry_store("tasks", backend="sqlite")
@@ -0,0 +1,131 @@
+"""
+Unit tests for cross-node agent request/response over Redis.
+
+Two EventBus instances share one fakeredis server, standing in for two
+orchestrator replicas behind a load balancer.
+"""
+
+import asyncio
+
+import fakeredis
+import pytest
+
+from shared.lib import event_bus as event_bus_module
+from shared.lib.agent_events import (
+    AgentRequestEvent,
+    AgentRequestType,
+    AgentResponseEvent,
+    AgentResponseStatus,
+)
+from shared.lib.event_bus import EventBus
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        event_bus_module.redis,
+        "from_url",
+        lambda url, **kwargs: fakeredis.FakeAsyncRedis(server=server, **kwargs),
+    )
+    return server
+
+
+@pytest.fixture
+async def nodes(redis_server):
+    node_a, node_b = EventBus(), EventBus()
+    await node_a.connect()
+    await node_b.connect()
+    # Let both listeners finish subscribing
+    await asyncio.sleep(0.05)
+    yield node_a, node_b
+    await node_a.close(drain_timeout=0)
+    await node_b.close(drain_timeout=0)
+
+
+def _request(timeout: float = 2.0) -> AgentRequestEvent:
+    return AgentRequestEvent(
+        source_agent="orchestrator",
+        target_agent="code-review",
+        request_type=AgentRequestType.REVIEW_CODE,
+        payload={"file_path": "main.py"},
+        timeout_seconds=timeout,
+    )
+
+
+def _respond(bus: EventBus, delay: float = 0.0):
+    async def handler(event):
+        await asyncio.sleep(delay)
+        await bus.respond_to_request(
+            AgentResponseEvent(
+                request_id=event.data["request_id"],
+                source_agent="code-review",
+                target_agent=event.data["source_agent"],
+                status=AgentResponseStatus.SUCCESS,
+                result={"handled_by": bus.node_id},
+            )
+        )
+
+    return handler
+
+
+async def test_reply_from_other_node_resolves_request(nodes):
+    node_a, node_b = nodes
+    node_b.subscribe("agent_request", _respond(node_b))
+
+    response = await node_a.request_agent(_request())
+
+    assert response.status == AgentResponseStatus.SUCCESS
+    assert response.result == {"handled_by": node_b.node_id}
+    assert node_b.get_stats()["redis_replies_sent"] == 1
+    assert node_a.get_stats()["redis_replies_received"] == 1
+
+
+async def test_reply_channels_are_per_node(nodes):
+    node_a, node_b = nodes
+
+    assert node_a.reply_channel != node_b.reply_channel
+    assert node_a.reply_channel.endswith(node_a.node_id)
+
+
+async def test_remote_timeout_returns_timeout_response(nodes):
+    node_a, _ = nodes
+
+    response = await node_a.request_agent(_request(timeout=0.1))
+
+    assert response.status == AgentResponseStatus.TIMEOUT
+    assert node_a.get_stats()["agent_timeouts"] == 1
+    assert node_a._pending_requests == {}
+
+
+async def test_late_reply_is_discarded(nodes):
+    node_a, node_b = nodes
+    node_b.subscribe("agent_request", _respond(node_b, delay=0.3))
+
+    response = await node_a.request_agent(_request(timeout=0.1))
+    assert response.status == AgentResponseStatus.TIMEOUT
+
+    await asyncio.sleep(0.4)
+    # The route expired with the requester's deadline, so the responder
+    # drops the reply instead of sending it
+    assert node_b.get_stats()["late_replies_discarded"] == 1
+    assert node_b.get_stats()["redis_replies_sent"] == 0
+    assert node_a.get_stats()["agent_responses_received"] == 0
+
+
+async def test_reply_arriving_after_timeout_is_discarded(nodes):
+    node_a, _ = nodes
+
+    node_a._resolve_pending_request({"request_id": "unknown-request"})
+
+    assert node_a.get_stats()["late_replies_discarded"] == 1
+
+
+async def test_local_responder_still_resolves_directly(nodes):
+    node_a, _ = nodes
+    node_a.subscribe("agent_request", _respond(node_a))
+
+    response = await node_a.request_agent(_request())
+
+    assert response.result == {"handled_by": node_a.node_id}
+    assert node_a.get_stats()["redis_replies_sent"] == 0
@@ -0,0 +1,128 @@
+"""
+Unit tests for EventBus batched Redis publishing and wire codecs.
+"""
+
+import asyncio
+import json
+
+import fakeredis
+import pytest
+
+from shared.lib import event_bus as event_bus_module
+from shared.lib.event_bus import ENVELOPE_MAGIC, EventBus, EventCodec
+
+EVENT = {"event_id": "e1", "event_type": "task_completed", "payload": {"n": 1}}
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson", "msgpack"])
+def test_codec_round_trip(codec):
+    if codec != "json":
+        pytest.importorskip(codec)
+
+    encoded = EventCodec(codec).encode(EVENT)
+
+    assert EventCodec.decode(encoded) == EVENT
+
+
+def test_json_codecs_stay_readable_by_older_nodes():
+    for codec in ("json", "orjson"):
+        assert json.loads(EventCodec(codec).encode(EVENT)) == EVENT
+
+
+def test_decodes_legacy_text_messages():
+    assert EventCodec.decode(json.dumps(EVENT)) == EVENT
+
+
+def test_rejects_newer_schema_version():
+    raw = ENVELOPE_MAGIC + bytes((99, 1)) + b"..."
+
+    with pytest.raises(ValueError, match="schema version"):
+        EventCodec.decode(raw)
+
+
+def test_unknown_codec_falls_back_to_json():
+    assert EventCodec("protobuf").name == "json"
+
+
+@pytest.fixture
+async def make_node(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        event_bus_module.redis,
+        "from_url",
+        lambda url, **kwargs: fakeredis.FakeAsyncRedis(server=server, **kwargs),
+    )
+    created = []
+
+    async def factory(node_id, codec="json", linger_ms="2", batch_size="256", subscribe=None):
+        monkeypatch.setenv("EVENT_BUS_NODE_ID", node_id)
+        monkeypatch.setenv("EVENT_BUS_CODEC", codec)
+        monkeypatch.setenv("EVENT_BUS_PUBLISH_LINGER_MS", linger_ms)
+        monkeypatch.setenv("EVENT_BUS_PUBLISH_BATCH_SIZE", batch_size)
+        bus = EventBus()
+        received = []
+        if subscribe:
+            async def record(event):
+                received.append(event.data)
+            bus.subscribe(subscribe, record)
+        await bus.connect()
+        await asyncio.sleep(0.05)
+        created.append(bus)
+        return bus, received
+
+    yield factory
+    for bus in created:
+        await bus.close(drain_timeout=0)
+
+
+async def test_publishes_within_linger_window_share_one_batch(make_node):
+    node_a, _ = await make_node("node-a", linger_ms="50")
+    _, received = await make_node("node-b", subscribe="task_completed")
+
+    for n in range(10):
+        await node_a.emit("task_completed", {"n": n}, source="a")
+    assert node_a.get_stats()["redis_events_published"] == 0
+
+    await asyncio.sleep(0.15)
+    assert node_a.get_stats()["redis_publish_batches"] == 1
+    assert [data["n"] for data in received] == list(range(10))
+
+
+async def test_full_batches_are_sent_without_waiting(make_node):
+    node_a, _ = await make_node("node-a", linger_ms="10000", batch_size="4")
+
+    for n in range(8):
+        await node_a.emit("task_completed", {"n": n}, source="a")
+    await asyncio.sleep(0.05)
+
+    assert node_a.get_stats()["redis_events_published"] == 8
+    assert node_a.get_stats()["redis_publish_batches"] == 2
+
+
+async def test_close_flushes_pending_publishes(make_node):
+    node_a, _ = await make_node("node-a", linger_ms="10000")
+
+    await node_a.emit("task_completed", {}, source="a")
+    await node_a.close(drain_timeout=0)
+
+    assert node_a.get_stats()["redis_events_published"] == 1
+
+
+async def test_linger_zero_publishes_immediately(make_node):
+    node_a, _ = await make_node("node-a", linger_ms="0")
+
+    await node_a.emit("task_completed", {}, source="a")
+
+    assert node_a.get_stats()["redis_events_published"] == 1
+    assert node_a.get_stats()["redis_publish_batches"] == 0
+
+
+async def test_mixed_codec_nodes_interoperate(make_node):
+    pytest.importorskip("msgpack")
+    node_a, _ = await make_node("node-a", codec="msgpack")
+    _, received = await make_node("node-b", codec="json", subscribe="task_completed")
+
+    await node_a.emit("task_completed", {"n": 1}, source="a")
+    await asyncio.sleep(0.1)
+
+    assert received == [{"n": 1}]
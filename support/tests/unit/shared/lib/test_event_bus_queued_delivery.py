@@ -0,0 +1,199 @@
+"""
+Unit tests for EventBus queued (fire-and-forget) delivery.
+
+Covers non-blocking emit, priority ordering and each overflow policy.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from shared.lib.event_bus import DeliveryOptions, EventBus, OverflowPolicy
+
+
+@pytest.fixture
+async def bus():
+    event_bus = EventBus()
+    yield event_bus
+    await event_bus.close(drain_timeout=1.0)
+
+
+async def test_emit_does_not_wait_for_queued_subscriber(bus):
+    delivered = []
+
+    async def slow_notifier(event):
+        await asyncio.sleep(0.3)
+        delivered.append(event.data["n"])
+
+    bus.subscribe("approval_required", slow_notifier, delivery=DeliveryOptions())
+
+    started = time.monotonic()
+    await bus.emit("approval_required", {"n": 1}, source="test")
+    assert time.monotonic() - started < 0.1
+    assert delivered == []
+
+    await bus.drain()
+    assert delivered == [1]
+    assert bus.get_stats()["events_delivered"] == 1
+
+
+async def test_direct_subscribers_still_awaited(bus):
+    delivered = []
+
+    async def direct(event):
+        delivered.append("direct")
+
+    async def queued(event):
+        await asyncio.sleep(0.05)
+        delivered.append("queued")
+
+    bus.subscribe("task_completed", direct)
+    bus.subscribe("task_completed", queued, delivery=DeliveryOptions())
+
+    await bus.emit("task_completed", {}, source="test")
+    assert delivered == ["direct"]
+
+    await bus.drain()
+    assert delivered == ["direct", "queued"]
+
+
+async def test_higher_priority_events_delivered_first(bus):
+    gate = asyncio.Event()
+    delivered = []
+
+    async def subscriber(event):
+        await gate.wait()
+        delivered.append(event.data["name"])
+
+    bus.subscribe("work", subscriber, delivery=DeliveryOptions())
+
+    # First event occupies the worker; the rest queue up behind it
+    await bus.emit("work", {"name": "first"}, source="test")
+    await asyncio.sleep(0)
+    await bus.emit("work", {"name": "low"}, source="test", priority=0)
+    await bus.emit("work", {"name": "high"}, source="test", priority=10)
+    await bus.emit("work", {"name": "low-2"}, source="test", priority=0)
+
+    gate.set()
+    await bus.drain()
+    assert delivered == ["first", "high", "low", "low-2"]
+
+
+async def _fill(bus, policy, count, max_queue_size=2, **options):
+    gate = asyncio.Event()
+    delivered = []
+
+    async def subscriber(event):
+        await gate.wait()
+        delivered.append(event.data["n"])
+
+    bus.subscribe(
+        "work",
+        subscriber,
+        delivery=DeliveryOptions(max_queue_size=max_queue_size, overflow=policy, **options),
+    )
+    # Let the worker pick up the first event so the queue holds the rest
+    await bus.emit("work", {"n": 0}, source="test")
+    await asyncio.sleep(0)
+    for n in range(1, count):
+        await bus.emit("work", {"n": n}, source="test")
+    return gate, delivered
+
+
+async def test_drop_policy_discards_overflow(bus):
+    gate, delivered = await _fill(bus, OverflowPolicy.DROP, count=5)
+
+    gate.set()
+    await bus.drain()
+    assert delivered == [0, 1, 2]
+    assert bus.get_stats()["events_dropped"] == 2
+
+
+async def test_spill_policy_keeps_overflow(bus):
+    gate, delivered = await _fill(bus, OverflowPolicy.SPILL, count=6)
+
+    queue_stats = bus.get_queue_stats()["work:subscriber"]
+    assert queue_stats["spilled"] == 3
+    assert queue_stats["depth"] == 5
+
+    gate.set()
+    await bus.drain()
+    assert delivered == [0, 1, 2, 3, 4, 5]
+    assert bus.get_stats()["events_spilled"] == 3
+    assert bus.get_stats()["events_dropped"] == 0
+
+
+async def test_new_events_do_not_overtake_spilled_ones(bus):
+    permits = asyncio.Semaphore(0)
+    delivered = []
+
+    async def subscriber(event):
+        await permits.acquire()
+        delivered.append(event.data["n"])
+
+    bus.subscribe(
+        "work",
+        subscriber,
+        delivery=DeliveryOptions(max_queue_size=1, overflow=OverflowPolicy.SPILL),
+    )
+    for n in range(3):  # 0 in the worker, 1 queued, 2 spilled
+        await bus.emit("work", {"n": n}, source="test")
+        await asyncio.sleep(0)
+
+    # Deliver 0; the worker takes 1, leaving room in the queue while 2 is spilled
+    permits.release()
+    await asyncio.sleep(0.01)
+    await bus.emit("work", {"n": 3}, source="test")
+
+    for _ in range(3):
+        permits.release()
+    await bus.drain()
+    assert delivered == [0, 1, 2, 3]
+
+
+async def test_failed_deliveries_are_not_counted(bus):
+    async def broken(event):
+        raise RuntimeError("handler failed")
+
+    bus.subscribe("work", broken, delivery=DeliveryOptions())
+    await bus.emit("work", {}, source="test")
+    await bus.drain()
+
+    assert bus.get_stats()["events_delivered"] == 0
+    assert bus.get_stats()["subscriber_errors"] == 1
+
+
+async def test_spill_buffer_is_bounded(bus):
+    gate, delivered = await _fill(bus, OverflowPolicy.SPILL, count=6, spill_max_size=1)
+
+    gate.set()
+    await bus.drain()
+    assert delivered == [0, 1, 2, 3]
+    assert bus.get_stats()["events_dropped"] == 2
+
+
+async def test_block_policy_applies_backpressure(bus):
+    gate, delivered = await _fill(bus, OverflowPolicy.BLOCK, count=3)
+
+    blocked_emit = asyncio.create_task(bus.emit("work", {"n": 3}, source="test"))
+    await asyncio.sleep(0.05)
+    assert not blocked_emit.done()
+
+    gate.set()
+    await blocked_emit
+    await bus.drain()
+    assert delivered == [0, 1, 2, 3]
+    assert bus.get_stats()["events_blocked"] == 1
+
+
+async def test_unsubscribe_stops_queued_workers(bus):
+    async def subscriber(event):
+        pass
+
+    bus.subscribe("work", subscriber, delivery=DeliveryOptions())
+    await bus.emit("work", {}, source="test")
+    await bus.drain()
+
+    bus.unsubscribe("work", subscriber)
+    assert bus.get_queue_stats() == {}
@@ -0,0 +1,209 @@
+"""
+Unit tests for EventBus Redis transports: sharded pub/sub channels with
+pattern subscriptions and echo suppression, the Streams backend, and the
+legacy single channel kept for rolling deploys.
+"""
+
+import asyncio
+import json
+
+import fakeredis
+import pytest
+
+from shared.lib import event_bus as event_bus_module
+from shared.lib.event_bus import EventBus
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        event_bus_module.redis,
+        "from_url",
+        lambda url, **kwargs: fakeredis.FakeAsyncRedis(server=server, **kwargs),
+    )
+    monkeypatch.setenv("EVENT_BUS_STREAM_BLOCK_MS", "20")
+    return server
+
+
+@pytest.fixture
+async def make_node(redis_server, monkeypatch):
+    created = []
+
+    async def factory(node_id: str, transport: str = "pubsub", subscriptions=None, legacy=None):
+        monkeypatch.setenv("EVENT_BUS_NODE_ID", node_id)
+        monkeypatch.setenv("EVENT_BUS_TRANSPORT", transport)
+        if legacy:
+            monkeypatch.setenv("EVENT_BUS_LEGACY_CHANNEL", legacy)
+        else:
+            monkeypatch.delenv("EVENT_BUS_LEGACY_CHANNEL", raising=False)
+        bus = EventBus()
+        received = []
+        for event_type in subscriptions or []:
+            async def record(event, _subscribed=event_type):
+                received.append((_subscribed, event.type))
+            bus.subscribe(event_type, record)
+        await bus.connect()
+        await asyncio.sleep(0.05)
+        created.append(bus)
+        return bus, received
+
+    yield factory
+    for bus in created:
+        await bus.close(drain_timeout=0)
+
+
+async def _settle():
+    await asyncio.sleep(0.15)
+
+
+async def test_node_only_receives_subscribed_event_types(make_node):
+    node_a, _ = await make_node("node-a")
+    node_b, received = await make_node("node-b", subscriptions=["task_completed"])
+
+    await node_a.emit("task_completed", {}, source="a")
+    await node_a.emit("approval_required", {}, source="a")
+    await _settle()
+
+    assert received == [("task_completed", "task_completed")]
+    assert node_b.get_stats()["redis_events_received"] == 1
+
+
+async def test_own_events_are_not_redispatched(make_node):
+    node_a, received = await make_node("node-a", subscriptions=["task_completed"])
+
+    await node_a.emit("task_completed", {}, source="a")
+    await _settle()
+
+    assert received == [("task_completed", "task_completed")]
+    assert node_a.get_stats()["redis_echoes_suppressed"] == 1
+
+
+async def test_pattern_subscription(make_node):
+    node_a, _ = await make_node("node-a")
+    _, received = await make_node("node-b", subscriptions=["task.*"])
+
+    await node_a.emit("task.delegated", {}, source="a")
+    await node_a.emit("resource.locked", {}, source="a")
+    await _settle()
+
+    assert received == [("task.*", "task.delegated")]
+
+
+async def test_overlapping_subscriptions_dispatch_once(make_node):
+    node_a, _ = await make_node("node-a")
+    node_b, received = await make_node("node-b", subscriptions=["task.*", "task.failed"])
+
+    await node_a.emit("task.failed", {}, source="a")
+    await _settle()
+
+    assert sorted(received) == [("task.*", "task.failed"), ("task.failed", "task.failed")]
+    assert node_b.get_stats()["redis_duplicates_skipped"] == 1
+
+
+async def test_legacy_nodes_receive_events_during_rollout(make_node, redis_server):
+    old_node = fakeredis.FakeAsyncRedis(server=redis_server).pubsub()
+    await old_node.subscribe("agent-events")
+    await old_node.get_message(timeout=0.1)  # subscribe confirmation
+    node_a, _ = await make_node("node-a", legacy="dual")
+
+    await node_a.emit("task_completed", {"n": 1}, source="a")
+    message = await old_node.get_message(ignore_subscribe_messages=True, timeout=1.0)
+
+    assert json.loads(message["data"])["event_type"] == "task_completed"
+    await old_node.aclose()
+
+
+async def test_legacy_channel_is_off_by_default(make_node, redis_server):
+    old_node = fakeredis.FakeAsyncRedis(server=redis_server).pubsub()
+    await old_node.subscribe("agent-events")
+    await old_node.get_message(timeout=0.1)  # subscribe confirmation
+    node_a, _ = await make_node("node-a")
+
+    await node_a.emit("task_completed", {"n": 1}, source="a")
+    await node_a.flush()
+
+    assert await old_node.get_message(ignore_subscribe_messages=True, timeout=0.2) is None
+    assert b"agent-events" not in node_a.redis_pubsub.channels
+    assert node_a.get_stats()["redis_events_published"] == 1
+    await old_node.aclose()
+
+
+async def test_events_from_legacy_nodes_are_dispatched(make_node, redis_server):
+    _, received = await make_node("node-b", subscriptions=["task_completed"], legacy="subscribe")
+
+    old_node = fakeredis.FakeAsyncRedis(server=redis_server)
+    await old_node.publish(
+        "agent-events",
+        json.dumps({"event_type": "task_completed", "source_agent": "old", "payload": {}}),
+    )
+    await _settle()
+
+    assert received == [("task_completed", "task_completed")]
+
+
+async def test_dual_published_events_dispatch_once(make_node):
+    node_a, _ = await make_node("node-a", legacy="dual")
+    node_b, received = await make_node("node-b", subscriptions=["task_completed"], legacy="dual")
+
+    await node_a.emit("task_completed", {}, source="a")
+    await _settle()
+
+    assert received == [("task_completed", "task_completed")]
+    assert node_b.get_stats()["redis_duplicates_skipped"] == 1
+
+
+async def test_subscribing_after_connect_adds_channel(make_node):
+    node_a, _ = await make_node("node-a")
+    node_b, received = await make_node("node-b")
+
+    async def record(event):
+        received.append(event.type)
+
+    node_b.subscribe("task_failed", record)
+    await asyncio.sleep(0.05)
+    await node_a.emit("task_failed", {}, source="a")
+    await _settle()
+
+    assert received == ["task_failed"]
+
+
+async def test_streams_transport_delivers_and_acks(make_node):
+    node_a, _ = await make_node("node-a", transport="streams")
+    node_b, received = await make_node("node-b", transport="streams", subscriptions=["task_completed"])
+
+    await node_a.emit("task_completed", {}, source="a")
+    await _settle()
+
+    assert received == [("task_completed", "task_completed")]
+    assert node_b.get_stats()["stream_entries_acked"] == 1
+
+
+async def test_streams_replay_events_missed_while_down(make_node):
+    node_a, _ = await make_node("node-a", transport="streams")
+    node_b, _ = await make_node("node-b", transport="streams", subscriptions=["task_completed"])
+    await node_b.close(drain_timeout=0)
+
+    await node_a.emit("task_completed", {"n": 1}, source="a")
+    _, received = await make_node("node-b", transport="streams", subscriptions=["task_completed"])
+    await _settle()
+
+    assert received == [("task_completed", "task_completed")]
+
+
+async def test_streams_replay_unacked_entries(make_node, redis_server):
+    node_a, _ = await make_node("node-a", transport="streams")
+    node_b, _ = await make_node("node-b", transport="streams", subscriptions=["task_completed"])
+    await node_b.close(drain_timeout=0)
+
+    # Simulate node-b crashing after reading an entry but before acking it
+    await node_a.emit("task_completed", {}, source="a")
+    client = fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True)
+    await client.xreadgroup("node-b", "node-b", {"agent-stream:task_completed": ">"})
+
+    node_b, received = await make_node("node-b", transport="streams", subscriptions=["task_completed"])
+    await _settle()
+
+    assert received == [("task_completed", "task_completed")]
+    pending = await client.xpending("agent-stream:task_completed", "node-b")
+    assert pending["pending"] == 0
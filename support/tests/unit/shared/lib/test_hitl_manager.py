@@ -0,0 +1,152 @@
+"""
+Unit tests for HITLManager pending-queue queries and backlog metrics.
+
+A fake psycopg connection records the SQL issued, so no database is needed.
+"""
+
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+from shared.lib.hitl_manager import HITLManager, approval_backlog, approval_timeouts, decode_cursor
+
+
+class FakeConnection:
+    def __init__(self, rows=None):
+        self.rows = rows or []
+        self.results = []  # per-fetch rows, used before falling back to rows
+        self.executed = []
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @asynccontextmanager
+    async def cursor(self):
+        yield self
+
+    async def execute(self, query, params=None):
+        self.executed.append((" ".join(query.split()), params))
+
+    async def fetchall(self):
+        return self.results.pop(0) if self.results else self.rows
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _pending_row(n):
+    created = datetime(2026, 1, 1) + timedelta(minutes=n)
+    return (
+        uuid.uuid4(), f"wf-{n}", "deploy", "Deploy", "infrastructure", "low",
+        "deploy", "prod", created, created + timedelta(hours=1),
+    )
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = HITLManager()
+    manager.policies = {
+        "roles": {
+            "developer": {"can_approve": ["low"]},
+            "tech_lead": {"can_approve": ["low", "medium", "high"]},
+        }
+    }
+    manager.db = FakeConnection()
+
+    async def get_connection():
+        return manager.db
+
+    monkeypatch.setattr(manager, "_get_connection", get_connection)
+    return manager
+
+
+async def test_role_filter_is_applied_in_sql(manager):
+    await manager.list_pending_page(approver_role="tech_lead", limit=10)
+
+    query, params = manager.db.executed[0]
+    assert "risk_level = ANY(%s)" in query
+    assert params == [["high", "low", "medium"], 11]
+
+
+async def test_risk_filter_intersects_role(manager):
+    await manager.list_pending_page(approver_role="tech_lead", risk_levels=["high", "critical"])
+
+    assert manager.db.executed[0][1][0] == ["high"]
+
+
+async def test_role_without_approvals_skips_query(manager):
+    results, next_cursor = await manager.list_pending_page(approver_role="guest")
+
+    assert results == [] and next_cursor is None
+    assert manager.db.executed == []
+
+
+async def test_keyset_pagination(manager):
+    manager.db.rows = [_pending_row(n) for n in (5, 4, 3)]
+
+    results, next_cursor = await manager.list_pending_page(limit=2)
+
+    assert [r["workflow_id"] for r in results] == ["wf-5", "wf-4"]
+    assert decode_cursor(next_cursor) == (manager.db.rows[1][8], str(manager.db.rows[1][0]))
+
+    manager.db.rows = [_pending_row(3)]
+    results, last_cursor = await manager.list_pending_page(limit=2, cursor=next_cursor)
+
+    query, params = manager.db.executed[-1]
+    assert "(created_at, id) < (%s, %s::uuid)" in query
+    assert params[:2] == list(decode_cursor(next_cursor))
+    assert len(results) == 1 and last_cursor is None
+
+
+async def test_invalid_cursor_rejected(manager):
+    with pytest.raises(ValueError):
+        await manager.list_pending_page(cursor="not-a-cursor")
+
+
+async def test_backlog_gauge_reads_maintained_counts(manager):
+    manager.db.rows = [("high", 3), ("low", 7)]
+
+    await manager._update_backlog_metrics()
+
+    statements = [query for query, _ in manager.db.executed]
+    assert statements == ["SELECT risk_level, pending FROM approval_backlog_counts"]
+    assert manager.db.commits == 0
+    assert approval_backlog.labels(risk_level="high")._value.get() == 3
+    assert approval_backlog.labels(risk_level="critical")._value.get() == 0
+
+
+async def test_expiry_sweep_records_timeouts(manager):
+    timeouts = approval_timeouts.labels(agent="sweep-agent", risk_level="high")
+    before = timeouts._value.get()
+    created = datetime.utcnow() - timedelta(hours=2)
+    manager.db.results = [
+        [("r1", "sweep-agent", "high", created), ("r2", "sweep-agent", "high", created)],
+        [("high", 0)],
+    ]
+
+    assert await manager.expire_stale_requests() == 2
+
+    expire, backlog = [query for query, _ in manager.db.executed]
+    assert expire.startswith("UPDATE approval_requests SET status = 'expired'")
+    assert "status = 'pending' AND expires_at <= NOW()" in expire
+    assert "approval_backlog_counts" in backlog
+    assert timeouts._value.get() == before + 2
+
+
+async def test_mark_expired_counts_timeout_once(manager):
+    timeouts = approval_timeouts.labels(agent="check-agent", risk_level="low")
+    before = timeouts._value.get()
+    created = datetime.utcnow() - timedelta(hours=2)
+    manager.db.results = [[("r1", "check-agent", "low", created)], [], []]
+
+    assert await manager._mark_expired("r1") is True
+    assert await manager._mark_expired("r1") is False  # the sweep got there first
+
+    assert manager.db.executed[0][1] == ("r1",)
+    assert timeouts._value.get() == before + 1
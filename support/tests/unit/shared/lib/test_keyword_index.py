@@ -0,0 +1,105 @@
+"""
+Unit tests for the precompiled keyword matcher and its use in
+ProgressiveMCPLoader tool selection.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from shared.lib.keyword_index import KeywordIndex
+from shared.lib.progressive_mcp_loader import ProgressiveMCPLoader, ToolLoadingStrategy
+
+
+def brute_force(mapping, text):
+    matched = set()
+    for keyword, values in mapping.items():
+        if keyword in text.lower():
+            matched.update(values)
+    return matched
+
+
+def brute_force_fragment(mapping, fragment):
+    matched = set()
+    fragment = fragment.lower()
+    for keyword, values in mapping.items():
+        if fragment in keyword or keyword in fragment:
+            matched.update(values)
+    return matched
+
+
+@pytest.fixture
+def loader():
+    discovery = MagicMock()
+    discovery.discover_servers.return_value = {
+        "servers": [
+            {"name": "memory", "tools": ["create_entities"]},
+            {"name": "gitmcp", "tools": ["git_commit", "create_pr"]},
+            {"name": "dockerhub", "tools": ["build"]},
+            {"name": "rust-mcp-filesystem", "tools": ["read_file"]},
+        ]
+    }
+    mcp_client = MagicMock()
+    mcp_client.profile = {}
+    return ProgressiveMCPLoader(mcp_client, discovery)
+
+
+class TestKeywordIndex:
+    """Aho-Corasick matcher must agree with naive substring scans."""
+
+    MAPPING = {
+        "he": ["a"],
+        "she": ["b"],
+        "his": ["c"],
+        "hers": ["d"],
+        "pull request": ["git"],
+        "pr": ["git2"],
+    }
+
+    @pytest.mark.parametrize(
+        "text",
+        ["ushers", "his hershey", "open a Pull Request", "nothing", "", "prpr"],
+    )
+    def test_match_equals_brute_force(self, text):
+        index = KeywordIndex(self.MAPPING)
+        assert index.match(text) == brute_force(self.MAPPING, text)
+
+    @pytest.mark.parametrize("fragment", ["request", "she", "shell", "pu", "xyz"])
+    def test_match_fragment_equals_brute_force(self, fragment):
+        index = KeywordIndex(self.MAPPING)
+        assert index.match_fragment(fragment) == brute_force_fragment(
+            self.MAPPING, fragment
+        )
+
+    def test_loader_mapping_equivalence(self, loader):
+        text = "Implement a GitHub Actions pipeline to deploy the docker image and notify"
+        assert loader._keyword_index.match(text) == brute_force(
+            loader.keyword_to_servers, text
+        )
+
+
+class TestLoaderServerTable:
+    """Server -> tools table is built once and rebuilt on discovery refresh."""
+
+    def test_table_built_once(self, loader):
+        loader.get_tools_for_task("commit the code", strategy=ToolLoadingStrategy.MINIMAL)
+        loader.get_tools_for_task("build docker image", strategy=ToolLoadingStrategy.MINIMAL)
+
+        assert loader.mcp_discovery.discover_servers.call_count == 1
+        loader.mcp_discovery.get_server.assert_not_called()
+
+    def test_refresh_rebuilds_table(self, loader):
+        assert loader._get_server_tools("time") == []
+
+        loader._on_discovery_refresh(
+            {"servers": [{"name": "time", "tools": ["get_current_time"]}]}
+        )
+
+        assert loader._get_server_tools("time") == ["get_current_time"]
+
+    def test_minimal_strategy_uses_keyword_index(self, loader):
+        toolsets = loader.get_tools_for_task(
+            "open a pull request", strategy=ToolLoadingStrategy.MINIMAL
+        )
+
+        assert {ts.server for ts in toolsets} == {"memory", "gitmcp"}
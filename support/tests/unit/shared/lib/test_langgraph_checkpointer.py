@@ -0,0 +1,181 @@
+"""
+Unit tests for BatchingAsyncPostgresSaver write batching and pruning.
+
+A fake psycopg pool records which connection checkout each statement ran on,
+so no database is needed.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from psycopg_pool import AsyncConnectionPool
+
+from shared.lib.langgraph_base import BatchingAsyncPostgresSaver
+
+
+class FakeCursor:
+    def __init__(self, pool, checkout):
+        self.pool = pool
+        self.checkout = checkout
+
+    async def execute(self, query, params=None, **kwargs):
+        self.pool.statements.append((self.checkout, query))
+
+    async def executemany(self, query, params, **kwargs):
+        self.pool.statements.append((self.checkout, query))
+
+    async def fetchone(self):
+        return None
+
+
+class FakeConnection:
+    def __init__(self, pool, checkout):
+        self.pool = pool
+        self.checkout = checkout
+
+    @asynccontextmanager
+    async def pipeline(self):
+        yield
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    @asynccontextmanager
+    async def cursor(self, **kwargs):
+        yield FakeCursor(self.pool, self.checkout)
+
+
+class FakePool(AsyncConnectionPool):
+    """Passes the saver's isinstance check without opening connections."""
+
+    def __init__(self):
+        self.statements = []
+        self.checkouts = 0
+
+    @asynccontextmanager
+    async def connection(self, timeout=None):
+        self.checkouts += 1
+        yield FakeConnection(self, self.checkouts)
+
+    def __del__(self):
+        pass
+
+
+def _config(thread_id="t1", checkpoint_id="c1"):
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": "", "checkpoint_id": checkpoint_id}}
+
+
+def _checkpoint(checkpoint_id):
+    return {
+        "v": 4,
+        "id": checkpoint_id,
+        "ts": "2026-01-01T00:00:00+00:00",
+        "channel_values": {"step": 1},
+        "channel_versions": {},
+        "versions_seen": {},
+    }
+
+
+@pytest.fixture
+async def make_saver():
+    savers = []
+
+    def factory(**kwargs):
+        pool = FakePool()
+        saver = BatchingAsyncPostgresSaver(pool, **kwargs)
+        savers.append(saver)
+        return saver, pool
+
+    yield factory
+    for saver in savers:
+        saver._pending_writes.clear()
+        await saver.aclose()
+
+
+async def test_task_writes_ride_along_with_next_checkpoint(make_saver):
+    saver, pool = make_saver(write_linger_seconds=10)
+
+    await saver.aput_writes(_config(), [("messages", "a")], task_id="task-a")
+    await saver.aput_writes(_config(), [("messages", "b")], task_id="task-b")
+    assert pool.statements == []
+
+    await saver.aput(_config(), _checkpoint("c2"), {}, {})
+
+    assert pool.checkouts == 1
+    queries = [query for _, query in pool.statements]
+    assert sum("checkpoint_writes" in q for q in queries) == 2
+    assert "checkpoints" in queries[-1]
+    assert saver.stats["batched_writes"] == 2
+
+
+async def test_interrupt_writes_are_not_buffered(make_saver):
+    saver, pool = make_saver(write_linger_seconds=10)
+
+    await saver.aput_writes(_config(), [("messages", "a")], task_id="task-a")
+    await saver.aput_writes(_config(), [("__interrupt__", {"value": "approve?"})], task_id="task-b")
+
+    # The interrupt goes out now, together with the writes queued before it
+    assert pool.checkouts == 1
+    assert len(pool.statements) == 2
+    assert saver._pending_writes == {}
+
+
+async def test_buffered_writes_flushed_after_linger(make_saver):
+    saver, pool = make_saver(write_linger_seconds=0.02)
+
+    await saver.aput_writes(_config(), [("messages", "a")], task_id="task-a")
+    await asyncio.sleep(0.1)
+
+    assert len(pool.statements) == 1
+
+
+async def test_reads_see_buffered_writes(make_saver):
+    saver, pool = make_saver(write_linger_seconds=10)
+    await saver.aput_writes(_config("t1"), [("messages", "a")], task_id="task-a")
+    await saver.aput_writes(_config("t2"), [("messages", "b")], task_id="task-b")
+
+    assert await saver.aget_tuple(_config("t1")) is None
+
+    # Only the thread being read is flushed
+    assert "checkpoint_writes" in pool.statements[0][1]
+    assert list(saver._pending_writes) == [("t2", "")]
+
+
+async def test_prune_keeps_latest_for_touched_threads(make_saver):
+    saver, pool = make_saver(prune_strategy="keep_latest")
+    calls = []
+
+    async def aprune(thread_ids, *, strategy="keep_latest"):
+        calls.append((list(thread_ids), strategy))
+        if thread_ids == ["delta"]:
+            raise NotImplementedError
+
+    saver.aprune = aprune
+    for thread_id in ("t1", "delta"):
+        await saver.aput(_config(thread_id), _checkpoint("c2"), {}, {})
+
+    assert await saver.prune() == 1
+    assert sorted(calls) == [(["delta"], "keep_latest"), (["t1"], "keep_latest")]
+
+    # Nothing written since the last pass
+    calls.clear()
+    assert await saver.prune() == 0
+    assert calls == []
+
+
+async def test_pruning_is_opt_in(make_saver):
+    saver, _ = make_saver()
+    calls = []
+
+    async def aprune(thread_ids, *, strategy="keep_latest"):
+        calls.append(list(thread_ids))
+
+    saver.aprune = aprune
+    await saver.aput(_config("t1"), _checkpoint("c2"), {}, {})
+    saver.start_pruning()
+
+    assert saver._prune_task is None
+    assert await saver.prune() == 0
+    assert calls == []
@@ -0,0 +1,106 @@
+"""
+Unit tests for cached, concurrent MCP server discovery.
+
+The Docker MCP Toolkit CLI is replaced with a fake async runner so the tests
+exercise caching and concurrency without Docker.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from shared.lib.mcp_discovery import MCPToolkitDiscovery
+
+SERVERS = ["memory", "github", "playwright", "notion"]
+INSPECT_DELAY = 0.1
+
+
+class FakeToolkit:
+    """Fake `docker mcp` CLI recording how many calls ran at once."""
+
+    def __init__(self):
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def run(self, cmd, timeout):
+        self.calls += 1
+        if cmd[3] == "list":
+            return 0, json.dumps(SERVERS), ""
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(INSPECT_DELAY)
+        self.in_flight -= 1
+        server = cmd[4]
+        return 0, json.dumps({"tools": [{"name": f"{server}_tool"}]}), ""
+
+
+@pytest.fixture
+def toolkit(monkeypatch):
+    fake = FakeToolkit()
+    monkeypatch.setattr(
+        MCPToolkitDiscovery, "_check_toolkit_available", lambda self: True
+    )
+    monkeypatch.setattr(MCPToolkitDiscovery, "_run_async", staticmethod(fake.run))
+    return fake
+
+
+async def test_refresh_inspects_servers_concurrently(toolkit, tmp_path):
+    discovery = MCPToolkitDiscovery(cache_path=tmp_path / "catalog.json")
+
+    started = time.monotonic()
+    catalog = await discovery.adiscover_servers()
+    elapsed = time.monotonic() - started
+
+    assert catalog["total_servers"] == len(SERVERS)
+    assert catalog["total_tools"] == len(SERVERS)
+    assert toolkit.max_in_flight == len(SERVERS)
+    assert elapsed < INSPECT_DELAY * len(SERVERS)
+
+
+async def test_concurrency_limit_is_respected(toolkit, tmp_path):
+    discovery = MCPToolkitDiscovery(cache_path=tmp_path / "catalog.json", concurrency=2)
+
+    await discovery.adiscover_servers()
+
+    assert toolkit.max_in_flight == 2
+
+
+async def test_cached_catalog_served_from_disk(toolkit, tmp_path):
+    cache_path = tmp_path / "catalog.json"
+    await MCPToolkitDiscovery(cache_path=cache_path).adiscover_servers()
+    calls_after_first = toolkit.calls
+
+    restarted = MCPToolkitDiscovery(cache_path=cache_path)
+    catalog = await restarted.adiscover_servers()
+
+    assert catalog["total_servers"] == len(SERVERS)
+    assert restarted.get_server("memory")["tools"] == ["memory_tool"]
+    assert toolkit.calls == calls_after_first
+
+
+async def test_stale_catalog_served_while_refreshing(toolkit, tmp_path):
+    discovery = MCPToolkitDiscovery(
+        cache_path=tmp_path / "catalog.json", cache_ttl_seconds=0
+    )
+    first = await discovery.adiscover_servers()
+    refreshed = []
+    discovery.add_refresh_listener(refreshed.append)
+
+    stale = discovery.discover_servers()
+
+    assert stale is first
+    assert not refreshed
+    await discovery._refresh_task
+    assert len(refreshed) == 1
+
+
+async def test_concurrent_callers_share_one_refresh(toolkit, tmp_path):
+    discovery = MCPToolkitDiscovery(cache_path=tmp_path / "catalog.json")
+
+    await asyncio.gather(*(discovery.refresh() for _ in range(5)))
+
+    assert toolkit.calls == 1 + len(SERVERS)
@@ -0,0 +1,82 @@
+"""
+Unit tests for the background memory-entity sink on MCPToolClient: batching,
+bounded buffering and flush on close.
+"""
+
+import asyncio
+
+import pytest
+
+from shared.lib.mcp_tool_client import MCPToolClient, _MemoryEntitySink
+
+
+class RecordingClient(MCPToolClient):
+    def __init__(self, fail=False, delay=0.0):
+        self.agent_name = "test"
+        self.calls = []
+        self.fail = fail
+        self.delay = delay
+
+    async def invoke_tool(self, server, tool, params=None):
+        await asyncio.sleep(self.delay)
+        self.calls.append((server, tool, [e["name"] for e in params["entities"]]))
+        if self.fail:
+            return {"success": False, "error": "memory server down"}
+        return {"success": True, "result": {}}
+
+
+def _sink(client, linger_ms=10, max_batch=50, max_pending=1000):
+    client._memory_sink = _MemoryEntitySink(client, linger_ms, max_batch, max_pending)
+    return client._memory_sink
+
+
+async def test_record_does_not_wait_and_batches_writes():
+    client = RecordingClient(delay=1.0)
+    sink = _sink(client)
+
+    for n in range(3):
+        client.record_memory_entity(f"e{n}", "orchestrator_event", [f"n={n}"])
+    assert client.calls == []
+
+    client.delay = 0
+    await asyncio.sleep(0.05)
+
+    assert client.calls == [("memory", "create_entities", ["e0", "e1", "e2"])]
+    assert sink.stats["written"] == 3 and sink.stats["batches"] == 1
+
+
+async def test_full_batch_is_written_without_linger():
+    client = RecordingClient()
+    sink = _sink(client, linger_ms=10_000, max_batch=2)
+
+    for n in range(5):
+        client.record_memory_entity(f"e{n}", "orchestrator_event")
+    await asyncio.sleep(0.01)
+
+    assert client.calls[0][2] == ["e0", "e1"]
+    await client.close()
+    assert [names for _, _, names in client.calls] == [["e0", "e1"], ["e2", "e3"], ["e4"]]
+    assert sink.stats["written"] == 5
+
+
+async def test_oldest_entities_dropped_when_buffer_full():
+    client = RecordingClient()
+    sink = _sink(client, linger_ms=10_000, max_pending=2)
+
+    for n in range(4):
+        client.record_memory_entity(f"e{n}", "orchestrator_event")
+    await client.flush_memory_entities()
+
+    assert client.calls == [("memory", "create_entities", ["e2", "e3"])]
+    assert sink.stats["dropped"] == 2
+
+
+async def test_failed_writes_are_counted_not_raised():
+    client = RecordingClient(fail=True)
+    sink = _sink(client, linger_ms=10_000)
+
+    client.record_memory_entity("e0", "orchestrator_error")
+    await client.close()
+
+    assert sink.stats["failed"] == 1
+    assert sink._task is None
@@ -0,0 +1,130 @@
+"""
+Unit tests for the persistent MCP stdio session pool.
+
+Uses a small fake MCP server (a Python script speaking newline-delimited
+JSON-RPC on stdin/stdout) instead of Docker containers.
+"""
+
+import asyncio
+import sys
+import textwrap
+
+import pytest
+
+from shared.lib.mcp_session_pool import (
+    MCPPoolConfig,
+    MCPSessionError,
+    MCPSessionPool,
+)
+from shared.lib.mcp_tool_client import MCPToolClient
+
+FAKE_SERVER = textwrap.dedent(
+    """
+    import json, os, sys, time
+
+    for line in sys.stdin:
+        msg = json.loads(line)
+        if "id" not in msg:
+            continue
+        method = msg["method"]
+        if method == "initialize":
+            result = {"serverInfo": {"name": "fake", "pid": os.getpid()}}
+        elif method == "ping":
+            result = {}
+        elif method == "tools/call":
+            name = msg["params"]["name"]
+            args = msg["params"]["arguments"]
+            if name == "crash":
+                sys.exit(1)
+            if name == "sleep":
+                time.sleep(args.get("seconds", 0))
+            if name == "fail":
+                print(json.dumps({"jsonrpc": "2.0", "id": msg["id"],
+                                  "error": {"code": -32000, "message": "boom"}}), flush=True)
+                continue
+            result = {"content": [{"type": "text", "text": json.dumps(args)}],
+                      "pid": os.getpid()}
+        else:
+            print(json.dumps({"jsonrpc": "2.0", "id": msg["id"],
+                              "error": {"code": -32601, "message": "not found"}}), flush=True)
+            continue
+        print(json.dumps({"jsonrpc": "2.0", "id": msg["id"], "result": result}), flush=True)
+    """
+)
+
+
+@pytest.fixture
+def fake_server(tmp_path):
+    path = tmp_path / "fake_mcp_server.py"
+    path.write_text(FAKE_SERVER)
+    return str(path)
+
+
+@pytest.fixture
+async def pool(fake_server):
+    config = MCPPoolConfig(
+        request_timeout_seconds=5.0,
+        health_check_interval_seconds=3600,
+        command_factory=lambda server: [sys.executable, fake_server],
+    )
+    pool = MCPSessionPool(config)
+    yield pool
+    await pool.close()
+
+
+async def test_call_tool_reuses_process(pool):
+    first = await pool.call_tool("memory", "echo", {"a": 1})
+    second = await pool.call_tool("memory", "echo", {"b": 2})
+
+    assert first["content"][0]["text"] == '{"a": 1}'
+    assert first["pid"] == second["pid"]
+    assert pool.get_stats()["memory"]["requests"] >= 3  # initialize + 2 calls
+
+
+async def test_concurrent_requests_are_multiplexed(pool):
+    results = await asyncio.gather(
+        *(pool.call_tool("memory", "echo", {"i": i}) for i in range(10))
+    )
+
+    assert [r["content"][0]["text"] for r in results] == [
+        f'{{"i": {i}}}' for i in range(10)
+    ]
+
+
+async def test_server_error_raises_with_code(pool):
+    with pytest.raises(MCPSessionError) as exc_info:
+        await pool.call_tool("memory", "fail")
+
+    assert exc_info.value.code == -32000
+
+
+async def test_dead_session_is_restarted(pool):
+    first = await pool.call_tool("memory", "echo")
+
+    with pytest.raises(MCPSessionError):
+        await pool.call_tool("memory", "crash")
+
+    second = await pool.call_tool("memory", "echo")
+    assert second["pid"] != first["pid"]
+    assert pool.get_stats()["memory"]["restarts"] == 1
+
+
+async def test_health_check_and_idle_reaping(pool):
+    await pool.call_tool("memory", "echo")
+
+    assert await pool.health_check() == {"memory": True}
+
+    pool.config.idle_timeout_seconds = 0
+    await asyncio.sleep(0.01)
+    assert await pool.reap_idle() == ["memory"]
+    assert pool.get_stats() == {}
+
+
+async def test_tool_client_wraps_pool_results(pool):
+    client = MCPToolClient("test", session_pool=pool)
+
+    ok = await client.invoke_tool("memory", "echo", {"x": 1})
+    failed = await client.invoke_tool("memory", "fail")
+
+    assert ok["success"] is True
+    assert failed == {"success": False, "error": "boom"}
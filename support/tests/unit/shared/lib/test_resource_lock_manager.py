@@ -0,0 +1,241 @@
+"""
+Unit tests for ResourceLockManager: waiting on release notifications, the
+in-process lock table, lease renewal and batch acquisition.
+
+The stored procedures are replaced by a small in-memory lock table so the
+wait loop can be exercised without PostgreSQL.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+
+from shared.lib.resource_lock_manager import LOCK_RELEASED_CHANNEL, ResourceLockManager
+
+
+class FakeLockTable:
+    """Mimics acquire/release_resource_lock, including FIFO queueing."""
+
+    def __init__(self, listener):
+        self.listener = listener
+        self.owners = {}
+        self.queue = []
+        self.attempts = 0
+        self.acquired_order = []
+        self.renewals = 0
+
+    async def try_acquire(self, resource_id, agent_id, timeout_seconds, reason, metadata, wait_timeout):
+        self.attempts += 1
+        waiting = [agent for resource, agent in self.queue if resource == resource_id]
+        if resource_id not in self.owners and (not waiting or waiting[0] == agent_id):
+            self.owners[resource_id] = agent_id
+            self.acquired_order.append(resource_id)
+            if (resource_id, agent_id) in self.queue:
+                self.queue.remove((resource_id, agent_id))
+            return {"lock_acquired": True, "wait_time_ms": 0, "message": "ok"}
+        if wait_timeout > 0 and (resource_id, agent_id) not in self.queue:
+            self.queue.append((resource_id, agent_id))
+        return {"lock_acquired": False, "wait_time_ms": 0, "message": "busy"}
+
+    def release(self, resource_id):
+        del self.owners[resource_id]
+        self.listener._on_notify(None, 0, LOCK_RELEASED_CHANNEL, resource_id)
+
+    async def fetchrow(self, query, resource_id, agent_id):
+        assert "release_resource_lock" in query
+        if self.owners.get(resource_id) != agent_id:
+            return {"success": False, "message": "not owner"}
+        self.release(resource_id)
+        return {"success": True, "message": "ok"}
+
+    async def fetchval(self, query, resource_id, agent_id, timeout_seconds):
+        assert "renew_resource_lock" in query
+        self.renewals += 1
+        return self.owners.get(resource_id) == agent_id
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    async def leave_queue(self, resource_id, agent_id):
+        if (resource_id, agent_id) in self.queue:
+            self.queue.remove((resource_id, agent_id))
+            self.listener._on_notify(None, 0, LOCK_RELEASED_CHANNEL, resource_id)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    mgr = ResourceLockManager("postgresql://unused", retry_delays=[10])
+    table = FakeLockTable(mgr._release_listener)
+
+    async def no_listen():
+        pass
+
+    monkeypatch.setattr(mgr._release_listener, "start", no_listen)
+    monkeypatch.setattr(mgr, "_try_acquire", table.try_acquire)
+    monkeypatch.setattr(mgr, "_leave_wait_queue", table.leave_queue)
+    mgr.pool = table
+    mgr.table = table
+    return mgr
+
+
+async def test_waiter_wakes_on_release_notification(manager):
+    manager.table.owners["deployment:prod"] = "holder"
+
+    waiter = asyncio.create_task(manager.acquire_lock("deployment:prod", "waiter"))
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+
+    started = time.monotonic()
+    manager.table.release("deployment:prod")
+    assert await asyncio.wait_for(waiter, timeout=1) is True
+    # Woken by the notification, not the 10s re-check interval
+    assert time.monotonic() - started < 0.5
+    assert manager.table.attempts == 2
+
+
+async def test_waiters_are_served_in_arrival_order(manager):
+    manager.table.owners["deployment:prod"] = "holder"
+    order = []
+
+    async def worker(agent_id):
+        await manager.acquire_lock("deployment:prod", agent_id)
+        order.append(agent_id)
+
+    first = asyncio.create_task(worker("first"))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(worker("second"))
+    await asyncio.sleep(0.01)
+
+    manager.table.release("deployment:prod")
+    await asyncio.sleep(0.05)
+    assert order == ["first"]
+
+    await manager.release_lock("deployment:prod", "first")
+    await asyncio.wait_for(asyncio.gather(first, second), timeout=1)
+    assert order == ["first", "second"]
+    await manager.release_lock("deployment:prod", "second")
+    assert manager._local_locks == {}
+
+
+async def test_timed_out_waiter_leaves_queue(manager):
+    manager.table.owners["deployment:prod"] = "holder"
+
+    acquired = await manager.acquire_lock("deployment:prod", "waiter", wait_timeout=0.1)
+
+    assert acquired is False
+    assert manager.table.queue == []
+    assert manager._release_listener._waiters == {}
+
+
+async def test_no_wait_makes_single_attempt(manager):
+    manager.table.owners["deployment:prod"] = "holder"
+
+    acquired = await manager.acquire_lock("deployment:prod", "waiter", wait=False)
+
+    assert acquired is False
+    assert manager.table.attempts == 1
+    assert manager.table.queue == []
+
+
+async def test_listener_disconnect_wakes_waiters(manager):
+    listener = manager._release_listener
+
+    async with listener.watch("deployment:prod") as released:
+        listener._on_terminated(None)
+        assert released.is_set()
+
+
+async def test_local_waiters_do_not_hit_database(manager):
+    assert await manager.acquire_lock("deployment:prod", "step-1")
+
+    waiters = [
+        asyncio.create_task(manager.acquire_lock("deployment:prod", f"step-{n}"))
+        for n in range(2, 6)
+    ]
+    await asyncio.sleep(0.05)
+    # Only the first acquisition reached the database
+    assert manager.table.attempts == 1
+
+    for n in range(1, 6):
+        if n > 1:
+            await asyncio.wait_for(waiters[n - 2], timeout=1)
+        await manager.release_lock("deployment:prod", f"step-{n}")
+
+    assert manager.table.attempts == 5
+    assert manager._local_locks == {}
+
+
+async def test_no_wait_fails_fast_on_local_holder(manager):
+    assert await manager.acquire_lock("deployment:prod", "step-1")
+
+    assert await manager.acquire_lock("deployment:prod", "step-2", wait=False) is False
+    assert manager.table.attempts == 1
+    await manager.release_lock("deployment:prod", "step-1")
+
+
+async def test_lease_renewed_until_release(manager):
+    assert await manager.acquire_lock("deployment:prod", "agent", timeout_seconds=3, renew=True)
+    renewal = manager._local_locks["deployment:prod"].renewal
+
+    # Renewal interval is a third of the timeout (1s)
+    await asyncio.sleep(1.1)
+    assert manager.table.renewals == 1
+
+    await manager.release_lock("deployment:prod", "agent")
+    await asyncio.sleep(0)
+    assert renewal.cancelled()
+
+
+async def test_lease_not_renewed_by_default(manager):
+    assert await manager.acquire_lock("deployment:prod", "agent", timeout_seconds=3)
+
+    assert manager._local_locks["deployment:prod"].renewal is None
+    await manager.release_lock("deployment:prod", "agent")
+
+
+async def test_batch_acquires_in_sorted_order(manager):
+    resources = ["deployment:prod", "config:prod.yaml", "deployment:prod", "cache:redis"]
+
+    assert await manager.acquire_locks(resources, "agent", wait=False)
+
+    assert manager.table.acquired_order == ["cache:redis", "config:prod.yaml", "deployment:prod"]
+    assert await manager.release_locks(resources, "agent")
+    assert manager.table.owners == {}
+
+
+async def test_batch_releases_partial_acquisition(manager):
+    manager.table.owners["deployment:prod"] = "someone-else"
+
+    acquired = await manager.acquire_locks(
+        ["config:prod.yaml", "deployment:prod"], "agent", wait_timeout=0.1
+    )
+
+    assert acquired is False
+    assert manager.table.owners == {"deployment:prod": "someone-else"}
+    assert manager._local_locks == {}
+
+
+async def test_queue_entry_heartbeat_outlasts_recheck_interval():
+    calls = []
+
+    class RecordingPool:
+        @asynccontextmanager
+        async def acquire(self):
+            yield self
+
+        async def fetchrow(self, query, *args):
+            calls.append((query, args))
+            return {"lock_acquired": False, "wait_time_ms": 0, "message": "busy"}
+
+    mgr = ResourceLockManager("postgresql://unused", retry_delays=[1, 4])
+    mgr.pool = RecordingPool()
+
+    await mgr._try_acquire("deployment:prod", "agent", 60, None, {}, wait_timeout=30)
+
+    query, args = calls[0]
+    assert "$7" in query
+    # Waiters re-poll at least every 4s; the entry lapses only after 8s of silence
+    assert args[-2:] == (30, 8)
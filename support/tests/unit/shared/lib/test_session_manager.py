@@ -0,0 +1,262 @@
+"""
+Unit tests for SessionManager write coalescing and the recent-history cache.
+
+A fake asyncpg pool records the statements issued, so no database is needed.
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pytest
+
+from shared.lib.session_manager import SessionManager
+
+
+class FakeConnection:
+    """Records statements; stores sessions and messages in memory."""
+
+    def __init__(self):
+        self.statements = []
+        self.transactions = 0
+        self.sessions = {}
+        self.messages = []
+        self.fail_writes = False
+        self.block_writes: asyncio.Event = None
+        self.hide_new_sessions = 0
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.transactions += 1
+        yield
+
+    async def execute(self, query, *args):
+        self.statements.append(query)
+        if "INSERT INTO chat_messages" in query:
+            if self.block_writes is not None:
+                await self.block_writes.wait()
+            if self.fail_writes:
+                raise ConnectionError("database unavailable")
+            written = {m[0] for m in self.messages}
+            rows = [row for row in zip(*args) if row[1] in self.sessions and row[0] not in written]
+            self.messages.extend(rows)
+            return f"INSERT 0 {len(rows)}"
+        return "UPDATE 1"
+
+    async def fetchrow(self, query, session_id, user_id, now, metadata, limit):
+        self.statements.append(query)
+        if self.hide_new_sessions:
+            # Another caller created the session after this statement's snapshot
+            self.hide_new_sessions -= 1
+            self.sessions.setdefault(session_id, {
+                "session_id": session_id,
+                "user_id": "other",
+                "created_at": now,
+                "updated_at": now,
+                "metadata": metadata,
+            })
+            return None
+        created = session_id not in self.sessions
+        if created:
+            self.sessions[session_id] = {
+                "session_id": session_id,
+                "user_id": user_id,
+                "created_at": now,
+                "updated_at": now,
+                "metadata": metadata,
+            }
+        history = [
+            {"message_id": m[0], "role": m[2], "content": m[3], "created_at": m[4].isoformat(), "metadata": json.loads(m[5])}
+            for m in self.messages
+            if m[1] == session_id
+        ][-limit:] if limit else []
+        return {**self.sessions[session_id], "created": created, "history": json.dumps(history)}
+
+    async def fetch(self, query, session_id, limit):
+        self.statements.append(query)
+        rows = [
+            {"message_id": m[0], "role": m[2], "content": m[3], "created_at": m[4], "metadata": m[5]}
+            for m in self.messages
+            if m[1] == session_id
+        ]
+        return list(reversed(rows))[:limit]
+
+
+@pytest.fixture
+def db():
+    return FakeConnection()
+
+
+@pytest.fixture
+async def make_manager(db, monkeypatch):
+    managers = []
+
+    def factory(linger_ms="20"):
+        monkeypatch.setenv("SESSION_WRITE_LINGER_MS", linger_ms)
+        manager = SessionManager(db_pool=db)
+        managers.append(manager)
+        return manager
+
+    yield factory
+    for manager in managers:
+        await manager.close()
+
+
+async def test_messages_within_linger_share_one_transaction(make_manager, db):
+    manager = make_manager()
+    await manager.create_session(session_id="s1")
+    await manager.create_session(session_id="s2")
+    db.statements.clear()
+
+    for n in range(3):
+        await manager.add_message("s1", "user", f"hello {n}")
+        await manager.add_message("s2", "assistant", f"hi {n}")
+    assert db.statements == []
+
+    await asyncio.sleep(0.1)
+    assert db.transactions == 1
+    assert len(db.statements) == 2
+    assert len(db.messages) == 6
+
+
+async def test_message_timestamps_are_strictly_increasing(make_manager, db):
+    manager = make_manager()
+    await manager.create_session(session_id="s1")
+
+    for n in range(20):
+        await manager.add_message("s1", "user", str(n))
+    await manager.flush()
+
+    timestamps = [m[4] for m in db.messages]
+    assert timestamps == sorted(set(timestamps))
+
+
+async def test_history_served_from_cache_after_writes(make_manager, db):
+    manager = make_manager(linger_ms="10000")
+    _, history, created = await manager.get_or_create_session("s1", user_id="u1")
+    assert created and history == []
+
+    await manager.add_message("s1", "user", "first")
+    await manager.add_message("s1", "assistant", "second")
+    db.statements.clear()
+
+    history = await manager.load_conversation_history("s1", limit=10)
+    session, cached_history, created = await manager.get_or_create_session("s1")
+
+    assert [m["content"] for m in history] == ["first", "second"]
+    assert cached_history == history
+    assert session["user_id"] == "u1" and not created
+    assert db.statements == []
+
+
+async def test_cache_miss_loads_history_in_one_round_trip(make_manager, db):
+    writer = make_manager(linger_ms="0")
+    await writer.create_session(session_id="s1")
+    for n in range(3):
+        await writer.add_message("s1", "user", str(n))
+
+    reader = make_manager()
+    db.statements.clear()
+    _, history, created = await reader.get_or_create_session("s1", history_limit=2)
+
+    assert not created
+    assert len(db.statements) == 1
+    assert [m["content"] for m in history] == ["1", "2"]
+    assert isinstance(history[0]["created_at"], datetime)
+
+
+async def test_cache_miss_flushes_pending_writes_first(make_manager, db):
+    manager = make_manager(linger_ms="10000")
+    await manager.create_session(session_id="s1")
+    await manager.add_message("s1", "user", "queued")
+    manager._history.clear()
+
+    history = await manager.load_conversation_history("s1")
+
+    assert [m["content"] for m in history] == ["queued"]
+
+
+async def test_failed_batch_is_retried(make_manager, db):
+    manager = make_manager(linger_ms="10000")
+    await manager.create_session(session_id="s1")
+    await manager.add_message("s1", "user", "keep me")
+
+    db.fail_writes = True
+    await manager.flush()
+    assert db.messages == []
+
+    db.fail_writes = False
+    await manager.close()
+    assert [m[3] for m in db.messages] == ["keep me"]
+
+
+async def test_messages_for_unknown_sessions_do_not_poison_batch(make_manager, db):
+    manager = make_manager(linger_ms="10000")
+    await manager.create_session(session_id="s1")
+    await manager.add_message("deleted", "user", "orphan")
+    await manager.add_message("s1", "user", "kept")
+
+    await manager.flush()
+
+    assert [m[3] for m in db.messages] == ["kept"]
+
+
+async def test_writer_retries_failed_batch_without_new_writes(make_manager, db):
+    manager = make_manager(linger_ms="10")
+    manager._writer.retry_delay = 0.05
+    await manager.create_session(session_id="s1")
+
+    db.fail_writes = True
+    await manager.add_message("s1", "user", "first")
+    await asyncio.sleep(0.03)
+    await manager.add_message("s1", "user", "second")
+    await asyncio.sleep(0.03)
+    assert db.messages == []
+
+    db.fail_writes = False
+    await asyncio.sleep(0.1)
+
+    assert [m[3] for m in db.messages] == ["first", "second"]
+
+
+async def test_cancelled_write_keeps_messages(make_manager, db):
+    manager = make_manager(linger_ms="10000")
+    await manager.create_session(session_id="s1")
+    await manager.add_message("s1", "user", "in flight")
+
+    db.block_writes = asyncio.Event()
+    flush = asyncio.create_task(manager.flush())
+    await asyncio.sleep(0.01)
+    flush.cancel()
+    await asyncio.gather(flush, return_exceptions=True)
+    assert manager._writer.pending_for("s1")
+
+    db.block_writes = None
+    await manager.close()
+    assert [m[3] for m in db.messages] == ["in flight"]
+
+
+async def test_close_drains_instead_of_dropping(make_manager, db):
+    manager = make_manager(linger_ms="10000")
+    await manager.create_session(session_id="s1")
+    for n in range(3):
+        await manager.add_message("s1", "user", str(n))
+
+    await manager.close()
+
+    assert [m[3] for m in db.messages] == ["0", "1", "2"]
+
+
+async def test_session_created_concurrently_is_loaded(make_manager, db):
+    manager = make_manager()
+    db.hide_new_sessions = 1
+
+    session, history, created = await manager.get_or_create_session("s1", user_id="u1")
+
+    assert session["user_id"] == "other"
+    assert not created and history == []
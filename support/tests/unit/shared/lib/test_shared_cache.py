@@ -0,0 +1,115 @@
+"""
+Unit tests for the shared LRU/TTL cache and its Redis tier.
+"""
+
+import time
+
+import fakeredis.aioredis
+import pytest
+
+from shared.lib.intent_classifier import IntentClassifier
+from shared.lib.shared_cache import LRUCache, TieredCache
+
+
+class TestLRUCache:
+    """Eviction, TTL and stats behaviour."""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache("test_lru", max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3)
+
+        assert cache.keys() == ["a", "c"]
+        assert cache.stats.evictions == 1
+
+    def test_entries_expire_after_ttl(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(time, "monotonic", lambda: now[0])
+        cache = LRUCache("test_ttl", max_size=10, ttl_seconds=5)
+        cache.set("a", 1)
+
+        now[0] += 4
+        assert cache.get("a") == 1
+        now[0] += 2
+        assert cache.get("a") is None
+        assert cache.stats.expirations == 1
+        assert len(cache) == 0
+
+    def test_hit_rate(self):
+        cache = LRUCache("test_stats", max_size=10)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["hit_rate_percent"] == pytest.approx(66.67)
+
+    def test_falsy_values_are_hits(self):
+        cache = LRUCache("test_falsy", max_size=10)
+        cache.set("zero", 0)
+
+        assert cache.get("zero", default="miss") == 0
+
+    def test_insert_cost_independent_of_size(self):
+        small = LRUCache("test_small", max_size=100)
+        large = LRUCache("test_large", max_size=100_000)
+        for i in range(100_000):
+            large.set(i, i)
+        for i in range(100):
+            small.set(i, i)
+
+        def time_inserts(cache, start):
+            begin = time.perf_counter()
+            for i in range(start, start + 5000):
+                cache.set(i, i)
+            return time.perf_counter() - begin
+
+        assert time_inserts(large, 200_000) < time_inserts(small, 200_000) * 5
+
+
+class TestTieredCache:
+    """Redis tier shares entries between caches (processes)."""
+
+    @pytest.fixture
+    def redis_server(self):
+        return fakeredis.FakeServer()
+
+    def make_cache(self, redis_server):
+        tiered = TieredCache(LRUCache("test_tiered", max_size=10), redis_url="redis://fake")
+        tiered._redis = fakeredis.aioredis.FakeRedis(server=redis_server, decode_responses=True)
+        tiered._redis_disabled = False
+        return tiered
+
+    async def test_remote_hit_populates_local(self, redis_server):
+        writer = self.make_cache(redis_server)
+        reader = self.make_cache(redis_server)
+
+        await writer.aset("lib", {"id": "/org/lib"})
+        value = await reader.aget("lib")
+
+        assert value == {"id": "/org/lib"}
+        assert reader.remote_stats.hits == 1
+        assert reader.local.get("lib") == {"id": "/org/lib"}
+
+    async def test_without_redis_is_local_only(self):
+        tiered = TieredCache(LRUCache("test_local_only", max_size=10))
+
+        await tiered.aset("k", "v")
+
+        assert await tiered.aget("k") == "v"
+        assert tiered.get_stats()["redis_enabled"] is False
+
+
+def test_intent_classifier_cache_is_lru():
+    classifier = IntentClassifier()
+    classifier.classify("/execute deploy the service")
+
+    intent, confidence, reasoning = classifier.classify("/execute deploy the service")
+
+    assert reasoning == "cached"
+    assert classifier._classification_cache.get_stats()["hits"] == 1
@@ -0,0 +1,155 @@
+"""
+Unit tests for SSEStream: content coalescing, ordering with other frames,
+backpressure and keepalives.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from shared.lib.sse_stream import SSEStream, sse_frame
+
+
+def _payloads(frames):
+    return [json.loads(f[len("data: "):]) for f in frames if f.startswith("data: ")]
+
+
+async def _collect(stream, producer):
+    return [frame async for frame in stream.iterate(producer)]
+
+
+async def test_tokens_are_coalesced_and_accumulated():
+    stream = SSEStream(max_frame_chars=1000, max_delay_ms=50)
+
+    async def producer():
+        for n in range(100):
+            stream.content(f"t{n} ")
+        return
+        yield
+
+    frames = await _collect(stream, producer())
+
+    assert _payloads(frames) == [{"type": "content", "content": stream.text}]
+    assert stream.text.startswith("t0 t1 ") and stream.text.endswith("t99 ")
+
+
+async def test_other_frames_keep_their_position():
+    stream = SSEStream(max_frame_chars=1000, max_delay_ms=1000)
+
+    async def producer():
+        stream.content("before ")
+        stream.content("tool")
+        yield sse_frame({"type": "tool_call", "tool": "read_file"})
+        stream.content("after")
+
+    payloads = _payloads(await _collect(stream, producer()))
+
+    assert payloads == [
+        {"type": "content", "content": "before tool"},
+        {"type": "tool_call", "tool": "read_file"},
+        {"type": "content", "content": "after"},
+    ]
+
+
+async def test_pending_content_flushed_after_delay_budget():
+    stream = SSEStream(max_frame_chars=1000, max_delay_ms=20)
+    received = []
+
+    async def producer():
+        stream.content("early")
+        await asyncio.sleep(0.2)
+        stream.content("late")
+        return
+        yield
+
+    started = asyncio.get_running_loop().time()
+    async for frame in stream.iterate(producer()):
+        received.append((asyncio.get_running_loop().time() - started, frame))
+
+    assert [json.loads(f[6:])["content"] for _, f in received] == ["early", "late"]
+    # The first frame did not wait for the producer's next event
+    assert received[0][0] < 0.15
+
+
+async def test_slow_client_gets_larger_frames_without_blocking_producer():
+    stream = SSEStream(max_frame_chars=8, max_delay_ms=0)
+    produced = asyncio.Event()
+
+    async def producer():
+        for n in range(50):
+            stream.content(f"{n},")
+            await asyncio.sleep(0)
+        produced.set()
+        return
+        yield
+
+    frames = []
+    async for frame in stream.iterate(producer()):
+        frames.append(frame)
+        await asyncio.sleep(0.01)  # slow client
+
+    assert produced.is_set()
+    assert "".join(p["content"] for p in _payloads(frames)) == stream.text
+    assert len(frames) < 50
+
+
+async def test_full_frame_buffer_pauses_producer():
+    stream = SSEStream(max_buffered_frames=2)
+    sent = 0
+
+    async def producer():
+        nonlocal sent
+        for n in range(10):
+            yield sse_frame({"type": "tool_call", "n": n})
+            sent += 1
+
+    iterator = stream.iterate(producer())
+    await iterator.__anext__()
+    await asyncio.sleep(0.05)
+
+    assert sent <= 4
+    rest = [frame async for frame in iterator]
+    assert len(rest) == 9
+
+
+async def test_idle_stream_sends_keepalive():
+    stream = SSEStream(keepalive_seconds=0.05)
+
+    async def producer():
+        await asyncio.sleep(0.12)
+        yield sse_frame({"type": "done"})
+
+    frames = await _collect(stream, producer())
+
+    assert ": keepalive\n\n" in frames
+    assert _payloads(frames) == [{"type": "done"}]
+
+
+async def test_closing_the_response_cancels_the_producer():
+    stream = SSEStream()
+    cancelled = asyncio.Event()
+
+    async def producer():
+        try:
+            yield sse_frame({"type": "start"})
+            await asyncio.sleep(10)
+        finally:
+            cancelled.set()
+
+    iterator = stream.iterate(producer())
+    await iterator.__anext__()
+    await iterator.aclose()
+
+    assert cancelled.is_set()
+
+
+async def test_producer_errors_propagate():
+    stream = SSEStream()
+
+    async def producer():
+        yield sse_frame({"type": "start"})
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await _collect(stream, producer())
@@ -0,0 +1,103 @@
+"""
+Unit tests for the EMBEDDING tool selection strategy.
+
+A deterministic bag-of-words embedder stands in for a real embedding model.
+"""
+
+import re
+from unittest.mock import MagicMock
+
+import pytest
+
+from shared.lib.progressive_mcp_loader import ProgressiveMCPLoader, ToolLoadingStrategy
+from shared.lib.tool_embedding_index import ToolEmbeddingIndex
+
+VOCAB = ["git", "commit", "pull", "request", "docker", "image", "build", "file", "read", "memory"]
+
+
+class BagOfWordsEmbeddings:
+    """Counts vocabulary words; has no async methods, exercising the to_thread path."""
+
+    def __init__(self):
+        self.query_calls = 0
+        self.document_calls = 0
+
+    def _embed(self, text):
+        words = re.findall(r"[a-z]+", text.lower())
+        return [float(words.count(v)) for v in VOCAB]
+
+    def embed_documents(self, texts):
+        self.document_calls += 1
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        return self._embed(text)
+
+
+CATALOG = {
+    "servers": [
+        {"name": "memory", "tools": ["create_entities"]},
+        {"name": "gitmcp", "tools": ["git_commit", "create_pull_request"]},
+        {"name": "dockerhub", "tools": ["build_image"]},
+        {"name": "rust-mcp-filesystem", "tools": ["read_file"]},
+    ]
+}
+
+
+def make_loader(embeddings):
+    discovery = MagicMock()
+    discovery.discover_servers.return_value = CATALOG
+    mcp_client = MagicMock()
+    mcp_client.profile = {}
+    return ProgressiveMCPLoader(mcp_client, discovery, embeddings=embeddings)
+
+
+def test_index_ranks_by_cosine_similarity():
+    index = ToolEmbeddingIndex(BagOfWordsEmbeddings())
+    index.build({"gitmcp": ["git_commit"], "dockerhub": ["build_image"]})
+
+    matches = index.search("build the docker image", top_k=2)
+
+    assert [(m.server, m.tool) for m in matches][0] == ("dockerhub", "build_image")
+    assert matches[0].score > matches[-1].score
+
+
+async def test_async_selection_embeds_catalog_once():
+    embeddings = BagOfWordsEmbeddings()
+    loader = make_loader(embeddings)
+
+    first = await loader.aget_tools_for_task(
+        "open a pull request for the commit", strategy=ToolLoadingStrategy.EMBEDDING
+    )
+    await loader.aget_tools_for_task(
+        "build a docker image", strategy=ToolLoadingStrategy.EMBEDDING
+    )
+
+    servers = [ts.server for ts in first]
+    assert servers[0] == "memory"  # universal tools always first
+    assert "gitmcp" in servers
+    assert embeddings.document_calls == 1
+    assert embeddings.query_calls == 2
+
+
+async def test_discovery_refresh_rebuilds_index():
+    embeddings = BagOfWordsEmbeddings()
+    loader = make_loader(embeddings)
+    await loader.aget_tools_for_task("git commit", strategy=ToolLoadingStrategy.EMBEDDING)
+
+    loader._on_discovery_refresh(CATALOG)
+    await loader.aget_tools_for_task("docker build", strategy=ToolLoadingStrategy.EMBEDDING)
+
+    assert embeddings.document_calls == 2
+
+
+def test_falls_back_to_progressive_without_embeddings():
+    loader = make_loader(embeddings=None)
+
+    toolsets = loader.get_tools_for_task(
+        "commit the code", strategy=ToolLoadingStrategy.EMBEDDING
+    )
+
+    assert {ts.server for ts in toolsets} == {"memory", "gitmcp", "rust-mcp-filesystem"}
+    assert all("Embedding" not in ts.rationale for ts in toolsets)
@@ -0,0 +1,180 @@
+"""
+Unit tests for the state service's pooled handlers: pool creation, bulk log
+inserts and keyset pagination of task logs.
+
+A fake asyncpg pool stands in for PostgreSQL; requests go through the ASGI
+app with httpx.
+"""
+
+import asyncio
+import importlib.util
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+import pytest
+
+_MAIN = Path(__file__).resolve().parents[5] / "shared" / "services" / "state" / "main.py"
+_spec = importlib.util.spec_from_file_location("state_service_main", _MAIN)
+state_service = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(state_service)
+
+START = datetime(2026, 1, 1)
+
+
+class FakeConnection:
+    """Answers the agent_logs queries from an in-memory table."""
+
+    def __init__(self):
+        self.logs = []
+
+    def add_logs(self, task_id, count):
+        for _ in range(count):
+            row_id = len(self.logs) + 1
+            self.logs.append({
+                "id": row_id,
+                "task_id": task_id,
+                "agent": "orchestrator",
+                "log_level": "info",
+                "message": f"log {row_id}",
+                "metadata": None,
+                # Two rows per timestamp so the id tie-breaker matters
+                "timestamp": START + timedelta(seconds=row_id // 2),
+            })
+
+    async def fetch(self, query, task_id, *args):
+        assert "FROM agent_logs" in query
+        rows = sorted(
+            (row for row in self.logs if row["task_id"] == task_id),
+            key=lambda row: (row["timestamp"], row["id"]),
+        )
+        if "(timestamp, id) >" in query:
+            after_ts, after_id, limit = args
+            rows = [row for row in rows if (row["timestamp"], row["id"]) > (after_ts, after_id)]
+        else:
+            (limit,) = args
+        return rows if limit is None else rows[:limit]
+
+    async def fetchval(self, query, *columns):
+        assert "unnest" in query
+        for task_id, agent, log_level, message, metadata in zip(*columns):
+            self.logs.append({
+                "id": len(self.logs) + 1,
+                "task_id": task_id,
+                "agent": agent,
+                "log_level": log_level,
+                "message": message,
+                "metadata": metadata,
+                "timestamp": START,
+            })
+        return len(columns[0])
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    conn = FakeConnection()
+    monkeypatch.setattr(state_service, "_pool", FakePool(conn))
+    return conn
+
+
+@pytest.fixture
+async def client(conn):
+    transport = httpx.ASGITransport(app=state_service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://state") as client:
+        yield client
+
+
+async def test_pool_created_once_with_json_codec(monkeypatch):
+    monkeypatch.setattr(state_service, "_pool", None)
+    created = []
+
+    async def create_pool(**kwargs):
+        await asyncio.sleep(0.01)
+        created.append(kwargs)
+        return FakePool(FakeConnection())
+
+    monkeypatch.setattr(state_service.asyncpg, "create_pool", create_pool)
+
+    pools = await asyncio.gather(*(state_service.get_db_pool() for _ in range(5)))
+
+    assert len(created) == 1
+    assert all(pool is pools[0] for pool in pools)
+    assert created[0]["init"] is state_service._init_connection
+    assert created[0]["max_size"] == state_service.PG_POOL_MAX_SIZE
+
+
+async def test_logs_without_limit_returns_every_row(client, conn):
+    conn.add_logs("task-1", 7)
+    conn.add_logs("task-2", 2)
+
+    response = await client.get("/logs/task-1")
+
+    assert response.status_code == 200
+    assert [log["id"] for log in response.json()] == [1, 2, 3, 4, 5, 6, 7]
+    assert "x-next-cursor" not in response.headers
+
+
+async def test_logs_paginate_with_keyset_cursor(client, conn):
+    conn.add_logs("task-1", 6)
+
+    pages = []
+    params = {"limit": 4}
+    while True:
+        response = await client.get("/logs/task-1", params=params)
+        pages.append([log["id"] for log in response.json()])
+        if "x-next-cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["x-next-cursor"]
+
+    assert pages == [[1, 2, 3, 4], [5, 6]]
+
+
+async def test_full_last_page_has_no_cursor(client, conn):
+    conn.add_logs("task-1", 4)
+
+    response = await client.get("/logs/task-1", params={"limit": 4})
+
+    assert len(response.json()) == 4
+    assert "x-next-cursor" not in response.headers
+
+
+async def test_invalid_cursor_rejected(client, conn):
+    response = await client.get("/logs/task-1", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+
+async def test_batch_inserts_in_one_statement(client, conn):
+    logs = [
+        {"task_id": "task-1", "agent": "feature-dev", "log_level": "info", "message": f"m{n}"}
+        for n in range(3)
+    ]
+
+    response = await client.post("/logs/batch", json={"logs": logs})
+
+    assert response.json() == {"success": True, "inserted": 3}
+    assert [row["message"] for row in conn.logs] == ["m0", "m1", "m2"]
+
+
+async def test_batch_size_is_bounded(client, conn):
+    log = {"task_id": "task-1", "agent": "feature-dev", "log_level": "info", "message": "m"}
+
+    response = await client.post(
+        "/logs/batch", json={"logs": [log] * (state_service.MAX_LOG_BATCH + 1)}
+    )
+
+    assert response.status_code == 422
+    assert conn.logs == []
@@ -19,19 +19,25 @@ from shared.lib.error_classification import (
     ErrorSeverity,
     RecoveryTier,
     classify_error,
+    clear_classification_cache,
     get_error_signature,
     is_retriable,
+    _classification_cache,
+    _normalize_error_message,
 )
 from shared.lib.error_pattern_memory import (
     ErrorPattern,
     PatternMatch,
     ResolutionStep,
     ErrorPatternMemory,
+    EmbeddingWorker,
+    close_embedding_worker,
 )
 from shared.lib.error_recovery_engine import (
     RecoveryResult,
     RecoveryOutcome,
     ErrorRecoveryEngine,
+    LoopProtection,
     with_recovery,
 )
 
@@ -99,6 +105,49 @@ class TestErrorClassification:
         classification = classify_error(error)
         # Config errors may or may not be retriable depending on patterns
         assert classification.category in (ErrorCategory.CONFIG, ErrorCategory.EXTERNAL)
+    
+    def test_normalization_replaces_variable_parts(self):
+        """IDs, UUIDs, addresses, IPs and timestamps normalize to placeholders."""
+        message = (
+            "Request 123e4567-e89b-12d3-a456-426614174000 to 10.0.0.1:5432 "
+            "failed at 2024-01-02T10:11:12Z (obj 0x7fff1234, job 98765)"
+        )
+        
+        assert _normalize_error_message(message) == (
+            "request <uuid> to <ip> failed at <timestamp> (obj <addr>, job <id>)"
+        )
+    
+    def test_classification_is_memoized_per_type_and_normalized_message(self):
+        """Equivalent errors are classified once; a different type is a new entry."""
+        clear_classification_cache()
+        
+        first = classify_error(ConnectionError("Connection refused to 10.0.0.1:8080"))
+        second = classify_error(ConnectionError("Connection refused to 10.0.0.2:9090"))
+        classify_error(TimeoutError("Connection refused to 10.0.0.1:8080"))
+        
+        stats = _classification_cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["size"] == 2
+        assert first.category == second.category == ErrorCategory.NETWORK
+    
+    def test_memoized_classification_does_not_share_context(self):
+        """Cached results get the caller's context and independent lists."""
+        clear_classification_cache()
+        
+        first = classify_error(Exception("merge conflict"), context={"step": "a"})
+        first.remediation_hints.clear()
+        second = classify_error(Exception("merge conflict"), context={"step": "b"})
+        
+        assert second.context == {"step": "b"}
+        assert second.remediation_hints
+        assert second.category == ErrorCategory.GIT
+    
+    def test_unmatched_message_defaults_to_external(self):
+        """Messages matching no pattern and no known type fall back to EXTERNAL."""
+        classification = classify_error(RuntimeError("something odd happened"))
+        
+        assert classification.category == ErrorCategory.EXTERNAL
+        assert classification.matched_patterns == []
 
 
 class TestResolutionStep:
@@ -231,6 +280,322 @@ class TestErrorPatternMemory:
         assert result is None
 
 
+class TestErrorPatternCache:
+    """Tests for the pattern memory's read-through cache (mocked Qdrant)."""
+    
+    @pytest.fixture
+    def qdrant(self):
+        mock = MagicMock()
+        mock.is_enabled.return_value = True
+        mock.client.get_collections.return_value = MagicMock(collections=[MagicMock()])
+        mock.client.scroll.return_value = ([], None)
+        mock.search_semantic = AsyncMock(return_value=[])
+        mock.upsert_points = AsyncMock(return_value=True)
+        return mock
+    
+    @pytest.fixture
+    def memory(self, qdrant):
+        worker = EmbeddingWorker(model_loader=lambda: FakeEmbeddingModel())
+        memory = ErrorPatternMemory(qdrant_client=qdrant, embedding_worker=worker)
+        yield memory
+        worker.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_unknown_error_cached_negatively(self, memory, qdrant):
+        """Repeated unknown errors should not go back to Qdrant."""
+        for _ in range(5):
+            matches = await memory.find_similar_patterns(ConnectionError("Connection refused"))
+            assert matches == []
+        assert qdrant.client.scroll.call_count == 1
+        assert qdrant.search_semantic.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_negative_entries_expire(self, memory, qdrant):
+        """Negative entries should only live for negative_ttl_seconds."""
+        memory._negative_ttl_seconds = 0.05
+        await memory.find_similar_patterns(ConnectionError("Connection refused"))
+        await asyncio.sleep(0.1)
+        await memory.find_similar_patterns(ConnectionError("Connection refused"))
+        assert qdrant.search_semantic.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_stored_pattern_replaces_negative_entry(self, memory, qdrant):
+        """Storing a pattern should make it visible despite an earlier miss."""
+        error = ConnectionError("Connection refused")
+        assert await memory.find_similar_patterns(error) == []
+        
+        await memory.store_pattern(error, [ResolutionStep(action="retry")], success=True)
+        matches = await memory.find_similar_patterns(error)
+        
+        assert len(matches) == 1
+        assert matches[0].is_exact_match
+    
+    @pytest.mark.asyncio
+    async def test_cache_is_bounded(self, memory):
+        """The local cache should evict beyond its configured size."""
+        for n in range(memory._local_cache.max_size + 10):
+            memory._add_negative(f"signature-{n}")
+        assert len(memory._local_cache) == memory._local_cache.max_size
+    
+    @pytest.mark.asyncio
+    async def test_prefetch_loads_most_used_patterns(self, memory, qdrant):
+        """Startup prefetch should cache the top-N patterns by attempt count."""
+        ranked = [
+            MagicMock(id=f"p{n}", payload={"attempt_count": n}) for n in range(5)
+        ]
+        qdrant.client.scroll.return_value = (ranked, None)
+        qdrant.client.retrieve.side_effect = lambda collection_name, ids, with_vectors: [
+            MagicMock(
+                payload=ErrorPattern(
+                    id=pid, signature_key=f"sig-{pid}", category=ErrorCategory.NETWORK,
+                    error_type="ConnectionError", message_template="refused",
+                    resolution_steps=[ResolutionStep(action="retry")],
+                ).to_dict(),
+                vector=[0.1, 0.2],
+            )
+            for pid in ids
+        ]
+        
+        assert await memory.prefetch_top_patterns(limit=2) == 2
+        
+        assert qdrant.client.retrieve.call_args.kwargs["ids"] == ["p4", "p3"]
+        assert memory._get_from_cache("sig-p4").id == "p4"
+        assert memory._get_from_cache("sig-p0") is None
+
+
+class FakeEmbeddingModel:
+    """Stands in for SentenceTransformer; records batches and calling threads."""
+    
+    def __init__(self):
+        self.batches = []
+        self.threads = []
+    
+    def encode(self, texts, batch_size=None, convert_to_numpy=True):
+        import threading
+        import numpy as np
+        self.batches.append(list(texts))
+        self.threads.append(threading.get_ident())
+        return np.array([[float(len(text)), 1.0] for text in texts])
+
+
+class TestEmbeddingWorker:
+    """Tests for the batched, off-loop embedding worker."""
+    
+    @pytest.fixture
+    def model(self):
+        return FakeEmbeddingModel()
+    
+    @pytest.fixture
+    def worker(self, model):
+        loads = []
+        
+        def loader():
+            import threading
+            loads.append(threading.get_ident())
+            return model
+        
+        worker = EmbeddingWorker(model_loader=loader, batch_window_ms=20)
+        worker.loads = loads
+        yield worker
+        worker.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_batch(self, worker, model):
+        """Requests inside the batching window should be encoded together."""
+        results = await asyncio.gather(
+            worker.embed("Connection refused"),
+            worker.embed("Timeout exceeded"),
+            worker.embed("Permission denied"),
+        )
+        assert len(model.batches) == 1
+        assert len(model.batches[0]) == 3
+        assert results[0] == [18.0, 1.0]
+    
+    @pytest.mark.asyncio
+    async def test_embeddings_memoized_by_normalized_message(self, worker, model):
+        """Messages differing only in variable parts should reuse one embedding."""
+        first = await worker.embed("Connection to 10.0.0.1 refused (request 12345)")
+        second = await worker.embed("Connection to 10.0.0.2 refused (request 67890)")
+        assert first == second
+        assert len(model.batches) == 1
+    
+    @pytest.mark.asyncio
+    async def test_identical_in_flight_requests_deduplicated(self, worker, model):
+        """Duplicate concurrent requests should be encoded once."""
+        await asyncio.gather(*(worker.embed("Connection refused") for _ in range(5)))
+        assert model.batches == [["Connection refused"]]
+    
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_without_waiting(self, model):
+        """Reaching batch_size should flush before the window expires."""
+        worker = EmbeddingWorker(model_loader=lambda: model, batch_size=2, batch_window_ms=10_000)
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(worker.embed("error one"), worker.embed("error two")),
+                timeout=1,
+            )
+        finally:
+            worker.shutdown()
+        assert len(model.batches) == 1
+    
+    @pytest.mark.asyncio
+    async def test_model_loaded_lazily_off_event_loop(self, worker, model):
+        """The model should load on first use, on the worker thread."""
+        import threading
+        assert worker.loads == []
+        await worker.embed("Connection refused")
+        assert len(worker.loads) == 1
+        assert worker.loads[0] != threading.get_ident()
+        assert model.threads[0] != threading.get_ident()
+    
+    @pytest.mark.asyncio
+    async def test_close_flushes_pending_requests(self, model):
+        """close() should encode queued requests instead of abandoning them."""
+        worker = EmbeddingWorker(model_loader=lambda: model, batch_window_ms=10_000)
+        request = asyncio.create_task(worker.embed("Connection refused"))
+        await asyncio.sleep(0)
+        
+        await worker.close()
+        
+        assert await request == [18.0, 1.0]
+        assert not worker._flush_tasks
+    
+    @pytest.mark.asyncio
+    async def test_close_embedding_worker_drains_shared_worker(self, model):
+        """Shutdown should drain the shared worker and tolerate one never created."""
+        import shared.lib.error_pattern_memory as epm
+        
+        await close_embedding_worker()
+        worker = EmbeddingWorker(model_loader=lambda: model, batch_window_ms=10_000)
+        with patch.object(epm, "_embedding_worker", worker):
+            request = asyncio.create_task(worker.embed("Connection refused"))
+            await asyncio.sleep(0)
+            
+            await close_embedding_worker()
+            
+            assert await request == [18.0, 1.0]
+            assert epm._embedding_worker is None
+    
+    @pytest.mark.asyncio
+    async def test_failed_flush_still_resolves_waiters(self, model, caplog):
+        """An error while storing results should be logged, not leave callers hanging."""
+        worker = EmbeddingWorker(model_loader=lambda: model, batch_window_ms=1)
+        worker._cache.set = lambda *args: (_ for _ in ()).throw(RuntimeError("cache broken"))
+        try:
+            result = await asyncio.wait_for(worker.embed("Connection refused"), timeout=1)
+            await asyncio.sleep(0)
+        finally:
+            await worker.close()
+        assert result == [18.0, 1.0]
+        assert "Embedding flush failed" in caplog.text
+    
+    @pytest.mark.asyncio
+    async def test_unavailable_model_returns_none(self):
+        """A missing model should yield None rather than raising."""
+        worker = EmbeddingWorker(model_loader=lambda: None)
+        try:
+            assert await worker.embed("Connection refused") is None
+        finally:
+            worker.shutdown()
+
+
+class TestLoopProtection:
+    """Tests for bounded, sharded loop protection state."""
+    
+    @pytest.fixture
+    def clock(self):
+        class Clock:
+            now = 1000.0
+            
+            def __call__(self):
+                return self.now
+        return Clock()
+    
+    @pytest.fixture
+    def protection(self, clock):
+        config = {
+            "max_tier_escalations_per_workflow": 2,
+            "cooldown_seconds": 300,
+            "sweep_interval_seconds": 60,
+            "loop_detection": {"window_seconds": 60, "max_identical_errors": 3},
+        }
+        return LoopProtection(config, clock=clock)
+    
+    @pytest.fixture
+    def signature(self):
+        return get_error_signature(ConnectionError("Connection refused"))
+    
+    @pytest.mark.asyncio
+    async def test_loop_detected_within_window(self, protection, signature):
+        """Repeated identical errors inside the window should trip detection."""
+        for _ in range(2):
+            await protection.record_error(signature)
+        assert await protection.check_loop(signature) is False
+        await protection.record_error(signature)
+        assert await protection.check_loop(signature) is True
+    
+    @pytest.mark.asyncio
+    async def test_errors_outside_window_ignored(self, protection, signature, clock):
+        """Errors older than the window should not count toward a loop."""
+        for _ in range(3):
+            await protection.record_error(signature)
+            clock.now += 25
+        assert await protection.check_loop(signature) is False
+    
+    @pytest.mark.asyncio
+    async def test_error_history_is_bounded(self, protection, signature):
+        """Only the last max_identical_errors timestamps should be kept."""
+        for _ in range(100):
+            await protection.record_error(signature)
+        shard = protection._shard(signature.to_key())
+        assert len(shard.error_times[signature.to_key()]) == 3
+    
+    @pytest.mark.asyncio
+    async def test_escalation_limit_and_reset(self, protection, signature):
+        """Workflows exceeding max escalations should trip until reset."""
+        await protection.record_escalation("wf-1")
+        await protection.record_escalation("wf-1")
+        assert await protection.check_loop(signature, "wf-1") is True
+        await protection.reset_workflow("wf-1")
+        assert await protection.check_loop(signature, "wf-1") is False
+    
+    @pytest.mark.asyncio
+    async def test_stale_keys_swept(self, protection, signature, clock):
+        """Idle signatures and unfinished workflows should be swept."""
+        await protection.record_error(signature)
+        await protection.record_escalation("wf-abandoned")
+        assert protection.get_stats()["tracked_workflows"] == 1
+        
+        clock.now += 301
+        await protection.record_escalation("wf-active")
+        
+        stats = protection.get_stats()
+        assert stats["tracked_signatures"] == 0
+        assert stats["tracked_workflows"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_redis_backend_shared_across_replicas(self, signature, clock):
+        """Replicas sharing Redis should see each other's errors."""
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        config = {"loop_detection": {"window_seconds": 60, "max_identical_errors": 3}}
+        replicas = []
+        for _ in range(2):
+            replica = LoopProtection(config, clock=clock)
+            replica._redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+            replica._redis_disabled = False
+            replicas.append(replica)
+        
+        await replicas[0].record_error(signature)
+        clock.now += 1
+        await replicas[1].record_error(signature)
+        clock.now += 1
+        await replicas[0].record_error(signature)
+        
+        assert await replicas[1].check_loop(signature) is True
+        assert replicas[1].get_stats()["tracked_signatures"] == 0
+
+
 class TestErrorRecoveryEngine:
     """Tests for ErrorRecoveryEngine."""
     
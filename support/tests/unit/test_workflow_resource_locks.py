@@ -0,0 +1,72 @@
+"""Unit tests for workflow step resource locks (ResourceLockManager leases)
+
+Tests verify:
+1. Steps hold the lock under a workflow-scoped owner with lease renewal
+2. A lock still busy after the wait fails the step
+3. Lock service errors fall back to local tracking
+"""
+
+import pytest
+from unittest.mock import AsyncMock
+
+from agent_orchestrator.workflows.workflow_engine import (
+    WorkflowDefinition,
+    WorkflowEngine,
+    WorkflowState,
+    WorkflowStatus,
+)
+
+
+@pytest.fixture
+def lock_manager():
+    manager = AsyncMock()
+    manager.acquire_lock = AsyncMock(return_value=True)
+    manager.release_lock = AsyncMock(return_value=True)
+    return manager
+
+
+@pytest.fixture
+def engine(lock_manager):
+    return WorkflowEngine(llm_client=None, state_client=AsyncMock(), lock_manager=lock_manager)
+
+
+@pytest.fixture
+def state():
+    definition = WorkflowDefinition(name="deploy", version="1", description="", steps=[])
+    return WorkflowState(
+        workflow_id="wf-1",
+        definition=definition,
+        status=WorkflowStatus.RUNNING,
+        current_step="deploy_prod",
+    )
+
+
+async def test_lock_held_with_renewal_and_released(engine, lock_manager, state):
+    await engine._acquire_lock("deployment:prod", state)
+
+    args, kwargs = lock_manager.acquire_lock.call_args
+    assert args == ("deployment:prod", "workflow:wf-1")
+    assert kwargs["renew"] is True
+    assert state.resource_locks == ["deployment:prod"]
+
+    await engine._release_lock("deployment:prod", state)
+
+    lock_manager.release_lock.assert_awaited_once_with("deployment:prod", "workflow:wf-1")
+    assert state.resource_locks == []
+
+
+async def test_busy_lock_fails_step(engine, lock_manager, state):
+    lock_manager.acquire_lock.return_value = False
+
+    with pytest.raises(RuntimeError, match="deployment:prod"):
+        await engine._acquire_lock("deployment:prod", state)
+
+    assert state.resource_locks == []
+
+
+async def test_lock_service_error_tracks_locally(engine, lock_manager, state):
+    lock_manager.acquire_lock.side_effect = ConnectionError("postgres down")
+
+    await engine._acquire_lock("deployment:prod", state)
+
+    assert state.resource_locks == ["deployment:prod"]